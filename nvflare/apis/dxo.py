@@ -24,6 +24,7 @@ class DataKind(object):
     FL_MODEL = "FL_MODEL"
     WEIGHTS = "WEIGHTS"
     WEIGHT_DIFF = "WEIGHT_DIFF"
+    SPARSE_WEIGHT_DIFF = "SPARSE_WEIGHT_DIFF"  # WEIGHT_DIFF with sparse or low-rank values
     METRICS = "METRICS"
     ANALYTIC = "ANALYTIC"
     COLLECTION = "COLLECTION"  # Dict or List of DXO objects
@@ -187,6 +187,8 @@ class FLContextKey(object):
     SERVER_CONFIG = "__server_config__"
     SERVER_HOST_NAME = "__server_host_name__"
     PROCESS_TYPE = ReservedKey.PROCESS_TYPE
+    TASK_REQUEST_HOLD_TIME = "__task_request_hold_time__"  # how long the client allows its task request to be held
+    PENDING_TASK_IDS = "__pending_task_ids__"  # ids of the tasks the client is still working on when prefetching
 
 
 class ProcessType:
@@ -453,6 +455,8 @@ class FLMetaKey:
     SITE_NAME = "site_name"
     PROCESS_RC_FILE = "_process_rc.txt"
     SUBMIT_MODEL_NAME = "submit_model_name"
+    AGGREGATED_WEIGHT = "aggregated_weight"
+    AGGREGATED_CONTRIBUTORS = "aggregated_contributors"
 
 
 class StreamCtxKey:
@@ -504,6 +508,27 @@ class ConfigVarName:
     # server: wait this long since job schedule time before starting to check dead/disconnected clients
     DEAD_CLIENT_CHECK_LEAD_TIME = "dead_client_check_lead_time"
 
+    # server: whether to process task results concurrently instead of under the global controller lock
+    CONCURRENT_RESULT_INTAKE = "concurrent_result_intake"
+
+    # server: max number of worker threads for concurrent result intake
+    MAX_RESULT_INTAKE_WORKERS = "max_result_intake_workers"
+
+    # server: whether the task monitor checks tasks on state changes instead of periodically
+    EVENT_DRIVEN_TASK_CHECK = "event_driven_task_check"
+
+    # client: how long the server may hold a getTask request till a task is available (long poll). 0 disables it.
+    GET_TASK_HOLD_TIME = "get_task_hold_time"
+
+    # client: whether to prefetch the next task while the result of the current task is being sent
+    PREFETCH_NEXT_TASK = "prefetch_next_task"
+
+    # server: max time to hold a getTask request from a client
+    MAX_GET_TASK_HOLD_TIME = "max_get_task_hold_time"
+
+    # server: max number of getTask requests that can be held at the same time
+    MAX_HELD_TASK_REQUESTS = "max_held_task_requests"
+
     # customized nvflare decomposers module name
     DECOMPOSER_MODULE = "nvflare_decomposers"
 
@@ -107,6 +107,9 @@ class AnyRelayTaskManager(TaskManager):
         sent_target_count[client_name] = send_count + 1
         return TaskCheckStatus.SEND
 
+    def has_dynamic_targets(self, task: Task) -> bool:
+        return task.props[_KEY_DYNAMIC_TARGETS]
+
     def check_task_exit(self, task: Task) -> Tuple[bool, TaskCompletionStatus]:
         """Determine whether the task should exit.
 
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 import time
-from typing import Tuple
+from typing import Optional, Tuple
 
 from nvflare.apis.controller_spec import ClientTask, Task, TaskCompletionStatus
 from nvflare.apis.fl_context import FLContext
@@ -88,6 +88,13 @@ class BcastTaskManager(TaskManager):
             # no - continue to wait
             return False, TaskCompletionStatus.IGNORED
 
+    def get_exit_check_time(self, task: Task) -> Optional[float]:
+        min_resps_received_time = task.props[_KEY_MIN_RESPS_RCV_TIME]
+        if min_resps_received_time is None:
+            # the exit condition only changes when results are received
+            return None
+        return min_resps_received_time + task.props[_KEY_WAIT_TIME_AFTER_MIN_RESPS]
+
 
 class BcastForeverTaskManager(TaskManager):
     def __init__(self):
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 import time
-from typing import Tuple
+from typing import Optional, Tuple
 
 from nvflare.apis.controller_spec import ClientTask, Task, TaskCompletionStatus
 from nvflare.apis.fl_context import FLContext
@@ -172,6 +172,9 @@ class SequentialRelayTaskManager(TaskManager):
         self.logger.debug("win_end_idx={}".format(win_end_idx))
         return win_start_idx, win_end_idx
 
+    def has_dynamic_targets(self, task: Task) -> bool:
+        return task.props[_KEY_DYNAMIC_TARGETS]
+
     def check_task_exit(self, task: Task) -> Tuple[bool, TaskCompletionStatus]:
         """Determine whether the task should exit.
 
@@ -200,6 +203,38 @@ class SequentialRelayTaskManager(TaskManager):
         else:
             return False, TaskCompletionStatus.IGNORED
 
+    def get_exit_check_time(self, task: Task) -> Optional[float]:
+        # the relay window moves with time when timeouts are configured: the deadlines are computed from the times
+        # of the last client task, as in _determine_window
+        task_result_timeout = task.props[_KEY_TASK_RESULT_TIMEOUT]
+        task_assignment_timeout = task.props[_KEY_TASK_ASSIGN_TIMEOUT]
+        last_send_idx = task.props[_KEY_LAST_SEND_IDX]
+        last_send_target = task.targets[last_send_idx] if task.targets else None
+
+        if last_send_idx >= 0 and last_send_target in task.last_client_task_map:
+            last_task = task.last_client_task_map[last_send_target]
+            if last_task.result_received_time is None:
+                if not task_result_timeout:
+                    # the window only moves when the result is received
+                    return None
+                win_start_time = last_task.task_sent_time + task_result_timeout
+                if win_start_time > time.time():
+                    # the window moves to the next target when the last client times out
+                    return win_start_time
+            else:
+                win_start_time = last_task.result_received_time
+            win_start_idx = last_send_idx + 1
+        else:
+            win_start_time = task.schedule_time
+            win_start_idx = 0
+
+        if not task_assignment_timeout:
+            return None
+
+        # the task exits when the window extends past the entire target list + 1
+        num_targets = 0 if task.targets is None else len(task.targets)
+        return win_start_time + (num_targets + 1 - win_start_idx) * task_assignment_timeout
+
     def check_task_result(self, result: Shareable, client_task: ClientTask, fl_ctx: FLContext):
         """Check the result received from the client.
 
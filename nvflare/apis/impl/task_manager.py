@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from enum import Enum
-from typing import Tuple
+from typing import Optional, Tuple
 
 from nvflare.apis.controller_spec import ClientTask, Task, TaskCompletionStatus
 from nvflare.apis.fl_context import FLContext
@@ -82,6 +82,34 @@ class TaskManager(object):
         """
         pass
 
+    def has_dynamic_targets(self, task: Task) -> bool:
+        """Determine whether clients that are not in the task's targets can still be sent the task.
+
+        If not, check_task_send must return NO_BLOCK for clients that are not in the task's targets,
+        so that such clients do not need to check the task at all.
+
+        Args:
+            task (Task): an instance of Task
+
+        Returns:
+            bool: whether clients can join the task's targets after the task is scheduled
+        """
+        return False
+
+    def get_exit_check_time(self, task: Task) -> Optional[float]:
+        """Get the time at which check_task_exit should be called again, if nothing else happens to the task.
+
+        This is used by the event-driven task monitor for exit conditions that depend on time only.
+        Other changes to the task (results received, task sent, task cancelled) always cause the task to be checked.
+
+        Args:
+            task (Task): an instance of Task
+
+        Returns:
+            the time to check the task again, or None if the exit condition does not depend on time.
+        """
+        return None
+
     def check_task_result(self, result: Shareable, client_task: ClientTask, fl_ctx: FLContext):
         """Check the result received from the client.
 
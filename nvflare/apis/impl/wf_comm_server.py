@@ -11,8 +11,11 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import heapq
+import itertools
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from threading import Lock
 from typing import List, Optional, Tuple, Union
 
@@ -39,6 +42,11 @@ from .task_manager import TaskCheckStatus, TaskManager
 _TASK_KEY_ENGINE = "___engine"
 _TASK_KEY_MANAGER = "___mgr"
 _TASK_KEY_DONE = "___done"
+_TASK_KEY_INTAKE_LOCK = "___intake_lock"
+_TASK_KEY_PENDING_RESULTS = "___pending_results"
+_TASK_KEY_CHECK_TIME = "___check_time"
+_TASK_KEY_SEQ = "___seq"
+_TASK_KEY_INDEXED_CLIENTS = "___indexed_clients"
 
 
 def _check_positive_int(name, value):
@@ -80,16 +88,33 @@ class _DeadClientStatus:
 
 
 class WFCommServer(FLComponent, WFCommSpec):
-    def __init__(self, task_check_period=0.2):
+    def __init__(
+        self,
+        task_check_period=0.2,
+        concurrent_result_intake=False,
+        max_result_intake_workers=8,
+        event_driven_task_check=False,
+    ):
         """Manage life cycles of tasks and their destinations.
 
         Args:
             task_check_period (float, optional): interval for checking status of tasks. Defaults to 0.2.
+            concurrent_result_intake (bool, optional): whether to process submissions on a worker pool without
+                holding the global controller lock. Results of the same task are then processed concurrently,
+                so the task's result_received_cb must be thread-safe. Defaults to False.
+            max_result_intake_workers (int, optional): max number of threads for concurrent result intake.
+                Defaults to 8.
+            event_driven_task_check (bool, optional): whether the task monitor checks tasks only when they change
+                (results received, task sent or cancelled, timeouts due, clients disconnected) instead of
+                checking all tasks every task_check_period. Defaults to False.
         """
         super().__init__()
         self.controller = None
         self._engine = None
         self._tasks = []  # list of standing tasks
+        self._task_seq = itertools.count()  # schedule order of tasks
+        self._client_task_index = {}  # client name => standing tasks targeting the client, in schedule order
+        self._dynamic_target_tasks = []  # standing tasks that any client could join, in schedule order
         self._client_task_map = {}  # client_task_id => client_task
         self._all_done = False
         self._task_lock = Lock()
@@ -100,6 +125,18 @@ class WFCommServer(FLComponent, WFCommSpec):
         self._dead_clients_lock = Lock()  # need lock since dead_clients can be modified from different threads
         # make sure check_tasks, process_task_request, process_submission does not interfere with each other
         self._controller_lock = Lock()
+        self._concurrent_result_intake = concurrent_result_intake
+        self._max_result_intake_workers = max_result_intake_workers
+        self._result_intake_pool = None
+        self._event_driven_task_check = event_driven_task_check
+        self._task_check_event = threading.Event()  # set when there are tasks to be checked by the monitor
+        self._task_check_lock = Lock()  # protects the tasks to check and the timer heap
+        self._tasks_to_check = set()
+        self._check_all_tasks = False
+        self._task_check_timers = []  # heap of (due_time, seq, task or None for all tasks)
+        self._task_check_timer_seq = itertools.count()
+        self._task_change_cond = threading.Condition()  # notified when tasks could become available to clients
+        self._task_change_seq = 0
 
     def initialize_run(self, fl_ctx: FLContext):
         """Called by runners to initialize controller with information in fl_ctx.
@@ -120,8 +157,49 @@ class WFCommServer(FLComponent, WFCommSpec):
         self._dead_client_grace = ConfigService.get_float_var(
             name=ConfigVarName.DEAD_CLIENT_GRACE_PERIOD, conf=SystemConfigs.APPLICATION_CONF, default=60.0
         )
+
+        concurrent_result_intake = self._get_config_var(
+            ConfigService.get_bool_var, ConfigVarName.CONCURRENT_RESULT_INTAKE, self._concurrent_result_intake
+        )
+        if concurrent_result_intake:
+            max_workers = self._get_config_var(
+                ConfigService.get_int_var, ConfigVarName.MAX_RESULT_INTAKE_WORKERS, self._max_result_intake_workers
+            )
+            _check_positive_int("max_result_intake_workers", max_workers)
+            self._result_intake_pool = ThreadPoolExecutor(
+                max_workers=max(max_workers, 1), thread_name_prefix="result_intake"
+            )
+            self.log_info(fl_ctx, f"concurrent result intake enabled with {max_workers} workers")
+
+        self._event_driven_task_check = self._get_config_var(
+            ConfigService.get_bool_var, ConfigVarName.EVENT_DRIVEN_TASK_CHECK, self._event_driven_task_check
+        )
+        if self._event_driven_task_check:
+            self._task_monitor = threading.Thread(target=self._monitor_task_changes, args=(), daemon=True)
+            self.log_info(fl_ctx, "event-driven task check enabled")
         self._task_monitor.start()
 
+    @staticmethod
+    def _get_config_var(getter, name: str, default):
+        # the value configured in the job config takes precedence over the init arg
+        value = getter(name=name, conf=SystemConfigs.APPLICATION_CONF)
+        if value is None:
+            return default
+        return value
+
+    def get_task_change_seq(self) -> int:
+        return self._task_change_seq
+
+    def wait_for_task_change(self, seq: int, timeout: float):
+        with self._task_change_cond:
+            self._task_change_cond.wait_for(lambda: self._all_done or self._task_change_seq != seq, timeout)
+
+    def _signal_task_change(self):
+        # wake up task requests that are held till a task could be available
+        with self._task_change_cond:
+            self._task_change_seq += 1
+            self._task_change_cond.notify_all()
+
     def _try_again(self) -> Tuple[str, str, Optional[Shareable]]:
         # TODO: how to tell client no shareable available now?
         return "", "", None
@@ -160,7 +238,9 @@ class WFCommServer(FLComponent, WFCommSpec):
             self.log_warning(fl_ctx, f"received dead job report for client {client_name}")
             if not self._dead_clients.get(client_name):
                 self.log_warning(fl_ctx, f"client {client_name} is placed on dead client watch list")
-                self._dead_clients[client_name] = _DeadClientStatus()
+                status = _DeadClientStatus()
+                self._dead_clients[client_name] = status
+                self._notify_task_change(due_time=status.report_time + self._dead_client_grace)
             else:
                 self.log_warning(fl_ctx, f"discarded dead client report {client_name=}: already on watch list")
 
@@ -194,9 +274,10 @@ class WFCommServer(FLComponent, WFCommSpec):
             raise TypeError("fl_ctx must be an instance of FLContext, but got {}".format(type(fl_ctx)))
 
         client_task_to_send = None
+        pending_task_ids = self._get_pending_task_ids(fl_ctx)
         with self._task_lock:
             self.logger.debug("self._tasks: {}".format(self._tasks))
-            for task in self._tasks:
+            for task in self._get_candidate_tasks(client.name):
                 if task.completion_status is not None:
                     # this task is finished (and waiting for the monitor to exit it)
                     continue
@@ -211,6 +292,10 @@ class WFCommServer(FLComponent, WFCommSpec):
                 if client_task_to_check is not None:
                     # this client has been sent the task already
                     if client_task_to_check.result_received_time is None:
+                        if client_task_to_check.id in pending_task_ids:
+                            # the client is still working on this task, and is prefetching its next task
+                            continue
+
                         # controller has not received result from client
                         # something wrong happens when client working on this task, so resend the task
                         resend_task = True
@@ -299,6 +384,7 @@ class WFCommServer(FLComponent, WFCommSpec):
                 can_send_task = False
 
             if not can_send_task:
+                self._notify_task_change(task)
                 return self._try_again()
 
             self.logger.debug("after_task_sent_cb done on client_task_to_send: {}".format(client_task_to_send))
@@ -319,8 +405,19 @@ class WFCommServer(FLComponent, WFCommSpec):
                 self._client_task_map[client_task_to_send.id] = client_task_to_send
 
             task_data.set_header(ReservedHeaderKey.TASK_ID, client_task_to_send.id)
+            self._notify_task_change(task)
+            self._signal_task_change()
             return task_name, client_task_to_send.id, make_copy(task_data)
 
+    @staticmethod
+    def _get_pending_task_ids(fl_ctx: FLContext) -> List[str]:
+        # ids of the tasks the client is still working on, sent with the requests that prefetch the next task
+        peer_ctx = fl_ctx.get_peer_context()
+        if not isinstance(peer_ctx, FLContext):
+            return []
+        task_ids = peer_ctx.get_prop(FLContextKey.PENDING_TASK_IDS)
+        return task_ids if isinstance(task_ids, (list, tuple)) else []
+
     def handle_exception(self, task_id: str, fl_ctx: FLContext) -> None:
         """Called to cancel one task as its client_task is causing exception at upper level.
 
@@ -366,12 +463,28 @@ class WFCommServer(FLComponent, WFCommSpec):
             TypeError: when result is not an instance of Shareable
             ValueError: task_name is not found in the client_task
         """
+        if self._result_intake_pool and not self._all_done:
+            try:
+                future = self._result_intake_pool.submit(
+                    self._do_process_submission_concurrently, client, task_name, task_id, result, fl_ctx
+                )
+            except RuntimeError:
+                # the pool was shut down by finalize_run meanwhile
+                future = None
+            if future:
+                # the calling thread waits for the result so that errors are still reported to the caller
+                future.result()
+                return
+
+        if self._all_done:
+            self.log_warning(fl_ctx, f"got result of task {task_name} from {client.name} after the run is finalized")
+
+        # without concurrent intake, and for late submissions after the intake pool is shut down
         with self._controller_lock:
             self._do_process_submission(client, task_name, task_id, result, fl_ctx)
 
-    def _do_process_submission(
-        self, client: Client, task_name: str, task_id: str, result: Shareable, fl_ctx: FLContext
-    ):
+    @staticmethod
+    def _check_submission_inputs(client: Client, result: Shareable, fl_ctx: FLContext):
         if not isinstance(client, Client):
             raise TypeError("client must be an instance of Client, but got {}".format(type(client)))
 
@@ -380,22 +493,51 @@ class WFCommServer(FLComponent, WFCommSpec):
         if not isinstance(result, Shareable):
             raise TypeError("result must be an instance of Shareable, but got {}".format(type(result)))
 
+    def _process_result_of_unknown_task(
+        self, client: Client, task_name: str, task_id: str, result: Shareable, fl_ctx: FLContext
+    ):
+        # cannot find a standing task for the submission
+        self.log_debug(fl_ctx, "no standing task found for {}:{}".format(task_name, task_id))
+
+        self.log_debug(fl_ctx, "firing event EventType.BEFORE_PROCESS_RESULT_OF_UNKNOWN_TASK")
+        self.fire_event(EventType.BEFORE_PROCESS_RESULT_OF_UNKNOWN_TASK, fl_ctx)
+
+        self.controller.process_result_of_unknown_task(client, task_name, task_id, result, fl_ctx)
+
+        self.log_debug(fl_ctx, "firing event EventType.AFTER_PROCESS_RESULT_OF_UNKNOWN_TASK")
+        self.fire_event(EventType.AFTER_PROCESS_RESULT_OF_UNKNOWN_TASK, fl_ctx)
+
+    def _invoke_result_received_cb(self, client_task: ClientTask, task_name: str, task_id: str, fl_ctx: FLContext):
+        task = client_task.task
+        if task.result_received_cb is not None:
+            try:
+                self.log_debug(fl_ctx, "invoking result_received_cb ...")
+                task.result_received_cb(client_task=client_task, fl_ctx=fl_ctx)
+            except Exception as e:
+                # this task cannot proceed anymore
+                self.log_exception(
+                    fl_ctx,
+                    "processing error in result_received_cb on task {}({}): {}".format(
+                        task_name, task_id, secure_format_exception(e)
+                    ),
+                )
+                task.completion_status = TaskCompletionStatus.ERROR
+                task.exception = e
+        else:
+            self.log_debug(fl_ctx, "no result_received_cb")
+
+    def _do_process_submission(
+        self, client: Client, task_name: str, task_id: str, result: Shareable, fl_ctx: FLContext
+    ):
+        self._check_submission_inputs(client, result, fl_ctx)
+
         with self._task_lock:
             # task_id is the uuid associated with the client_task
             client_task = self._client_task_map.get(task_id, None)
             self.log_debug(fl_ctx, "Get submission from client task={} id={}".format(client_task, task_id))
 
         if client_task is None:
-            # cannot find a standing task for the submission
-            self.log_debug(fl_ctx, "no standing task found for {}:{}".format(task_name, task_id))
-
-            self.log_debug(fl_ctx, "firing event EventType.BEFORE_PROCESS_RESULT_OF_UNKNOWN_TASK")
-            self.fire_event(EventType.BEFORE_PROCESS_RESULT_OF_UNKNOWN_TASK, fl_ctx)
-
-            self.controller.process_result_of_unknown_task(client, task_name, task_id, result, fl_ctx)
-
-            self.log_debug(fl_ctx, "firing event EventType.AFTER_PROCESS_RESULT_OF_UNKNOWN_TASK")
-            self.fire_event(EventType.AFTER_PROCESS_RESULT_OF_UNKNOWN_TASK, fl_ctx)
+            self._process_result_of_unknown_task(client, task_name, task_id, result, fl_ctx)
             return
 
         task = client_task.task
@@ -415,24 +557,95 @@ class WFCommServer(FLComponent, WFCommSpec):
             manager = task.props[_TASK_KEY_MANAGER]
             manager.check_task_result(result, client_task, fl_ctx)
 
-            if task.result_received_cb is not None:
-                try:
-                    self.log_debug(fl_ctx, "invoking result_received_cb ...")
-                    task.result_received_cb(client_task=client_task, fl_ctx=fl_ctx)
-                except Exception as e:
-                    # this task cannot proceed anymore
-                    self.log_exception(
-                        fl_ctx,
-                        "processing error in result_received_cb on task {}({}): {}".format(
-                            task_name, task_id, secure_format_exception(e)
-                        ),
-                    )
-                    task.completion_status = TaskCompletionStatus.ERROR
-                    task.exception = e
-            else:
-                self.log_debug(fl_ctx, "no result_received_cb")
+            self._invoke_result_received_cb(client_task, task_name, task_id, fl_ctx)
+            client_task.result_received_time = time.time()
+        self._notify_task_change(task)
+        self._signal_task_change()
+
+    def _do_process_submission_concurrently(
+        self, client: Client, task_name: str, task_id: str, result: Shareable, fl_ctx: FLContext
+    ):
+        self._check_submission_inputs(client, result, fl_ctx)
+
+        with self._task_lock:
+            # task_id is the uuid associated with the client_task
+            client_task = self._client_task_map.get(task_id, None)
+            self.log_debug(fl_ctx, "Get submission from client task={} id={}".format(client_task, task_id))
+            if client_task is not None:
+                task = client_task.task
+                if task.name != task_name:
+                    raise ValueError("client specified task name {} doesn't match {}".format(task_name, task.name))
+
+                if task.completion_status is not None:
+                    # the task is already finished - drop the result
+                    self.log_info(fl_ctx, "task is already finished - submission dropped")
+                    return
+
+                # the task monitor will not exit the task while it still has results being processed
+                task.props[_TASK_KEY_PENDING_RESULTS] += 1
+
+        if client_task is None:
+            self._process_result_of_unknown_task(client, task_name, task_id, result, fl_ctx)
+            return
+
+        try:
+            with task.props[_TASK_KEY_INTAKE_LOCK]:
+                client_task.result = result
+                manager = task.props[_TASK_KEY_MANAGER]
+                manager.check_task_result(result, client_task, fl_ctx)
 
+            # the CB is invoked outside the task's locks so that results of the same task can be processed
+            # concurrently with each other and with task dispatch
+            self._invoke_result_received_cb(client_task, task_name, task_id, fl_ctx)
             client_task.result_received_time = time.time()
+        finally:
+            with self._task_lock:
+                task.props[_TASK_KEY_PENDING_RESULTS] -= 1
+            self._notify_task_change(task)
+            self._signal_task_change()
+
+    def _add_to_task_index(self, task: Task):
+        # must be called with the task_lock held
+        manager = task.props[_TASK_KEY_MANAGER]
+        if manager.has_dynamic_targets(task):
+            # any client could be added to the targets of the task
+            self._dynamic_target_tasks.append(task)
+            task.props[_TASK_KEY_INDEXED_CLIENTS] = []
+            return
+
+        # targets could contain duplicates (e.g. relay)
+        client_names = list(dict.fromkeys(task.targets))
+        for name in client_names:
+            self._client_task_index.setdefault(name, []).append(task)
+        task.props[_TASK_KEY_INDEXED_CLIENTS] = client_names
+
+    def _remove_from_task_index(self, task: Task):
+        # must be called with the task_lock held
+        client_names = task.props.get(_TASK_KEY_INDEXED_CLIENTS)
+        if client_names is None:
+            return
+
+        if not client_names:
+            self._dynamic_target_tasks.remove(task)
+
+        for name in client_names:
+            tasks = self._client_task_index.get(name)
+            if tasks:
+                tasks.remove(task)
+                if not tasks:
+                    self._client_task_index.pop(name)
+
+    def _get_candidate_tasks(self, client_name: str) -> List[Task]:
+        """Get standing tasks that could be sent to the client, in the order they were scheduled.
+
+        Must be called with the task_lock held.
+        Task managers return NO_BLOCK for clients that are not targets of tasks without dynamic targets,
+        so other tasks do not need to be checked for the client.
+        """
+        client_tasks = self._client_task_index.get(client_name, [])
+        if not self._dynamic_target_tasks:
+            return client_tasks
+        return list(heapq.merge(client_tasks, self._dynamic_target_tasks, key=lambda t: t.props[_TASK_KEY_SEQ]))
 
     def _schedule_task(
         self,
@@ -470,13 +683,22 @@ class WFCommServer(FLComponent, WFCommSpec):
 
         task.props[_TASK_KEY_MANAGER] = manager
         task.props[_TASK_KEY_ENGINE] = self._engine
+        task.props[_TASK_KEY_INTAKE_LOCK] = Lock()
+        task.props[_TASK_KEY_PENDING_RESULTS] = 0
         task.is_standing = True
         task.schedule_time = time.time()
 
         with self._task_lock:
+            task.props[_TASK_KEY_SEQ] = next(self._task_seq)
             self._tasks.append(task)
+            self._add_to_task_index(task)
             self.log_info(fl_ctx, "scheduled task {}".format(task.name))
 
+        self._notify_task_change(task)
+        if task.timeout:
+            self._notify_task_change(task, due_time=task.schedule_time + task.timeout)
+        self._signal_task_change()
+
     def broadcast(
         self,
         task: Task,
@@ -692,6 +914,7 @@ class WFCommServer(FLComponent, WFCommSpec):
             fl_ctx (Optional[FLContext], optional): FLContext associated with this cancellation. Defaults to None.
         """
         task.completion_status = completion_status
+        self._notify_task_change(task)
 
     def cancel_all_tasks(self, completion_status=TaskCompletionStatus.CANCELLED, fl_ctx: Optional[FLContext] = None):
         """Cancel all standing tasks in this controller.
@@ -704,6 +927,7 @@ class WFCommServer(FLComponent, WFCommSpec):
         with self._task_lock:
             for t in self._tasks:
                 t.completion_status = completion_status
+        self._notify_task_change()
 
     def finalize_run(self, fl_ctx: FLContext):
         """Do cleanup of the coordinator implementation.
@@ -717,6 +941,10 @@ class WFCommServer(FLComponent, WFCommSpec):
         """
         self.cancel_all_tasks()  # unconditionally cancel all tasks
         self._all_done = True
+        self._task_check_event.set()  # wake up the task monitor so it can exit
+        self._signal_task_change()  # release held task requests
+        if self._result_intake_pool:
+            self._result_intake_pool.shutdown(wait=False)
 
     def relay(
         self,
@@ -845,10 +1073,16 @@ class WFCommServer(FLComponent, WFCommSpec):
         )
         self.wait_for_task(task, abort_signal)
 
-    def _check_dead_clients(self):
+    def _check_dead_clients(self) -> bool:
+        """Check clients on the dead client watch list.
+
+        Returns: whether any client is newly deemed disconnected
+
+        """
         if not self._dead_clients:
-            return
+            return False
 
+        newly_disconnected = False
         now = time.time()
         with self._dead_clients_lock:
             for client_name, status in self._dead_clients.items():
@@ -862,10 +1096,12 @@ class WFCommServer(FLComponent, WFCommSpec):
 
                 # consider client disconnected
                 status.disconnect_time = now
+                newly_disconnected = True
                 self.logger.error(f"Client {client_name} is deemed disconnected!")
                 with self._engine.new_context() as fl_ctx:
                     fl_ctx.set_prop(FLContextKey.DISCONNECTED_CLIENT_NAME, client_name)
                     self.fire_event(EventType.CLIENT_DISCONNECTED, fl_ctx)
+        return newly_disconnected
 
     def _monitor_tasks(self):
         while not self._all_done:
@@ -881,14 +1117,106 @@ class WFCommServer(FLComponent, WFCommSpec):
                 return
             time.sleep(self._task_check_period)
 
-    def check_tasks(self):
+    def _notify_task_change(self, task: Optional[Task] = None, due_time: Optional[float] = None):
+        """Inform the event-driven task monitor that a task needs to be checked.
+
+        Args:
+            task: the task to be checked. None means all standing tasks.
+            due_time: when to check the task. None means now.
+        """
+        if not self._event_driven_task_check:
+            return
+
+        with self._task_check_lock:
+            if due_time is None:
+                if task is None:
+                    self._check_all_tasks = True
+                else:
+                    self._tasks_to_check.add(task)
+            else:
+                if task is not None:
+                    check_time = task.props.get(_TASK_KEY_CHECK_TIME)
+                    if check_time is not None and check_time <= due_time:
+                        # the task will be checked earlier, and its timers are set again after that check
+                        return
+                    task.props[_TASK_KEY_CHECK_TIME] = due_time
+                heapq.heappush(self._task_check_timers, (due_time, next(self._task_check_timer_seq), task))
+        self._task_check_event.set()
+
+    def _get_tasks_to_check(self):
+        """Get tasks that have changed or whose timers are due.
+
+        Returns: a tuple of (whether to check all tasks, set of tasks to check)
+
+        """
+        now = time.time()
+        with self._task_check_lock:
+            while self._task_check_timers and self._task_check_timers[0][0] <= now:
+                due_time, _, task = heapq.heappop(self._task_check_timers)
+                if task is None:
+                    self._check_all_tasks = True
+                    continue
+
+                if task.props.get(_TASK_KEY_CHECK_TIME) == due_time:
+                    task.props[_TASK_KEY_CHECK_TIME] = None
+                if task.is_standing:
+                    self._tasks_to_check.add(task)
+
+            check_all = self._check_all_tasks
+            tasks_to_check = self._tasks_to_check
+            self._check_all_tasks = False
+            self._tasks_to_check = set()
+        return check_all, tasks_to_check
+
+    def _get_task_check_wait_time(self) -> Optional[float]:
+        with self._task_check_lock:
+            if not self._task_check_timers:
+                return None
+            return max(self._task_check_timers[0][0] - time.time(), 0.0)
+
+    def _monitor_task_changes(self):
+        while not self._all_done:
+            self._task_check_event.wait(self._get_task_check_wait_time())
+            self._task_check_event.clear()
+            if self._all_done:
+                return
+
+            # clients are deemed disconnected by timers set at the time of dead client reports
+            if self._check_dead_clients():
+                if self._job_policy_violated():
+                    with self._engine.new_context() as fl_ctx:
+                        self.system_panic("Aborting job due to deployment policy violation", fl_ctx)
+                    return
+                self._notify_task_change()
+
+            check_all, tasks_to_check = self._get_tasks_to_check()
+            if check_all:
+                self.check_tasks()
+            elif tasks_to_check:
+                self.check_tasks(tasks_to_check)
+
+    def check_tasks(self, tasks=None):
+        """Check standing tasks and exit the ones that are done.
+
+        Args:
+            tasks: the tasks to check. None means all standing tasks.
+        """
         with self._controller_lock:
-            self._do_check_tasks()
+            self._do_check_tasks(tasks)
 
-    def _do_check_tasks(self):
+    def _do_check_tasks(self, tasks=None):
         exit_tasks = []
         with self._task_lock:
-            for task in self._tasks:
+            if tasks is None:
+                tasks_to_check = self._tasks
+            else:
+                tasks_to_check = [t for t in self._tasks if t in tasks]
+
+            for task in tasks_to_check:
+                if task.props.get(_TASK_KEY_PENDING_RESULTS):
+                    # results of this task are still being processed - check it again next time
+                    continue
+
                 if task.completion_status is not None:
                     exit_tasks.append(task)
                     continue
@@ -921,12 +1249,16 @@ class WFCommServer(FLComponent, WFCommSpec):
                     exit_tasks.append(task)
                     continue
 
+                if self._event_driven_task_check:
+                    self._schedule_task_recheck(task)
+
             for exit_task in exit_tasks:
                 exit_task.is_standing = False
                 self.logger.debug(
                     "Removing task={}, completion_status={}".format(exit_task, exit_task.completion_status)
                 )
                 self._tasks.remove(exit_task)
+                self._remove_from_task_index(exit_task)
                 for client_task in exit_task.client_tasks:
                     self.logger.debug("Removing client_task with id={}".format(client_task.id))
                     self._client_task_map.pop(client_task.id)
@@ -936,6 +1268,9 @@ class WFCommServer(FLComponent, WFCommSpec):
         if len(exit_tasks) <= 0:
             return
 
+        # exited tasks no longer block other tasks from being sent
+        self._signal_task_change()
+
         with self._engine.new_context() as fl_ctx:
             for exit_task in exit_tasks:
                 with exit_task.cb_lock:
@@ -956,6 +1291,22 @@ class WFCommServer(FLComponent, WFCommSpec):
                             exit_task.completion_status = TaskCompletionStatus.ERROR
                             exit_task.exception = e
 
+    def _schedule_task_recheck(self, task: Task):
+        # the task is still standing: set timers for exit conditions that only depend on time
+        manager = task.props[_TASK_KEY_MANAGER]
+        if manager is not None:
+            check_time = manager.get_exit_check_time(task)
+            if check_time is not None:
+                self._notify_task_change(task, due_time=check_time)
+
+        if self._dead_clients:
+            lead_time = ConfigService.get_float_var(
+                name=ConfigVarName.DEAD_CLIENT_CHECK_LEAD_TIME, conf=SystemConfigs.APPLICATION_CONF, default=30.0
+            )
+            if time.time() - task.schedule_time < lead_time:
+                # dead clients are not checked for this task yet
+                self._notify_task_change(task, due_time=task.schedule_time + lead_time)
+
     def _get_task_dead_clients(self, task: Task):
         """
         See whether the task is only waiting for response from a dead client
@@ -993,12 +1344,12 @@ class WFCommServer(FLComponent, WFCommSpec):
         def wrap(*args, **kwargs):
             if func:
                 func(*args, **kwargs)
-            task.props[_TASK_KEY_DONE] = True
+            task.props[_TASK_KEY_DONE].set()
 
         return wrap
 
     def wait_for_task(self, task: Task, abort_signal: Signal):
-        task.props[_TASK_KEY_DONE] = False
+        task.props[_TASK_KEY_DONE] = threading.Event()
         task.task_done_cb = self._process_finished_task(task=task, func=task.task_done_cb)
         while True:
             if task.completion_status is not None:
@@ -1008,10 +1359,9 @@ class WFCommServer(FLComponent, WFCommSpec):
                 self.cancel_task(task, fl_ctx=None, completion_status=TaskCompletionStatus.ABORTED)
                 break
 
-            task_done = task.props[_TASK_KEY_DONE]
-            if task_done:
+            # wake up as soon as the task is done, or check the abort signal again after the wait
+            if task.props[_TASK_KEY_DONE].wait(self._task_check_period):
                 break
-            time.sleep(self._task_check_period)
 
     def _job_policy_violated(self):
         if not self._engine:
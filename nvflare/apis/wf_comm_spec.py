@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
 from abc import ABC
 from typing import List, Optional, Tuple, Union
 
@@ -267,6 +268,29 @@ class WFCommSpec(ABC):
         """
         raise NotImplementedError
 
+    def get_task_change_seq(self) -> int:
+        """Get the sequence number of changes to standing tasks.
+
+        The number is increased whenever a change could make a task available to clients (e.g. a task is scheduled).
+
+        Returns: the current task change sequence number
+
+        """
+        return 0
+
+    def wait_for_task_change(self, seq: int, timeout: float):
+        """Wait until standing tasks have changed since the specified sequence number, or the timeout expires.
+
+        This is used to hold task requests from clients until a task could be available.
+        Implementations should return as soon as the tasks change.
+
+        Args:
+            seq: the task change sequence number obtained before the last task request was processed
+            timeout: max time to wait in seconds
+
+        """
+        time.sleep(timeout)
+
     def handle_exception(self, task_id: str, fl_ctx: FLContext):
         """Called after process_task_request returns, but exception occurs before task is sent out."""
         raise NotImplementedError
@@ -0,0 +1,226 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Tuple
+
+import numpy as np
+
+
+class SparseArray(object):
+    def __init__(self, indices: np.ndarray, values: np.ndarray, shape: Tuple[int, ...]):
+        """An array of the given shape that is zero except at the given indices.
+
+        Args:
+            indices: unique indices into the flattened (C order) array.
+            values: values at the indices.
+            shape: shape of the dense array.
+        """
+        indices = np.asarray(indices)
+        values = np.asarray(values)
+        if indices.ndim != 1 or values.ndim != 1 or indices.size != values.size:
+            raise ValueError(
+                f"indices and values must be 1-D arrays of the same size but got {indices.shape} and {values.shape}"
+            )
+        self.indices = indices
+        self.values = values
+        self.shape = tuple(shape)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.values.dtype
+
+    def to_dense(self) -> np.ndarray:
+        dense = np.zeros(self.size, dtype=self.values.dtype)
+        dense[self.indices] = self.values
+        return dense.reshape(self.shape)
+
+    def add_to(self, dense: np.ndarray, weight=1.0):
+        """Adds the weighted values to a dense array of the same shape, in place."""
+        if not dense.flags.c_contiguous:
+            raise ValueError("dense array must be C contiguous")
+        flat = dense.reshape(-1)
+        flat[self.indices] += self.values * weight if weight != 1.0 else self.values
+
+
+class LowRankArray(object):
+    def __init__(self, a: np.ndarray, b: np.ndarray):
+        """A 2-D array represented by the product of two low-rank factors: a @ b.
+
+        Args:
+            a: factor of shape (m, r).
+            b: factor of shape (r, n).
+        """
+        a = np.asarray(a)
+        b = np.asarray(b)
+        if a.ndim != 2 or b.ndim != 2 or a.shape[1] != b.shape[0]:
+            raise ValueError(f"factors must be of shapes (m, r) and (r, n) but got {a.shape} and {b.shape}")
+        self.a = a
+        self.b = b
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.a.shape[0], self.b.shape[1]
+
+    @property
+    def size(self) -> int:
+        return self.a.shape[0] * self.b.shape[1]
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.result_type(self.a, self.b)
+
+    def to_dense(self) -> np.ndarray:
+        return self.a @ self.b
+
+    def add_to(self, dense: np.ndarray, weight=1.0):
+        """Adds the weighted product to a dense array of the same shape, in place."""
+        # weighting a factor is cheaper than weighting the product
+        a = self.a * weight if weight != 1.0 else self.a
+        dense += a @ self.b
+
+
+class SignArray(object):
+    def __init__(self, bits: np.ndarray, scale: float, shape: Tuple[int, ...], dtype=np.float32):
+        """An array whose elements are all +scale or -scale, with the signs packed into bits.
+
+        Args:
+            bits: signs packed with `np.packbits` (1 is +scale, 0 is -scale), in C order of the flattened array.
+            scale: magnitude of all elements.
+            shape: shape of the dense array.
+            dtype: dtype of the dense array. Defaults to float32.
+        """
+        bits = np.asarray(bits)
+        self.shape = tuple(shape)
+        if bits.dtype != np.uint8 or bits.ndim != 1 or bits.size != (self.size + 7) // 8:
+            raise ValueError(f"bits must be a 1-D uint8 array of size {(self.size + 7) // 8} but got {bits.shape}")
+        self.bits = bits
+        self.scale = float(scale)
+        self._dtype = np.dtype(dtype)
+
+    @staticmethod
+    def from_dense(v: np.ndarray, scale: float) -> "SignArray":
+        """Creates a SignArray with the signs of v. Zeros are taken as positive."""
+        return SignArray(np.packbits(np.reshape(v, -1) >= 0), scale, v.shape, v.dtype)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    def to_dense(self) -> np.ndarray:
+        dense = np.zeros(self.shape, dtype=self._dtype)
+        self.add_to(dense)
+        return dense
+
+    def add_to(self, dense: np.ndarray, weight=1.0):
+        """Adds the weighted values to a dense array of the same shape, in place."""
+        if not dense.flags.c_contiguous:
+            raise ValueError("dense array must be C contiguous")
+        c = self.scale * weight
+        positive = np.unpackbits(self.bits, count=self.size).view(bool)
+        flat = dense.reshape(-1)
+        flat += np.where(positive, c, -c).astype(dense.dtype, copy=False)
+
+
+class BlockQuantizedArray(object):
+    def __init__(
+        self,
+        quantized: np.ndarray,
+        absmax: np.ndarray,
+        code: np.ndarray,
+        blocksize: int,
+        shape: Tuple[int, ...],
+        dtype=np.float32,
+        packed: bool = False,
+    ):
+        """An array quantized in blocks: each element is code[index] * absmax of its block.
+
+        This is the layout of the blockwise 8-bit and 4-bit quantization of bitsandbytes.
+
+        Args:
+            quantized: uint8 indices into the code, in C order of the flattened array.
+            absmax: scale of each block.
+            code: values of the indices.
+            blocksize: number of elements in each block.
+            shape: shape of the dense array.
+            dtype: dtype of the dense array. Defaults to float32.
+            packed: whether two 4-bit indices are packed in each byte, the first one in the high bits.
+        """
+        self.shape = tuple(shape)
+        self.quantized = np.asarray(quantized).reshape(-1)
+        self.absmax = np.asarray(absmax, dtype=np.float32).reshape(-1)
+        self.code = np.asarray(code, dtype=np.float32)
+        self.blocksize = blocksize
+        self.packed = packed
+        self._dtype = np.dtype(dtype)
+        num_indices = self.quantized.size * 2 if packed else self.quantized.size
+        if self.quantized.dtype != np.uint8 or num_indices < self.size or num_indices > self.size + 1:
+            raise ValueError(f"quantized must be a uint8 array with {self.size} indices")
+        if self.absmax.size != (self.size + blocksize - 1) // blocksize:
+            raise ValueError(f"absmax must have {(self.size + blocksize - 1) // blocksize} values")
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    def _get_indices(self, start: int, end: int) -> np.ndarray:
+        if not self.packed:
+            return self.quantized[start:end]
+        # start is even
+        packed = self.quantized[start // 2 : (end + 1) // 2]
+        indices = np.empty(packed.size * 2, dtype=np.uint8)
+        np.right_shift(packed, 4, out=indices[::2])
+        np.bitwise_and(packed, 0xF, out=indices[1::2])
+        return indices[: end - start]
+
+    def to_dense(self) -> np.ndarray:
+        dense = np.zeros(self.shape, dtype=np.float64)
+        self.add_to(dense)
+        return dense.astype(self._dtype)
+
+    def add_to(self, dense: np.ndarray, weight=1.0, chunk_size: int = 2**16):
+        """Adds the weighted values to a dense array of the same shape, in place.
+
+        The values are dequantized in chunks of blocks, so no dense copy of the array is created.
+        """
+        if not dense.flags.c_contiguous:
+            raise ValueError("dense array must be C contiguous")
+        flat = dense.reshape(-1)
+        bs = self.blocksize
+        # chunks of whole blocks, and of an even number of elements for packed indices
+        step = bs * max(1, chunk_size // bs) * (2 if self.packed and bs % 2 else 1)
+        for start in range(0, self.size, step):
+            end = min(start + step, self.size)
+            values = self.code[self._get_indices(start, end)]
+            scale = self.absmax[start // bs : (end + bs - 1) // bs] * np.float32(weight)
+            full = (end - start) // bs * bs
+            out = flat[start : start + full].reshape(-1, bs)
+            out += values[:full].reshape(-1, bs) * scale[: full // bs, None]
+            if full < end - start:
+                flat[start + full : end] += values[full:] * scale[-1]
+
+
+# compressed arrays that can be added into a dense array with `add_to`
+COMPRESSED_ARRAY_TYPES = (SparseArray, LowRankArray, SignArray, BlockQuantizedArray)
@@ -12,13 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
 from typing import Any, Dict, Optional
 
 from nvflare.apis.dxo import DXO, DataKind, MetaKey
 from nvflare.apis.fl_component import FLComponent
 from nvflare.apis.fl_context import FLContext
-from nvflare.app_common.aggregators.weighted_aggregation_helper import WeightedAggregationHelper
+from nvflare.app_common.abstract.sparse_array import COMPRESSED_ARRAY_TYPES
+from nvflare.app_common.aggregators.weighted_aggregation_helper import (
+    ShardedWeightedAggregationHelper,
+    WeightedAggregationHelper,
+)
 from nvflare.app_common.app_constant import AppConstants
+from nvflare.app_common.utils.flat_model import FlatModel, FlatModelIndex
 from nvflare.fuel.utils.log_utils import get_module_logger
 
 
@@ -30,6 +36,9 @@ class DXOAggregator(FLComponent):
         expected_data_kind: DataKind = DataKind.WEIGHT_DIFF,
         name_postfix: str = "",
         weigh_by_local_iter: bool = True,
+        num_aggregation_shards: int = 1,
+        flatten_model: bool = False,
+        partial_aggregation: bool = False,
     ):
         """Perform accumulated weighted aggregation for one kind of corresponding DXO from contributors.
 
@@ -45,15 +54,41 @@ class DXOAggregator(FLComponent):
                 the number of computations on encrypted ciphertext.
                 The aggregated sum will still be divided by the provided weights and `aggregation_weights` for the
                 resulting weighted sum to be valid.
+            num_aggregation_shards (int, optional): number of shards of vars to aggregate in parallel threads.
+                Defaults to 1 (no sharding).
+            flatten_model (bool, optional): whether to copy the vars of each contribution into one contiguous buffer,
+                so that it's aggregated with single vectorized ops instead of per-var ops.
+                This helps models with many small vars. All vars must be numeric arrays. Defaults to False.
+            partial_aggregation (bool, optional): whether the result is a partial aggregate to be forwarded to a
+                higher tier aggregator, in which case the total weight and the names of the aggregated contributors
+                are added to the meta of the result DXO. Defaults to False.
         """
         super().__init__()
         self.expected_data_kind = expected_data_kind
         self.aggregation_weights = aggregation_weights or {}
         self.logger.debug(f"aggregation weights control: {aggregation_weights}")
 
-        self.aggregation_helper = WeightedAggregationHelper(
-            exclude_vars=exclude_vars, weigh_by_local_iter=weigh_by_local_iter
-        )
+        if flatten_model and num_aggregation_shards > 1:
+            raise ValueError("flatten_model cannot be used with num_aggregation_shards > 1")
+        self.exclude_vars = exclude_vars
+        self.flatten_model = flatten_model
+        self._flat_index = None
+        self._flat_index_used = False  # whether contributions of the current round were laid out with the index
+        self.weigh_by_local_iter = weigh_by_local_iter
+        self.partial_aggregation = partial_aggregation
+        self._aggregated_contributors = []
+        self._total_weight = 0.0
+        # guards the flat index, the aggregated contributors and the total weight against concurrent accepts
+        self._lock = threading.Lock()
+
+        if num_aggregation_shards > 1:
+            self.aggregation_helper = ShardedWeightedAggregationHelper(
+                exclude_vars=exclude_vars, weigh_by_local_iter=weigh_by_local_iter, num_shards=num_aggregation_shards
+            )
+        else:
+            self.aggregation_helper = WeightedAggregationHelper(
+                exclude_vars=exclude_vars, weigh_by_local_iter=weigh_by_local_iter
+            )
 
         self.warning_count = {}
         self.warning_limit = 10
@@ -66,6 +101,14 @@ class DXOAggregator(FLComponent):
     def reset_aggregation_helper(self):
         if self.aggregation_helper:
             self.aggregation_helper.reset_stats()
+        with self._lock:
+            self._aggregated_contributors = []
+            self._total_weight = 0.0
+            self._flat_index_used = False
+
+    def shutdown(self):
+        if isinstance(self.aggregation_helper, ShardedWeightedAggregationHelper):
+            self.aggregation_helper.shutdown()
 
     def accept(self, dxo: DXO, contributor_name, contribution_round, fl_ctx: FLContext) -> bool:
         """Store DXO and update aggregator's internal state
@@ -82,11 +125,13 @@ class DXOAggregator(FLComponent):
             self.log_error(fl_ctx, f"Expected DXO but got {type(dxo)}")
             return False
 
-        if dxo.data_kind not in (DataKind.WEIGHT_DIFF, DataKind.WEIGHTS, DataKind.METRICS):
+        if dxo.data_kind not in (DataKind.WEIGHT_DIFF, DataKind.SPARSE_WEIGHT_DIFF, DataKind.WEIGHTS, DataKind.METRICS):
             self.log_error(fl_ctx, "cannot handle data kind {}".format(dxo.data_kind))
             return False
 
-        if dxo.data_kind != self.expected_data_kind:
+        # sparse weight diffs are aggregated into dense weight diffs
+        data_kind = DataKind.WEIGHT_DIFF if dxo.data_kind == DataKind.SPARSE_WEIGHT_DIFF else dxo.data_kind
+        if data_kind != self.expected_data_kind:
             self.log_error(fl_ctx, "expected {} but got {}".format(self.expected_data_kind, dxo.data_kind))
             return False
 
@@ -127,6 +172,12 @@ class DXOAggregator(FLComponent):
                 )
                 return False
 
+        aggregated_weight = dxo.get_meta_prop(MetaKey.AGGREGATED_WEIGHT)
+        if aggregated_weight is not None:
+            return self._accept_partial_aggregate(
+                dxo, data, aggregated_weight, contributor_name, contribution_round, fl_ctx
+            )
+
         n_iter = dxo.get_meta_prop(MetaKey.NUM_STEPS_CURRENT_ROUND)
         if n_iter is None:
             if self.warning_count.get(contributor_name, 0) <= self.warning_limit:
@@ -157,10 +208,71 @@ class DXOAggregator(FLComponent):
             aggregation_weight = 1.0
 
         # aggregate
-        self.aggregation_helper.add(data, aggregation_weight * float_n_iter, contributor_name, contribution_round)
+        weight = aggregation_weight * float_n_iter
+        if not self._add(data, weight, contributor_name, contribution_round, [contributor_name], fl_ctx):
+            return False
         self.log_debug(fl_ctx, "End accept")
         return True
 
+    def _accept_partial_aggregate(
+        self, dxo: DXO, data, aggregated_weight, contributor_name, contribution_round, fl_ctx: FLContext
+    ) -> bool:
+        # the contribution is the weighted average of the contributions of a subtree, forwarded by a relay
+        if not self.weigh_by_local_iter:
+            self.log_error(fl_ctx, f"cannot aggregate partial aggregate from {contributor_name} without weighting")
+            return False
+
+        contributors = dxo.get_meta_prop(MetaKey.AGGREGATED_CONTRIBUTORS) or [contributor_name]
+        weight = float(aggregated_weight) * self.aggregation_weights.get(contributor_name, 1.0)
+        if not self._add(data, weight, contributor_name, contribution_round, contributors, fl_ctx):
+            return False
+        self.log_debug(fl_ctx, f"accepted partial aggregate of {contributors} from {contributor_name}")
+        return True
+
+    def _add(self, data, weight: float, contributor_name, contribution_round, contributors, fl_ctx: FLContext) -> bool:
+        if self.flatten_model and not any(isinstance(v, COMPRESSED_ARRAY_TYPES) for v in data.values()):
+            # the index is computed once for contributions of the same model
+            with self._lock:
+                if self._flat_index is None or not self._flat_index.matches(data, exclude_vars=self.exclude_vars):
+                    if self._flat_index_used:
+                        # contributions of this round were laid out with the current index
+                        self.log_error(
+                            fl_ctx,
+                            f"discarding DXO from {contributor_name} at round: {contribution_round} "
+                            "as its vars differ from the vars of the contributions accepted already",
+                        )
+                        return False
+                    self._flat_index = FlatModelIndex.from_dict(data, exclude_vars=self.exclude_vars)
+                flat_index = self._flat_index
+                self._flat_index_used = True
+            data = FlatModel.from_dict(data, index=flat_index)
+
+        with self._lock:
+            # a leaf contribution must not be counted twice, whether directly or as part of a partial aggregate
+            duplicates = set(contributors).intersection(self._aggregated_contributors)
+            if duplicates:
+                self.log_warning(
+                    fl_ctx,
+                    f"discarding DXO from {contributor_name} at round: {contribution_round} "
+                    f"as contributions of {sorted(duplicates)} were accepted already",
+                )
+                return False
+            self._aggregated_contributors.extend(contributors)
+            self._total_weight += weight
+
+        # like the aggregation helpers, the contribution is recorded first so that concurrent adds can overlap
+        try:
+            self.aggregation_helper.add(data, weight, contributor_name, contribution_round)
+        except Exception:
+            # the contribution was not aggregated: its contributors may still be accepted from a resubmission
+            with self._lock:
+                if all(c in self._aggregated_contributors for c in contributors):
+                    for c in contributors:
+                        self._aggregated_contributors.remove(c)
+                    self._total_weight -= weight
+            raise
+        return True
+
     def aggregate(self, fl_ctx: FLContext) -> DXO:
         """Called when workflow determines to generate DXO to send back to contributors
         Args:
@@ -174,6 +286,8 @@ class DXOAggregator(FLComponent):
         self.log_info(fl_ctx, f"aggregating {self.aggregation_helper.get_len()} update(s) at round {current_round}")
         self.log_debug(fl_ctx, f"complete history {self.aggregation_helper.get_len()}")
         aggregated_dict = self.aggregation_helper.get_result()
+        if isinstance(aggregated_dict, FlatModel):
+            aggregated_dict = aggregated_dict.to_dict()
         self.log_debug(fl_ctx, "End aggregation")
 
         dxo = DXO(data_kind=self.expected_data_kind, data=aggregated_dict)
@@ -181,4 +295,12 @@ class DXOAggregator(FLComponent):
             dxo.set_meta_prop(MetaKey.PROCESSED_ALGORITHM, self.processed_algorithm)
             self.processed_algorithm = None
 
+        with self._lock:
+            if self.partial_aggregation:
+                dxo.set_meta_prop(MetaKey.AGGREGATED_WEIGHT, self._total_weight)
+                dxo.set_meta_prop(MetaKey.AGGREGATED_CONTRIBUTORS, list(self._aggregated_contributors))
+            self._aggregated_contributors = []
+            self._total_weight = 0.0
+            self._flat_index_used = False
+
         return dxo
@@ -50,6 +50,9 @@ class InTimeAccumulateWeightedAggregator(Aggregator):
         aggregation_weights: Union[Dict[str, Any], Dict[str, Dict[str, Any]], None] = None,
         expected_data_kind: Union[DataKind, Dict[str, DataKind]] = DataKind.WEIGHT_DIFF,
         weigh_by_local_iter: bool = True,
+        num_aggregation_shards: int = 1,
+        flatten_model: bool = False,
+        partial_aggregation: bool = False,
     ):
         """Perform accumulated weighted aggregation.
 
@@ -75,6 +78,18 @@ class InTimeAccumulateWeightedAggregator(Aggregator):
                 the number of computations on encrypted ciphertext.
                 The aggregated sum will still be divided by the provided weights and `aggregation_weights` for the
                 resulting weighted sum to be valid.
+            num_aggregation_shards (int, optional): number of shards the vars of each DXO are split into.
+                Shards are aggregated in parallel threads, so that large models use multiple cores
+                and concurrent contributions do not wait for each other. Defaults to 1 (no sharding).
+            flatten_model (bool, optional): whether to copy the vars of each contribution into one contiguous
+                buffer, so that a model with many small vars is aggregated with single vectorized ops.
+                Cannot be used with `num_aggregation_shards` > 1. Defaults to False.
+            partial_aggregation (bool, optional): whether this aggregator runs on a relay of a hierarchical
+                aggregation, and forwards its result to a higher tier aggregator. If True, the total weight and the
+                contributors of each aggregated DXO are added to its meta, so that the higher tier aggregator
+                (any InTimeAccumulateWeightedAggregator) weighs it by the total weight of the subtree.
+                Relay sites use it with the RelayAggregationExecutor, which sends the tasks of the server to the
+                children of the relay and returns the partial aggregate of their results. Defaults to False.
         """
         super().__init__()
         self.logger.debug(f"exclude vars: {exclude_vars}")
@@ -83,10 +98,14 @@ class InTimeAccumulateWeightedAggregator(Aggregator):
 
         self._single_dxo_key = ""
         self._weigh_by_local_iter = weigh_by_local_iter
+        self._num_aggregation_shards = num_aggregation_shards
+        self._flatten_model = flatten_model
+        self._partial_aggregation = partial_aggregation
 
         self.aggregation_weights = aggregation_weights
         self.exclude_vars = exclude_vars
         self.expected_data_kind = expected_data_kind
+        self.dxo_aggregators = dict()
 
     def handle_event(self, event_type: str, fl_ctx: FLContext):
         # _initialize() can not be called from the constructor. Because it changes the data, even the data format
@@ -94,6 +113,9 @@ class InTimeAccumulateWeightedAggregator(Aggregator):
         # parameters when re-construct the object creation configuration.
         if event_type == EventType.START_RUN:
             self._initialize(self.aggregation_weights, self.exclude_vars, self.expected_data_kind)
+        elif event_type == EventType.END_RUN:
+            for aggregator in self.dxo_aggregators.values():
+                aggregator.shutdown()
 
     def _initialize(self, aggregation_weights, exclude_vars, expected_data_kind):
         # Check expected data kind
@@ -166,6 +188,9 @@ class InTimeAccumulateWeightedAggregator(Aggregator):
                         expected_data_kind=self.expected_data_kind[k],
                         name_postfix=k,
                         weigh_by_local_iter=self._weigh_by_local_iter,
+                        num_aggregation_shards=self._num_aggregation_shards,
+                        flatten_model=self._flatten_model,
+                        partial_aggregation=self._partial_aggregation,
                     )
                 }
             )
@@ -187,7 +212,13 @@ class InTimeAccumulateWeightedAggregator(Aggregator):
             self.log_exception(fl_ctx, "shareable data is not a valid DXO")
             return False
 
-        if dxo.data_kind not in (DataKind.WEIGHT_DIFF, DataKind.WEIGHTS, DataKind.METRICS, DataKind.COLLECTION):
+        if dxo.data_kind not in (
+            DataKind.WEIGHT_DIFF,
+            DataKind.SPARSE_WEIGHT_DIFF,
+            DataKind.WEIGHTS,
+            DataKind.METRICS,
+            DataKind.COLLECTION,
+        ):
             self.log_error(
                 fl_ctx,
                 f"cannot handle data kind {dxo.data_kind}, "
@@ -0,0 +1,302 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from nvflare.apis.dxo import DXO, DataKind, from_shareable
+from nvflare.apis.fl_constant import ReservedKey, ReturnCode
+from nvflare.apis.fl_context import FLContext
+from nvflare.apis.shareable import Shareable
+from nvflare.app_common.abstract.aggregator import Aggregator
+from nvflare.app_common.app_constant import AppConstants
+
+
+class RobustAggregationMethod:
+    TRIMMED_MEAN = "trimmed_mean"
+    MEDIAN = "median"
+    KRUM = "krum"
+
+
+class _ContributionStack(object):
+    def __init__(self, initial_capacity: int):
+        """Contributions stacked per var into preallocated 2-D buffers of shape (capacity, var size)."""
+        self.initial_capacity = max(initial_capacity, 1)
+        self.names = None
+        self.shapes = {}
+        self.buffers = {}
+        self.contributors = []
+
+    def __len__(self):
+        return len(self.contributors)
+
+    def reset(self):
+        # keep the buffers and the schema for the next round
+        self.contributors = []
+
+    def check(self, data: Dict) -> Optional[str]:
+        """Returns the reason why data can't be added, or None."""
+        if self.names is None:
+            return None
+        for name in self.names:
+            v = data.get(name)
+            if v is None:
+                return f"missing var {name}"
+            if np.shape(v) != self.shapes[name]:
+                return f"shape of var {name} is {np.shape(v)} but expected {self.shapes[name]}"
+        return None
+
+    def _init_schema(self, data: Dict):
+        self.names = list(data.keys())
+        for name, v in data.items():
+            v = np.asarray(v)
+            self.shapes[name] = v.shape
+            dtype = v.dtype if v.dtype.kind == "f" else np.dtype(np.float64)
+            self.buffers[name] = np.empty((self.initial_capacity, v.size), dtype=dtype)
+
+    def add(self, contributor: str, data: Dict):
+        if self.names is None:
+            self._init_schema(data)
+
+        row = len(self.contributors)
+        for name in self.names:
+            buffer = self.buffers[name]
+            if row >= buffer.shape[0]:
+                new_buffer = np.empty((buffer.shape[0] * 2, buffer.shape[1]), dtype=buffer.dtype)
+                new_buffer[:row] = buffer[:row]
+                buffer = self.buffers[name] = new_buffer
+            buffer[row] = np.reshape(data[name], -1)
+        self.contributors.append(contributor)
+
+    def get(self, name: str) -> np.ndarray:
+        """Gets the stacked contributions of a var, of shape (num contributions, var size)."""
+        return self.buffers[name][: len(self.contributors)]
+
+
+class RobustAggregator(Aggregator):
+    def __init__(
+        self,
+        method: str = RobustAggregationMethod.TRIMMED_MEAN,
+        trim_ratio: float = 0.1,
+        num_byzantine: int = 0,
+        num_selected: int = 1,
+        exclude_vars: Optional[str] = None,
+        expected_data_kind: str = DataKind.WEIGHT_DIFF,
+        expected_num_contributions: int = 8,
+        chunk_size: int = 0,
+    ):
+        """Perform Byzantine-robust aggregation of one DXO of weights or weight diffs.
+
+        Contributions are stacked per var into preallocated buffers as they are accepted, and aggregated
+        coordinate-wise with `np.partition` (trimmed mean, median) or by selecting contributions (Krum).
+        Contributions are not weighted.
+
+        Args:
+            method (str, optional): "trimmed_mean", "median" or "krum". Defaults to "trimmed_mean".
+            trim_ratio (float, optional): for "trimmed_mean", the fraction of the largest and of the smallest values of
+                each coordinate that are removed before averaging. Must be in [0, 0.5). Defaults to 0.1.
+            num_byzantine (int, optional): for "krum", the number of Byzantine contributors to tolerate. Defaults to 0.
+            num_selected (int, optional): for "krum", the number of contributions with the best scores to average
+                (Multi-Krum if > 1). Defaults to 1.
+            exclude_vars (str, optional): regex to match vars that are not aggregated. Defaults to None.
+            expected_data_kind (str, optional): DataKind.WEIGHT_DIFF or DataKind.WEIGHTS.
+                Defaults to DataKind.WEIGHT_DIFF.
+            expected_num_contributions (int, optional): number of contributions the buffers are preallocated for.
+                Buffers grow as needed. Defaults to 8.
+            chunk_size (int, optional): max number of elements of a var processed at once, to bound the temporary
+                memory used by aggregation to (number of contributions x chunk_size). 0 processes each var at once.
+                Defaults to 0.
+        """
+        super().__init__()
+        methods = (RobustAggregationMethod.TRIMMED_MEAN, RobustAggregationMethod.MEDIAN, RobustAggregationMethod.KRUM)
+        if method not in methods:
+            raise ValueError(f"method must be trimmed_mean, median or krum but got {method}")
+        if not 0 <= trim_ratio < 0.5:
+            raise ValueError(f"trim_ratio must be in [0, 0.5) but got {trim_ratio}")
+        if num_byzantine < 0:
+            raise ValueError(f"num_byzantine must be >= 0 but got {num_byzantine}")
+        if num_selected <= 0:
+            raise ValueError(f"num_selected must be > 0 but got {num_selected}")
+        if chunk_size < 0:
+            raise ValueError(f"chunk_size must be >= 0 but got {chunk_size}")
+        if expected_data_kind not in (DataKind.WEIGHT_DIFF, DataKind.WEIGHTS):
+            raise ValueError(f"expected_data_kind = {expected_data_kind} is not WEIGHT_DIFF or WEIGHTS")
+
+        self.method = method
+        self.trim_ratio = trim_ratio
+        self.num_byzantine = num_byzantine
+        self.num_selected = num_selected
+        self.exclude_vars = re.compile(exclude_vars) if exclude_vars else None
+        self.expected_data_kind = expected_data_kind
+        self.chunk_size = chunk_size
+
+        self._lock = threading.Lock()
+        self._stack = _ContributionStack(expected_num_contributions)
+
+    def reset(self, fl_ctx: FLContext):
+        with self._lock:
+            self._stack.reset()
+
+    def accept(self, shareable: Shareable, fl_ctx: FLContext) -> bool:
+        """Store the contribution in the stacked buffers.
+
+        Args:
+            shareable: information from contributor
+            fl_ctx: context provided by workflow
+
+        Returns:
+            The boolean to indicate if the contribution is accepted.
+        """
+        try:
+            dxo = from_shareable(shareable)
+        except Exception:
+            self.log_exception(fl_ctx, "shareable data is not a valid DXO")
+            return False
+
+        contributor_name = shareable.get_peer_prop(key=ReservedKey.IDENTITY_NAME, default="?")
+        contribution_round = shareable.get_cookie(AppConstants.CONTRIBUTION_ROUND)
+
+        rc = shareable.get_return_code()
+        if rc and rc != ReturnCode.OK:
+            self.log_warning(fl_ctx, f"Contributor {contributor_name} returned rc: {rc}. Disregarding contribution.")
+            return False
+
+        if dxo.data_kind != self.expected_data_kind:
+            self.log_error(fl_ctx, "expected {} but got {}".format(self.expected_data_kind, dxo.data_kind))
+            return False
+
+        current_round = fl_ctx.get_prop(AppConstants.CURRENT_ROUND)
+        if contribution_round != current_round:
+            self.log_warning(
+                fl_ctx,
+                f"discarding DXO from {contributor_name} at round: "
+                f"{contribution_round}. Current round is: {current_round}",
+            )
+            return False
+
+        if not dxo.data:
+            self.log_error(fl_ctx, "no data to aggregate")
+            return False
+
+        data = {k: v for k, v in dxo.data.items() if not (self.exclude_vars and self.exclude_vars.search(k))}
+        with self._lock:
+            if contributor_name in self._stack.contributors:
+                self.log_warning(
+                    fl_ctx,
+                    f"discarding DXO from {contributor_name} at round: {contribution_round} as it was accepted already",
+                )
+                return False
+
+            reason = self._stack.check(data)
+            if reason:
+                self.log_error(fl_ctx, f"discarding DXO from {contributor_name}: {reason}")
+                return False
+
+            self._stack.add(contributor_name, data)
+        return True
+
+    def _get_chunks(self, size: int):
+        chunk_size = self.chunk_size or size
+        for start in range(0, size, chunk_size):
+            yield start, min(start + chunk_size, size)
+
+    def _trimmed_mean(self, stacked: np.ndarray, out: np.ndarray):
+        n = stacked.shape[0]
+        k = int(self.trim_ratio * n)
+        for start, end in self._get_chunks(stacked.shape[1]):
+            chunk = stacked[:, start:end]
+            if k:
+                chunk = np.partition(chunk, (k, n - k - 1), axis=0)[k : n - k]
+            np.mean(chunk, axis=0, out=out[start:end])
+
+    def _median(self, stacked: np.ndarray, out: np.ndarray):
+        n = stacked.shape[0]
+        mid = n // 2
+        for start, end in self._get_chunks(stacked.shape[1]):
+            if n % 2:
+                out[start:end] = np.partition(stacked[:, start:end], mid, axis=0)[mid]
+            else:
+                chunk = np.partition(stacked[:, start:end], (mid - 1, mid), axis=0)
+                np.mean(chunk[mid - 1 : mid + 1], axis=0, out=out[start:end])
+
+    def _krum_select(self, fl_ctx: FLContext) -> List[int]:
+        n = len(self._stack)
+        num_neighbors = n - self.num_byzantine - 2
+        if num_neighbors < 1:
+            self.log_warning(
+                fl_ctx,
+                f"Krum needs more than {self.num_byzantine + 2} contributions to tolerate {self.num_byzantine} "
+                f"Byzantine contributors, but got {n}",
+            )
+            num_neighbors = max(n - 1, 1)
+
+        # pairwise squared distances of the whole contributions, accumulated over chunks of all vars
+        distances = np.zeros((n, n))
+        for name in self._stack.names:
+            stacked = self._stack.get(name)
+            for start, end in self._get_chunks(stacked.shape[1]):
+                chunk = stacked[:, start:end].astype(np.float64)
+                gram = chunk @ chunk.T
+                sq_norms = np.diag(gram)
+                distances += sq_norms[:, None] + sq_norms[None, :] - 2 * gram
+        np.maximum(distances, 0, out=distances)
+        np.fill_diagonal(distances, np.inf)
+
+        if n > 1:
+            closest = np.partition(distances, num_neighbors - 1, axis=1)[:, :num_neighbors]
+            scores = closest.sum(axis=1)
+        else:
+            scores = np.zeros(1)
+        selected = np.argsort(scores, kind="stable")[: min(self.num_selected, n)]
+        return sorted(selected.tolist())
+
+    def aggregate(self, fl_ctx: FLContext) -> Shareable:
+        """Called when workflow determines to generate shareable to send back to contributors
+
+        Args:
+            fl_ctx (FLContext): context provided by workflow
+
+        Returns:
+            Shareable: the robust aggregation of accepted contributions
+        """
+        with self._lock:
+            n = len(self._stack)
+            current_round = fl_ctx.get_prop(AppConstants.CURRENT_ROUND)
+            self.log_info(fl_ctx, f"aggregating {n} update(s) with {self.method} at round {current_round}")
+            if n == 0:
+                self.log_error(fl_ctx, "no contributions to aggregate")
+                return Shareable()
+
+            selected = None
+            if self.method == RobustAggregationMethod.KRUM:
+                selected = self._krum_select(fl_ctx)
+                self.log_info(fl_ctx, f"Krum selected {[self._stack.contributors[i] for i in selected]}")
+
+            result = {}
+            for name in self._stack.names:
+                stacked = self._stack.get(name)
+                out = np.empty(stacked.shape[1], dtype=stacked.dtype)
+                if self.method == RobustAggregationMethod.TRIMMED_MEAN:
+                    self._trimmed_mean(stacked, out)
+                elif self.method == RobustAggregationMethod.MEDIAN:
+                    self._median(stacked, out)
+                else:
+                    np.mean(stacked[selected], axis=0, out=out)
+                result[name] = out.reshape(self._stack.shapes[name])
+            self._stack.reset()
+
+        return DXO(data_kind=self.expected_data_kind, data=result).to_shareable()
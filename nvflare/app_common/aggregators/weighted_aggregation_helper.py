@@ -13,14 +13,48 @@
 # limitations under the License.
 
 import re
+import sys
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+import numpy as np
+
+from nvflare.app_common.abstract.sparse_array import COMPRESSED_ARRAY_TYPES
+from nvflare.app_common.utils.flat_model import FlatModel, FlatModelIndex
+
+_NUMPY_ACCUMULATE_KINDS = "biuf"
+_FLAT_MODEL_KEY = "__flat_model__"
+
+
+def _get_torch():
+    # tensors can only be received if torch has already been imported, so there is no need to import it here
+    return sys.modules.get("torch")
+
+
+def _get_num_elements(v) -> int:
+    size = getattr(v, "size", None)
+    if isinstance(size, int):
+        return size
+    numel = getattr(v, "numel", None)
+    if callable(numel):
+        return numel()
+    return 1
+
 
 class WeightedAggregationHelper(object):
     def __init__(self, exclude_vars: Optional[str] = None, weigh_by_local_iter: bool = True):
         """Perform weighted aggregation.
 
+        Numpy arrays and torch tensors are accumulated in place into float64 buffers owned by the helper.
+        The aggregated result is cast back to the floating point dtype of the first contribution.
+        SparseArray, LowRankArray and SignArray values are added into dense float64 totals without densifying them
+        first.
+        Other values (e.g. floats, encrypted values) are accumulated with the `*` and `+` operators.
+        Contributions can also be FlatModel objects, whose buffers are accumulated with single vectorized ops;
+        exclude_vars is not applied to them (vars are excluded when the FlatModelIndex is created),
+        and the result is a FlatModel.
+
         Args:
             exclude_vars (str, optional): regex string to match excluded vars during aggregation. Defaults to None.
             weigh_by_local_iter (bool, optional): Whether to weight the contributions by the number of iterations
@@ -38,28 +72,99 @@ class WeightedAggregationHelper(object):
         self.total = dict()
         self.counts = dict()
         self.history = list()
+        self.dtypes = dict()  # var name => original dtype of vars accumulated in place
+        self.flat_index = None  # index of FlatModel contributions
+
+        # var name => whether it is excluded, computed once per var name of the model
+        self._excluded = dict()
+        self._scratch = None
 
     def reset_stats(self):
         self.total = dict()
         self.counts = dict()
         self.history = list()
+        self.dtypes = dict()
+        self.flat_index = None
+
+    def _is_excluded(self, k) -> bool:
+        excluded = self._excluded.get(k)
+        if excluded is None:
+            excluded = self.exclude_vars is not None and bool(self.exclude_vars.search(k))
+            self._excluded[k] = excluded
+        return excluded
+
+    def _get_scratch(self, v: np.ndarray) -> np.ndarray:
+        # a single buffer for weighting contributions, reused across vars
+        if self._scratch is None or self._scratch.size < v.size:
+            self._scratch = np.empty(v.size, dtype=np.float64)
+        return self._scratch[: v.size].reshape(v.shape)
+
+    def _start_total(self, k, v, weight):
+        if isinstance(v, np.ndarray) and v.dtype.kind in _NUMPY_ACCUMULATE_KINDS:
+            self.dtypes[k] = v.dtype
+            total = v.astype(np.float64)
+            if self.weigh_by_local_iter:
+                np.multiply(total, weight, out=total)
+            return total
+
+        if isinstance(v, COMPRESSED_ARRAY_TYPES):
+            # accumulated into a dense total without densifying the contribution
+            self.dtypes[k] = v.dtype
+            total = np.zeros(v.shape, dtype=np.float64)
+            v.add_to(total, weight if self.weigh_by_local_iter else 1.0)
+            return total
+
+        torch = _get_torch()
+        if torch is not None and isinstance(v, torch.Tensor) and not v.is_complex():
+            self.dtypes[k] = v.dtype
+            total = v.detach().to(dtype=torch.float64, copy=True)
+            if self.weigh_by_local_iter:
+                total.mul_(weight)
+            return total
+
+        return v * weight if self.weigh_by_local_iter else v
+
+    def _add_to_total(self, k, current_total, v, weight):
+        if k in self.dtypes and getattr(v, "shape", None) == current_total.shape:
+            if isinstance(current_total, np.ndarray):
+                if isinstance(v, np.ndarray) and v.dtype.kind in _NUMPY_ACCUMULATE_KINDS:
+                    if self.weigh_by_local_iter:
+                        v = np.multiply(v, weight, out=self._get_scratch(v))
+                    return np.add(current_total, v, out=current_total)
+                if isinstance(v, COMPRESSED_ARRAY_TYPES):
+                    v.add_to(current_total, weight if self.weigh_by_local_iter else 1.0)
+                    return current_total
+            else:
+                torch = _get_torch()
+                if torch is not None and isinstance(v, torch.Tensor) and not v.is_complex():
+                    v = v.detach().to(device=current_total.device)
+                    return current_total.add_(v, alpha=weight if self.weigh_by_local_iter else 1)
+
+        if self.weigh_by_local_iter:
+            weighted_value = v * weight
+        else:
+            weighted_value = v  # used in homomorphic encryption to reduce computations on ciphertext
+        return current_total + weighted_value
 
     def add(self, data, weight, contributor_name, contribution_round):
         """Compute weighted sum and sum of weights."""
         with self.lock:
-            for k, v in data.items():
-                if self.exclude_vars is not None and self.exclude_vars.search(k):
-                    continue
-                if self.weigh_by_local_iter:
-                    weighted_value = v * weight
-                else:
-                    weighted_value = v  # used in homomorphic encryption to reduce computations on ciphertext
+            if isinstance(data, FlatModel):
+                if self.flat_index is None:
+                    self.flat_index = data.index
+                elif data.index != self.flat_index:
+                    raise ValueError("FlatModel contribution has a different index than previous contributions")
+                items = [(_FLAT_MODEL_KEY, data.buffer)]
+            else:
+                items = [(k, v) for k, v in data.items() if not self._is_excluded(k)]
+
+            for k, v in items:
                 current_total = self.total.get(k, None)
                 if current_total is None:
-                    self.total[k] = weighted_value
+                    self.total[k] = self._start_total(k, v, weight)
                     self.counts[k] = weight
                 else:
-                    self.total[k] = current_total + weighted_value
+                    self.total[k] = self._add_to_total(k, current_total, v, weight)
                     self.counts[k] = self.counts[k] + weight
             self.history.append(
                 {
@@ -69,10 +174,29 @@ class WeightedAggregationHelper(object):
                 }
             )
 
+    def _get_average(self, k, total):
+        dtype = self.dtypes.get(k)
+        if dtype is None:
+            return total * (1.0 / self.counts[k])
+
+        if isinstance(total, np.ndarray):
+            np.multiply(total, 1.0 / self.counts[k], out=total)
+            return total.astype(dtype, copy=False) if dtype.kind == "f" else total
+
+        total.mul_(1.0 / self.counts[k])
+        return total.to(dtype=dtype) if dtype.is_floating_point else total
+
     def get_result(self):
         """Divide weighted sum by sum of weights."""
         with self.lock:
-            aggregated_dict = {k: v * (1.0 / self.counts[k]) for k, v in self.total.items()}
+            aggregated_dict = {k: self._get_average(k, v) for k, v in self.total.items()}
+            if self.flat_index is not None:
+                # averages of non-float vars are float64, same as for dict contributions
+                index = self.flat_index
+                dtypes = [d if d.kind == "f" else np.dtype(np.float64) for d in index.dtypes]
+                aggregated_dict = FlatModel(
+                    aggregated_dict[_FLAT_MODEL_KEY], FlatModelIndex(index.names, index.shapes, dtypes)
+                )
             self.reset_stats()
             return aggregated_dict
 
@@ -81,3 +205,110 @@ class WeightedAggregationHelper(object):
 
     def get_len(self):
         return len(self.get_history())
+
+
+class ShardedWeightedAggregationHelper(object):
+    def __init__(self, exclude_vars: Optional[str] = None, weigh_by_local_iter: bool = True, num_shards: int = 4):
+        """Perform weighted aggregation with vars partitioned into shards that are aggregated in parallel.
+
+        Each shard is a WeightedAggregationHelper with its own lock, and shards are processed by a thread pool
+        (numpy and torch release the GIL for large arrays). Contributions added concurrently can therefore
+        proceed in parallel on different shards.
+        Vars are assigned to shards when first seen, balancing the number of elements of the shards.
+
+        Args:
+            exclude_vars (str, optional): regex string to match excluded vars during aggregation. Defaults to None.
+            weigh_by_local_iter (bool, optional): Whether to weight the contributions by the number of iterations
+                performed in local training in the current round. Defaults to `True`.
+            num_shards (int, optional): number of shards and worker threads. Defaults to 4.
+        """
+        super().__init__()
+        if not isinstance(num_shards, int) or num_shards <= 0:
+            raise ValueError(f"num_shards must be a positive int but got {num_shards}")
+        self.lock = threading.Lock()
+        self.shards = [
+            WeightedAggregationHelper(exclude_vars=exclude_vars, weigh_by_local_iter=weigh_by_local_iter)
+            for _ in range(num_shards)
+        ]
+        self.history = list()
+
+        # var name => shard index, kept across rounds
+        self._shard_of = dict()
+        self._var_order = dict()
+        self._shard_sizes = [0] * num_shards
+        self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self.lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=len(self.shards), thread_name_prefix="weighted_aggregation"
+                )
+            return self._executor
+
+    def shutdown(self):
+        with self.lock:
+            executor = self._executor
+            self._executor = None
+        if executor:
+            executor.shutdown(wait=False)
+
+    def reset_stats(self):
+        with self.lock:
+            for shard in self.shards:
+                shard.reset_stats()
+            self.history = list()
+
+    def _split(self, data) -> list:
+        # must be called with the lock held
+        shard_data = [dict() for _ in self.shards]
+        for k, v in data.items():
+            i = self._shard_of.get(k)
+            if i is None:
+                i = min(range(len(self.shards)), key=lambda x: self._shard_sizes[x])
+                self._shard_of[k] = i
+                self._var_order[k] = len(self._var_order)
+                self._shard_sizes[i] += _get_num_elements(v)
+            shard_data[i][k] = v
+        return shard_data
+
+    def _run_on_shards(self, fn, shard_args: list) -> list:
+        executor = self._get_executor()
+        futures = [executor.submit(fn, shard, arg) for shard, arg in zip(self.shards, shard_args) if arg is not None]
+        return [f.result() for f in futures]
+
+    def add(self, data, weight, contributor_name, contribution_round):
+        """Compute weighted sum and sum of weights."""
+        if isinstance(data, FlatModel):
+            raise TypeError("FlatModel contributions are not supported by ShardedWeightedAggregationHelper")
+
+        with self.lock:
+            shard_data = self._split(data)
+            self.history.append(
+                {
+                    "contributor_name": contributor_name,
+                    "round": contribution_round,
+                    "weight": weight,
+                }
+            )
+
+        self._run_on_shards(
+            lambda shard, d: shard.add(d, weight, contributor_name, contribution_round),
+            [d if d else None for d in shard_data],
+        )
+
+    def get_result(self):
+        """Divide weighted sum by sum of weights."""
+        results = self._run_on_shards(lambda shard, _: shard.get_result(), [True] * len(self.shards))
+        aggregated_dict = dict()
+        for result in results:
+            aggregated_dict.update(result)
+        with self.lock:
+            self.history = list()
+            return dict(sorted(aggregated_dict.items(), key=lambda item: self._var_order[item[0]]))
+
+    def get_history(self):
+        return self.history
+
+    def get_len(self):
+        return len(self.get_history())
@@ -19,6 +19,7 @@ from typing import Any
 from nvflare.app_common.abstract.fl_model import FLModel
 from nvflare.app_common.abstract.learnable import Learnable
 from nvflare.app_common.abstract.model import ModelLearnable
+from nvflare.app_common.abstract.sparse_array import LowRankArray, SignArray, SparseArray
 from nvflare.app_common.widgets.event_recorder import _CtxPropReq, _EventReq, _EventStats
 from nvflare.fuel.utils import fobs
 from nvflare.fuel.utils.fobs.datum import DatumManager
@@ -58,6 +59,59 @@ class FLModelDecomposer(fobs.Decomposer):
         )
 
 
+class SparseArrayDecomposer(fobs.Decomposer):
+    def supported_type(self):
+        return SparseArray
+
+    def decompose(self, b: SparseArray, manager: DatumManager = None) -> Any:
+        externalizer = Externalizer(manager)
+        return (
+            externalizer.externalize(b.indices),
+            externalizer.externalize(b.values),
+            list(b.shape),
+        )
+
+    def recompose(self, data: tuple, manager: DatumManager = None) -> SparseArray:
+        assert isinstance(data, tuple)
+        indices, values, shape = data
+        internalizer = Internalizer(manager)
+        return SparseArray(
+            indices=internalizer.internalize(indices),
+            values=internalizer.internalize(values),
+            shape=tuple(shape),
+        )
+
+
+class LowRankArrayDecomposer(fobs.Decomposer):
+    def supported_type(self):
+        return LowRankArray
+
+    def decompose(self, b: LowRankArray, manager: DatumManager = None) -> Any:
+        externalizer = Externalizer(manager)
+        return externalizer.externalize(b.a), externalizer.externalize(b.b)
+
+    def recompose(self, data: tuple, manager: DatumManager = None) -> LowRankArray:
+        assert isinstance(data, tuple)
+        a, b = data
+        internalizer = Internalizer(manager)
+        return LowRankArray(a=internalizer.internalize(a), b=internalizer.internalize(b))
+
+
+class SignArrayDecomposer(fobs.Decomposer):
+    def supported_type(self):
+        return SignArray
+
+    def decompose(self, b: SignArray, manager: DatumManager = None) -> Any:
+        externalizer = Externalizer(manager)
+        return externalizer.externalize(b.bits), b.scale, list(b.shape), b.dtype.str
+
+    def recompose(self, data: tuple, manager: DatumManager = None) -> SignArray:
+        assert isinstance(data, tuple)
+        bits, scale, shape, dtype = data
+        internalizer = Internalizer(manager)
+        return SignArray(bits=internalizer.internalize(bits), scale=scale, shape=tuple(shape), dtype=dtype)
+
+
 def register():
     if register.registered:
         return
@@ -65,6 +119,9 @@ def register():
     fobs.register(DictDecomposer(Learnable))
     fobs.register(DictDecomposer(ModelLearnable))
     fobs.register(FLModelDecomposer)
+    fobs.register(SparseArrayDecomposer)
+    fobs.register(LowRankArrayDecomposer)
+    fobs.register(SignArrayDecomposer)
 
     fobs.register_data_classes(
         _CtxPropReq,
@@ -48,6 +48,7 @@ class ClientAPILauncherExecutor(LauncherExecutor):
         params_exchange_format: str = ExchangeFormat.NUMPY,
         params_transfer_type: str = TransferType.FULL,
         config_file_name: str = CLIENT_API_CONFIG,
+        params_diff_in_place: bool = False,
     ) -> None:
         """Initializes the ClientAPILauncherExecutor.
 
@@ -77,6 +78,9 @@ class ClientAPILauncherExecutor(LauncherExecutor):
             params_transfer_type (str): How to transfer the parameters. FULL means the whole model parameters are sent.
                 DIFF means that only the difference is sent.
             config_file_name (str): The config file name to write attributes into, the client api will read in this file.
+            params_diff_in_place (bool): Whether the DIFF is computed into the params of the received model, on the
+                device of the trained params, instead of allocating a new copy of the model. The received params are
+                overwritten. Only used when params_transfer_type is DIFF.
         """
         LauncherExecutor.__init__(
             self,
@@ -102,6 +106,7 @@ class ClientAPILauncherExecutor(LauncherExecutor):
 
         self._params_exchange_format = params_exchange_format
         self._params_transfer_type = params_transfer_type
+        self._params_diff_in_place = params_diff_in_place
         self._config_file_name = config_file_name
 
     def initialize(self, fl_ctx: FLContext) -> None:
@@ -114,6 +119,7 @@ class ClientAPILauncherExecutor(LauncherExecutor):
             ConfigKey.TRAIN_WITH_EVAL: self._train_with_evaluation,
             ConfigKey.EXCHANGE_FORMAT: self._params_exchange_format,
             ConfigKey.TRANSFER_TYPE: self._params_transfer_type,
+            ConfigKey.DIFF_IN_PLACE: self._params_diff_in_place,
             ConfigKey.TRAIN_TASK_NAME: self._train_task_name,
             ConfigKey.EVAL_TASK_NAME: self._evaluate_task_name,
             ConfigKey.SUBMIT_MODEL_TASK_NAME: self._submit_model_task_name,
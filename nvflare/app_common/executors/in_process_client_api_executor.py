@@ -60,6 +60,7 @@ class InProcessClientAPIExecutor(Executor):
         train_task_name: str = AppConstants.TASK_TRAIN,
         evaluate_task_name: str = AppConstants.TASK_VALIDATION,
         submit_model_task_name: str = AppConstants.TASK_SUBMIT_MODEL,
+        params_diff_in_place: bool = False,
     ):
         super(InProcessClientAPIExecutor, self).__init__()
         self._abort = False
@@ -68,6 +69,7 @@ class InProcessClientAPIExecutor(Executor):
         self._log_pull_interval = log_pull_interval
         self._params_exchange_format = params_exchange_format
         self._params_transfer_type = params_transfer_type
+        self._params_diff_in_place = params_diff_in_place
 
         if not task_script_path or not task_script_path.endswith(".py"):
             raise ValueError(f"invalid task_script_path '{task_script_path}'")
@@ -187,6 +189,7 @@ class InProcessClientAPIExecutor(Executor):
                 ConfigKey.TRAIN_WITH_EVAL: self._train_with_evaluation,
                 ConfigKey.EXCHANGE_FORMAT: self._params_exchange_format,
                 ConfigKey.TRANSFER_TYPE: self._params_transfer_type,
+                ConfigKey.DIFF_IN_PLACE: self._params_diff_in_place,
                 ConfigKey.TRAIN_TASK_NAME: self._train_task_name,
                 ConfigKey.EVAL_TASK_NAME: self._evaluate_task_name,
                 ConfigKey.SUBMIT_MODEL_TASK_NAME: self._submit_model_task_name,
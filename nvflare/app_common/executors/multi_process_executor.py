@@ -15,8 +15,10 @@
 import os
 import shlex
 import subprocess
+import tempfile
 import threading
 import time
+import uuid
 from abc import abstractmethod
 
 from nvflare.apis.event_type import EventType
@@ -41,10 +43,19 @@ from nvflare.fuel.utils.class_utils import ModuleScanner
 from nvflare.fuel.utils.component_builder import ComponentBuilder
 from nvflare.fuel.utils.config_service import ConfigService
 from nvflare.fuel.utils.log_utils import get_obj_logger
+from nvflare.fuel.utils.pipe.shared_memory_pipe import SHM_DIR, SharedMemoryFileAccessor
 from nvflare.private.defs import CellChannel, CellChannelTopic, new_cell_message
 from nvflare.security.logging import secure_format_exception
 
 
+_TASK_INPUT_SEGMENT_PREFIX = "nvflare_segment_"
+
+
+def get_task_input_accessor(task_input_path: str) -> SharedMemoryFileAccessor:
+    """Gets the accessor of the task input file shared by all rank processes."""
+    return SharedMemoryFileAccessor(os.path.dirname(task_input_path), _TASK_INPUT_SEGMENT_PREFIX, multiple_readers=True)
+
+
 class WorkerComponentBuilder(ComponentBuilder):
     FL_PACKAGES = ["nvflare"]
     FL_MODULES = ["client", "app"]
@@ -59,16 +70,21 @@ class WorkerComponentBuilder(ComponentBuilder):
 
 
 class MultiProcessExecutor(Executor):
-    def __init__(self, executor_id=None, num_of_processes=1, components=None):
+    def __init__(self, executor_id=None, num_of_processes=1, components=None, shared_task_input=False):
         """Manage the multi-process execution life cycle.
 
         Arguments:
             executor_id: executor component ID
             num_of_processes: number of processes to create
             components: a dictionary for component classes to their arguments
+            shared_task_input: whether to write the task data once into shared memory for all rank processes,
+                instead of sending it to each of them. The arrays and CPU tensors of the task data are mapped
+                copy-on-write by the ranks, without being deserialized. Only rank 0 returns the result.
         """
         super().__init__()
         self.executor_id = executor_id
+        self.shared_task_input = shared_task_input
+        self.task_input_path = None
 
         self.components_conf = components
         self.components = {}
@@ -298,6 +314,12 @@ class MultiProcessExecutor(Executor):
                 CommunicationMetaData.SHAREABLE: shareable,
                 CommunicationMetaData.FL_CTX: get_serializable_data(fl_ctx),
             }
+            if self.shared_task_input:
+                # the ranks have read the input of the previous task, since its result was received
+                self._remove_task_input()
+                self.task_input_path = self._write_task_input(shareable)
+                data[CommunicationMetaData.SHAREABLE] = None
+                data[CommunicationMetaData.TASK_INPUT_PATH] = self.task_input_path
 
             request = new_cell_message({}, data)
             self.engine.client.cell.fire_and_forget(
@@ -310,6 +332,22 @@ class MultiProcessExecutor(Executor):
             self.log_error(fl_ctx, "Multi-Process Execution error.")
             return make_reply(ReturnCode.EXECUTION_RESULT_ERROR)
 
+    @staticmethod
+    def _write_task_input(shareable: Shareable) -> str:
+        task_input_dir = SHM_DIR if os.path.isdir(SHM_DIR) else tempfile.gettempdir()
+        task_input_path = os.path.join(task_input_dir, f"nvflare_task_input_{uuid.uuid4().hex}")
+        get_task_input_accessor(task_input_path).write(shareable, task_input_path)
+        return task_input_path
+
+    def _remove_task_input(self):
+        task_input_path, self.task_input_path = self.task_input_path, None
+        if task_input_path:
+            get_task_input_accessor(task_input_path).remove_segment(task_input_path)
+            try:
+                os.remove(task_input_path)
+            except FileNotFoundError:
+                pass
+
     def finalize(self, fl_ctx: FLContext):
         """This is called when exiting/aborting the executor."""
         if self.finalized:
@@ -317,6 +355,7 @@ class MultiProcessExecutor(Executor):
 
         self.finalized = True
         self.stop_execute = True
+        self._remove_task_input()
 
         request = new_cell_message({}, None)
         self.engine.client.cell.fire_and_forget(
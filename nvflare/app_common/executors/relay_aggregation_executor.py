@@ -0,0 +1,129 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import List
+
+from nvflare.apis.controller_spec import ClientTask, Task
+from nvflare.apis.dxo import MetaKey, from_shareable
+from nvflare.apis.event_type import EventType
+from nvflare.apis.executor import Executor
+from nvflare.apis.fl_constant import ReservedKey, ReturnCode
+from nvflare.apis.fl_context import FLContext
+from nvflare.apis.impl.task_controller import TaskController
+from nvflare.apis.shareable import Shareable, make_reply
+from nvflare.apis.signal import Signal
+from nvflare.app_common.abstract.aggregator import Aggregator
+from nvflare.app_common.app_constant import AppConstants
+from nvflare.fuel.utils.validation_utils import check_non_empty_str, check_positive_int
+from nvflare.security.logging import secure_format_exception
+
+
+class RelayAggregationExecutor(Executor, TaskController):
+
+    _PROP_NUM_ACCEPTED = "num_accepted"
+
+    def __init__(self, children: List[str], aggregator_id: str, task_timeout: int = 3600):
+        """Executor of a relay site in two-tier aggregation.
+
+        The relay sends each task it gets from the server to its child sites through the aux channel,
+        and the children run the task with the executors they configured for it.
+        The results of the children are aggregated as they are received, and the partial aggregate is returned to
+        the server as the result of the relay. The aggregator of the server weighs it by the total weight of the
+        subtree, so the result is the same as if the children had sent their results to the server.
+
+        The aggregator must be an InTimeAccumulateWeightedAggregator with `partial_aggregation=True`.
+        A child can be a relay itself, in which case its partial aggregate is added to the one of this relay.
+        The workflow of the server must only send the task to the relays (e.g. `train_targets` of ScatterAndGather).
+
+        Args:
+            children: names of the child sites of the relay.
+            aggregator_id: component id of the aggregator of the results of the children.
+            task_timeout: how long to wait for the results of the children, in seconds. Defaults to 3600.
+        """
+        Executor.__init__(self)
+        TaskController.__init__(self)
+        if not isinstance(children, list) or not children:
+            raise ValueError(f"children must be a non-empty list of site names but got {children}")
+        for child in children:
+            check_non_empty_str("child", child)
+        check_non_empty_str("aggregator_id", aggregator_id)
+        check_positive_int("task_timeout", task_timeout)
+        self.children = children
+        self.aggregator_id = aggregator_id
+        self.task_timeout = task_timeout
+        self.aggregator = None
+
+    def handle_event(self, event_type: str, fl_ctx: FLContext):
+        if event_type == EventType.START_RUN:
+            self.start_controller(fl_ctx)
+            self.aggregator = fl_ctx.get_engine().get_component(self.aggregator_id)
+            if not isinstance(self.aggregator, Aggregator):
+                self.system_panic(
+                    f"aggregator {self.aggregator_id} must be an Aggregator but got {type(self.aggregator)}", fl_ctx
+                )
+        elif event_type == EventType.END_RUN:
+            self.stop_controller(fl_ctx)
+
+    def execute(self, task_name: str, shareable: Shareable, fl_ctx: FLContext, abort_signal: Signal) -> Shareable:
+        # the children return the contribution round of the server, which is checked by the aggregator
+        contribution_round = shareable.get_cookie(AppConstants.CONTRIBUTION_ROUND)
+        if contribution_round is None:
+            self.log_warning(fl_ctx, "CONTRIBUTION_ROUND Not Set in task data!")
+        fl_ctx.set_prop(AppConstants.CURRENT_ROUND, contribution_round, private=True, sticky=False)
+
+        self.aggregator.reset(fl_ctx)
+        task = Task(
+            name=task_name,
+            data=shareable,
+            props={self._PROP_NUM_ACCEPTED: 0},
+            timeout=self.task_timeout,
+            result_received_cb=self._process_child_result,
+        )
+        self.log_info(fl_ctx, f"sending task {task_name} of round {contribution_round} to children {self.children}")
+        self.broadcast_and_wait(task=task, fl_ctx=fl_ctx, targets=self.children, abort_signal=abort_signal)
+
+        if abort_signal.triggered:
+            return make_reply(ReturnCode.TASK_ABORTED)
+
+        num_accepted = task.get_prop(self._PROP_NUM_ACCEPTED)
+        if not num_accepted:
+            self.log_error(fl_ctx, f"no result of task {task_name} accepted from children {self.children}")
+            return make_reply(ReturnCode.EXECUTION_EXCEPTION)
+
+        result = self.aggregator.aggregate(fl_ctx)
+        try:
+            dxo = from_shareable(result)
+        except Exception as e:
+            self.log_error(fl_ctx, f"aggregated result is not a valid DXO: {secure_format_exception(e)}")
+            return make_reply(ReturnCode.EXECUTION_EXCEPTION)
+        if dxo.get_meta_prop(MetaKey.AGGREGATED_WEIGHT) is None:
+            # otherwise the server would weigh the partial aggregate like the result of one site
+            self.log_error(fl_ctx, f"aggregator {self.aggregator_id} must be configured with partial_aggregation")
+            return make_reply(ReturnCode.EXECUTION_EXCEPTION)
+
+        self.log_info(fl_ctx, f"aggregated results of {num_accepted} of {len(self.children)} children")
+        return result
+
+    def _process_child_result(self, client_task: ClientTask, fl_ctx: FLContext):
+        result = client_task.result
+        # aux replies don't carry the identity of the child
+        peer_props = result.get_peer_props() or {}
+        peer_props[ReservedKey.IDENTITY_NAME] = client_task.client.name
+        result.set_peer_props(peer_props)
+
+        if self.aggregator.accept(result, fl_ctx):
+            task = client_task.task
+            task.set_prop(self._PROP_NUM_ACCEPTED, task.get_prop(self._PROP_NUM_ACCEPTED) + 1)
+        # the result is not needed once aggregated
+        client_task.result = None
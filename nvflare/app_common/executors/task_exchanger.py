@@ -65,7 +65,7 @@ class TaskExchanger(Executor):
             peer_read_timeout (float, optional): time to wait for peer to accept sent message.
             task_wait_time (float, optional): how long to wait for a task to complete.
                 None means waiting forever. Defaults to None.
-            result_poll_interval (float): how often to poll task result.
+            result_poll_interval (float): max time to wait for the task result before checking abort and timeout.
                 Defaults to 0.5.
             pipe_channel_name: the channel name for sending task requests.
                 Defaults to "task".
@@ -178,7 +178,7 @@ class TaskExchanger(Executor):
                 abort_signal.trigger("task pipe stopped!")
                 return make_reply(ReturnCode.TASK_ABORTED)
 
-            reply: Optional[Message] = self.pipe_handler.get_next()
+            reply: Optional[Message] = self.pipe_handler.get_next(timeout=self.result_poll_interval)
             if reply is None:
                 if self.task_wait_time and time.time() - start > self.task_wait_time:
                     # timed out
@@ -224,7 +224,6 @@ class TaskExchanger(Executor):
                 except Exception as ex:
                     self.log_error(fl_ctx, f"Failed to convert result: {secure_format_exception(ex)}")
                     return make_reply(ReturnCode.EXECUTION_EXCEPTION)
-            time.sleep(self.result_poll_interval)
 
     def check_input_shareable(self, task_name: str, shareable: Shareable, fl_ctx: FLContext) -> bool:
         """Checks input shareable before execute.
@@ -12,8 +12,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from .error_feedback_compressor import ErrorFeedbackCompressor
 from .exclude_vars import ExcludeVars
 from .percentile_privacy import PercentilePrivacy
 from .svt_privacy import SVTPrivacy
+from .top_k_sparsifier import TopKSparsifier
+from .weight_diff_decompressor import WeightDiffDecompressor
 
-__all__ = ["PercentilePrivacy", "SVTPrivacy", "ExcludeVars"]
+__all__ = [
+    "PercentilePrivacy",
+    "SVTPrivacy",
+    "ExcludeVars",
+    "TopKSparsifier",
+    "ErrorFeedbackCompressor",
+    "WeightDiffDecompressor",
+]
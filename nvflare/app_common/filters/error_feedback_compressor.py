@@ -0,0 +1,161 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from typing import Optional, Union
+
+import numpy as np
+
+from nvflare.apis.dxo import DataKind
+from nvflare.apis.dxo_filter import DXO, DXOFilter
+from nvflare.apis.event_type import EventType
+from nvflare.apis.fl_context import FLContext
+from nvflare.apis.shareable import Shareable
+from nvflare.app_common.abstract.sparse_array import SignArray, SparseArray
+from nvflare.app_common.filters.top_k_sparsifier import top_k_sparsify
+
+
+class CompressionMethod:
+    TOP_K = "top_k"
+    RANDOM_K = "random_k"
+    SIGN = "sign"
+
+
+def random_k_sparsify(v: np.ndarray, k: int, rng: np.random.Generator) -> SparseArray:
+    """Keeps k elements of the array chosen uniformly at random.
+
+    Args:
+        v: the array.
+        k: number of elements to keep.
+        rng: random number generator.
+
+    Returns:
+        SparseArray with the indices of the kept elements in ascending order.
+    """
+    flat = v.reshape(-1)
+    if k >= flat.size:
+        indices = np.arange(flat.size)
+    else:
+        indices = rng.choice(flat.size, size=k, replace=False)
+        indices.sort()
+    index_dtype = np.int32 if flat.size <= np.iinfo(np.int32).max else np.int64
+    return SparseArray(indices=indices.astype(index_dtype, copy=False), values=flat[indices], shape=v.shape)
+
+
+def sign_compress(v: np.ndarray) -> SignArray:
+    """Compresses the array to its signs scaled by its mean magnitude (scaled sign-SGD).
+
+    Args:
+        v: the array.
+
+    Returns:
+        SignArray
+    """
+    return SignArray.from_dense(v, scale=float(np.mean(np.abs(v), dtype=np.float64)))
+
+
+class ErrorFeedbackCompressor(DXOFilter):
+    def __init__(
+        self,
+        method: str = CompressionMethod.TOP_K,
+        ratio: float = 0.01,
+        min_size: int = 1024,
+        seed: Optional[int] = None,
+    ):
+        """Compress weight diffs with error feedback.
+
+        The part of a weight diff that is not sent because of compression (the residual) is kept by the filter and
+        added to the weight diff of the same var in the next round, so that no update is lost over the rounds.
+        Residuals are kept per var name for the whole run, so use one filter instance per client.
+
+        Compressed vars are replaced by SparseArray ("top_k", "random_k") or SignArray ("sign") objects, and the
+        DXO data kind becomes SPARSE_WEIGHT_DIFF, which is aggregated by InTimeAccumulateWeightedAggregator
+        without being densified. For other aggregators, add WeightDiffDecompressor to the server task result filters.
+
+        Args:
+            method (str, optional): "top_k" keeps the elements with the largest magnitudes, "random_k" keeps random
+                elements and "sign" sends the signs of all elements scaled by their mean magnitude.
+                Defaults to "top_k".
+            ratio (float, optional): for "top_k" and "random_k", fraction of the elements of each var to keep.
+                Defaults to 0.01.
+            min_size (int, optional): vars with fewer elements are sent dense. Defaults to 1024.
+            seed (int, optional): seed for "random_k". Defaults to None.
+        """
+        super().__init__(supported_data_kinds=[DataKind.WEIGHT_DIFF], data_kinds_to_filter=[DataKind.WEIGHT_DIFF])
+        if method not in (CompressionMethod.TOP_K, CompressionMethod.RANDOM_K, CompressionMethod.SIGN):
+            raise ValueError(f"method must be top_k, random_k or sign but got {method}")
+        if not 0 < ratio <= 1:
+            raise ValueError(f"ratio must be in (0, 1] but got {ratio}")
+        if not isinstance(min_size, int) or min_size < 0:
+            raise ValueError(f"min_size must be a non-negative int but got {min_size}")
+        self.method = method
+        self.ratio = ratio
+        self.min_size = min_size
+
+        self._rng = np.random.default_rng(seed)
+        self._residuals = {}
+        self._lock = threading.Lock()
+
+    def handle_event(self, event_type: str, fl_ctx: FLContext):
+        if event_type == EventType.END_RUN:
+            with self._lock:
+                self._residuals = {}
+
+    def _compress(self, v: np.ndarray) -> Union[SparseArray, SignArray]:
+        if self.method == CompressionMethod.SIGN:
+            return sign_compress(v)
+        k = max(1, int(self.ratio * v.size))
+        if self.method == CompressionMethod.TOP_K:
+            return top_k_sparsify(v, k)
+        return random_k_sparsify(v, k, self._rng)
+
+    def process_dxo(self, dxo: DXO, shareable: Shareable, fl_ctx: FLContext) -> Union[None, DXO]:
+        """Replace large vars of the weight diff with their compressed error-corrected values.
+
+        Args:
+            dxo (DXO): DXO to be filtered.
+            shareable: that the dxo belongs to
+            fl_ctx (FLContext): only used for logging.
+
+        Returns: filtered dxo
+        """
+        n_compressed = 0
+        with self._lock:
+            for var_name, v in dxo.data.items():
+                if not isinstance(v, np.ndarray) or v.dtype.kind != "f" or v.size < max(self.min_size, 1):
+                    continue
+
+                residual = self._residuals.get(var_name)
+                if residual is None or residual.shape != v.shape or residual.dtype != v.dtype:
+                    corrected = np.array(v, order="C")
+                else:
+                    corrected = np.add(residual, v, out=residual)
+
+                compressed = self._compress(corrected)
+
+                # what is not sent is carried over to the next round
+                if isinstance(compressed, SparseArray):
+                    corrected.reshape(-1)[compressed.indices] = 0
+                else:
+                    compressed.add_to(corrected, -1.0)
+                self._residuals[var_name] = corrected
+                dxo.data[var_name] = compressed
+                n_compressed += 1
+
+        if not n_compressed:
+            return None
+
+        self.log_debug(fl_ctx, f"Compressed {n_compressed} variables with {self.method} and error feedback.")
+        dxo.data_kind = DataKind.SPARSE_WEIGHT_DIFF
+        return dxo
@@ -0,0 +1,93 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Union
+
+import numpy as np
+
+from nvflare.apis.dxo import DataKind
+from nvflare.apis.dxo_filter import DXO, DXOFilter
+from nvflare.apis.fl_context import FLContext
+from nvflare.apis.shareable import Shareable
+from nvflare.app_common.abstract.sparse_array import SparseArray
+
+
+def top_k_sparsify(v: np.ndarray, k: int) -> SparseArray:
+    """Keeps the k elements of the array with the largest magnitudes.
+
+    Args:
+        v: the array.
+        k: number of elements to keep.
+
+    Returns:
+        SparseArray with the indices of the kept elements in ascending order.
+    """
+    flat = v.reshape(-1)
+    if k >= flat.size:
+        indices = np.arange(flat.size)
+    else:
+        indices = np.argpartition(np.abs(flat), flat.size - k)[flat.size - k :]
+        indices.sort()
+    index_dtype = np.int32 if flat.size <= np.iinfo(np.int32).max else np.int64
+    return SparseArray(indices=indices.astype(index_dtype, copy=False), values=flat[indices], shape=v.shape)
+
+
+class TopKSparsifier(DXOFilter):
+    def __init__(self, ratio: float = 0.01, min_size: int = 1024):
+        """Sparsify weight diffs by keeping the elements with the largest magnitudes of each var.
+
+        Vars that are numpy arrays with at least `min_size` elements are replaced by SparseArray objects, and the
+        DXO data kind becomes SPARSE_WEIGHT_DIFF, which is aggregated by InTimeAccumulateWeightedAggregator
+        without being densified.
+
+        Args:
+            ratio (float, optional): fraction of the elements of each var to keep. Defaults to 0.01.
+            min_size (int, optional): vars with fewer elements are sent dense. Defaults to 1024.
+        """
+        super().__init__(supported_data_kinds=[DataKind.WEIGHT_DIFF], data_kinds_to_filter=[DataKind.WEIGHT_DIFF])
+        if not 0 < ratio <= 1:
+            raise ValueError(f"ratio must be in (0, 1] but got {ratio}")
+        if not isinstance(min_size, int) or min_size < 0:
+            raise ValueError(f"min_size must be a non-negative int but got {min_size}")
+        self.ratio = ratio
+        self.min_size = min_size
+
+    def process_dxo(self, dxo: DXO, shareable: Shareable, fl_ctx: FLContext) -> Union[None, DXO]:
+        """Replace large vars of the weight diff with their top-k elements.
+
+        Args:
+            dxo (DXO): DXO to be filtered.
+            shareable: that the dxo belongs to
+            fl_ctx (FLContext): only used for logging.
+
+        Returns: filtered dxo
+        """
+        n_sparsified = 0
+        n_kept = 0
+        n_total = 0
+        for var_name, v in dxo.data.items():
+            if not isinstance(v, np.ndarray) or v.size < max(self.min_size, 1):
+                continue
+            k = max(1, int(self.ratio * v.size))
+            dxo.data[var_name] = top_k_sparsify(v, k)
+            n_sparsified += 1
+            n_kept += k
+            n_total += v.size
+
+        if not n_sparsified:
+            return None
+
+        self.log_debug(fl_ctx, f"Sparsified {n_sparsified} variables, keeping {n_kept} of {n_total} elements.")
+        dxo.data_kind = DataKind.SPARSE_WEIGHT_DIFF
+        return dxo
@@ -0,0 +1,54 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Union
+
+from nvflare.apis.dxo import DataKind
+from nvflare.apis.dxo_filter import DXO, DXOFilter
+from nvflare.apis.fl_context import FLContext
+from nvflare.apis.shareable import Shareable
+from nvflare.app_common.abstract.sparse_array import COMPRESSED_ARRAY_TYPES
+
+
+class WeightDiffDecompressor(DXOFilter):
+    def __init__(self):
+        """Convert SPARSE_WEIGHT_DIFF DXOs back to dense WEIGHT_DIFF DXOs.
+
+        Use it as a server task result filter with aggregators and workflows that only handle dense arrays.
+        InTimeAccumulateWeightedAggregator doesn't need it, since it adds compressed arrays into its dense totals
+        directly.
+        """
+        super().__init__(
+            supported_data_kinds=[DataKind.SPARSE_WEIGHT_DIFF], data_kinds_to_filter=[DataKind.SPARSE_WEIGHT_DIFF]
+        )
+
+    def process_dxo(self, dxo: DXO, shareable: Shareable, fl_ctx: FLContext) -> Union[None, DXO]:
+        """Densify the compressed vars of the weight diff.
+
+        Args:
+            dxo (DXO): DXO to be filtered.
+            shareable: that the dxo belongs to
+            fl_ctx (FLContext): only used for logging.
+
+        Returns: filtered dxo
+        """
+        n_decompressed = 0
+        for var_name, v in dxo.data.items():
+            if isinstance(v, COMPRESSED_ARRAY_TYPES):
+                dxo.data[var_name] = v.to_dense()
+                n_decompressed += 1
+
+        self.log_debug(fl_ctx, f"Decompressed {n_decompressed} variables.")
+        dxo.data_kind = DataKind.WEIGHT_DIFF
+        return dxo
@@ -32,6 +32,18 @@ def log_subprocess_output(process, logger):
         logger.info(c.decode().rstrip())
 
 
+def get_subprocess_env(fl_ctx: FLContext) -> dict:
+    """Gets the environment of the processes that run the training script with the Client API."""
+    env = os.environ.copy()
+    env["CLIENT_API_TYPE"] = "EX_PROCESS_API"
+
+    workspace = fl_ctx.get_prop(FLContextKey.WORKSPACE_OBJECT)
+    job_id = fl_ctx.get_prop(FLContextKey.CURRENT_JOB_ID)
+    app_custom_folder = workspace.get_app_custom_dir(job_id)
+    add_custom_dir_to_path(app_custom_folder, env)
+    return env
+
+
 class SubprocessLauncher(Launcher):
     def __init__(self, script: str, launch_once: bool = True, clean_up_script: Optional[str] = None):
         """Initializes the SubprocessLauncher.
@@ -70,13 +82,7 @@ class SubprocessLauncher(Launcher):
     def _start_external_process(self, fl_ctx: FLContext):
         if self._process is None:
             command = self._script
-            env = os.environ.copy()
-            env["CLIENT_API_TYPE"] = "EX_PROCESS_API"
-
-            workspace = fl_ctx.get_prop(FLContextKey.WORKSPACE_OBJECT)
-            job_id = fl_ctx.get_prop(FLContextKey.CURRENT_JOB_ID)
-            app_custom_folder = workspace.get_app_custom_dir(job_id)
-            add_custom_dir_to_path(app_custom_folder, env)
+            env = get_subprocess_env(fl_ctx)
 
             command_seq = shlex.split(command)
             self._process = subprocess.Popen(
@@ -0,0 +1,219 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shlex
+import subprocess
+import threading
+from collections import deque
+from threading import Thread
+from typing import List, Optional, Tuple
+
+from nvflare.apis.fl_context import FLContext
+from nvflare.apis.shareable import Shareable
+from nvflare.apis.signal import Signal
+from nvflare.app_common.abstract.launcher import Launcher, LauncherRunStatus
+from nvflare.app_common.launchers.subprocess_launcher import get_subprocess_env, log_subprocess_output
+from nvflare.fuel.utils.log_utils import get_obj_logger
+from nvflare.fuel.utils.validation_utils import check_positive_int, check_positive_number
+
+
+class _WarmWorker:
+    def __init__(self, interpreter: List[str], worker_args: List[str], cwd: str, env: dict, logger):
+        """A worker process that has imported the preloaded modules, and runs the script when asked to."""
+        status_r, status_w = os.pipe()
+        try:
+            self.process = subprocess.Popen(
+                interpreter
+                + ["-m", "nvflare.app_common.launchers.warm_pool_worker", "--status_fd", str(status_w)]
+                + worker_args,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                cwd=cwd,
+                env=env,
+                pass_fds=(status_w,),
+            )
+        except BaseException:
+            os.close(status_r)
+            raise
+        finally:
+            os.close(status_w)
+
+        self.num_tasks = 0
+        self.exit_code = None  # exit code of the current task, None while it is running
+        self.task_done = threading.Event()
+        self.task_done.set()
+        self._log_thread = Thread(target=log_subprocess_output, args=(self.process, logger), daemon=True)
+        self._log_thread.start()
+        self._status_thread = Thread(target=self._read_status, args=(status_r,), daemon=True)
+        self._status_thread.start()
+
+    def _read_status(self, status_r: int):
+        with os.fdopen(status_r, "r") as status:
+            for line in iter(status.readline, ""):
+                self.exit_code = int(line)
+                self.task_done.set()
+        # the process exited
+        return_code = self.process.wait()
+        if not self.task_done.is_set():
+            self.exit_code = return_code or 1
+            self.task_done.set()
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run_task(self):
+        self.num_tasks += 1
+        self.exit_code = None
+        self.task_done.clear()
+        self.process.stdin.write(b"run\n")
+        self.process.stdin.flush()
+
+    def stop(self):
+        self.process.stdin.close()
+        if self.is_alive():
+            self.process.terminate()
+        self.process.wait()
+        self._log_thread.join()
+        self._status_thread.join()
+
+
+class WarmPoolLauncher(Launcher):
+    def __init__(
+        self,
+        script: str,
+        pool_size: int = 1,
+        preload_modules: Optional[List[str]] = None,
+        max_tasks_per_worker: int = 1,
+        task_end_timeout: float = 5.0,
+    ):
+        """Launcher that runs each task in a warm Python process of a pool, instead of starting a new one.
+
+        The pool keeps pool_size idle worker processes that have already started the interpreter and imported the
+        preload_modules (e.g. torch), so a task starts without waiting for them. The workers run the script with the
+        Client API like SubprocessLauncher (with launch_once=False) does, over the same pipes.
+
+        A worker is replaced by a new one after max_tasks_per_worker tasks. With more than one task per worker, the
+        script is run again in the same interpreter: the modules it imported (and e.g. the CUDA context) are reused,
+        so the script must not rely on a fresh interpreter state.
+
+        Args:
+            script: the command to run the script, as `python [flags] script.py [args]` or
+                `python [flags] -m module [args]`. Flags that take a value are not supported.
+            pool_size: number of idle workers to keep ready.
+            preload_modules: modules imported by the workers before they get a task.
+            max_tasks_per_worker: number of tasks a worker runs before it is replaced.
+            task_end_timeout: how long to wait for the script to end after its task is stopped, before the worker
+                is terminated. Only used when workers run more than one task.
+        """
+        super().__init__()
+        check_positive_int("pool_size", pool_size)
+        check_positive_int("max_tasks_per_worker", max_tasks_per_worker)
+        check_positive_number("task_end_timeout", task_end_timeout)
+
+        self._interpreter, self._worker_args = self._get_worker_command(script, preload_modules or [])
+        self._pool_size = pool_size
+        self._max_tasks_per_worker = max_tasks_per_worker
+        self._task_end_timeout = task_end_timeout
+        self._app_dir = None
+        self._env = None
+        self._idle_workers = deque()
+        self._worker = None  # the worker running the current task
+        self._lock = threading.Lock()
+        self.logger = get_obj_logger(self)
+
+    @staticmethod
+    def _get_worker_command(script: str, preload_modules: List[str]) -> Tuple[List[str], List[str]]:
+        # splits the script command into the interpreter with its flags, and the args of the worker module
+        command_seq = shlex.split(script)
+        if not command_seq or not os.path.basename(command_seq[0]).startswith("python"):
+            raise ValueError(f"script must be run with a python interpreter, but got '{script}'")
+
+        i = 1
+        while i < len(command_seq) and command_seq[i].startswith("-") and command_seq[i] != "-m":
+            i += 1
+        if i >= len(command_seq) or (command_seq[i] == "-m" and i + 1 >= len(command_seq)):
+            raise ValueError(f"missing python script or module in '{script}'")
+
+        preload = ["--preload", ",".join(preload_modules)] if preload_modules else []
+        return command_seq[:i], preload + ["--"] + command_seq[i:]
+
+    def initialize(self, fl_ctx: FLContext):
+        self._app_dir = self.get_app_dir(fl_ctx)
+        self._env = get_subprocess_env(fl_ctx)
+        with self._lock:
+            self._fill_pool()
+
+    def finalize(self, fl_ctx: FLContext) -> None:
+        with self._lock:
+            workers = list(self._idle_workers)
+            self._idle_workers.clear()
+            if self._worker:
+                workers.append(self._worker)
+                self._worker = None
+        for worker in workers:
+            worker.stop()
+
+    def _start_worker(self) -> _WarmWorker:
+        return _WarmWorker(self._interpreter, self._worker_args, self._app_dir, self._env, self.logger)
+
+    def _fill_pool(self):
+        # remove the workers that died while idle, e.g. because a preloaded module crashed
+        alive = [w for w in self._idle_workers if w.is_alive()]
+        if len(alive) < len(self._idle_workers):
+            self.logger.warning(f"{len(self._idle_workers) - len(alive)} idle workers exited")
+        self._idle_workers = deque(alive)
+        while len(self._idle_workers) < self._pool_size:
+            self._idle_workers.append(self._start_worker())
+
+    def launch_task(self, task_name: str, shareable: Shareable, fl_ctx: FLContext, abort_signal: Signal) -> bool:
+        with self._lock:
+            if self._env is None:
+                self._env = get_subprocess_env(fl_ctx)
+            if self._worker is None:
+                self._fill_pool()
+                self._worker = self._idle_workers.popleft()
+                self._worker.run_task()
+                # prepare the next worker while this task runs
+                self._fill_pool()
+        return True
+
+    def stop_task(self, task_name: str, fl_ctx: FLContext, abort_signal: Signal) -> None:
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is None:
+            return
+
+        if worker.num_tasks < self._max_tasks_per_worker and worker.task_done.wait(self._task_end_timeout):
+            if worker.exit_code == 0 and worker.is_alive():
+                # the reused worker runs the next task, and the newest idle worker is no longer needed
+                with self._lock:
+                    self._idle_workers.appendleft(worker)
+                    extra = self._idle_workers.pop() if len(self._idle_workers) > self._pool_size else None
+                if extra:
+                    extra.stop()
+                return
+        worker.stop()
+
+    def check_run_status(self, task_name: str, fl_ctx: FLContext) -> str:
+        worker = self._worker
+        if worker is None:
+            return LauncherRunStatus.NOT_RUNNING
+        exit_code = worker.exit_code
+        if exit_code is None:
+            return LauncherRunStatus.RUNNING
+        if exit_code == 0:
+            return LauncherRunStatus.COMPLETE_SUCCESS
+        return LauncherRunStatus.COMPLETE_FAILED
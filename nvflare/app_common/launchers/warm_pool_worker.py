@@ -0,0 +1,108 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Warm worker process of the WarmPoolLauncher.
+
+The worker imports the preloaded modules, then runs the training script in this interpreter each time it reads a
+line from stdin, and writes the exit code of each run to the status fd. It exits at the end of stdin.
+
+Usage:
+    python -m nvflare.app_common.launchers.warm_pool_worker --status_fd FD [--preload m1,m2] -- script.py [args]
+    python -m nvflare.app_common.launchers.warm_pool_worker --status_fd FD [--preload m1,m2] -- -m module [args]
+"""
+
+import argparse
+import importlib
+import os
+import runpy
+import sys
+import traceback
+
+
+def _reset_client_api():
+    # the Client API of the script must be initialized again by its next run in this interpreter
+    flare_api = sys.modules.get("nvflare.client.api")
+    client_api = getattr(flare_api, "client_api", None)
+    if client_api is None:
+        return
+    flare_api.client_api = None
+    try:
+        # a script may end with a non-blocking send, which must complete before the agent stops
+        background_sender = getattr(client_api, "background_sender", None)
+        if background_sender is not None:
+            background_sender.wait()
+    finally:
+        registry = getattr(client_api, "process_model_registry", None)
+        agent = getattr(registry, "flare_agent", None)
+        if agent is not None:
+            agent.stop()
+
+
+def run_script(script_args: list) -> int:
+    """Runs the script as `python script.py args` or `python -m module args` would.
+
+    Returns:
+        the exit code of the script
+    """
+    try:
+        if script_args[0] == "-m":
+            sys.argv = script_args[1:]
+            runpy.run_module(script_args[1], run_name="__main__", alter_sys=True)
+        else:
+            sys.argv = list(script_args)
+            runpy.run_path(script_args[0], run_name="__main__")
+        return 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    finally:
+        _reset_client_api()
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--status_fd", type=int, required=True, help="fd to write the exit code of each run to")
+    parser.add_argument("--preload", type=str, default="", help="comma separated modules to import at start")
+    parser.add_argument("script_args", nargs=argparse.REMAINDER, help="script and its args, after --")
+    args = parser.parse_args()
+    script_args = args.script_args[1:] if args.script_args[:1] == ["--"] else args.script_args
+    if not script_args or (script_args[0] == "-m" and len(script_args) < 2):
+        parser.error("missing script")
+
+    if script_args[0] != "-m":
+        # as done by the interpreter for `python script.py`
+        sys.path.insert(0, os.path.dirname(os.path.abspath(script_args[0])))
+
+    for module in filter(None, args.preload.split(",")):
+        try:
+            importlib.import_module(module.strip())
+        except Exception as e:
+            print(f"failed to preload module {module}: {e}", file=sys.stderr)
+
+    with os.fdopen(args.status_fd, "w") as status:
+        for _ in iter(sys.stdin.readline, ""):
+            exit_code = run_script(script_args)
+            status.write(f"{exit_code}\n")
+            status.flush()
+
+
+if __name__ == "__main__":
+    main()
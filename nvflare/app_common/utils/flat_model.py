@@ -0,0 +1,184 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def _to_numpy(v) -> np.ndarray:
+    if isinstance(v, np.ndarray):
+        return v
+    if hasattr(v, "detach"):
+        # torch tensor
+        return v.detach().cpu().numpy()
+    return np.asarray(v)
+
+
+class FlatModelIndex(object):
+    def __init__(self, names: List[str], shapes: List[Tuple[int, ...]], dtypes: List[np.dtype]):
+        """Layout of the vars of a model in one contiguous buffer.
+
+        Args:
+            names: names of the vars, in the order they are laid out in the buffer.
+            shapes: shapes of the vars.
+            dtypes: original dtypes of the vars.
+        """
+        if not (len(names) == len(shapes) == len(dtypes)):
+            raise ValueError("names, shapes and dtypes must have the same length")
+        self.names = list(names)
+        self.shapes = [tuple(s) for s in shapes]
+        self.dtypes = [np.dtype(d) for d in dtypes]
+        self.offsets = []
+        offset = 0
+        for shape in self.shapes:
+            self.offsets.append(offset)
+            offset += int(np.prod(shape, dtype=np.int64))
+        self.size = offset
+        self.dtype = np.result_type(*self.dtypes) if self.dtypes else np.dtype(np.float32)
+
+    @staticmethod
+    def from_dict(params: Dict, exclude_vars: Optional[str] = None) -> "FlatModelIndex":
+        """Creates the index of the vars of a dict of arrays (e.g. a state_dict).
+
+        Args:
+            params: dict of var name => array.
+            exclude_vars: regex string to match vars that are not included in the index. Defaults to None.
+
+        Returns:
+            FlatModelIndex
+        """
+        pattern = re.compile(exclude_vars) if exclude_vars else None
+        names, shapes, dtypes = [], [], []
+        for k, v in params.items():
+            if pattern is not None and pattern.search(k):
+                continue
+            v = _to_numpy(v)
+            names.append(k)
+            shapes.append(v.shape)
+            dtypes.append(v.dtype)
+        return FlatModelIndex(names, shapes, dtypes)
+
+    def matches(self, params: Dict, exclude_vars: Optional[str] = None) -> bool:
+        """Checks whether the params have exactly the vars of this index, with the same shapes.
+
+        Args:
+            params: dict of var name => array.
+            exclude_vars: regex string to match vars of the params that are not expected in the index,
+                as used when the index was created. Defaults to None.
+
+        Returns:
+            True if the params can be laid out with this index without dropping any var.
+        """
+        pattern = re.compile(exclude_vars) if exclude_vars else None
+        num_vars = 0
+        for k in params.keys():
+            if pattern is None or not pattern.search(k):
+                num_vars += 1
+        if num_vars != len(self.names):
+            return False
+
+        for name, shape in zip(self.names, self.shapes):
+            v = params.get(name)
+            if v is None or tuple(v.shape) != shape:
+                return False
+        return True
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, FlatModelIndex)
+            and self.names == other.names
+            and self.shapes == other.shapes
+            and self.dtypes == other.dtypes
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+
+class FlatModel(object):
+    def __init__(self, buffer: np.ndarray, index: FlatModelIndex):
+        """A model stored as one contiguous 1-D buffer, with an index of the layout of its vars.
+
+        Operations over the whole model (e.g. weighted sums, diffs) can be done on the buffer at once,
+        instead of looping over the vars.
+
+        Args:
+            buffer: 1-D array holding all vars.
+            index: layout of the vars in the buffer.
+        """
+        if buffer.ndim != 1 or buffer.size != index.size:
+            raise ValueError(f"buffer must be a 1-D array of size {index.size} but got shape {buffer.shape}")
+        self.buffer = buffer
+        self.index = index
+
+    @staticmethod
+    def from_dict(
+        params: Dict, index: Optional[FlatModelIndex] = None, dtype=None, out: Optional[np.ndarray] = None
+    ) -> "FlatModel":
+        """Copies the vars of a dict of arrays (e.g. a state_dict) into one buffer.
+
+        Args:
+            params: dict of var name => array.
+            index: layout to use. It is created from the params if not provided.
+                Reuse the index for models with the same vars to avoid re-computing it.
+            dtype: dtype of the buffer. Defaults to the common dtype of the vars.
+            out: preallocated buffer to copy the vars into.
+
+        Returns:
+            FlatModel
+        """
+        if index is None:
+            index = FlatModelIndex.from_dict(params)
+
+        if out is None:
+            out = np.empty(index.size, dtype=dtype if dtype is not None else index.dtype)
+        elif out.ndim != 1 or out.size != index.size:
+            raise ValueError(f"out must be a 1-D array of size {index.size} but got shape {out.shape}")
+
+        for name, offset, shape in zip(index.names, index.offsets, index.shapes):
+            v = _to_numpy(params[name])
+            if v.shape != shape:
+                raise ValueError(f"shape of var {name} is {v.shape} but the index expects {shape}")
+            out[offset : offset + v.size] = v.reshape(-1)
+        return FlatModel(out, index)
+
+    def get(self, name: str) -> np.ndarray:
+        """Gets a var as a view into the buffer."""
+        i = self.index.names.index(name)
+        offset = self.index.offsets[i]
+        shape = self.index.shapes[i]
+        return self.buffer[offset : offset + int(np.prod(shape, dtype=np.int64))].reshape(shape)
+
+    def to_dict(self, restore_dtypes: bool = True) -> Dict[str, np.ndarray]:
+        """Converts to a dict of var name => array.
+
+        The arrays are views into the buffer, unless they have to be cast to their original dtypes.
+
+        Args:
+            restore_dtypes: whether to cast the vars to their original dtypes. Defaults to True.
+
+        Returns:
+            dict of var name => array
+        """
+        result = {}
+        index = self.index
+        for name, offset, shape, dtype in zip(index.names, index.offsets, index.shapes, index.dtypes):
+            v = self.buffer[offset : offset + int(np.prod(shape, dtype=np.int64))].reshape(shape)
+            result[name] = v.astype(dtype, copy=False) if restore_dtypes else v
+        return result
+
+    def copy(self) -> "FlatModel":
+        return FlatModel(self.buffer.copy(), self.index)
@@ -12,7 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List
+import threading
+from typing import List, Optional
 
 from nvflare.apis.fl_constant import FLMetaKey
 from nvflare.app_common.abstract.fl_model import FLModel
@@ -33,6 +34,7 @@ class BaseFedAvg(ModelController):
         num_clients: int = 3,
         num_rounds: int = 5,
         start_round: int = 0,
+        aggregate_in_time: bool = False,
         **kwargs,
     ):
         """The base controller for FedAvg Workflow. *Note*: This class is based on the `ModelController`.
@@ -57,15 +59,31 @@ class BaseFedAvg(ModelController):
             num_clients (int, optional): The number of clients. Defaults to 3.
             num_rounds (int, optional): The total number of training rounds. Defaults to 5.
             start_round (int, optional): The starting round number.
+            aggregate_in_time (bool, optional): whether to add each result of `send_model_and_wait` into a running
+                weighted sum as soon as it is received, instead of keeping all results until aggregation.
+                Server memory then scales with the model size instead of the number of clients.
+                `send_model_and_wait` returns an empty list in this mode, and `aggregate` of an empty list returns
+                the weighted average of the received results. A custom `aggregate_fn` cannot be used in this mode.
+                Defaults to False.
         """
         super().__init__(*args, **kwargs)
 
         self.num_clients = num_clients
         self.num_rounds = num_rounds
         self.start_round = start_round
+        self.aggregate_in_time = aggregate_in_time
 
         self.current_round = None
 
+        self._in_time_lock = threading.Lock()
+        self._in_time_aggr_helper = WeightedAggregationHelper()
+        self._in_time_metrics_helper = WeightedAggregationHelper()
+        self._in_time_all_metrics = True
+        self._in_time_params_type = None
+        self._in_time_round = None
+        self._in_time_num_aggregated = 0
+        self._in_time_empty_clients = []
+
     @staticmethod
     def _check_results(results: List[FLModel]):
         empty_clients = []
@@ -76,6 +94,53 @@ class BaseFedAvg(ModelController):
         if len(empty_clients) > 0:
             raise ValueError(f"Result from client(s) {empty_clients} is empty!")
 
+    @staticmethod
+    def _add_result(
+        aggr_helper: WeightedAggregationHelper,
+        aggr_metrics_helper: WeightedAggregationHelper,
+        result: FLModel,
+        all_metrics: bool,
+    ) -> bool:
+        """Adds the result to the aggregation helpers.
+
+        Returns: whether all results added so far have metrics.
+        """
+        aggr_helper.add(
+            data=result.params,
+            weight=result.meta.get(FLMetaKey.NUM_STEPS_CURRENT_ROUND, 1.0),
+            contributor_name=result.meta.get("client_name", AppConstants.CLIENT_UNKNOWN),
+            contribution_round=result.current_round,
+        )
+        if not result.metrics:
+            all_metrics = False
+        if all_metrics:
+            aggr_metrics_helper.add(
+                data=result.metrics,
+                weight=result.meta.get(FLMetaKey.NUM_STEPS_CURRENT_ROUND, 1.0),
+                contributor_name=result.meta.get("client_name", AppConstants.CLIENT_UNKNOWN),
+                contribution_round=result.current_round,
+            )
+        return all_metrics
+
+    @staticmethod
+    def _make_aggr_result(
+        aggr_helper: WeightedAggregationHelper,
+        aggr_metrics_helper: WeightedAggregationHelper,
+        all_metrics: bool,
+        params_type,
+        current_round: Optional[int],
+        num_aggregated: int,
+    ) -> FLModel:
+        aggr_params = aggr_helper.get_result()
+        aggr_metrics = aggr_metrics_helper.get_result() if all_metrics else None
+
+        return FLModel(
+            params=aggr_params,
+            params_type=params_type,
+            metrics=aggr_metrics,
+            meta={"nr_aggregated": num_aggregated, "current_round": current_round},
+        )
+
     @staticmethod
     def aggregate_fn(results: List[FLModel]) -> FLModel:
         if not results:
@@ -85,38 +150,72 @@ class BaseFedAvg(ModelController):
         aggr_metrics_helper = WeightedAggregationHelper()
         all_metrics = True
         for _result in results:
-            aggr_helper.add(
-                data=_result.params,
-                weight=_result.meta.get(FLMetaKey.NUM_STEPS_CURRENT_ROUND, 1.0),
-                contributor_name=_result.meta.get("client_name", AppConstants.CLIENT_UNKNOWN),
-                contribution_round=_result.current_round,
+            all_metrics = BaseFedAvg._add_result(aggr_helper, aggr_metrics_helper, _result, all_metrics)
+
+        return BaseFedAvg._make_aggr_result(
+            aggr_helper,
+            aggr_metrics_helper,
+            all_metrics,
+            results[0].params_type,
+            results[0].current_round,
+            len(results),
+        )
+
+    def _collect_result(self, result: FLModel) -> None:
+        if not self.aggregate_in_time:
+            super()._collect_result(result)
+            return
+
+        # add the result to the running weighted sums, so that it can be released right away
+        with self._in_time_lock:
+            if not result.params:
+                self._in_time_empty_clients.append(result.meta.get("client_name", AppConstants.CLIENT_UNKNOWN))
+                return
+            self._in_time_all_metrics = self._add_result(
+                self._in_time_aggr_helper, self._in_time_metrics_helper, result, self._in_time_all_metrics
             )
-            if not _result.metrics:
-                all_metrics = False
-            if all_metrics:
-                aggr_metrics_helper.add(
-                    data=_result.metrics,
-                    weight=_result.meta.get(FLMetaKey.NUM_STEPS_CURRENT_ROUND, 1.0),
-                    contributor_name=_result.meta.get("client_name", AppConstants.CLIENT_UNKNOWN),
-                    contribution_round=_result.current_round,
+            if not self._in_time_num_aggregated:
+                self._in_time_params_type = result.params_type
+                self._in_time_round = result.current_round
+            self._in_time_num_aggregated += 1
+
+    def _reset_results(self) -> None:
+        super()._reset_results()
+        # drop anything left over from a previous broadcast, e.g. when its aggregation was skipped
+        with self._in_time_lock:
+            self._reset_in_time_aggregation()
+
+    def _reset_in_time_aggregation(self):
+        self._in_time_aggr_helper.reset_stats()
+        self._in_time_metrics_helper.reset_stats()
+        self._in_time_all_metrics = True
+        self._in_time_params_type = None
+        self._in_time_round = None
+        self._in_time_num_aggregated = 0
+        self._in_time_empty_clients = []
+
+    def _get_in_time_aggr_result(self) -> FLModel:
+        with self._in_time_lock:
+            try:
+                if not self._in_time_num_aggregated:
+                    raise ValueError("received empty results for aggregation.")
+                return self._make_aggr_result(
+                    self._in_time_aggr_helper,
+                    self._in_time_metrics_helper,
+                    self._in_time_all_metrics,
+                    self._in_time_params_type,
+                    self._in_time_round,
+                    self._in_time_num_aggregated,
                 )
-
-        aggr_params = aggr_helper.get_result()
-        aggr_metrics = aggr_metrics_helper.get_result() if all_metrics else None
-
-        aggr_result = FLModel(
-            params=aggr_params,
-            params_type=results[0].params_type,
-            metrics=aggr_metrics,
-            meta={"nr_aggregated": len(results), "current_round": results[0].current_round},
-        )
-        return aggr_result
+            finally:
+                self._reset_in_time_aggregation()
 
     def aggregate(self, results: List[FLModel], aggregate_fn=None) -> FLModel:
         """Called by the `run` routine to aggregate the training results of clients.
 
         Args:
             results: a list of FLModel containing training results of the clients.
+                If `aggregate_in_time` is enabled and the list is empty, the results already added in time are used.
             aggregate_fn: a function that turns the list of FLModel into one resulting (aggregated) FLModel.
 
         Returns: aggregated FLModel.
@@ -129,9 +228,26 @@ class BaseFedAvg(ModelController):
         if not aggregate_fn:
             aggregate_fn = self.aggregate_fn
 
-        self.info(f"aggregating {len(results)} update(s) at round {self.current_round}")
+        in_time = self.aggregate_in_time and not results
+        if in_time:
+            if aggregate_fn is not BaseFedAvg.aggregate_fn:
+                raise ValueError(
+                    "aggregate_in_time only supports the default weighted average, "
+                    f"but got custom aggregate_fn {aggregate_fn}"
+                )
+            with self._in_time_lock:
+                empty_clients = self._in_time_empty_clients
+                num_results = self._in_time_num_aggregated
+                if empty_clients:
+                    self._reset_in_time_aggregation()
+            if empty_clients:
+                raise ValueError(f"Result from client(s) {empty_clients} is empty!")
+        else:
+            num_results = len(results)
+
+        self.info(f"aggregating {num_results} update(s) at round {self.current_round}")
         try:
-            aggr_result = aggregate_fn(results)
+            aggr_result = self._get_in_time_aggr_result() if in_time else aggregate_fn(results)
         except Exception as e:
             error_msg = f"Exception in aggregate call: {secure_format_exception(e)}"
             self.exception(error_msg)
@@ -72,6 +72,7 @@ class BaseModelController(Controller, FLComponentWrapper, ABC):
 
         # model related
         self._results = []
+        self._num_results = 0
 
     def start_controller(self, fl_ctx: FLContext) -> None:
         self.fl_ctx = fl_ctx
@@ -150,7 +151,7 @@ class BaseModelController(Controller, FLComponentWrapper, ABC):
             self.info(f"Sending task {task_name} to all clients")
 
         if blocking:
-            self._results = []  # reset results list
+            self._reset_results()
             self.broadcast_and_wait(
                 task=task,
                 targets=targets,
@@ -162,9 +163,9 @@ class BaseModelController(Controller, FLComponentWrapper, ABC):
 
             if targets is not None:
                 expected_responses = min_responses if min_responses != 0 else len(targets)
-                if len(self._results) != expected_responses:
+                if self._num_results != expected_responses:
                     self.warning(
-                        f"Number of results ({len(self._results)}) is different from number of expected responses ({expected_responses})."
+                        f"Number of results ({self._num_results}) is different from number of expected responses ({expected_responses})."
                     )
 
             # de-reference the internal results before returning
@@ -233,13 +234,29 @@ class BaseModelController(Controller, FLComponentWrapper, ABC):
             except Exception as e:
                 self.error(f"Unsuccessful callback {callback} for task {client_task.task.name}: {e}")
         else:
-            self._results.append(result_model)
+            self._num_results += 1
+            self._collect_result(result_model)
 
             # Cleanup task result
             client_task.result = None
 
         gc.collect()
 
+    def _reset_results(self) -> None:
+        """Reset the results collected by `_collect_result` before a blocking broadcast starts."""
+        self._results = []
+        self._num_results = 0
+
+    def _collect_result(self, result: FLModel) -> None:
+        """Collect a result of a blocking broadcast, which will be returned by `broadcast_model`.
+
+        Subclasses can override this to consume results as they arrive instead of keeping them all.
+
+        Args:
+            result: FLModel received from a client.
+        """
+        self._results.append(result)
+
     def process_result_of_unknown_task(
         self, client: Client, task_name: str, client_task_id: str, result: Shareable, fl_ctx: FLContext
     ) -> None:
@@ -28,6 +28,8 @@ class FedAvg(BaseFedAvg):
         num_clients (int, optional): The number of clients. Defaults to 3.
         num_rounds (int, optional): The total number of training rounds. Defaults to 5.
         start_round (int, optional): The starting round number.
+        aggregate_in_time (bool, optional): whether to aggregate each result as soon as it is received,
+            so that the results of all clients are not kept in memory at the same time. Defaults to False.
         persistor_id (str, optional): ID of the persistor component. Defaults to "persistor".
     """
 
@@ -45,6 +45,13 @@ class Scaffold(BaseFedAvg):
             Defaults to False.
     """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.aggregate_in_time:
+            raise ValueError(
+                "Scaffold aggregates its control terms with scaffold_aggregate_fn, set aggregate_in_time=False"
+            )
+
     def initialize(self, fl_ctx):
         super().initialize(fl_ctx)
         self.model = self.load_model()
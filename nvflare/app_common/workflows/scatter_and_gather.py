@@ -13,7 +13,7 @@
 # limitations under the License.
 
 import gc
-from typing import Any
+from typing import Any, List, Optional
 
 from nvflare.apis.client import Client
 from nvflare.apis.controller_spec import ClientTask, OperatorMethod, Task, TaskOperatorKey
@@ -57,6 +57,7 @@ class ScatterAndGather(Controller):
         task_check_period: float = 0.5,
         persist_every_n_rounds: int = 1,
         snapshot_every_n_rounds: int = 1,
+        train_targets: Optional[List[str]] = None,
     ):
         """The controller for ScatterAndGather Workflow.
 
@@ -89,6 +90,8 @@ class ScatterAndGather(Controller):
                 If n is 0 then no persist.
             snapshot_every_n_rounds (int, optional): persist the server state every n rounds. Defaults to 1.
                 If n is 0 then no persist.
+            train_targets (List[str], optional): names of the clients to send the train task to.
+                Defaults to None, which means all clients. In two-tier aggregation, these are the relay sites.
 
         Raises:
             TypeError: when any of input arguments does not have correct type
@@ -118,6 +121,11 @@ class ScatterAndGather(Controller):
         if not isinstance(train_task_name, str):
             raise TypeError("train_task_name must be a string but got {}".format(type(train_task_name)))
 
+        if train_targets is not None and not (
+            isinstance(train_targets, list) and train_targets and all(isinstance(t, str) for t in train_targets)
+        ):
+            raise TypeError(f"train_targets must be a non-empty list of client names but got {train_targets}")
+
         if not isinstance(task_check_period, (int, float)):
             raise TypeError(f"task_check_period must be an int or float but got {type(task_check_period)}")
         elif task_check_period <= 0:
@@ -127,6 +135,7 @@ class ScatterAndGather(Controller):
         self.persistor_id = persistor_id
         self.shareable_generator_id = shareable_generator_id
         self.train_task_name = train_task_name
+        self.train_targets = train_targets
         self.aggregator = None
         self.persistor = None
         self.shareable_gen = None
@@ -252,6 +261,7 @@ class ScatterAndGather(Controller):
 
                 self.broadcast_and_wait(
                     task=train_task,
+                    targets=self.train_targets,
                     min_responses=self._min_clients,
                     wait_time_after_min_received=self._wait_time_after_min_received,
                     fl_ctx=fl_ctx,
@@ -24,6 +24,7 @@ from nvflare.app_common.abstract.learnable import Learnable
 from nvflare.app_common.abstract.model import ModelLearnableKey, make_model_learnable
 from nvflare.app_common.app_constant import AppConstants
 from nvflare.app_common.shareablegenerators.full_model_shareable_generator import FullModelShareableGenerator
+from nvflare.app_opt.pt.flat_parameters import FlatParameters
 from nvflare.security.logging import secure_format_exception
 
 
@@ -34,6 +35,7 @@ class PTFedOptModelShareableGenerator(FullModelShareableGenerator):
         lr_scheduler_args: dict = None,
         source_model="model",
         device=None,
+        fused_update: bool = False,
     ):
         """Implement the FedOpt algorithm.
 
@@ -51,6 +53,10 @@ class PTFedOptModelShareableGenerator(FullModelShareableGenerator):
             source_model: either a valid torch model object or a component ID of a torch model object
             device: specify the device to run server-side optimization, e.g. "cpu" or "cuda:0"
                 (will default to cuda if available and no device is specified).
+            fused_update: if True, the trainable parameters are kept in one flat tensor, so that each optimizer step
+                is one vectorized update of all parameters. Only use it with optimizers that update each element
+                independently (e.g. SGD, Adam), and when the aggregated diffs have all trainable parameters.
+                Defaults to False.
 
         Raises:
             TypeError: when any of input arguments does not have correct type
@@ -80,6 +86,8 @@ class PTFedOptModelShareableGenerator(FullModelShareableGenerator):
             self.device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
         else:
             self.device = torch.device(device)
+        self.fused_update = fused_update
+        self.flat_params = None
         self.optimizer_name = None
         self.lr_scheduler_name = None
 
@@ -119,12 +127,21 @@ class PTFedOptModelShareableGenerator(FullModelShareableGenerator):
 
             self.model.to(self.device)
 
+            if self.fused_update:
+                try:
+                    self.flat_params = FlatParameters(self.model)
+                except ValueError as e:
+                    self.log_warning(fl_ctx, f"Cannot use fused update, falling back to per-parameter update: {e}")
+
             # set up optimizer
             try:
                 # use provided or default optimizer arguments and add the model parameters
                 if "args" not in self.optimizer_args:
                     self.optimizer_args["args"] = {}
-                self.optimizer_args["args"]["params"] = self.model.parameters()
+                if self.flat_params:
+                    self.optimizer_args["args"]["params"] = [self.flat_params.param]
+                else:
+                    self.optimizer_args["args"]["params"] = self.model.parameters()
                 self.optimizer = engine.build_component(self.optimizer_args)
                 # get optimizer name for log
                 self.optimizer_name = self._get_component_name(self.optimizer_args)
@@ -162,15 +179,19 @@ class PTFedOptModelShareableGenerator(FullModelShareableGenerator):
 
         """
         self.model.train()
-        self.optimizer.zero_grad()
+        # keep the flat gradient allocated across rounds instead of re-creating it every update
+        self.optimizer.zero_grad(set_to_none=self.flat_params is None)
 
         # Apply the update to the model. We must multiply weights_delta by -1.0 to
         # view it as a gradient that should be applied to the server_optimizer.
-        updated_params = []
-        for name, param in self.model.named_parameters():
-            if name in model_diff:
-                param.grad = torch.tensor(-1.0 * model_diff[name]).to(self.device)
-                updated_params.append(name)
+        if self.flat_params:
+            updated_params = self.flat_params.set_grad_from_diff(model_diff)
+        else:
+            updated_params = []
+            for name, param in self.model.named_parameters():
+                if name in model_diff:
+                    param.grad = torch.tensor(-1.0 * model_diff[name]).to(self.device)
+                    updated_params.append(name)
 
         self.optimizer.step()
         if self.lr_scheduler is not None:
@@ -216,8 +237,11 @@ class PTFedOptModelShareableGenerator(FullModelShareableGenerator):
 
         # convert to numpy dict of weights
         start = time.time()
-        for key in weights:
-            weights[key] = weights[key].detach().cpu().numpy()
+        if self.flat_params:
+            weights = self.flat_params.state_dict_to_numpy(weights)
+        else:
+            for key in weights:
+                weights[key] = weights[key].detach().cpu().numpy()
         secs_detach = time.time() - start
 
         # update unnamed parameters such as batch norm layers if there are any using the averaged update
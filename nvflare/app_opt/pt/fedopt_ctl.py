@@ -19,6 +19,7 @@ import torch
 
 from nvflare.app_common.abstract.fl_model import FLModel
 from nvflare.app_common.workflows.fedavg import FedAvg
+from nvflare.app_opt.pt.flat_parameters import FlatParameters
 from nvflare.security.logging import secure_format_exception
 
 
@@ -36,6 +37,7 @@ class FedOpt(FedAvg):
             "args": {"T_max": 3, "eta_min": 0.9},
         },
         device=None,
+        fused_update: bool = False,
         **kwargs,
     ):
         """Implement the FedOpt algorithm. Based on FedAvg ModelController.
@@ -51,6 +53,10 @@ class FedOpt(FedAvg):
             lr_scheduler_args: dictionary of server-side learning rate scheduler arguments, with keys of 'lr_scheduler_path' and 'args.
             device: specify the device to run server-side optimization, e.g. "cpu" or "cuda:0"
                 (will default to cuda if available and no device is specified).
+            fused_update: if True, the trainable parameters are kept in one flat tensor, so that each optimizer step
+                is one vectorized update of all parameters. Only use it with optimizers that update each element
+                independently (e.g. SGD, Adam), and when the aggregated diffs have all trainable parameters.
+                Defaults to False.
 
         Raises:
             TypeError: when any of input arguments does not have correct type
@@ -64,8 +70,10 @@ class FedOpt(FedAvg):
             self.device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
         else:
             self.device = torch.device(device)
+        self.fused_update = fused_update
 
         self.torch_model = None
+        self.flat_params = None
         self.optimizer = None
         self.lr_scheduler = None
 
@@ -86,11 +94,20 @@ class FedOpt(FedAvg):
             print("server model", self.torch_model)
         self.torch_model.to(self.device)
 
+        if self.fused_update:
+            try:
+                self.flat_params = FlatParameters(self.torch_model)
+            except ValueError as e:
+                self.warning(f"Cannot use fused update, falling back to per-parameter update: {e}")
+
         # set up optimizer
         try:
             if "args" not in self.optimizer_args:
                 self.optimizer_args["args"] = {}
-            self.optimizer_args["args"]["params"] = self.torch_model.parameters()
+            if self.flat_params:
+                self.optimizer_args["args"]["params"] = [self.flat_params.param]
+            else:
+                self.optimizer_args["args"]["params"] = self.torch_model.parameters()
             self.optimizer = self.build_component(self.optimizer_args)
         except Exception as e:
             error_msg = f"Exception while constructing optimizer: {secure_format_exception(e)}"
@@ -123,15 +140,19 @@ class FedOpt(FedAvg):
 
         """
         self.torch_model.train()
-        self.optimizer.zero_grad()
+        # keep the flat gradient allocated across rounds instead of re-creating it every update
+        self.optimizer.zero_grad(set_to_none=self.flat_params is None)
 
         # Apply the update to the model. We must multiply weights_delta by -1.0 to
         # view it as a gradient that should be applied to the server_optimizer.
-        updated_params = []
-        for name, param in self.torch_model.named_parameters():
-            if name in model_diff:
-                param.grad = torch.tensor(-1.0 * model_diff[name]).to(self.device)
-                updated_params.append(name)
+        if self.flat_params:
+            updated_params = self.flat_params.set_grad_from_diff(model_diff)
+        else:
+            updated_params = []
+            for name, param in self.torch_model.named_parameters():
+                if name in model_diff:
+                    param.grad = torch.tensor(-1.0 * model_diff[name]).to(self.device)
+                    updated_params.append(name)
 
         self.optimizer.step()
         if self.lr_scheduler is not None:
@@ -148,8 +169,11 @@ class FedOpt(FedAvg):
 
         # convert to numpy dict of weights
         start = time.time()
-        for key in weights:
-            weights[key] = weights[key].detach().cpu().numpy()
+        if self.flat_params:
+            weights = self.flat_params.state_dict_to_numpy(weights)
+        else:
+            for key in weights:
+                weights[key] = weights[key].detach().cpu().numpy()
         secs_detach = time.time() - start
 
         # update unnamed parameters such as batch norm layers if there are any using the averaged update
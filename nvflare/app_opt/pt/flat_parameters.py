@@ -0,0 +1,133 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Dict, List
+
+import numpy as np
+import torch
+
+
+class FlatParameters(object):
+    def __init__(self, model: torch.nn.Module):
+        """Re-allocates the trainable parameters of a model as views into one contiguous tensor.
+
+        An optimizer built with `[flat_parameters.param]` instead of `model.parameters()` updates all parameters
+        with one vectorized op per optimizer step, instead of one op per parameter. This gives the same result for
+        optimizers that update each element independently (e.g. SGD, Adam, Adagrad), but not for optimizers that use
+        per-parameter norms (e.g. LARS, LAMB).
+
+        Args:
+            model: the model. All trainable parameters must have the same dtype and device.
+        """
+        named_params = [(name, p) for name, p in model.named_parameters() if p.requires_grad]
+        if not named_params:
+            raise ValueError("model has no trainable parameters")
+        dtypes = {p.dtype for _, p in named_params}
+        devices = {p.device for _, p in named_params}
+        if len(dtypes) > 1 or len(devices) > 1:
+            raise ValueError(f"all trainable parameters must have the same dtype and device but got {dtypes} {devices}")
+
+        self.names = [name for name, _ in named_params]
+        self.shapes = [p.shape for _, p in named_params]
+        self.offsets = []
+        offset = 0
+        for _, p in named_params:
+            self.offsets.append(offset)
+            offset += p.numel()
+
+        _, first = named_params[0]
+        flat = torch.empty(offset, dtype=first.dtype, device=first.device)
+        with torch.no_grad():
+            for (_, p), start in zip(named_params, self.offsets):
+                view = flat[start : start + p.numel()].view_as(p)
+                view.copy_(p)
+                p.data = view
+        self.param = torch.nn.Parameter(flat)
+        self.param.grad = torch.zeros_like(flat)
+        # numpy buffer the diffs are gathered into: the gradient itself on the CPU, else a (pinned) host buffer
+        self._host_grad = None
+        self._host_grad_source = None
+
+    def _views(self, t: torch.Tensor):
+        for name, start, shape in zip(self.names, self.offsets, self.shapes):
+            yield name, t[start : start + shape.numel()].view(shape)
+
+    def _get_grad(self) -> torch.Tensor:
+        # optimizer.zero_grad() sets the gradient to None by default (torch >= 2.0)
+        if self.param.grad is None:
+            self.param.grad = torch.zeros_like(self.param)
+        return self.param.grad
+
+    def _get_host_grad(self, grad: torch.Tensor) -> np.ndarray:
+        if self._host_grad is None or (grad.device.type == "cpu" and self._host_grad_source is not grad):
+            if grad.device.type == "cpu":
+                self._host_grad = grad.numpy()
+            else:
+                self._host_grad = torch.empty(grad.numel(), dtype=grad.dtype, pin_memory=True).numpy()
+            self._host_grad_source = grad
+        return self._host_grad
+
+    def set_grad_from_diff(self, model_diff: Dict) -> List[str]:
+        """Sets the gradient to the negated model diff, so that an optimizer step applies the diff.
+
+        Numpy diffs are gathered into the flat gradient with one concatenation and negated in one pass, then copied
+        to the device at once. Diffs given as tensors, or for parameters without a numpy dtype (e.g. bfloat16), are
+        copied var by var.
+
+        Args:
+            model_diff: dict of var name => numpy array or tensor. It must have all trainable parameters.
+
+        Returns:
+            names of the updated parameters
+        """
+        missing = [name for name in self.names if name not in model_diff]
+        if missing:
+            raise ValueError(f"model_diff has no values for parameters {missing}")
+
+        values = [model_diff[name] for name in self.names]
+        grad = self._get_grad()
+        with torch.no_grad():
+            if grad.dtype != torch.bfloat16 and not any(isinstance(v, torch.Tensor) for v in values):
+                host_grad = self._get_host_grad(grad)
+                np.concatenate([np.asarray(v).reshape(-1) for v in values], out=host_grad, casting="same_kind")
+                np.negative(host_grad, out=host_grad)
+                if grad.device.type != "cpu":
+                    grad.copy_(torch.from_numpy(host_grad))
+            else:
+                for (_, view), v in zip(self._views(grad), values):
+                    view.copy_(torch.as_tensor(v).reshape(view.shape))
+                grad.neg_()
+        return list(self.names)
+
+    def to_numpy(self) -> Dict[str, np.ndarray]:
+        """Gets the parameters as numpy arrays, with one device to host copy of the flat tensor.
+
+        As with `tensor.cpu().numpy()`, the arrays share memory with the parameters if they are on the CPU.
+        """
+        flat = self.param.detach().cpu().numpy()
+        return {
+            name: flat[start : start + shape.numel()].reshape(tuple(shape))
+            for name, start, shape in zip(self.names, self.offsets, self.shapes)
+        }
+
+    def state_dict_to_numpy(self, state_dict: Dict[str, torch.Tensor]) -> Dict[str, np.ndarray]:
+        """Converts a state dict of the model to numpy arrays.
+
+        The trainable parameters are copied with `to_numpy`, the other tensors (e.g. batch norm statistics) one by one.
+        """
+        weights = self.to_numpy()
+        for key, value in state_dict.items():
+            if key not in weights:
+                weights[key] = value.detach().cpu().numpy()
+        return weights
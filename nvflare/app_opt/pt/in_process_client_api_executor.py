@@ -37,6 +37,7 @@ class PTInProcessClientAPIExecutor(InProcessClientAPIExecutor):
         evaluate_task_name: str = AppConstants.TASK_VALIDATION,
         submit_model_task_name: str = AppConstants.TASK_SUBMIT_MODEL,
         params_exchange_format=ExchangeFormat.PYTORCH,
+        params_diff_in_place: bool = False,
     ):
         super(PTInProcessClientAPIExecutor, self).__init__(
             task_script_path=task_script_path,
@@ -52,6 +53,7 @@ class PTInProcessClientAPIExecutor(InProcessClientAPIExecutor):
             params_exchange_format=params_exchange_format,
             params_transfer_type=params_transfer_type,
             log_pull_interval=log_pull_interval,
+            params_diff_in_place=params_diff_in_place,
         )
         fobs.register(TensorDecomposer)
 
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Dict
+from typing import Dict, List
 
 import numpy as np
 import torch
@@ -20,19 +20,51 @@ import torch
 from nvflare.app_common.abstract.params_converter import ParamsConverter
 
 
+def _get_pinned_buffer(buffers: Dict[str, torch.Tensor], key: str, shape, dtype: torch.dtype) -> torch.Tensor:
+    # reuse the pinned buffer of the var if its shape and dtype did not change
+    buffer = buffers.get(key)
+    if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+        buffer = buffers[key] = torch.empty(shape, dtype=dtype, pin_memory=True)
+    return buffer
+
+
 class NumpyToPTParamsConverter(ParamsConverter):
+    def __init__(self, supported_tasks: List[str] = None, use_pinned_buffers: bool = False):
+        """Converts numpy arrays to CPU tensors.
+
+        Args:
+            supported_tasks: tasks to convert the params of. None means all tasks.
+            use_pinned_buffers: if CUDA is available, copy the arrays into pinned CPU buffers allocated once per var
+                and reused every round, so that the training script can move them to the GPU asynchronously
+                (e.g. `.to(device, non_blocking=True)`). This costs one extra CPU copy of the params per round,
+                so it only pays off if the script does such non-blocking transfers.
+                The tensors are overwritten by the next conversion.
+                Otherwise, the tensors share memory with the arrays.
+        """
+        super().__init__(supported_tasks)
+        self.use_pinned_buffers = use_pinned_buffers
+        self._buffers = {}
+
+    def _to_tensor(self, key: str, value, shape=None) -> torch.Tensor:
+        if shape is not None:
+            value = np.reshape(value, shape)
+        if not self.use_pinned_buffers or not torch.cuda.is_available():
+            return torch.as_tensor(value)
+
+        tensor = torch.as_tensor(value)
+        buffer = _get_pinned_buffer(self._buffers, key, tensor.shape, tensor.dtype)
+        buffer.copy_(tensor)
+        return buffer
+
     def convert(self, params: Dict, fl_ctx) -> Dict:
         tensor_shapes = fl_ctx.get_prop("tensor_shapes")
         exclude_vars = fl_ctx.get_prop("exclude_vars")
 
         return_params = {}
         if tensor_shapes:
-            return_params = {
-                k: torch.as_tensor(np.reshape(v, tensor_shapes[k])) if k in tensor_shapes else torch.as_tensor(v)
-                for k, v in params.items()
-            }
+            return_params = {k: self._to_tensor(k, v, tensor_shapes.get(k)) for k, v in params.items()}
         else:
-            return_params = {k: torch.as_tensor(v) for k, v in params.items()}
+            return_params = {k: self._to_tensor(k, v) for k, v in params.items()}
 
         if exclude_vars:
             for k, v in exclude_vars.items():
@@ -42,16 +74,57 @@ class NumpyToPTParamsConverter(ParamsConverter):
 
 
 class PTToNumpyParamsConverter(ParamsConverter):
+    def __init__(self, supported_tasks: List[str] = None, use_pinned_buffers: bool = False):
+        """Converts tensors to numpy arrays.
+
+        Args:
+            supported_tasks: tasks to convert the params of. None means all tasks.
+            use_pinned_buffers: copy GPU tensors into pinned CPU buffers allocated once per var and reused every
+                round. All copies are started asynchronously and waited for once per device before the conversion
+                returns, instead of one blocking copy per var. This only batches the device to host copies:
+                they are not overlapped with sending the params, which starts after the conversion.
+                The arrays are overwritten by the next conversion. CPU tensors are never copied.
+        """
+        super().__init__(supported_tasks)
+        self.use_pinned_buffers = use_pinned_buffers
+        self._buffers = {}
+
+    def _to_numpy(self, tensors: Dict[str, torch.Tensor]) -> Dict[str, np.ndarray]:
+        if not self.use_pinned_buffers:
+            return {k: v.cpu().numpy() for k, v in tensors.items()}
+
+        host_tensors = {}
+        devices = set()
+        for k, v in tensors.items():
+            v = v.detach()
+            if v.device.type == "cuda":
+                buffer = _get_pinned_buffer(self._buffers, k, v.shape, v.dtype)
+                buffer.copy_(v, non_blocking=True)
+                devices.add(v.device)
+                v = buffer
+            host_tensors[k] = v
+
+        # wait for the copies only, not for other work queued on the devices
+        events = []
+        for device in devices:
+            event = torch.cuda.Event()
+            event.record(torch.cuda.current_stream(device))
+            events.append(event)
+        for event in events:
+            event.synchronize()
+        return {k: v.cpu().numpy() for k, v in host_tensors.items()}
+
     def convert(self, params: Dict, fl_ctx) -> Dict:
-        return_tensors = {}
+        tensors = {}
         tensor_shapes = {}
         exclude_vars = {}
         for k, v in params.items():
             if isinstance(v, torch.Tensor):
-                return_tensors[k] = v.cpu().numpy()
+                tensors[k] = v
                 tensor_shapes[k] = v.shape
             else:
                 exclude_vars[k] = v
+        return_tensors = self._to_numpy(tensors)
 
         if tensor_shapes:
             fl_ctx.set_prop("tensor_shapes", tensor_shapes)
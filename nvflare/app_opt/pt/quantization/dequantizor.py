@@ -17,21 +17,33 @@ from typing import Union
 
 import numpy as np
 import torch
-from bitsandbytes.functional import QuantState, dequantize_4bit, dequantize_blockwise
 
 from nvflare.apis.dxo import DXO, DataKind, MetaKey
 from nvflare.apis.dxo_filter import DXOFilter
 from nvflare.apis.fl_context import FLContext
 from nvflare.apis.shareable import Shareable
+from nvflare.app_common.abstract.sparse_array import BlockQuantizedArray
+from nvflare.app_opt.pt.quantization import numpy_quantization
 from nvflare.app_opt.pt.quantization.constant import QUANTIZATION_TYPE
+from nvflare.app_opt.pt.quantization.quantizor import can_use_bitsandbytes
+from nvflare.fuel.utils.import_utils import optional_import
+
+QuantState, _ = optional_import(module="bitsandbytes.functional", name="QuantState")
+dequantize_blockwise, _ = optional_import(module="bitsandbytes.functional", name="dequantize_blockwise")
+dequantize_4bit, _ = optional_import(module="bitsandbytes.functional", name="dequantize_4bit")
 
 
 class ModelDequantizor(DXOFilter):
-    def __init__(self):
+    def __init__(self, aggregate_quantized: bool = False):
         """Filter to dequantize Shareable object to recover from quantization
 
         Args:
-            None
+            aggregate_quantized: if True, blockwise8, float4 and normfloat4 values are not dequantized, but kept as
+                BlockQuantizedArray objects that InTimeAccumulateWeightedAggregator dequantizes block by block into
+                its aggregation totals, so no full precision copy of the updates is created on the server.
+                Only use it in the server task result filters of such an aggregator. The aggregated values are
+                numpy arrays. To send the global model quantized, add a ModelQuantizor to the server task data
+                filters. Defaults to False.
 
         """
 
@@ -39,6 +51,46 @@ class ModelDequantizor(DXOFilter):
         data_kinds = [DataKind.WEIGHTS, DataKind.WEIGHT_DIFF]
         super().__init__(supported_data_kinds=data_kinds, data_kinds_to_filter=data_kinds)
         self.logger.info("Using model dequantizator.")
+        self.aggregate_quantized = aggregate_quantized
+
+    @staticmethod
+    def _to_block_quantized_array(
+        values, quant_state: dict, quantization_type: str, source_data_type: str
+    ) -> BlockQuantizedArray:
+        if isinstance(values, torch.Tensor):
+            values = values.cpu().numpy()
+        quant_state = {k: v.cpu().numpy() if isinstance(v, torch.Tensor) else v for k, v in quant_state.items()}
+        # numpy has no bfloat16
+        dtype = np.float32 if source_data_type == "bfloat16" else np.dtype(source_data_type)
+        if quantization_type == "blockwise8":
+            return BlockQuantizedArray(
+                quantized=values,
+                absmax=quant_state["absmax"],
+                code=quant_state["code"],
+                blocksize=numpy_quantization.BLOCKWISE8_BLOCKSIZE,
+                shape=values.shape,
+                dtype=dtype,
+            )
+        return BlockQuantizedArray(
+            quantized=values,
+            absmax=quant_state["absmax"],
+            code=quant_state["quant_map"],
+            blocksize=quant_state["blocksize"],
+            shape=quant_state["shape"],
+            dtype=dtype,
+            packed=True,
+        )
+
+    @staticmethod
+    def _dequantize_numpy(values, quant_state: dict, quantization_type: str) -> torch.Tensor:
+        if isinstance(values, torch.Tensor):
+            values = values.cpu().numpy()
+        quant_state = {k: v.cpu().numpy() if isinstance(v, torch.Tensor) else v for k, v in quant_state.items()}
+        if quantization_type == "blockwise8":
+            dequantized = numpy_quantization.dequantize_blockwise(values, quant_state["absmax"], quant_state["code"])
+        else:
+            dequantized = numpy_quantization.dequantize_4bit(values, quant_state)
+        return torch.from_numpy(dequantized)
 
     def dequantization(
         self, params: dict, quant_state: dict, quantization_type: str, source_datatype: dict, fl_ctx: FLContext
@@ -82,10 +134,20 @@ class ModelDequantizor(DXOFilter):
                 if quantization_type == "float16":
                     # direct assign and convert back to higher precision
                     params[param_name] = values
+                elif quantization_type in ["blockwise8", "float4", "normfloat4"] and self.aggregate_quantized:
+                    # keep the values quantized, they are dequantized block by block during aggregation
+                    params[param_name] = self._to_block_quantized_array(
+                        values, quant_state[param_name], quantization_type, source_data_type
+                    )
+                    n_bytes_after += values.nbytes
+                    continue
                 elif quantization_type in ["blockwise8", "float4", "normfloat4"]:
-                    # use bitsandbytes to dequantize the values
-                    # extract quantization state
-                    if quantization_type == "blockwise8":
+                    if not can_use_bitsandbytes(quantization_type):
+                        # no bitsandbytes or no GPU, use the numpy implementation of the same format
+                        dequantized = self._dequantize_numpy(values, quant_state[param_name], quantization_type)
+                    elif quantization_type == "blockwise8":
+                        # use bitsandbytes to dequantize the values
+                        # extract quantization state
                         if source_data_format == "numpy":
                             # first convert numpy array to tensor if numpy
                             quantized = torch.as_tensor(values)
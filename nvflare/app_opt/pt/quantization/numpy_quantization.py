@@ -0,0 +1,242 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Vectorized NumPy implementation of the bitsandbytes blockwise 8-bit and 4-bit (fp4, nf4) quantization.
+
+It needs neither bitsandbytes nor a GPU. The quantized values and quantization states have the same layout as those of
+bitsandbytes, so values quantized by either implementation can be dequantized by the other one.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+BLOCKWISE8_BLOCKSIZE = 4096
+BLOCKWISE4_BLOCKSIZE = 64
+
+NF4_CODE = np.array(
+    [
+        -1.0,
+        -0.6961928009986877,
+        -0.5250730514526367,
+        -0.39491748809814453,
+        -0.28444138169288635,
+        -0.18477343022823334,
+        -0.09105003625154495,
+        0.0,
+        0.07958029955625534,
+        0.16093020141124725,
+        0.24611230194568634,
+        0.33791524171829224,
+        0.44070982933044434,
+        0.5626170039176941,
+        0.7229568362236023,
+        1.0,
+    ],
+    dtype=np.float32,
+)
+
+FP4_CODE = (
+    np.array(
+        [0, 0.0625, 8.0, 12.0, 4.0, 6.0, 2.0, 3.0, -0.0, -0.0625, -8.0, -12.0, -4.0, -6.0, -2.0, -3.0], dtype=np.float32
+    )
+    / np.float32(12.0)
+)
+
+_4BIT_CODES = {"fp4": FP4_CODE, "nf4": NF4_CODE}
+_dynamic_map = None
+
+
+def create_dynamic_map() -> np.ndarray:
+    """Creates the signed 8-bit dynamic quantization map used by bitsandbytes blockwise quantization.
+
+    The map is sent with the quantized values, and may differ from the one of bitsandbytes in the last bit of a few
+    entries due to the different floating point operations used to create it.
+
+    Returns:
+        sorted float32 array of 256 values in [-1, 1].
+    """
+    global _dynamic_map
+    if _dynamic_map is None:
+        max_exponent_bits = 7
+        data = []
+        for i in range(max_exponent_bits):
+            boundaries = np.linspace(0.1, 1, 2**i + 1, dtype=np.float32)
+            means = (boundaries[:-1] + boundaries[1:]) / np.float32(2.0)
+            scale = np.float32(10 ** (-(max_exponent_bits - 1) + i))
+            data.append(scale * means)
+            data.append(-scale * means)
+        data.append(np.array([0.0, 1.0], dtype=np.float32))
+        _dynamic_map = np.sort(np.concatenate(data))
+    return _dynamic_map.copy()
+
+
+_bucket_tables = {}
+
+
+def _get_bucket_table(bounds: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+    key = bounds.tobytes()
+    table = _bucket_tables.get(key)
+    if table is None:
+        # the 2**16 float32 values with the same upper 16 bits form a bucket.
+        # for each bucket, the number of bounds below its smallest and below its largest value.
+        upper = np.arange(2**16, dtype=np.uint32) << 16
+        negative = upper >= 0x80000000
+        smallest = np.where(negative, upper | 0xFFFF, upper).view(np.float32)
+        largest = np.where(negative, upper, upper | 0xFFFF).view(np.float32)
+        with np.errstate(invalid="ignore"):
+            start = np.searchsorted(bounds, smallest, side="left")
+            end = np.searchsorted(bounds, largest, side="left")
+        num_steps = int(np.max(np.where(np.isnan(smallest) | np.isnan(largest), 0, end - start)))
+        padded_bounds = np.append(bounds, np.float32(np.inf)).astype(np.float32)
+        table = _bucket_tables[key] = (start.astype(np.uint8), padded_bounds, num_steps)
+    return table
+
+
+def _bucketize(values: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """Same as np.searchsorted(bounds, values, side="left") for float32 values and up to 255 sorted bounds.
+
+    The index is looked up from the upper 16 bits of the values, then corrected with the few bounds in the bucket,
+    which is much faster than a binary search for each value.
+    """
+    if bounds.size > 255 or np.isnan(values).any():
+        return np.searchsorted(bounds, values, side="left").astype(np.uint8)
+    start, padded_bounds, num_steps = _get_bucket_table(np.ascontiguousarray(bounds, dtype=np.float32))
+    indices = start[np.ascontiguousarray(values, dtype=np.float32).view(np.uint32) >> 16]
+    for _ in range(num_steps):
+        indices += values > padded_bounds[indices]
+    return indices
+
+
+def _scale_blocks(values: np.ndarray, blocksize: int) -> Tuple[np.ndarray, np.ndarray]:
+    # scale each block by its absmax, as float32
+    flat = np.asarray(values, dtype=np.float32).reshape(-1)
+    n = flat.size
+    full = n - n % blocksize
+    blocks = flat[:full].reshape(-1, blocksize)
+    # max(|x|) without allocating |x|
+    absmax = np.maximum(blocks.max(axis=1), -blocks.min(axis=1)) if full else np.empty(0, dtype=np.float32)
+    scaled = np.empty(n, dtype=np.float32)
+    inv_absmax = np.float32(1.0) / np.maximum(absmax, np.float32(1e-38))
+    np.multiply(blocks, inv_absmax[:, None], out=scaled[:full].reshape(-1, blocksize))
+    if full < n:
+        last = np.maximum(np.abs(flat[full:]).max(), np.float32(1e-38))
+        absmax = np.append(absmax, last).astype(np.float32)
+        np.divide(flat[full:], last, out=scaled[full:])
+    np.clip(scaled, -1, 1, out=scaled)
+    return scaled, absmax
+
+
+def _scale_back(values: np.ndarray, absmax: np.ndarray, blocksize: int) -> np.ndarray:
+    # multiply each block of values by its absmax, in place
+    n = values.size
+    full = n - n % blocksize
+    blocks = values[:full].reshape(-1, blocksize)
+    np.multiply(blocks, absmax[: full // blocksize, None], out=blocks)
+    if full < n:
+        np.multiply(values[full:], absmax[-1], out=values[full:])
+    return values
+
+
+def quantize_blockwise(
+    values: np.ndarray, code: Optional[np.ndarray] = None, blocksize: int = BLOCKWISE8_BLOCKSIZE
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Quantizes values to 8 bits, in blocks scaled by their absmax.
+
+    Args:
+        values: array to quantize.
+        code: sorted quantization map of 256 values. Defaults to the dynamic map.
+        blocksize: number of values in each block. Defaults to 4096.
+
+    Returns:
+        uint8 indices into the code with the shape of values, float32 absmax of each block, and the code.
+    """
+    if code is None:
+        code = create_dynamic_map()
+    scaled, absmax = _scale_blocks(values, blocksize)
+    bounds = (code[:-1] + code[1:]) / np.float32(2.0)
+    quantized = _bucketize(scaled, bounds)
+    return quantized.reshape(np.shape(values)), absmax, code
+
+
+def dequantize_blockwise(
+    quantized: np.ndarray, absmax: np.ndarray, code: np.ndarray, blocksize: int = BLOCKWISE8_BLOCKSIZE
+) -> np.ndarray:
+    """Dequantizes values quantized by `quantize_blockwise`.
+
+    Returns:
+        float32 array with the shape of quantized.
+    """
+    values = np.asarray(code, dtype=np.float32)[quantized.reshape(-1)]
+    return _scale_back(values, np.asarray(absmax, dtype=np.float32), blocksize).reshape(quantized.shape)
+
+
+def quantize_4bit(
+    values: np.ndarray, quant_type: str = "fp4", blocksize: int = BLOCKWISE4_BLOCKSIZE, dtype: Optional[str] = None
+) -> Tuple[np.ndarray, Dict]:
+    """Quantizes values to 4 bits, in blocks scaled by their absmax, and packs two values per byte.
+
+    Args:
+        values: array to quantize.
+        quant_type: "fp4" or "nf4". Defaults to "fp4".
+        blocksize: number of values in each block. Defaults to 64.
+        dtype: name of the dtype of the values recorded in the quantization state. Defaults to the dtype of values.
+
+    Returns:
+        packed uint8 array of shape ((n + 1) // 2, 1), and the quantization state with the same keys as
+        bitsandbytes QuantState.as_dict().
+    """
+    code = _4BIT_CODES.get(quant_type)
+    if code is None:
+        raise ValueError(f"quant_type must be fp4 or nf4 but got {quant_type}")
+    order = np.argsort(code, kind="stable")
+    sorted_code = code[order]
+    bounds = (sorted_code[:-1] + sorted_code[1:]) / np.float32(2.0)
+
+    scaled, absmax = _scale_blocks(values, blocksize)
+    if scaled.size % 2:
+        scaled = np.append(scaled, np.float32(0.0))
+    q = order.astype(np.uint8)[_bucketize(scaled, bounds)]
+    packed = ((q[::2] << 4) | q[1::2]).reshape(-1, 1)
+
+    quant_state = {
+        "quant_type": quant_type,
+        "absmax": absmax,
+        "blocksize": blocksize,
+        "quant_map": code.copy(),
+        "dtype": dtype or np.asarray(values).dtype.name,
+        "shape": tuple(np.shape(values)),
+    }
+    return packed, quant_state
+
+
+def dequantize_4bit(packed: np.ndarray, quant_state: Dict) -> np.ndarray:
+    """Dequantizes values quantized by `quantize_4bit`.
+
+    Args:
+        packed: packed uint8 array.
+        quant_state: quantization state with the keys "absmax", "blocksize", "quant_map" and "shape".
+
+    Returns:
+        float32 array of the original shape.
+    """
+    shape = tuple(quant_state["shape"])
+    n = int(np.prod(shape, dtype=np.int64))
+    packed = packed.reshape(-1)
+    q = np.empty(packed.size * 2, dtype=np.uint8)
+    np.right_shift(packed, 4, out=q[::2])
+    np.bitwise_and(packed, 0xF, out=q[1::2])
+    values = np.asarray(quant_state["quant_map"], dtype=np.float32)[q[:n]]
+    absmax = np.asarray(quant_state["absmax"], dtype=np.float32)
+    return _scale_back(values, absmax, quant_state["blocksize"]).reshape(shape)
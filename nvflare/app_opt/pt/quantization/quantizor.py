@@ -17,13 +17,28 @@ from typing import Union
 
 import numpy as np
 import torch
-from bitsandbytes.functional import quantize_4bit, quantize_blockwise
 
 from nvflare.apis.dxo import DXO, DataKind, MetaKey
 from nvflare.apis.dxo_filter import DXOFilter
 from nvflare.apis.fl_context import FLContext
 from nvflare.apis.shareable import Shareable
+from nvflare.app_opt.pt.quantization import numpy_quantization
 from nvflare.app_opt.pt.quantization.constant import DATA_TYPE, QUANTIZATION_TYPE
+from nvflare.fuel.utils.import_utils import optional_import
+
+quantize_blockwise, bnb_blockwise_ok = optional_import(module="bitsandbytes.functional", name="quantize_blockwise")
+quantize_4bit, bnb_4bit_ok = optional_import(module="bitsandbytes.functional", name="quantize_4bit")
+
+
+def can_use_bitsandbytes(quantization_type: str) -> bool:
+    """Whether bitsandbytes can be used for the quantization type.
+
+    bitsandbytes must be installed, and 4-bit quantization also needs a GPU.
+    Otherwise, the NumPy implementation in numpy_quantization is used.
+    """
+    if quantization_type == "blockwise8":
+        return bnb_blockwise_ok
+    return bnb_4bit_ok and torch.cuda.is_available()
 
 
 class ModelQuantizor(DXOFilter):
@@ -55,6 +70,24 @@ class ModelQuantizor(DXOFilter):
         self.TS_FP16_MIN = torch.finfo(torch.float16).min
         self.TS_FP16_MAX = torch.finfo(torch.float16).max
 
+    def _quantize_numpy(self, values, source_data_format: str, source_data_type: str):
+        if source_data_format == "torch":
+            values = values.detach().cpu().float().numpy()
+
+        if self.quantization_type == "blockwise8":
+            quantized, absmax, code = numpy_quantization.quantize_blockwise(values)
+            state = {"absmax": absmax, "code": code}
+        else:
+            quant_type = "fp4" if self.quantization_type == "float4" else "nf4"
+            quantized, state = numpy_quantization.quantize_4bit(values, quant_type=quant_type, dtype=source_data_type)
+        n_bytes_meta = sum(v.nbytes for v in state.values() if isinstance(v, np.ndarray))
+
+        # keep source data format
+        if source_data_format == "torch":
+            quantized = torch.from_numpy(quantized)
+            state = {k: torch.from_numpy(v) if isinstance(v, np.ndarray) else v for k, v in state.items()}
+        return quantized, state, n_bytes_meta
+
     def quantization(self, params: dict, fl_ctx: FLContext):
         n_params = len(params.keys())
         self.log_info(fl_ctx, f"Running quantization on {n_params} variables")
@@ -117,9 +150,15 @@ class ModelQuantizor(DXOFilter):
                         values = values.to(torch.float16)
                     params[param_name] = values
                 elif self.quantization_type in ["blockwise8", "float4", "normfloat4"]:
-                    # use bitsandbytes to quantize the values
-                    # input is a tensor, output is a tuple of (quantized tensor, quantized_state)
-                    if self.quantization_type == "blockwise8":
+                    if not can_use_bitsandbytes(self.quantization_type):
+                        # no bitsandbytes or no GPU, use the numpy implementation with the same output format
+                        values, quant_state[param_name], n_bytes = self._quantize_numpy(
+                            values, source_data_format, source_data_type
+                        )
+                        n_bytes_meta += n_bytes
+                    elif self.quantization_type == "blockwise8":
+                        # use bitsandbytes to quantize the values
+                        # input is a tensor, output is a tuple of (quantized tensor, quantized_state)
                         if source_data_format == "numpy":
                             # if numpy, first convert numpy array to tensor
                             values_tensor = torch.as_tensor(values)
@@ -67,6 +67,8 @@ class PTScaffoldHelper(object):
         self.c_global = None
         self.c_local = None
         self.c_delta_para = None
+        # c_global - c_local of the floating point terms, which is constant during local training
+        self._corrections = None
 
     def init(self, model):
         # create models for SCAFFOLD correction terms
@@ -81,6 +83,7 @@ class PTScaffoldHelper(object):
 
     def get_params(self):
         self.cnt = 0
+        self._corrections = None
         # Adapted from https://github.com/Xtra-Computing/NIID-Bench/blob/main/experiments.py#L371
         c_global_para = self.c_global.state_dict()
         c_local_para = self.c_local.state_dict()
@@ -89,10 +92,25 @@ class PTScaffoldHelper(object):
     def model_update(self, model, curr_lr, c_global_para, c_local_para):
         # Update model using scaffold controls
         # See https://github.com/Xtra-Computing/NIID-Bench/blob/main/experiments.py#L391
+        # The floating point tensors are updated in place, as they share memory with the model.
+        # c_global_para and c_local_para must be the dicts returned by the last get_params call:
+        # their difference is computed on the first update and reused until the controls change.
         net_para = model.state_dict()
-        for key in net_para:
-            net_para[key] = net_para[key] - curr_lr * (c_global_para[key] - c_local_para[key])
-        model.load_state_dict(net_para)
+        float_keys = [key for key in net_para if torch.is_floating_point(net_para[key])]
+        if self._corrections is None:
+            self._corrections = torch._foreach_sub(
+                [c_global_para[key] for key in float_keys], [c_local_para[key] for key in float_keys]
+            )
+        if float_keys:
+            torch._foreach_add_([net_para[key] for key in float_keys], self._corrections, alpha=-curr_lr)
+
+        other_para = {
+            key: net_para[key] - curr_lr * (c_global_para[key] - c_local_para[key])
+            for key in net_para
+            if not torch.is_floating_point(net_para[key])
+        }
+        if other_para:
+            model.load_state_dict(other_para, strict=False)
 
         self.cnt += 1
 
@@ -101,18 +119,41 @@ class PTScaffoldHelper(object):
         # See https://github.com/Xtra-Computing/NIID-Bench/blob/main/experiments.py#L403
 
         c_new_para = self.c_local.state_dict()
-        self.c_delta_para = copy.deepcopy(self.c_local.state_dict())
+        self.c_delta_para = {}
         global_model_para = model_global.state_dict()
         net_para = model.state_dict()
-        for key in net_para:
-            c_new_para[key] = (
-                c_new_para[key] - c_global_para[key] + (global_model_para[key] - net_para[key]) / (self.cnt * curr_lr)
+        float_keys = [key for key in net_para if torch.is_floating_point(c_new_para[key])]
+        fused_deltas = {}
+        if float_keys:
+            # same operations as below, but with one kernel per operation for all the floating point terms
+            steps = torch._foreach_sub(
+                [global_model_para[key] for key in float_keys], [net_para[key] for key in float_keys]
             )
-            self.c_delta_para[key] = (c_new_para[key] - c_local_para[key]).cpu().numpy()
+            torch._foreach_div_(steps, self.cnt * curr_lr)
+            c_new = torch._foreach_sub(
+                [c_new_para[key] for key in float_keys], [c_global_para[key] for key in float_keys]
+            )
+            torch._foreach_add_(c_new, steps)
+            c_delta = torch._foreach_sub(c_new, [c_local_para[key] for key in float_keys])
+            for key, value, delta in zip(float_keys, c_new, c_delta):
+                c_new_para[key] = value
+                fused_deltas[key] = delta
+
+        for key in net_para:
+            if key not in fused_deltas:
+                c_new_para[key] = (
+                    c_new_para[key]
+                    - c_global_para[key]
+                    + (global_model_para[key] - net_para[key]) / (self.cnt * curr_lr)
+                )
+            delta = fused_deltas[key] if key in fused_deltas else c_new_para[key] - c_local_para[key]
+            self.c_delta_para[key] = delta.cpu().numpy()
         self.c_local.load_state_dict(c_new_para)
+        self._corrections = None
 
     def load_global_controls(self, weights):
         self.c_global.load_state_dict(weights)
+        self._corrections = None
 
     def get_delta_controls(self):
         if self.c_delta_para is None:
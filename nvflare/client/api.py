@@ -14,6 +14,7 @@
 
 import logging
 import os
+from concurrent.futures import Future
 from enum import Enum
 from typing import Any, Dict, Optional
 
@@ -67,17 +68,24 @@ def receive(timeout: Optional[float] = None) -> Optional[FLModel]:
     return client_api.receive(timeout)
 
 
-def send(model: FLModel, clear_cache: bool = True) -> None:
+def send(model: FLModel, clear_cache: bool = True, blocking: bool = True) -> Optional[Future]:
     """Sends the model to NVFlare side.
 
     Args:
         model (FLModel): The FLModel object to be sent.
         clear_cache (bool): Whether to clear the cache after send.
+        blocking (bool): Whether to wait until the model is sent. If False, the model is prepared, serialized
+            and sent on a background thread while the script goes on (e.g. with local evaluation). The params of
+            the model must not be changed until the returned Future is done. The next call to receive or send
+            waits until it's done.
+
+    Returns:
+        None if blocking; otherwise a Future that is done when the model is sent.
     """
     if not isinstance(model, FLModel):
         raise TypeError("model needs to be an instance of FLModel")
     global client_api
-    return client_api.send(model, clear_cache)
+    return client_api.send(model, clear_cache, blocking)
 
 
 def system_info() -> Dict:
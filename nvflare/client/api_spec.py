@@ -13,6 +13,7 @@
 # limitations under the License.
 
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
 from typing import Any, Dict, Optional
 
 from nvflare.apis.analytix import AnalyticsDataType
@@ -60,12 +61,18 @@ class APISpec(ABC):
         pass
 
     @abstractmethod
-    def send(self, model: FLModel, clear_cache: bool = True) -> None:
+    def send(self, model: FLModel, clear_cache: bool = True, blocking: bool = True) -> Optional[Future]:
         """Sends the model to NVFlare side.
 
         Args:
             model (FLModel): The FLModel object to be sent.
             clear_cache (bool): Whether to clear the cache after send.
+            blocking (bool): Whether to wait until the model is sent. If False, the model is prepared, serialized
+                and sent on a background thread, and the params of the model must not be changed until the
+                returned Future is done. The next call to receive or send waits until it's done.
+
+        Returns:
+            None if blocking; otherwise a Future that is done when the model is sent.
 
         Example:
 
@@ -0,0 +1,53 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+from nvflare.fuel.utils.log_utils import get_obj_logger
+
+
+class BackgroundSender:
+    def __init__(self):
+        """Runs the sends of the Client API on a background thread, one at a time and in order.
+
+        The thread is not a daemon thread: a pending send is completed before the training script exits.
+        """
+        self.logger = get_obj_logger(self)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Optional[Future] = None
+
+    def submit(self, send_func: Callable, *args, **kwargs) -> Future:
+        """Starts the send in the background.
+
+        Returns:
+            a Future of the result of send_func
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="flare_send")
+        future = self._executor.submit(send_func, *args, **kwargs)
+        future.add_done_callback(self._log_error)
+        self._pending = future
+        return future
+
+    def _log_error(self, future: Future):
+        if not future.cancelled() and future.exception():
+            self.logger.error(f"background send failed: {future.exception()}")
+
+    def wait(self):
+        """Waits until the pending send is done. Its error, if any, is only reported by its Future."""
+        pending = self._pending
+        if pending is not None:
+            wait([pending])
+            self._pending = None
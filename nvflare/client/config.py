@@ -33,6 +33,7 @@ class TransferType:
 class ConfigKey:
     EXCHANGE_FORMAT = "exchange_format"
     TRANSFER_TYPE = "transfer_type"
+    DIFF_IN_PLACE = "diff_in_place"
     TRAIN_WITH_EVAL = "train_with_eval"
     TRAIN_TASK_NAME = "train_task_name"
     EVAL_TASK_NAME = "eval_task_name"
@@ -57,6 +58,7 @@ class ClientConfig:
 
             EXCHANGE_FORMAT: Format to exchange, pytorch, raw, or numpy
             TRANSFER_TYPE: Either FULL or DIFF (means difference)
+            DIFF_IN_PLACE: Whether to compute the DIFF into the received model params
             TRAIN_WITH_EVAL: Whether train task needs to also do evaluation
             TRAIN_TASK_NAME: Name of the train task
             EVAL_TASK_NAME: Name of the evaluate task
@@ -139,6 +141,9 @@ class ClientConfig:
     def get_transfer_type(self) -> str:
         return self.config.get(ConfigKey.TASK_EXCHANGE, {}).get(ConfigKey.TRANSFER_TYPE, "FULL")
 
+    def get_diff_in_place(self) -> bool:
+        return self.config.get(ConfigKey.TASK_EXCHANGE, {}).get(ConfigKey.DIFF_IN_PLACE, False)
+
     def get_train_task(self):
         return self.config.get(ConfigKey.TASK_EXCHANGE, {}).get(ConfigKey.TRAIN_TASK_NAME, "")
 
@@ -14,6 +14,7 @@
 
 import importlib
 import os
+from concurrent.futures import Future
 from typing import Any, Dict, Optional, Tuple
 
 from nvflare.apis.analytix import AnalyticsDataType
@@ -21,6 +22,7 @@ from nvflare.apis.fl_constant import FLMetaKey
 from nvflare.apis.utils.analytix_utils import create_analytic_dxo
 from nvflare.app_common.abstract.fl_model import FLModel
 from nvflare.client.api_spec import APISpec
+from nvflare.client.background_sender import BackgroundSender
 from nvflare.client.config import ClientConfig, ConfigKey, ExchangeFormat, from_file
 from nvflare.client.constants import CLIENT_API_CONFIG
 from nvflare.client.flare_agent import FlareAgentException
@@ -65,6 +67,7 @@ class ExProcessClientAPI(APISpec):
         self.process_model_registry = None
         self.logger = get_obj_logger(self)
         self.receive_called = False
+        self.background_sender = BackgroundSender()
 
     def get_model_registry(self) -> ModelRegistry:
         """Gets the ModelRegistry."""
@@ -128,15 +131,23 @@ class ExProcessClientAPI(APISpec):
 
     def __receive(self, timeout: Optional[float] = None) -> Optional[FLModel]:
         model_registry = self.get_model_registry()
+        self.background_sender.wait()
         return model_registry.get_model(timeout)
 
-    def send(self, model: FLModel, clear_cache: bool = True) -> None:
+    def send(self, model: FLModel, clear_cache: bool = True, blocking: bool = True) -> Optional[Future]:
         model_registry = self.get_model_registry()
+        self.background_sender.wait()
         if not self.receive_called:
             raise RuntimeError('"receive" needs to be called before sending model!')
+        if blocking:
+            self._send(model_registry, model, clear_cache)
+            return None
+        return self.background_sender.submit(self._send, model_registry, model, clear_cache)
+
+    def _send(self, model_registry: ModelRegistry, model: FLModel, clear_cache: bool):
         model_registry.submit_model(model=model)
         if clear_cache:
-            self.clear()
+            self._clear()
 
     def system_info(self) -> Dict:
         model_registry = self.get_model_registry()
@@ -195,6 +206,10 @@ class ExProcessClientAPI(APISpec):
         flare_agent.log(dxo)
 
     def clear(self):
+        self.background_sender.wait()
+        self._clear()
+
+    def _clear(self):
         model_registry = self.get_model_registry()
         model_registry.clear()
         self.receive_called = False
@@ -254,7 +254,10 @@ class FlareAgent:
                 self.logger.debug("get request timeout")
                 return None
 
-            req: Optional[Message] = self.pipe_handler.get_next()
+            wait_time = 0.5
+            if timeout is not None:
+                wait_time = min(wait_time, timeout - (time.time() - start_time))
+            req: Optional[Message] = self.pipe_handler.get_next(timeout=wait_time)
             if req is not None:
                 if not isinstance(req.data, Shareable):
                     self.logger.error(f"bad task: expect request data to be Shareable but got {type(req.data)}")
@@ -272,7 +275,6 @@ class FlareAgent:
                 )
                 self.current_task = tc
                 return Task(task_name=tc.task_name, task_id=tc.task_id, data=task_data)
-            time.sleep(0.5)
 
     def submit_result(self, result, rc=RC.OK) -> bool:
         """Submit the result of the current task.
@@ -14,6 +14,7 @@
 
 import os
 import time
+from concurrent.futures import Future
 from typing import Any, Dict, Optional
 
 from nvflare.apis.analytix import AnalyticsDataType
@@ -22,9 +23,10 @@ from nvflare.apis.shareable import Shareable
 from nvflare.app_common.abstract.fl_model import FLModel, ParamsType
 from nvflare.app_common.utils.fl_model_utils import FLModelUtils
 from nvflare.client.api_spec import APISpec
+from nvflare.client.background_sender import BackgroundSender
 from nvflare.client.config import ClientConfig, ConfigKey, TransferType
 from nvflare.client.constants import SYS_ATTRS
-from nvflare.client.utils import DIFF_FUNCS
+from nvflare.client.utils import DIFF_FUNCS, IN_PLACE_DIFF_FUNCS
 from nvflare.fuel.data_event.data_bus import DataBus
 from nvflare.fuel.data_event.event_manager import EventManager
 from nvflare.fuel.utils.log_utils import get_obj_logger
@@ -62,6 +64,7 @@ class InProcessClientAPI(APISpec):
         self.stop = False
         self.rank = None
         self.receive_called = False  # to check if users have call received for a new model
+        self.background_sender = BackgroundSender()
 
     def init(self, rank: Optional[str] = None, config: Optional[Dict] = None):
         """Initializes NVFlare Client API environment.
@@ -104,6 +107,7 @@ class InProcessClientAPI(APISpec):
         return result
 
     def __receive(self) -> Optional[FLModel]:
+        self.background_sender.wait()
         if self.fl_model:
             return self.fl_model
 
@@ -119,13 +123,20 @@ class InProcessClientAPI(APISpec):
 
         return self.fl_model
 
-    def send(self, model: FLModel, clear_cache: bool = True) -> None:
+    def send(self, model: FLModel, clear_cache: bool = True, blocking: bool = True) -> Optional[Future]:
+        self.background_sender.wait()
         if self.__continue_job():
             self.logger.info("Try to send local model back to peer ")
 
         if not self.receive_called:
             raise RuntimeError('"receive" needs to be called before sending model!')
 
+        if blocking:
+            self._send(model, clear_cache)
+            return None
+        return self.background_sender.submit(self._send, model, clear_cache)
+
+    def _send(self, model: FLModel, clear_cache: bool):
         if self.client_config.get_transfer_type() == TransferType.DIFF:
             model = self._prepare_param_diff(model)
 
@@ -187,11 +198,13 @@ class InProcessClientAPI(APISpec):
         self.event_manager.fire_event(TOPIC_LOG_DATA, msg)
 
     def clear(self):
+        self.background_sender.wait()
         self.fl_model = None
 
     def _prepare_param_diff(self, model: FLModel) -> FLModel:
         exchange_format = self.client_config.get_exchange_format()
-        diff_func = DIFF_FUNCS.get(exchange_format, None)
+        diff_funcs = IN_PLACE_DIFF_FUNCS if self.client_config.get_diff_in_place() else DIFF_FUNCS
+        diff_func = diff_funcs.get(exchange_format, None)
 
         if diff_func is None:
             raise RuntimeError(f"no default params diff function for {exchange_format}")
@@ -18,7 +18,7 @@ from nvflare.app_common.abstract.fl_model import FLModel, ParamsType
 
 from .config import TransferType
 from .task_registry import TaskRegistry
-from .utils import DIFF_FUNCS
+from .utils import DIFF_FUNCS, IN_PLACE_DIFF_FUNCS
 
 
 class ModelRegistry(TaskRegistry):
@@ -61,7 +61,8 @@ class ModelRegistry(TaskRegistry):
 
     def _prepare_param_diff(self, model: FLModel) -> FLModel:
         exchange_format = self.config.get_exchange_format()
-        diff_func = DIFF_FUNCS.get(exchange_format, None)
+        diff_funcs = IN_PLACE_DIFF_FUNCS if self.config.get_diff_in_place() else DIFF_FUNCS
+        diff_func = diff_funcs.get(exchange_format, None)
         if diff_func is None:
             raise RuntimeError(f"no default params diff function for {exchange_format}")
         elif self.received_task is None:
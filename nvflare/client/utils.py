@@ -12,7 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Dict
+from typing import Any, Dict
+
+import numpy as np
 
 from .config import ExchangeFormat
 
@@ -43,4 +45,55 @@ def numerical_params_diff(original: Dict, new: Dict) -> Dict:
     return diff_dict
 
 
+def _diff_in_place(original: Any, new: Any) -> Any:
+    if isinstance(original, np.ndarray) and isinstance(new, np.ndarray):
+        if original.flags.writeable and original.shape == new.shape and np.can_cast(new.dtype, original.dtype):
+            return np.subtract(new, original, out=original)
+    elif type(original).__module__.startswith("torch") and type(new).__module__.startswith("torch"):
+        import torch
+
+        if not original.requires_grad and original.shape == new.shape and original.dtype.is_floating_point:
+            with torch.no_grad():
+                if original.device == new.device:
+                    return torch.sub(new, original, out=original)
+                # compute on the training device, then copy the diff into the original buffer
+                return original.copy_(new - original.to(new.device, non_blocking=True))
+    return new - original
+
+
+def numerical_params_diff_in_place(original: Dict, new: Dict) -> Dict:
+    """Calculates the numerical parameter difference into the buffers of the original values.
+
+    Unlike `numerical_params_diff`, no new buffer is allocated for the differences of numpy arrays and floating
+    point torch tensors: they are written into the original values, which are overwritten. Torch differences are
+    computed on the device of the new values, and only copied to the device of the original values.
+    Other values (e.g. integer buffers, or values of different shapes) are subtracted as in `numerical_params_diff`.
+
+    Args:
+        original: A dict of numerical values. Its values are overwritten with the differences.
+        new: A dict of numerical values.
+
+    Returns:
+        A dict with common keys that exist in both original dict and new dict,
+        values are the difference between original and new.
+    """
+    diff_dict = {}
+    for k in original:
+        if k not in new:
+            continue
+        if isinstance(new[k], list) and isinstance(original[k], list):
+            diff = [new[k][i] - original[k][i] for i in range(len(new[k]))]
+        else:
+            diff = _diff_in_place(original[k], new[k])
+
+        diff_dict[k] = diff
+    if diff_dict == {}:
+        raise RuntimeError("no common keys between original and new dict, parameters difference are empty.")
+    return diff_dict
+
+
 DIFF_FUNCS = {ExchangeFormat.PYTORCH: numerical_params_diff, ExchangeFormat.NUMPY: numerical_params_diff}
+IN_PLACE_DIFF_FUNCS = {
+    ExchangeFormat.PYTORCH: numerical_params_diff_in_place,
+    ExchangeFormat.NUMPY: numerical_params_diff_in_place,
+}
@@ -25,6 +25,7 @@ class CommunicationMetaData(object):
     LOCAL_EXECUTOR = "local_executor"
     RANK_NUMBER = "rank_number"
     SHAREABLE = "shareable"
+    TASK_INPUT_PATH = "task_input_path"
     RELAYER = "relayer"
     RANK_PROCESS_STARTED = "rank_process_started"
     PARENT_PASSWORD = "parent process secret password"
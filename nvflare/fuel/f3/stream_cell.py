@@ -223,11 +223,9 @@ class StreamCell:
 
         .. code-block: python
 
-            objects_stream_cb(future: ObjectStreamFuture, resume: bool, *args, **kwargs) -> int
-                future: It represents the streaming of all objects. An object CB can be registered with the future
-                to receive each object.
-                resume: True if this is a restarted stream
-                This CB returns the index to restart if this is a restarted stream
+            objects_stream_cb(future: ObjectStreamFuture, *args, **kwargs)
+                future: It represents the streaming of all objects. Its result is the number of objects, which is
+                set after all objects are received.
 
             object_cb(obj_sid: str, index: int, message: Message, *args, ** kwargs)
                 obj_sid: Object Stream ID
@@ -240,4 +238,4 @@ class StreamCell:
             object_stream_cb: The callback when an object stream is started
             object_cb: The callback is invoked when each object is received
         """
-        self.object_streamer.register_object_callbacks(channel, topic, object_stream_cb, object_cb, args, kwargs)
+        self.object_streamer.register_object_callbacks(channel, topic, object_stream_cb, object_cb, *args, **kwargs)
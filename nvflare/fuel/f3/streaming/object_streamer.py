@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import logging
+import threading
 from typing import Callable, Optional
 
 from nvflare.fuel.f3.cellnet.defs import MessageHeaderKey
@@ -60,6 +61,8 @@ class ObjectRxTask:
         self.origin = origin
         self.headers = headers
         self.object_future: Optional[ObjectStreamFuture] = None
+        self.num_received = 0
+        self.num_objects = None  # known when the end of the object stream is received
 
     def __str__(self):
         return f"ObjRx[SID:{self.obj_sid}/{self.index} from {self.origin} for {self.channel}/{self.topic}]"
@@ -70,10 +73,44 @@ class ObjectHandler:
         self.object_stream_cb = object_stream_cb
         self.object_cb = object_cb
         self.obj_tasks = obj_tasks
+        self.lock = threading.Lock()
+
+    def _check_done(self, task: ObjectRxTask):
+        with self.lock:
+            if task.num_objects is None or task.num_received < task.num_objects:
+                return
+            if self.obj_tasks.pop(task.obj_sid, None) is None:
+                return
+        task.object_future.set_result(task.num_objects)
+
+    def _remove_task(self, future: ObjectStreamFuture, task: ObjectRxTask):
+        # the receiver may fail the future of a stream itself, e.g. when it's not completed in time
+        with self.lock:
+            if self.obj_tasks.get(task.obj_sid) is task:
+                self.obj_tasks.pop(task.obj_sid)
+
+    def _fail(self, task: ObjectRxTask, error: Exception):
+        with self.lock:
+            if self.obj_tasks.pop(task.obj_sid, None) is None:
+                return
+        log.error(f"{task} failed: {error}")
+        task.object_future.set_exception(error)
+
+    def object_done(self, future: StreamFuture, task: ObjectRxTask, index: int, *args, **kwargs):
+        if task.object_future.done():
+            # the stream already failed, the remaining objects are dropped
+            return
+
+        try:
+            blob = future.result()
+            self.object_cb(task.obj_sid, index, Message(future.get_headers(), blob), *args, **kwargs)
+        except Exception as ex:
+            self._fail(task, ex)
+            return
 
-    def object_done(self, future: StreamFuture, obj_sid: int, index: int, *args, **kwargs):
-        blob = future.result()
-        self.object_cb(obj_sid, index, Message(future.get_headers(), blob), *args, **kwargs)
+        with self.lock:
+            task.num_received += 1
+        self._check_done(task)
 
     def handle_object(self, future: StreamFuture, *args, **kwargs):
         headers = future.get_headers()
@@ -82,20 +119,34 @@ class ObjectHandler:
         if obj_sid is None:
             return
 
-        task = self.obj_tasks.get(obj_sid, None)
-        if not task:
-            # Handle new object stream
-            origin = headers.get(MessageHeaderKey.ORIGIN)
-            channel = headers.get(StreamHeaderKey.CHANNEL)
-            topic = headers.get(StreamHeaderKey.TOPIC)
-            task = ObjectRxTask(obj_sid, channel, topic, origin, headers)
-            task.object_future = ObjectStreamFuture(obj_sid, headers)
-
+        with self.lock:
+            task = self.obj_tasks.get(obj_sid, None)
+            new_stream = task is None
+            if new_stream:
+                origin = headers.get(MessageHeaderKey.ORIGIN)
+                channel = headers.get(StreamHeaderKey.CHANNEL)
+                topic = headers.get(StreamHeaderKey.TOPIC)
+                task = ObjectRxTask(obj_sid, channel, topic, origin, headers)
+                task.object_future = ObjectStreamFuture(obj_sid, headers)
+                self.obj_tasks[obj_sid] = task
+
+        if new_stream:
+            task.object_future.add_done_callback(self._remove_task, task)
             stream_thread_pool.submit(self.object_stream_cb, task.object_future, *args, **kwargs)
 
-        task.object_future.set_index(task.index)
-        task.index += 1
-        future.add_done_callback(self.object_done, future, task.obj_sid, task.index)
+        num_objects = headers.get(StreamHeaderKey.OBJECT_COUNT, None)
+        if num_objects is not None:
+            # the end of the object stream, which has no payload
+            with self.lock:
+                task.num_objects = num_objects
+            self._check_done(task)
+            return
+
+        index = headers.get(StreamHeaderKey.OBJECT_INDEX)
+        with self.lock:
+            task.index = max(task.index, index)
+        task.object_future.set_index(index)
+        future.add_done_callback(self.object_done, task, index, *args, **kwargs)
 
 
 class ObjectStreamer:
@@ -125,23 +176,37 @@ class ObjectStreamer:
         handler = ObjectHandler(object_stream_cb, object_cb, self.obj_tasks)
         self.blob_streamer.register_blob_callback(channel, topic, handler.handle_object, *args, **kwargs)
 
-    def _streaming_task(self, task: ObjectTxTask):
-
-        for obj in task.iterator:
-
-            task.object_future.set_index(task.index)
+    def _send_blob(self, task: ObjectTxTask, headers: dict, blob):
+        message = Message(dict(task.headers), blob)
+        message.add_headers(headers)
+        blob_future = self.blob_streamer.send(
+            task.channel, task.topic, task.target, message, task.secure, task.optional
+        )
+        # Wait till it's done
+        return blob_future.result()
 
-            task.headers.update(
-                {
-                    StreamHeaderKey.OBJECT_STREAM_ID: task.obj_sid,
-                    StreamHeaderKey.OBJECT_INDEX: task.index,
-                }
+    def _streaming_task(self, task: ObjectTxTask):
+        try:
+            for obj in task.iterator:
+                if task.object_future.cancelled():
+                    log.debug(f"Stream {task.obj_sid} is cancelled")
+                    return
+
+                task.object_future.set_index(task.index)
+                bytes_sent = self._send_blob(
+                    task,
+                    {StreamHeaderKey.OBJECT_STREAM_ID: task.obj_sid, StreamHeaderKey.OBJECT_INDEX: task.index},
+                    obj,
+                )
+                log.debug(f"Stream {task.obj_sid} Object {task.index} is sent ({bytes_sent}")
+                task.index += 1
+
+            # tell the receiver that all objects are sent
+            self._send_blob(
+                task, {StreamHeaderKey.OBJECT_STREAM_ID: task.obj_sid, StreamHeaderKey.OBJECT_COUNT: task.index}, None
             )
-            blob_future = self.blob_streamer.send(task.channel, task.topic, task.target, task.headers, obj)
-
-            # Wait till it's done
-            bytes_sent = blob_future.result()
-            log.debug(f"Stream {task.obj_sid} Object {task.index} is sent ({bytes_sent}")
-            task.index += 1
-
-        task.object_future.set_result(task.index)
+            task.object_future.set_result(task.index)
+        except Exception as ex:
+            log.error(f"{task} failed: {ex}")
+            if not task.object_future.done():
+                task.object_future.set_exception(ex)
@@ -49,8 +49,9 @@ class StreamHeaderKey:
     CHANNEL = STREAM_PREFIX + "ch"
     FILE_NAME = STREAM_PREFIX + "fn"
     TOPIC = STREAM_PREFIX + "tp"
-    OBJECT_STREAM_ID = STREAM_PREFIX + "os"
+    OBJECT_STREAM_ID = STREAM_PREFIX + "oid"
     OBJECT_INDEX = STREAM_PREFIX + "oi"
+    OBJECT_COUNT = STREAM_PREFIX + "oc"
     STREAM_REQ_ID = STREAM_PREFIX + "ri"
     PAYLOAD_ENCODING = STREAM_PREFIX + "pe"
     OPTIONAL = STREAM_PREFIX + "op"
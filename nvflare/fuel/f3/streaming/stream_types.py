@@ -164,7 +164,7 @@ class StreamFuture:
         """
 
         with self.lock:
-            if self.error or self.result:
+            if self.error or self.waiter.is_set():
                 return False
 
             self.error = StreamCancelled(f"Stream {self.stream_id} is cancelled")
@@ -189,11 +189,18 @@ class StreamFuture:
     def add_done_callback(self, done_cb: Callable, *args, **kwargs):
         """Attaches a callable that will be called when the future finishes.
 
+        The callable is called with this future, args and kwargs. If the future is already done, it's called
+        immediately.
+
         Args:
             done_cb: A callable that will be called with this future completes
         """
         with self.lock:
-            self.done_callbacks.append((done_cb, args, kwargs))
+            if not self.waiter.is_set():
+                self.done_callbacks.append((done_cb, args, kwargs))
+                return
+
+        self._invoke_callback(done_cb, args, kwargs)
 
     def result(self, timeout=None) -> Any:
         """Return the result of the call that the future represents.
@@ -262,11 +269,18 @@ class StreamFuture:
         self._invoke_callbacks()
 
     def _invoke_callbacks(self):
-        for callback, args, kwargs in self.done_callbacks:
-            try:
-                callback(self, args, kwargs)
-            except Exception as ex:
-                log.error(f"Exception calling callback for {callback}: {ex}")
+        with self.lock:
+            callbacks = self.done_callbacks
+            self.done_callbacks = []
+
+        for callback, args, kwargs in callbacks:
+            self._invoke_callback(callback, args, kwargs)
+
+    def _invoke_callback(self, callback: Callable, args, kwargs):
+        try:
+            callback(self, *args, **kwargs)
+        except Exception as ex:
+            log.error(f"Exception calling callback for {callback}: {ex}")
 
 
 class ObjectStreamFuture(StreamFuture):
@@ -12,10 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import copy
 import queue
 import threading
 import time
-from typing import Tuple, Union
+from typing import Any, Dict, List, Tuple, Union
 
 from nvflare.apis.fl_constant import SystemVarName
 from nvflare.fuel.f3.cellnet.cell import Cell
@@ -24,6 +25,9 @@ from nvflare.fuel.f3.cellnet.defs import MessageHeaderKey, ReturnCode
 from nvflare.fuel.f3.cellnet.net_agent import NetAgent
 from nvflare.fuel.f3.cellnet.utils import make_reply
 from nvflare.fuel.f3.drivers.driver_params import DriverParams
+from nvflare.fuel.f3.message import Message as StreamMessage
+from nvflare.fuel.f3.streaming.stream_types import ObjectIterator, ObjectStreamFuture
+from nvflare.fuel.utils import fobs
 from nvflare.fuel.utils.attributes_exportable import ExportMode
 from nvflare.fuel.utils.config_service import search_file
 from nvflare.fuel.utils.constants import Mode
@@ -40,6 +44,11 @@ _HEADER_MSG_ID = _PREFIX + "msg_id"
 _HEADER_REQ_ID = _PREFIX + "req_id"
 _HEADER_START_TIME = _PREFIX + "start"
 _HEADER_HB_SEQ = _PREFIX + "hb_seq"
+_HEADER_STREAM_ID = _PREFIX + "stream_id"
+
+_OBJECTS_CHANNEL_SUFFIX = ".objects"
+_MIN_STREAMED_OBJECT_SIZE = 1024 * 1024
+_STREAM_COMPLETION_WAIT = 60.0
 
 
 def _cell_fqcn(mode, site_name, token):
@@ -70,6 +79,97 @@ def _from_cell_message(cm: CellMessage) -> Message:
     )
 
 
+class StreamedObjectRef:
+    def __init__(self, index: int):
+        """Placeholder for a large value of a message that is streamed as a separate object.
+
+        Args:
+            index: index of the object in the object stream.
+        """
+        self.index = index
+
+
+class StreamedObjectRefDecomposer(fobs.Decomposer):
+    def supported_type(self):
+        return StreamedObjectRef
+
+    def decompose(self, target: StreamedObjectRef, manager=None) -> Any:
+        return target.index
+
+    def recompose(self, data: Any, manager=None) -> StreamedObjectRef:
+        return StreamedObjectRef(data)
+
+
+def _is_large(value: Any) -> bool:
+    # numpy arrays and torch tensors have nbytes
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        size = len(value)
+    elif type(value).__module__.startswith(("numpy", "torch")):
+        size = getattr(value, "nbytes", 0)
+    else:
+        return False
+    return isinstance(size, int) and size >= _MIN_STREAMED_OBJECT_SIZE
+
+
+def _extract_large_values(obj: Any, values: List) -> Any:
+    # returns obj with its large values replaced by StreamedObjectRef, without changing obj
+    if isinstance(obj, dict):
+        result = None
+        for k, v in obj.items():
+            new_v = _extract_large_values(v, values)
+            if new_v is not v:
+                if result is None:
+                    result = copy.copy(obj)
+                result[k] = new_v
+        return obj if result is None else result
+    if type(obj) in (list, tuple):
+        items = [_extract_large_values(v, values) for v in obj]
+        if all(new_v is v for new_v, v in zip(items, obj)):
+            return obj
+        return items if isinstance(obj, list) else tuple(items)
+    if _is_large(obj):
+        values.append(obj)
+        # object 0 of the stream is the message body
+        return StreamedObjectRef(len(values))
+    return obj
+
+
+def _restore_large_values(obj: Any, values: Dict[int, Any]) -> Any:
+    if isinstance(obj, StreamedObjectRef):
+        return values.pop(obj.index)
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            obj[k] = _restore_large_values(v, values)
+        return obj
+    if type(obj) in (list, tuple):
+        return type(obj)(_restore_large_values(v, values) for v in obj)
+    return obj
+
+
+class _MessageObjects(ObjectIterator):
+    def __init__(self, body: Any, values: List):
+        """Serializes the body and the large values of a message one at a time, as they are streamed."""
+        super().__init__()
+        self.objects = [body] + values
+
+    def __next__(self):
+        if self.index >= len(self.objects):
+            raise StopIteration
+        obj = self.objects[self.index]
+        self.index += 1
+        return fobs.dumps(obj, buffer_list=True)
+
+
+class _ReceivedStream:
+    def __init__(self):
+        self.future = None
+        self.objects = {}  # index => object
+        self.data = None
+        self.error = None
+        self.done = threading.Event()
+        self.last_active_time = time.time()
+
+
 class _CellInfo:
     """
     A cell could be used by multiple pipes (e.g. one pipe for task interaction, another for metrics logging).
@@ -164,6 +264,7 @@ class CellPipe(Pipe):
         root_url: str = "",
         secure_mode: bool = True,
         workspace_dir: str = "",
+        streaming: bool = False,
     ):
         """The constructor of the CellPipe.
 
@@ -174,9 +275,13 @@ class CellPipe(Pipe):
             root_url (str): the root url of the cellnet that the pipe's cell will join
             secure_mode (bool): whether connection to the root is secure (TLS)
             workspace_dir (str): the directory that contains startup for joining the cellnet. Required only in secure_mode
+            streaming (bool): whether to stream the large values (e.g. model layers) of sent messages one at a time.
+                Each value is serialized and sent as a separate object, so that the sender and the receiver never
+                hold the whole serialized message. Messages can be received in both modes.
         """
         super().__init__(mode)
         self.logger = get_obj_logger(self)
+        self.streaming = streaming
 
         self.site_name = site_name
         self.token = token
@@ -195,6 +300,7 @@ class CellPipe(Pipe):
         check_str("token", token)
         check_str("site_name", site_name)
         check_str("workspace_dir", workspace_dir)
+        check_object_type("streaming", streaming, bool)
 
         mode = f"{mode}".strip().lower()  # convert to lower case string
         self.ci = self._build_cell(mode, root_url, site_name, token, secure_mode, workspace_dir)
@@ -215,6 +321,9 @@ class CellPipe(Pipe):
         self.closed = False
         self.last_peer_active_time = 0.0
         self.hb_seq = 1
+        self.received_streams = {}  # object stream ID => _ReceivedStream
+        self.streams_lock = threading.Lock()
+        fobs.register(StreamedObjectRefDecomposer)
 
     def _update_peer_active_time(self, msg: CellMessage, ch_name: str, msg_type: str):
         origin = msg.get_header(MessageHeaderKey.ORIGIN)
@@ -230,6 +339,12 @@ class CellPipe(Pipe):
         # as long as different pipes use different cell message channels
         self.channel = f"{_PREFIX}{channel_name}"
         self.cell.register_request_cb(channel=self.channel, topic="*", cb=self._receive_message)
+        self.cell.register_objects_cb(
+            channel=self.channel + _OBJECTS_CHANNEL_SUFFIX,
+            topic="*",
+            object_stream_cb=self._receive_objects,
+            object_cb=self._receive_object,
+        )
         self.cell.core_cell.add_incoming_request_filter(
             channel="*", topic="*", cb=self._update_peer_active_time, ch_name=channel_name, msg_type="req"
         )
@@ -277,11 +392,19 @@ class CellPipe(Pipe):
             )
             return True
 
+        request = None
+        if self.streaming and not optional:
+            request = self._stream_message(msg, timeout)
+        if request is None:
+            request = _to_cell_message(msg)
+        elif request is False:
+            return False
+
         reply = self.cell.send_request(
             channel=self.channel,
             topic=msg.topic,
             target=self.peer_fqcn,
-            request=_to_cell_message(msg),
+            request=request,
             timeout=timeout,
             optional=optional,
         )
@@ -299,6 +422,106 @@ class CellPipe(Pipe):
         else:
             return False
 
+    def _stream_message(self, msg: Message, timeout=None) -> Union[None, bool, CellMessage]:
+        """Streams the body and the large values of the message as objects.
+
+        Returns:
+            None if the message has no large values, False if the streaming failed. Otherwise, the request that
+            tells the peer to deliver the streamed message.
+        """
+        values = []
+        body = _extract_large_values(msg.data, values)
+        if not values:
+            return None
+
+        future = self.cell.send_objects(
+            channel=self.channel + _OBJECTS_CHANNEL_SUFFIX,
+            topic=msg.topic,
+            target=self.peer_fqcn,
+            message=StreamMessage({}, _MessageObjects(body, values)),
+        )
+        # like requests of stream channels, time out only if no object is sent within the timeout
+        last_index = -1
+        while True:
+            try:
+                future.result(timeout)
+                break
+            except TimeoutError:
+                index = future.get_index()
+                if index != last_index:
+                    last_index = index
+                    continue
+                future.cancel()
+                self.logger.error(f"timeout streaming '{msg.topic}' to '{self.peer_fqcn}' in channel '{self.channel}'")
+                return False
+            except Exception as ex:
+                self.logger.error(
+                    f"failed to stream '{msg.topic}' to '{self.peer_fqcn}' in channel '{self.channel}': {ex}"
+                )
+                return False
+
+        request = _to_cell_message(Message(msg.msg_type, msg.topic, None, msg.msg_id, msg.req_id))
+        request.set_header(_HEADER_STREAM_ID, future.get_stream_id())
+        return request
+
+    def _get_received_stream(self, stream_id) -> _ReceivedStream:
+        with self.streams_lock:
+            stream = self.received_streams.get(stream_id)
+            if not stream:
+                stream = _ReceivedStream()
+                self.received_streams[stream_id] = stream
+            return stream
+
+    def _expire_streams(self):
+        """Drops the streams that stopped receiving objects (e.g. cancelled by the sender), and the received
+        streams whose final request did not arrive within _STREAM_COMPLETION_WAIT.
+        """
+        now = time.time()
+        with self.streams_lock:
+            expired = [
+                (stream_id, stream)
+                for stream_id, stream in self.received_streams.items()
+                if stream.future and now - stream.last_active_time > _STREAM_COMPLETION_WAIT
+            ]
+            for stream_id, stream in expired:
+                if stream.done.is_set():
+                    self.received_streams.pop(stream_id, None)
+
+        for stream_id, stream in expired:
+            if not stream.done.is_set():
+                self.logger.warning(f"stream {stream_id} from peer {self.peer_fqcn} not completed in time")
+                # this also removes the stream from the object streamer, and from the received streams
+                stream.future.set_exception(TimeoutError(f"no object received in {_STREAM_COMPLETION_WAIT} secs"))
+
+    def _receive_objects(self, future: ObjectStreamFuture):
+        self._expire_streams()
+        self._get_received_stream(future.get_stream_id()).future = future
+        future.add_done_callback(self._objects_received)
+
+    def _receive_object(self, stream_id, index: int, message: StreamMessage):
+        # deserialize each object as it arrives, so that only one serialized object is held at a time
+        stream = self._get_received_stream(stream_id)
+        stream.objects[index] = fobs.loads(message.payload)
+        stream.last_active_time = time.time()
+
+    def _objects_received(self, future: ObjectStreamFuture):
+        stream_id = future.get_stream_id()
+        stream = self._get_received_stream(stream_id)
+        try:
+            stream.error = future.exception(timeout=0)
+            if not stream.error:
+                objects = stream.objects
+                stream.data = _restore_large_values(objects.pop(0), objects)
+        except Exception as ex:
+            stream.error = ex
+        stream.objects = None
+        stream.last_active_time = time.time()
+        stream.done.set()
+        if stream.error:
+            # the sender does not send the final request of a failed stream
+            with self.streams_lock:
+                self.received_streams.pop(stream_id, None)
+
     def _receive_message(self, request: CellMessage) -> Union[None, CellMessage]:
         sender = request.get_header(MessageHeaderKey.ORIGIN)
         topic = request.get_header(MessageHeaderKey.TOPIC)
@@ -307,6 +530,20 @@ class CellPipe(Pipe):
         if self.peer_fqcn != sender:
             raise RuntimeError(f"peer FQCN mismatch: expect {self.peer_fqcn} but got {sender}")
         msg = _from_cell_message(request)
+
+        self._expire_streams()
+        stream_id = request.get_header(_HEADER_STREAM_ID)
+        if stream_id is not None:
+            # the message was streamed: its objects are sent before this request, but may still be processed
+            stream = self._get_received_stream(stream_id)
+            done = stream.done.wait(_STREAM_COMPLETION_WAIT)
+            with self.streams_lock:
+                self.received_streams.pop(stream_id, None)
+            if not done or stream.error:
+                self.logger.error(f"failed to receive streamed '{topic}' from peer {sender}: {stream.error}")
+                return make_reply(ReturnCode.COMM_ERROR)
+            msg.data = stream.data
+
         self.received_msgs.put_nowait(msg)
         return make_reply(ReturnCode.OK)
 
@@ -322,10 +559,15 @@ class CellPipe(Pipe):
     def clear(self):
         while not self.received_msgs.empty():
             self.received_msgs.get_nowait()
+        with self.streams_lock:
+            self.received_streams.clear()
 
     def can_resend(self) -> bool:
         return True
 
+    def can_block_on_receive(self) -> bool:
+        return True
+
     def open(self, name: str):
         with self.pipe_lock:
             if self.closed:
@@ -356,4 +598,6 @@ class CellPipe(Pipe):
             "secure_mode": self.cell.core_cell.secure,
             "workspace_dir": self.workspace_dir,
         }
+        if self.streaming:
+            export_args["streaming"] = True
         return f"{self.__module__}.{self.__class__.__name__}", export_args
@@ -0,0 +1,172 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import threading
+import time
+
+# inotify constants from <sys/inotify.h>
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_libc = None
+_libc_lock = threading.Lock()
+
+
+def _get_libc():
+    global _libc
+    with _libc_lock:
+        if _libc is None:
+            _libc = False
+            if sys.platform.startswith("linux"):
+                try:
+                    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+                    if hasattr(libc, "inotify_init1") and hasattr(libc, "inotify_add_watch"):
+                        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+                        _libc = libc
+                except OSError:
+                    pass
+        return _libc
+
+
+def inotify_available() -> bool:
+    """Whether directory changes can be watched with inotify (Linux)."""
+    return bool(_get_libc())
+
+
+class DirWatcher(object):
+    def __init__(self, path: str, poll_interval: float, max_wait: float = 1.0, use_inotify: bool = True):
+        """Waits for files to be created, removed or renamed in a directory.
+
+        On Linux, the changes are watched with inotify, so that `wait` returns as soon as the directory changes.
+        Elsewhere, or if inotify cannot be used (e.g. the watch limit is reached), `wait` sleeps poll_interval.
+
+        Changes made after the watcher is created are never missed, so the watcher must be created before the
+        directory is checked. Changes made by other hosts on network file systems are not seen by inotify, so
+        `wait` returns at least every max_wait seconds.
+
+        A watcher can be shared by threads: one waiting thread polls inotify at a time, and every change wakes up
+        all waiting threads. A thread that checks the directory before waiting gets the version of the watcher
+        first, and passes it to `wait`, so that a change seen by another thread in between is not missed.
+
+        Args:
+            path: the directory to watch.
+            poll_interval: how long to sleep when inotify is not used.
+            max_wait: max time to wait for a change with inotify.
+            use_inotify: whether to use inotify if available.
+        """
+        self.poll_interval = poll_interval
+        self.max_wait = max(max_wait, poll_interval)
+        self.fd = -1
+        self._poller = None
+        self._cond = threading.Condition()
+        self._version = 0  # number of changes seen
+        self._polling = False
+        self._closed = False
+
+        libc = _get_libc() if use_inotify else None
+        if not libc:
+            return
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return
+        if libc.inotify_add_watch(fd, os.fsencode(path), _WATCH_MASK) < 0:
+            os.close(fd)
+            return
+        self.fd = fd
+        self._poller = select.poll()
+        self._poller.register(fd, select.POLLIN)
+
+    def is_event_driven(self) -> bool:
+        return self.fd >= 0
+
+    def get_version(self) -> int:
+        """Gets the number of changes seen so far, to be passed to `wait` after checking the directory."""
+        return self._version
+
+    def wait(self, timeout=None, version=None):
+        """Waits until the directory may have changed.
+
+        Args:
+            timeout: max number of secs to wait. None means max_wait.
+            version: the version got before the directory was checked. Returns right away if a change was seen
+                since. None means the current version.
+        """
+        if self.fd < 0:
+            time.sleep(self.poll_interval if timeout is None else max(min(timeout, self.poll_interval), 0))
+            return
+
+        wait_time = self.max_wait if timeout is None else min(timeout, self.max_wait)
+        end_time = time.time() + wait_time
+        with self._cond:
+            if version is None:
+                version = self._version
+            while True:
+                remaining = end_time - time.time()
+                if self._closed or self._version != version or remaining <= 0:
+                    return
+                if not self._polling:
+                    self._polling = True
+                    break
+                # another thread is polling, and wakes up all waiting threads when it's done
+                self._cond.wait(remaining)
+
+        changed = False
+        try:
+            if self._poller.poll(remaining * 1000.0):
+                changed = True
+                # drain the pending events: any change makes the callers check the directory again
+                try:
+                    while os.read(self.fd, 4096):
+                        pass
+                except BlockingIOError:
+                    pass
+        finally:
+            with self._cond:
+                self._polling = False
+                if changed:
+                    self._version += 1
+                if self._closed:
+                    self._close_fd()
+                self._cond.notify_all()
+
+    def _close_fd(self):
+        fd = self.fd
+        self.fd = -1
+        if fd >= 0:
+            os.close(fd)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            # the fd of a watcher being polled is closed by the polling thread, so that it's not reused meanwhile
+            if not self._polling:
+                self._close_fd()
+            self._cond.notify_all()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
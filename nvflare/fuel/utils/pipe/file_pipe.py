@@ -19,6 +19,7 @@ from typing import Tuple
 
 from nvflare.fuel.utils.attributes_exportable import ExportMode
 from nvflare.fuel.utils.constants import Mode
+from nvflare.fuel.utils.pipe.dir_watcher import DirWatcher, inotify_available
 from nvflare.fuel.utils.pipe.file_accessor import FileAccessor
 from nvflare.fuel.utils.pipe.file_name_utils import file_name_to_message, message_to_file_name
 from nvflare.fuel.utils.pipe.fobs_file_accessor import FobsFileAccessor
@@ -27,15 +28,21 @@ from nvflare.fuel.utils.validation_utils import check_object_type, check_positiv
 
 
 class FilePipe(Pipe):
-    def __init__(self, mode: Mode, root_path: str, file_check_interval=0.1):
+    def __init__(self, mode: Mode, root_path: str, file_check_interval=0.1, use_inotify: bool = True):
         """Implementation of communication through the file system.
 
+        Message files are written to a temporary folder and renamed into the folder of the reader, so that the reader
+        never sees a partial file.
+
         Args:
             mode (Mode): Mode of the endpoint. A pipe has two endpoints.
                 An endpoint can be either the one that initiates communication or the one listening.
             root_path (str): root path for this file pipe, folders and files will be created under this root_path
                 for communication.
             file_check_interval (float): how often should to check the file exists.
+                Not used when waiting with inotify.
+            use_inotify (bool): whether to wait for files with inotify instead of checking every
+                file_check_interval, on Linux. Defaults to True.
         """
         super().__init__(mode=mode)
         check_positive_number("file_check_interval", file_check_interval)
@@ -52,10 +59,12 @@ class FilePipe(Pipe):
 
         self.root_path = root_path
         self.file_check_interval = file_check_interval
+        self.use_inotify = use_inotify
         self.pipe_path = None
         self.x_path = None
         self.y_path = None
         self.t_path = None
+        self._watchers = {}  # dir path => DirWatcher, created when the pipe is opened
 
         if self.mode == Mode.ACTIVE:
             self.get_f = self.x_get
@@ -105,6 +114,12 @@ class FilePipe(Pipe):
         if not os.path.exists(t_path):
             self._make_dir(t_path)
 
+        # one watcher per directory for the life of the pipe, as each takes an inotify instance
+        self._close_watchers()
+        self._watchers = {
+            path: DirWatcher(path, self.file_check_interval, use_inotify=self.use_inotify) for path in (x_path, y_path)
+        }
+
         self.pipe_path = pipe_path
         self.x_path = x_path
         self.y_path = y_path
@@ -139,6 +154,18 @@ class FilePipe(Pipe):
         self._clear_dir(self.y_path)
         self._clear_dir(self.t_path)
 
+    def _get_watcher(self, path: str) -> DirWatcher:
+        watcher = self._watchers.get(path)
+        if not watcher:
+            raise BrokenPipeError("pipe broken")
+        return watcher
+
+    def _close_watchers(self):
+        watchers = self._watchers
+        self._watchers = {}
+        for watcher in watchers.values():
+            watcher.close()
+
     def _monitor_file(self, file_path: str, timeout=None) -> bool:
         """Monitors the file until it's read-and-removed by peer, or timed out.
 
@@ -150,10 +177,12 @@ class FilePipe(Pipe):
             whether the file has been read and removed
         """
         start = time.time()
+        watcher = self._get_watcher(os.path.dirname(file_path))
         while True:
             if not self.pipe_path:
                 raise BrokenPipeError("pipe broken")
 
+            version = watcher.get_version()
             if not os.path.exists(file_path):
                 return True
             if timeout and time.time() - start > timeout:
@@ -164,7 +193,7 @@ class FilePipe(Pipe):
                     # the file is read by the peer!
                     return True
                 return False
-            time.sleep(self.file_check_interval)
+            watcher.wait(timeout - (time.time() - start) if timeout else None, version)
 
     def x_put(self, msg: Message, timeout) -> bool:
         """
@@ -222,16 +251,17 @@ class FilePipe(Pipe):
             return self._get_next(from_dir)
 
         start = time.time()
+        watcher = self._get_watcher(from_dir)
         while True:
+            version = watcher.get_version()
             msg = self._get_next(from_dir)
             if msg:
                 return msg
 
-            if time.time() - start >= timeout:
-                break
-            time.sleep(self.file_check_interval)
-
-        return None
+            remaining = timeout - (time.time() - start)
+            if remaining <= 0:
+                return None
+            watcher.wait(remaining, version)
 
     def x_get(self, timeout=None):
         # read from X's queue
@@ -274,6 +304,7 @@ class FilePipe(Pipe):
     def close(self):
         pipe_path = self.pipe_path
         self.pipe_path = None
+        self._close_watchers()
         if self.mode == Mode.PASSIVE:
             if pipe_path and os.path.exists(pipe_path):
                 shutil.rmtree(pipe_path, ignore_errors=True)
@@ -283,11 +314,19 @@ class FilePipe(Pipe):
     def can_resend(self) -> bool:
         return False
 
+    def can_block_on_receive(self) -> bool:
+        return self.use_inotify and inotify_available()
+
     def export(self, export_mode: str) -> Tuple[str, dict]:
         if export_mode == ExportMode.SELF:
             mode = self.mode
         else:
             mode = Mode.ACTIVE if self.mode == Mode.PASSIVE else Mode.PASSIVE
 
-        export_args = {"mode": mode, "root_path": self.root_path}
+        export_args = {
+            "mode": mode,
+            "root_path": self.root_path,
+            "file_check_interval": self.file_check_interval,
+            "use_inotify": self.use_inotify,
+        }
         return f"{self.__module__}.{self.__class__.__name__}", export_args
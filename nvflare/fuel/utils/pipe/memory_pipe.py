@@ -62,9 +62,12 @@ class MemoryPipe(Pipe):
 
     def receive(self, timeout=None) -> Union[Message, None]:
         try:
-            return self.get_queue.get(block=False, timeout=timeout)
+            return self.get_queue.get(block=bool(timeout), timeout=timeout or None)
         except Empty:
             return None
 
     def can_resend(self) -> bool:
         return False
+
+    def can_block_on_receive(self) -> bool:
+        return True
@@ -176,6 +176,13 @@ class Pipe(AttributesExportable, ABC):
         """Whether the pipe is able to resend a message."""
         pass
 
+    def can_block_on_receive(self) -> bool:
+        """Whether `receive` with a timeout waits for a message without polling.
+
+        If True, a message is returned as soon as it arrives, so the reader does not need to sleep between receives.
+        """
+        return False
+
     def get_last_peer_active_time(self):
         """Get the last time that the peer is known to be active
 
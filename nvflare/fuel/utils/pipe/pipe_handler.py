@@ -12,9 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import heapq
 import threading
 import time
 from collections import deque
+from queue import Queue
 from typing import Optional
 
 from nvflare.apis.signal import Signal
@@ -28,6 +30,71 @@ from nvflare.fuel.utils.validation_utils import (
 )
 from nvflare.security.logging import secure_format_exception
 
+# max time to block in a receive, so that the heartbeat timeout is checked and a stop is seen
+_MAX_BLOCKING_READ_TIME = 1.0
+
+
+class _HeartbeatTimer(object):
+    """Sends the heartbeats of all pipe handlers of the process from one timer thread.
+
+    Handlers are kept in a heap ordered by the time of their next heartbeat. The timer thread sleeps until the
+    earliest one is due, and the heartbeat is sent by worker threads, as a send may block until the peer reads it.
+    The next heartbeat of a handler is scheduled once its previous one has been sent, so a handler occupies at most
+    one worker. When all workers are blocked (e.g. by stalled peers), another worker is started for the due handler,
+    so that heartbeats to healthy peers are never held up; workers beyond num_workers exit once their send is done.
+    """
+
+    def __init__(self, num_workers: int = 4):
+        self._heap = []
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._started = False
+        self._num_workers = num_workers
+        self._num_alive_workers = 0
+        self._num_idle_workers = 0  # workers waiting for a due handler that is not yet assigned to any of them
+        self._due_handlers = Queue()
+
+    def schedule(self, handler, due_time: float):
+        with self._cond:
+            if not self._started:
+                self._started = True
+                threading.Thread(target=self._run, name="pipe_heartbeat_timer", daemon=True).start()
+            self._seq += 1
+            heapq.heappush(self._heap, (due_time, self._seq, handler))
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.time():
+                    self._cond.wait(self._heap[0][0] - time.time() if self._heap else None)
+                _, _, handler = heapq.heappop(self._heap)
+            if not handler.asked_to_stop:
+                self._dispatch(handler)
+
+    def _dispatch(self, handler):
+        with self._cond:
+            if self._num_idle_workers:
+                self._num_idle_workers -= 1
+            else:
+                self._num_alive_workers += 1
+                threading.Thread(
+                    target=self._work, name=f"pipe_heartbeat_{self._num_alive_workers}", daemon=True
+                ).start()
+        self._due_handlers.put(handler)
+
+    def _work(self):
+        while True:
+            self._due_handlers.get()._send_heartbeat()
+            with self._cond:
+                if self._num_alive_workers > self._num_workers:
+                    self._num_alive_workers -= 1
+                    return
+                self._num_idle_workers += 1
+
+
+_heartbeat_timer = _HeartbeatTimer()
+
 
 class PipeHandler(object):
     """Monitors a pipe for messages from the peer.
@@ -69,6 +136,7 @@ class PipeHandler(object):
         resend_interval=2.0,
         max_resends=5,
         default_request_timeout=5.0,
+        blocking_receive=True,
     ):
         """Constructor of the PipeHandler.
 
@@ -82,6 +150,8 @@ class PipeHandler(object):
                 Note that if the pipe does not support resending, then no resend.
             max_resends (int, optional): max number of resends. None means no limit.
             default_request_timeout (float): default timeout for request if timeout not specified.
+            blocking_receive (bool): if the pipe supports blocking receives, wait in the pipe for messages instead of
+                reading it every read_interval. Defaults to True.
         """
         check_positive_number("read_interval", read_interval)
         check_positive_number("heartbeat_interval", heartbeat_interval)
@@ -99,11 +169,13 @@ class PipeHandler(object):
         self.default_request_timeout = default_request_timeout
         self.resend_interval = resend_interval
         self.max_resends = max_resends
+        self.blocking_receive = blocking_receive
         self.messages = deque([])
         self.reader = threading.Thread(target=self._read)
         self.reader.daemon = True
         self.asked_to_stop = False
         self.lock = threading.Lock()
+        self._message_added = threading.Condition(self.lock)
         self.status_cb = None
         self.cb_args = None
         self.cb_kwargs = None
@@ -112,10 +184,10 @@ class PipeHandler(object):
         self.msg_cb_kwargs = None
         self.peer_is_up_or_dead = threading.Event()
         self._pause = False
+        self._resumed = threading.Event()
+        self._resumed.set()
         self._last_heartbeat_received_time = None
-        self._check_interval = 0.01
-        self.heartbeat_sender = threading.Thread(target=self._heartbeat)
-        self.heartbeat_sender.daemon = True
+        self._heartbeat_started = False
 
     def set_status_cb(self, cb, *args, **kwargs):
         """Sets a callback function for status handling.
@@ -229,8 +301,9 @@ class PipeHandler(object):
         if self.reader and not self.reader.is_alive():
             self.reader.start()
 
-        if self.heartbeat_sender and not self.heartbeat_sender.is_alive():
-            self.heartbeat_sender.start()
+        if not self._heartbeat_started:
+            self._heartbeat_started = True
+            _heartbeat_timer.schedule(self, time.time())
 
     def stop(self, close_pipe=True):
         """Stops the handler and optionally close the monitored pipe.
@@ -240,6 +313,9 @@ class PipeHandler(object):
         """
         self.asked_to_stop = True
         self.peer_is_up_or_dead.clear()
+        self._resumed.set()
+        with self._message_added:
+            self._message_added.notify_all()
         pipe = self.pipe
         self.pipe = None
         if pipe and close_pipe:
@@ -299,8 +375,9 @@ class PipeHandler(object):
                 self.msg_cb(msg, *self.msg_cb_args, **self.msg_cb_kwargs)
                 return
 
-        with self.lock:
+        with self._message_added:
             self.messages.append(msg)
+            self._message_added.notify()
 
     def _read(self):
         try:
@@ -312,19 +389,30 @@ class PipeHandler(object):
     def _try_read(self):
         self._last_heartbeat_received_time = time.time()
         while not self.asked_to_stop:
-            time.sleep(self.read_interval)
-            if self._pause:
-                continue
-
             # we assign self.pipe to p and access pipe methods through p
             # this is because self.pipe could be set to None at any moment (e.g. the abort process could
             # stop the pipe handler at any time).
             p = self.pipe
+            blocking = self.blocking_receive and p is not None and p.can_block_on_receive()
+            if not blocking:
+                time.sleep(self.read_interval)
+            elif self._pause:
+                self._resumed.wait(_MAX_BLOCKING_READ_TIME)
+            if self._pause:
+                continue
+
             if not p:
                 # the pipe handler is most likely stopped, but we leave it for the while loop to decide
                 continue
 
-            msg = p.receive()
+            if blocking:
+                # wake up at least every read_interval if the heartbeat timeout must be checked that often
+                read_time = _MAX_BLOCKING_READ_TIME
+                if self.heartbeat_timeout:
+                    read_time = min(read_time, max(self.read_interval, self.heartbeat_timeout / 10))
+                msg = p.receive(timeout=read_time)
+            else:
+                msg = p.receive()
             now = time.time()
 
             if msg:
@@ -357,25 +445,25 @@ class PipeHandler(object):
 
         self.reader = None
 
-    def _heartbeat(self):
-        last_heartbeat_sent_time = 0.0
-        while not self.asked_to_stop:
-            if self._pause:
-                time.sleep(self._check_interval)
-                continue
-            now = time.time()
-
-            # send heartbeat to the peer
-            if now - last_heartbeat_sent_time > self.heartbeat_interval:
+    def _send_heartbeat(self):
+        # called by the heartbeat timer
+        if self.asked_to_stop:
+            return
+        start = time.time()
+        if not self._pause:
+            try:
                 self.send_to_peer(self._make_event_message(Topic.HEARTBEAT, ""))
-                last_heartbeat_sent_time = now
+            except Exception as e:
+                self.logger.debug(f"exception sending heartbeat: {secure_format_exception(e)}")
+        if not self.asked_to_stop:
+            _heartbeat_timer.schedule(self, start + self.heartbeat_interval)
 
-            time.sleep(self._check_interval)
-        self.heartbeat_sender = None
-
-    def get_next(self) -> Optional[Message]:
+    def get_next(self, timeout: Optional[float] = None) -> Optional[Message]:
         """Gets the next message from the message queue.
 
+        Args:
+            timeout: if specified, number of secs to wait for a message if the queue is empty.
+
         Returns:
             A Message at the top of the message queue.
             If the queue is empty, returns None.
@@ -383,8 +471,10 @@ class PipeHandler(object):
         if self.asked_to_stop:
             return None
 
-        with self.lock:
-            if self.messages:
+        with self._message_added:
+            if not self.messages and timeout:
+                self._message_added.wait_for(lambda: self.messages or self.asked_to_stop, timeout)
+            if self.messages and not self.asked_to_stop:
                 return self.messages.popleft()
             else:
                 return None
@@ -392,9 +482,11 @@ class PipeHandler(object):
     def pause(self):
         """Stops heartbeat checking and sending."""
         self._pause = True
+        self._resumed.clear()
 
     def resume(self):
         """Resumes heartbeat checking and sending."""
         if self._pause:
             self._pause = False
             self._last_heartbeat_received_time = time.time()
+            self._resumed.set()
@@ -0,0 +1,287 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import glob
+import hashlib
+import mmap
+import os
+from typing import Any, List, Tuple
+
+import numpy as np
+
+from nvflare.fuel.utils import fobs
+from nvflare.fuel.utils.attributes_exportable import ExportMode
+from nvflare.fuel.utils.constants import Mode
+from nvflare.fuel.utils.fobs.datum import DatumManager
+from nvflare.fuel.utils.import_utils import optional_import
+from nvflare.fuel.utils.pipe.file_accessor import FileAccessor
+from nvflare.fuel.utils.pipe.file_pipe import FilePipe
+from nvflare.fuel.utils.validation_utils import check_non_negative_int, check_str
+
+SHM_DIR = "/dev/shm"
+_ALIGNMENT = 64
+
+
+class SharedArrayRef:
+    def __init__(self, offset: int, dtype: str, shape: Tuple, is_tensor: bool = False):
+        """Placeholder for an array stored in the shared memory segment of a message.
+
+        Args:
+            offset: offset of the array in the segment.
+            dtype: numpy dtype string of the array.
+            shape: shape of the array.
+            is_tensor: whether the array is to be restored as a torch tensor.
+        """
+        self.offset = offset
+        self.dtype = dtype
+        self.shape = shape
+        self.is_tensor = is_tensor
+
+
+class SharedArrayRefDecomposer(fobs.Decomposer):
+    def supported_type(self):
+        return SharedArrayRef
+
+    def decompose(self, target: SharedArrayRef, manager: DatumManager = None) -> Any:
+        return [target.offset, target.dtype, list(target.shape), target.is_tensor]
+
+    def recompose(self, data: Any, manager: DatumManager = None) -> SharedArrayRef:
+        offset, dtype, shape, is_tensor = data
+        return SharedArrayRef(offset, dtype, tuple(shape), is_tensor)
+
+
+def _as_cpu_array(value: Any):
+    """Gets a numpy view of a numpy array or a CPU torch tensor, without importing torch."""
+    if isinstance(value, np.ndarray):
+        return value if value.dtype.kind not in "OV" else None
+    value_type = type(value)
+    if value_type.__module__.startswith("torch") and value_type.__name__ in ("Tensor", "Parameter"):
+        if value.device.type != "cpu":
+            return None
+        try:
+            return value.detach().numpy()
+        except (TypeError, RuntimeError):
+            # e.g. bfloat16 has no numpy dtype
+            return None
+    return None
+
+
+class SharedMemoryFileAccessor(FileAccessor):
+    def __init__(
+        self,
+        segment_dir: str,
+        segment_prefix: str = "nvflare_",
+        min_shared_size: int = 4096,
+        multiple_readers: bool = False,
+    ):
+        """File accessor that puts large arrays into a shared memory segment instead of the file.
+
+        Numpy arrays and CPU torch tensors of at least min_shared_size bytes found in dicts, lists and tuples
+        (e.g. the DXO of a Shareable) are copied once into a memory mapped segment in segment_dir, and replaced by
+        placeholders in the FOBS serialized file. The reader maps the segment, removes it, and gets arrays that are
+        views into the mapped memory without any copy. The memory is released when the arrays are released.
+
+        Args:
+            segment_dir: directory of the segments. Use a memory backed file system (e.g. /dev/shm).
+            segment_prefix: prefix of the segment file names.
+            min_shared_size: smaller arrays are serialized into the file.
+            multiple_readers: whether the file is read by several readers. The segment is then kept after being
+                read, and mapped copy-on-write, so that the changes made by a reader are not seen by the others.
+                The writer removes the file and the segment when they are no longer needed.
+        """
+        check_str("segment_dir", segment_dir)
+        check_str("segment_prefix", segment_prefix)
+        check_non_negative_int("min_shared_size", min_shared_size)
+        self.segment_dir = segment_dir
+        self.segment_prefix = segment_prefix
+        self.min_shared_size = min_shared_size
+        self.multiple_readers = multiple_readers
+        fobs.register(SharedArrayRefDecomposer)
+
+    def get_segment_path(self, file_path: str) -> str:
+        return os.path.join(self.segment_dir, self.segment_prefix + os.path.basename(file_path))
+
+    def remove_segment(self, file_path: str):
+        try:
+            os.remove(self.get_segment_path(file_path))
+        except FileNotFoundError:
+            pass
+
+    def _extract(self, obj: Any, arrays: List, offset: List[int]) -> Any:
+        # returns obj with its large arrays replaced by SharedArrayRef, without changing obj
+        if isinstance(obj, dict):
+            result = None
+            for k, v in obj.items():
+                new_v = self._extract(v, arrays, offset)
+                if new_v is not v:
+                    if result is None:
+                        result = copy.copy(obj)
+                    result[k] = new_v
+            return obj if result is None else result
+        if type(obj) in (list, tuple):
+            items = [self._extract(v, arrays, offset) for v in obj]
+            if all(new_v is v for new_v, v in zip(items, obj)):
+                return obj
+            return items if isinstance(obj, list) else tuple(items)
+
+        array = _as_cpu_array(obj)
+        if array is None or array.nbytes < max(self.min_shared_size, 1):
+            return obj
+        start = offset[0]
+        offset[0] = start + (array.nbytes + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+        arrays.append((start, array))
+        return SharedArrayRef(start, array.dtype.str, array.shape, is_tensor=not isinstance(obj, np.ndarray))
+
+    def write(self, data: Any, file_path: str) -> None:
+        arrays = []
+        offset = [0]
+        body = self._extract(data, arrays, offset)
+        if arrays:
+            segment_path = self.get_segment_path(file_path)
+            with open(segment_path, "w+b") as f:
+                f.truncate(offset[0])
+                with mmap.mmap(f.fileno(), offset[0]) as mm:
+                    for start, array in arrays:
+                        dst = np.frombuffer(mm, dtype=array.dtype, count=array.size, offset=start)
+                        np.copyto(dst.reshape(array.shape), array, casting="no")
+                        del dst
+        fobs.dumpf({"shared": bool(arrays), "body": body}, file_path)
+
+    def _restore(self, obj: Any, mm: mmap.mmap) -> Any:
+        if isinstance(obj, SharedArrayRef):
+            dtype = np.dtype(obj.dtype)
+            count = int(np.prod(obj.shape, dtype=np.int64))
+            array = np.frombuffer(mm, dtype=dtype, count=count, offset=obj.offset).reshape(obj.shape)
+            if obj.is_tensor:
+                torch, ok = optional_import(module="torch")
+                if ok:
+                    return torch.from_numpy(array)
+            return array
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                obj[k] = self._restore(v, mm)
+            return obj
+        if type(obj) in (list, tuple):
+            return type(obj)(self._restore(v, mm) for v in obj)
+        return obj
+
+    def read(self, file_path: str) -> Any:
+        content = fobs.loadf(file_path)
+        body = content["body"]
+        if not content["shared"]:
+            return body
+
+        segment_path = self.get_segment_path(file_path)
+        if self.multiple_readers:
+            with open(segment_path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            return self._restore(body, mm)
+
+        with open(segment_path, "r+b") as f:
+            mm = mmap.mmap(f.fileno(), 0)
+        # the mapping stays valid after the file is removed, and is unmapped when the arrays are released
+        os.remove(segment_path)
+        return self._restore(body, mm)
+
+
+class SharedMemoryPipe(FilePipe):
+    def __init__(
+        self,
+        mode: Mode,
+        root_path: str,
+        file_check_interval=0.1,
+        segment_dir: str = None,
+        min_shared_size=4096,
+        use_inotify: bool = True,
+    ):
+        """Pipe between processes on the same host that exchanges large arrays through shared memory.
+
+        Messages are exchanged through the files of a FilePipe, which only contain the small part of the data.
+        Numpy arrays and CPU torch tensors are copied once into a shared memory segment by the sender, and
+        received as views into that memory, without serialization. Both endpoints must be on the same host.
+
+        Args:
+            mode (Mode): Mode of the endpoint. A pipe has two endpoints.
+                An endpoint can be either the one that initiates communication or the one listening.
+            root_path (str): root path for the message files. Use a path under /dev/shm to keep them in memory.
+            file_check_interval (float): how often should to check the file exists.
+            segment_dir (str): directory for the shared memory segments. Defaults to /dev/shm if it exists,
+                otherwise the pipe directory.
+            min_shared_size (int): arrays with fewer bytes are serialized into the message files.
+            use_inotify (bool): whether to wait for message files with inotify, on Linux. Defaults to True.
+        """
+        super().__init__(
+            mode=mode, root_path=root_path, file_check_interval=file_check_interval, use_inotify=use_inotify
+        )
+        if segment_dir is not None:
+            check_str("segment_dir", segment_dir)
+        check_non_negative_int("min_shared_size", min_shared_size)
+        self.segment_dir = segment_dir
+        self.min_shared_size = min_shared_size
+        self.accessor = None
+
+    def set_file_accessor(self, accessor: FileAccessor):
+        raise RuntimeError("the file accessor of SharedMemoryPipe cannot be changed")
+
+    def open(self, name: str):
+        pipe_path = os.path.abspath(os.path.join(self.root_path, name))
+        segment_dir = self.segment_dir
+        if not segment_dir:
+            segment_dir = SHM_DIR if os.path.isdir(SHM_DIR) else pipe_path
+        # both endpoints use the same prefix, which is unique to the pipe
+        prefix = "nvflare_pipe_" + hashlib.sha256(pipe_path.encode("utf-8")).hexdigest()[:16] + "_"
+        self.accessor = SharedMemoryFileAccessor(segment_dir, prefix, self.min_shared_size)
+        super().open(name)
+
+    def _clear_segments(self):
+        if self.accessor:
+            pattern = os.path.join(self.accessor.segment_dir, glob.escape(self.accessor.segment_prefix) + "*")
+            for path in glob.glob(pattern):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _monitor_file(self, file_path: str, timeout=None) -> bool:
+        read = super()._monitor_file(file_path, timeout)
+        if not read:
+            # the message was withdrawn
+            self.accessor.remove_segment(file_path)
+        return read
+
+    def clear(self):
+        super().clear()
+        self._clear_segments()
+
+    def close(self):
+        if self.mode == Mode.PASSIVE:
+            self._clear_segments()
+        super().close()
+
+    def export(self, export_mode: str) -> Tuple[str, dict]:
+        if export_mode == ExportMode.SELF:
+            mode = self.mode
+        else:
+            mode = Mode.ACTIVE if self.mode == Mode.PASSIVE else Mode.PASSIVE
+
+        export_args = {
+            "mode": mode,
+            "root_path": self.root_path,
+            "file_check_interval": self.file_check_interval,
+            "segment_dir": self.segment_dir,
+            "min_shared_size": self.min_shared_size,
+            "use_inotify": self.use_inotify,
+        }
+        return f"{self.__module__}.{self.__class__.__name__}", export_args
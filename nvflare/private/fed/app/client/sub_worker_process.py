@@ -28,7 +28,7 @@ from nvflare.apis.fl_context import FLContext
 from nvflare.apis.signal import Signal
 from nvflare.apis.utils.fl_context_utils import get_serializable_data
 from nvflare.apis.workspace import Workspace
-from nvflare.app_common.executors.multi_process_executor import WorkerComponentBuilder
+from nvflare.app_common.executors.multi_process_executor import WorkerComponentBuilder, get_task_input_accessor
 from nvflare.fuel.common.multi_process_executor_constants import (
     CommunicateData,
     CommunicationMetaData,
@@ -263,6 +263,10 @@ class SubWorkerExecutor(Runner):
 
             task_name = data[CommunicationMetaData.TASK_NAME]
             shareable = data[CommunicationMetaData.SHAREABLE]
+            task_input_path = data.get(CommunicationMetaData.TASK_INPUT_PATH)
+            if task_input_path:
+                # the task data is written once into shared memory for all ranks
+                shareable = get_task_input_accessor(task_input_path).read(task_input_path)
             fl_ctx.props.update(data[CommunicationMetaData.FL_CTX].props)
 
             shareable = self.executor.execute(
@@ -26,6 +26,7 @@ from nvflare.apis.fl_constant import (
     ReservedTopic,
     ReturnCode,
     SiteType,
+    SystemConfigs,
 )
 from nvflare.apis.fl_context import FLContext
 from nvflare.apis.fl_exception import UnsafeJobError
@@ -35,6 +36,7 @@ from nvflare.apis.utils.fl_context_utils import add_job_audit_event
 from nvflare.apis.utils.reliable_message import ReliableMessage
 from nvflare.apis.utils.task_utils import apply_filters
 from nvflare.fuel.f3.cellnet.fqcn import FQCN
+from nvflare.fuel.utils.config_service import ConfigService
 from nvflare.private.defs import SpecialTaskName, TaskConstant
 from nvflare.private.fed.client.client_engine_executor_spec import ClientEngineExecutorSpec, TaskAssignment
 from nvflare.private.fed.tbi import TBI
@@ -47,6 +49,9 @@ _TASK_CHECK_RESULT_OK = 0
 _TASK_CHECK_RESULT_TRY_AGAIN = 1
 _TASK_CHECK_RESULT_TASK_GONE = 2
 
+# timeout of getTask requests in addition to the hold time, if get_task_timeout is not configured
+_HELD_TASK_REQUEST_TIMEOUT_MARGIN = 30.0
+
 
 class TaskRouter:
     def __init__(self):
@@ -155,7 +160,14 @@ class ClientRunner(TBI):
         self.task_check_interval = self.get_positive_float_var(ConfigVarName.TASK_CHECK_INTERVAL, 5.0)
         self.job_heartbeat_interval = self.get_positive_float_var(ConfigVarName.JOB_HEARTBEAT_INTERVAL, 10.0)
         self.get_task_timeout = self.get_positive_float_var(ConfigVarName.GET_TASK_TIMEOUT, None)
+        self.get_task_hold_time = self.get_positive_float_var(ConfigVarName.GET_TASK_HOLD_TIME, 0.0)
         self.submit_task_result_timeout = self.get_positive_float_var(ConfigVarName.SUBMIT_TASK_RESULT_TIMEOUT, None)
+        self.prefetch_next_task = ConfigService.get_bool_var(
+            name=ConfigVarName.PREFETCH_NEXT_TASK, conf=SystemConfigs.APPLICATION_CONF, default=False
+        )
+        self._prefetch_thread = None
+        self._prefetch_stop = threading.Event()
+        self._prefetched_task = None  # (task, peer_ctx, ssid) of the task received by the prefetch thread
         self._register_aux_message_handlers(engine)
 
     def find_executor(self, task_name):
@@ -452,8 +464,10 @@ class ClientRunner(TBI):
             A tuple of (task_fetch_interval, task_processed).
         """
         default_task_fetch_interval = self.default_task_fetch_interval
-        self.log_debug(fl_ctx, "fetching task from server ...")
-        task = self.engine.get_task_assignment(fl_ctx, self.get_task_timeout)
+        task = self._take_prefetched_task(fl_ctx)
+        if not task:
+            self.log_debug(fl_ctx, "fetching task from server ...")
+            task = self._get_task_assignment(fl_ctx)
 
         if not task:
             self.log_debug(fl_ctx, "no task received - will try in {} secs".format(default_task_fetch_interval))
@@ -481,12 +495,77 @@ class ClientRunner(TBI):
         self.log_debug(fl_ctx, "firing event EventType.BEFORE_SEND_TASK_RESULT")
         self.fire_event(EventType.BEFORE_SEND_TASK_RESULT, fl_ctx)
 
-        self._send_task_result(task_reply, task.task_id, fl_ctx)
+        if self.prefetch_next_task:
+            self._start_prefetch(task.task_id)
+        try:
+            self._send_task_result(task_reply, task.task_id, fl_ctx)
+        finally:
+            self._prefetch_stop.set()
         self.log_debug(fl_ctx, "firing event EventType.AFTER_SEND_TASK_RESULT")
         self.fire_event(EventType.AFTER_SEND_TASK_RESULT, fl_ctx)
 
         return task_fetch_interval, True
 
+    def _get_task_assignment(self, fl_ctx: FLContext) -> TaskAssignment:
+        get_task_timeout = self.get_task_timeout
+        if self.get_task_hold_time:
+            # let the server hold the request till a task is available, instead of polling for it
+            fl_ctx.set_prop(FLContextKey.TASK_REQUEST_HOLD_TIME, self.get_task_hold_time, private=False, sticky=False)
+            get_task_timeout = self.get_task_hold_time + (get_task_timeout or _HELD_TASK_REQUEST_TIMEOUT_MARGIN)
+        return self.engine.get_task_assignment(fl_ctx, get_task_timeout)
+
+    def _start_prefetch(self, pending_task_id: str):
+        """Starts to fetch the next task while the result of the pending task is being sent.
+
+        The download of the next task (e.g. the global model of the next round) then overlaps with the upload of
+        the result, instead of starting after it. The server does not send the pending task again to the client.
+        """
+        self._prefetch_stop.clear()
+        self._prefetched_task = None
+        self._prefetch_thread = threading.Thread(
+            target=self._prefetch, args=(pending_task_id,), name="task_prefetch", daemon=True
+        )
+        self._prefetch_thread.start()
+
+    def _prefetch(self, pending_task_id: str):
+        while not self.run_abort_signal.triggered:
+            with self.engine.new_context() as fl_ctx:
+                fl_ctx.set_prop(FLContextKey.PENDING_TASK_IDS, [pending_task_id], private=False, sticky=False)
+                try:
+                    task = self._get_task_assignment(fl_ctx)
+                except Exception as e:
+                    self.log_warning(fl_ctx, f"failed to prefetch task: {secure_format_exception(e)}")
+                    return
+
+                if task and task.name != SpecialTaskName.TRY_AGAIN:
+                    self.log_info(fl_ctx, f"prefetched task: name={task.name}, id={task.task_id}")
+                    self._prefetched_task = (task, fl_ctx.get_peer_context(), fl_ctx.get_prop(FLContextKey.SSID))
+                    return
+
+            # keep trying only while the result is being sent: then the next task is fetched as usual
+            wait_time = self.default_task_fetch_interval
+            if task and isinstance(task.data, Shareable):
+                wait_time = task.data.get_header(TaskConstant.WAIT_TIME, wait_time)
+            if self._prefetch_stop.wait(wait_time):
+                return
+
+    def _take_prefetched_task(self, fl_ctx: FLContext):
+        prefetch_thread = self._prefetch_thread
+        if prefetch_thread is None:
+            return None
+
+        # a held request of the prefetch thread is answered as soon as the next task is available
+        prefetch_thread.join()
+        self._prefetch_thread = None
+        prefetched, self._prefetched_task = self._prefetched_task, None
+        if prefetched is None:
+            return None
+
+        task, peer_ctx, ssid = prefetched
+        fl_ctx.set_peer_context(peer_ctx)
+        fl_ctx.set_prop(FLContextKey.SSID, ssid, sticky=False)
+        return task
+
     def _send_task_result(self, result: Shareable, task_id: str, fl_ctx: FLContext):
         try_count = 1
         while True:
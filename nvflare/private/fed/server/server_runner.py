@@ -18,7 +18,7 @@ import time
 from nvflare.apis.client import Client
 from nvflare.apis.event_type import EventType
 from nvflare.apis.fl_component import FLComponent
-from nvflare.apis.fl_constant import FilterKey, FLContextKey, ReservedKey, ReservedTopic, ReturnCode
+from nvflare.apis.fl_constant import ConfigVarName, FilterKey, FLContextKey, ReservedKey, ReservedTopic, ReturnCode
 from nvflare.apis.fl_context import FLContext
 from nvflare.apis.server_engine_spec import ServerEngineSpec
 from nvflare.apis.shareable import ReservedHeaderKey, Shareable, make_reply
@@ -101,6 +101,10 @@ class ServerRunner(TBI):
         self.current_wf_index = 0
         self.status = "init"
         self.turn_to_cold = False
+        self.max_task_request_hold_time = self.get_positive_float_var(ConfigVarName.MAX_GET_TASK_HOLD_TIME, 30.0)
+        self.max_held_task_requests = self.get_positive_int_var(ConfigVarName.MAX_HELD_TASK_REQUESTS, 32)
+        self.held_task_requests_lock = threading.Lock()
+        self.num_held_task_requests = 0
         self._register_aux_message_handler(engine)
 
     def _register_aux_message_handler(self, engine):
@@ -240,11 +244,20 @@ class ServerRunner(TBI):
             self.log_error(fl_ctx, "Aborting current RUN due to FATAL_SYSTEM_ERROR received: {}".format(reason))
             self.abort(fl_ctx)
 
-    def _task_try_again(self) -> (str, str, Shareable):
+    def _task_try_again(self, wait_time=None) -> (str, str, Shareable):
+        if wait_time is None:
+            wait_time = self.config.task_request_interval
         task_data = Shareable()
-        task_data.set_header(TaskConstant.WAIT_TIME, self.config.task_request_interval)
+        task_data.set_header(TaskConstant.WAIT_TIME, wait_time)
         return SpecialTaskName.TRY_AGAIN, "", task_data
 
+    def _get_task_request_hold_time(self, peer_ctx: FLContext) -> float:
+        # the client decides whether its task request can be held, the server limits for how long
+        hold_time = peer_ctx.get_prop(FLContextKey.TASK_REQUEST_HOLD_TIME)
+        if not isinstance(hold_time, (int, float)) or hold_time <= 0:
+            return 0.0
+        return min(hold_time, self.max_task_request_hold_time)
+
     def process_task_request(self, client: Client, fl_ctx: FLContext) -> (str, str, Shareable):
         """Process task request from a client.
 
@@ -288,13 +301,14 @@ class ServerRunner(TBI):
             self.log_info(fl_ctx, "invalid task request: not the same job_id - asked client to end the run")
             return SpecialTaskName.END_RUN, "", None
 
+        hold_time = self._get_task_request_hold_time(peer_ctx)
         try:
-            task_name, task_id, task_data = self._try_to_get_task(
-                # client, fl_ctx, self.config.task_request_timeout, self.config.task_retry_interval
-                client,
-                fl_ctx,
-            )
+            start = time.time()
+            task_name, task_id, task_data = self._try_to_get_task(client, fl_ctx, hold_time)
             if not task_name or task_name == SpecialTaskName.TRY_AGAIN:
+                if hold_time and time.time() - start >= hold_time:
+                    # the request has been held for the full hold time - the client can ask again right away
+                    return self._task_try_again(wait_time=0.0)
                 return self._task_try_again()
 
             # filter task data
@@ -323,7 +337,10 @@ class ServerRunner(TBI):
 
             audit_event_id = add_job_audit_event(fl_ctx=fl_ctx, msg=f'sent task to client "{client.name}"')
             task_data.set_header(ReservedHeaderKey.AUDIT_EVENT_ID, audit_event_id)
-            task_data.set_header(TaskConstant.WAIT_TIME, self.config.task_request_interval)
+
+            # a client whose requests can be held asks for the next task right after this one is done
+            wait_time = 0.0 if hold_time else self.config.task_request_interval
+            task_data.set_header(TaskConstant.WAIT_TIME, wait_time)
             return task_name, task_id, task_data
         except Exception as e:
             self.log_exception(
@@ -332,51 +349,86 @@ class ServerRunner(TBI):
             )
             return self._task_try_again()
 
-    def _try_to_get_task(self, client, fl_ctx, timeout=None, retry_interval=0.005):
+    def _hold_task_request(self) -> bool:
+        with self.held_task_requests_lock:
+            if self.num_held_task_requests >= self.max_held_task_requests:
+                return False
+            self.num_held_task_requests += 1
+            return True
+
+    def _release_task_request(self):
+        with self.held_task_requests_lock:
+            self.num_held_task_requests -= 1
+
+    def _try_to_get_task(self, client, fl_ctx, timeout=None):
+        """Try to get a task for the client from the current workflow.
+
+        If timeout is specified, the request is held till a task is assigned to the client or the timeout expires.
+        The number of requests held at the same time is limited since each of them occupies a message thread.
+        """
         start = time.time()
-        while True:
-            with self.wf_lock:
-                if self.current_wf is None:
-                    self.log_debug(fl_ctx, "no current workflow - asked client to try again later")
-                    return "", "", None
+        held = False
+        try:
+            while True:
+                with self.wf_lock:
+                    if self.current_wf is None:
+                        self.log_debug(fl_ctx, "no current workflow - asked client to try again later")
+                        return "", "", None
+
+                    communicator = self.current_wf.controller.communicator
+                    task_change_seq = communicator.get_task_change_seq()
+
+                    self.log_debug(fl_ctx, "firing event EventType.BEFORE_PROCESS_TASK_REQUEST")
+                    self.fire_event(EventType.BEFORE_PROCESS_TASK_REQUEST, fl_ctx)
+                    task_name, task_id, task_data = communicator.process_task_request(client, fl_ctx)
+                    self.log_debug(fl_ctx, "firing event EventType.AFTER_PROCESS_TASK_REQUEST")
+                    self.fire_event(EventType.AFTER_PROCESS_TASK_REQUEST, fl_ctx)
+
+                    if task_name and task_name != SpecialTaskName.TRY_AGAIN:
+                        if task_data:
+                            if not isinstance(task_data, Shareable):
+                                self.log_error(
+                                    fl_ctx,
+                                    "bad task data generated by workflow {}: must be Shareable but got {}".format(
+                                        self.current_wf.id, type(task_data)
+                                    ),
+                                )
+                                return "", "", None
+                        else:
+                            task_data = Shareable()
+
+                        task_data.set_header(ReservedHeaderKey.TASK_ID, task_id)
+                        task_data.set_header(ReservedHeaderKey.TASK_NAME, task_name)
+                        task_data.add_cookie(ReservedHeaderKey.WORKFLOW, self.current_wf.id)
+
+                        fl_ctx.set_prop(FLContextKey.TASK_NAME, value=task_name, private=True, sticky=False)
+                        fl_ctx.set_prop(FLContextKey.TASK_ID, value=task_id, private=True, sticky=False)
+                        fl_ctx.set_prop(FLContextKey.TASK_DATA, value=task_data, private=True, sticky=False)
+
+                        self.log_info(
+                            fl_ctx, f"assigned task to client {client.name}: name={task_name}, id={task_id}"
+                        )
 
-                self.log_debug(fl_ctx, "firing event EventType.BEFORE_PROCESS_TASK_REQUEST")
-                self.fire_event(EventType.BEFORE_PROCESS_TASK_REQUEST, fl_ctx)
-                task_name, task_id, task_data = self.current_wf.controller.communicator.process_task_request(
-                    client, fl_ctx
-                )
-                self.log_debug(fl_ctx, "firing event EventType.AFTER_PROCESS_TASK_REQUEST")
-                self.fire_event(EventType.AFTER_PROCESS_TASK_REQUEST, fl_ctx)
-
-                if task_name and task_name != SpecialTaskName.TRY_AGAIN:
-                    if task_data:
-                        if not isinstance(task_data, Shareable):
-                            self.log_error(
-                                fl_ctx,
-                                "bad task data generated by workflow {}: must be Shareable but got {}".format(
-                                    self.current_wf.id, type(task_data)
-                                ),
-                            )
-                            return "", "", None
-                    else:
-                        task_data = Shareable()
-
-                    task_data.set_header(ReservedHeaderKey.TASK_ID, task_id)
-                    task_data.set_header(ReservedHeaderKey.TASK_NAME, task_name)
-                    task_data.add_cookie(ReservedHeaderKey.WORKFLOW, self.current_wf.id)
-
-                    fl_ctx.set_prop(FLContextKey.TASK_NAME, value=task_name, private=True, sticky=False)
-                    fl_ctx.set_prop(FLContextKey.TASK_ID, value=task_id, private=True, sticky=False)
-                    fl_ctx.set_prop(FLContextKey.TASK_DATA, value=task_data, private=True, sticky=False)
-
-                    self.log_info(fl_ctx, f"assigned task to client {client.name}: name={task_name}, id={task_id}")
-
-                    return task_name, task_id, task_data
-
-            if timeout is None or time.time() - start > timeout:
-                break
-
-            time.sleep(retry_interval)
+                        return task_name, task_id, task_data
+
+                if not timeout or self.status != "started":
+                    break
+
+                remaining = timeout - (time.time() - start)
+                if remaining <= 0:
+                    break
+
+                if not held:
+                    held = self._hold_task_request()
+                    if not held:
+                        self.log_debug(fl_ctx, "too many task requests are held - asked client to try again later")
+                        break
+
+                # wait outside the wf_lock so that the workflow can schedule tasks and process results
+                communicator.wait_for_task_change(task_change_seq, remaining)
+        finally:
+            if held:
+                self._release_task_request()
 
         # ask client to retry
         return "", "", None
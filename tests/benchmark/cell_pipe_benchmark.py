@@ -0,0 +1,89 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure the time and the peak memory to send a model over a CellPipe, with and without streaming.
+
+Both endpoints run in this process, so the peak memory includes the sender and the receiver. It is traced with
+tracemalloc and does not include the model itself.
+
+Usage:
+    python -m tests.benchmark.cell_pipe_benchmark --model_mb 512
+"""
+
+import argparse
+import time
+import tracemalloc
+import uuid
+
+import numpy as np
+
+from nvflare.apis.dxo import DXO, DataKind
+from nvflare.apis.utils.decomposers import flare_decomposers
+from nvflare.app_common.decomposers import common_decomposers
+from nvflare.fuel.f3.cellnet.core_cell import CoreCell
+from nvflare.fuel.utils.network_utils import get_open_ports
+from nvflare.fuel.utils.pipe.cell_pipe import CellPipe
+from nvflare.fuel.utils.pipe.pipe import Message
+
+
+def _send(port: int, shareable, streaming: bool):
+    token = str(uuid.uuid4())
+    # pipes with the same root url share a cell, so the endpoints use different urls of the root
+    sender = CellPipe("ACTIVE", "site-1", token, f"tcp://localhost:{port}", secure_mode=False, streaming=streaming)
+    receiver = CellPipe("PASSIVE", "site-1", token, f"tcp://127.0.0.1:{port}", secure_mode=False)
+    sender.open("benchmark")
+    receiver.open("benchmark")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    if not sender.send(Message.new_request("train", shareable), timeout=60.0):
+        raise RuntimeError("failed to send the model")
+    msg = receiver.receive(timeout=60.0)
+    secs = time.perf_counter() - start
+    # the received model is needed in both modes
+    model_bytes = sum(v.nbytes for v in msg.data["DXO"]["data"].values())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    sender.close()
+    receiver.close()
+    return secs, (peak - model_bytes) / 1024**2
+
+
+def run(model_mb: int, layer_mb: int):
+    flare_decomposers.register()
+    common_decomposers.register()
+    n = layer_mb * 1024 * 1024 // 4
+    weights = {f"layer{i}": np.ones(n, dtype=np.float32) for i in range(max(1, model_mb // layer_mb))}
+    shareable = DXO(data_kind=DataKind.WEIGHTS, data=weights).to_shareable()
+
+    port = get_open_ports(1)[0]
+    root = CoreCell("server", f"tcp://localhost:{port}", secure=False, credentials={})
+    root.start()
+    for streaming in (False, True):
+        secs, peak_mb = _send(port, shareable, streaming)
+        print(f"streaming={streaming!s:>5}: {model_mb} MB model sent in {secs:.2f} secs, {peak_mb:.0f} MB extra peak")
+    root.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_mb", type=int, default=512)
+    parser.add_argument("--layer_mb", type=int, default=16)
+    args = parser.parse_args()
+    run(args.model_mb, args.layer_mb)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the per-parameter and the fused (FlatParameters) FedOpt server update.
+
+The model is a stack of linear layers with `num_params` parameters in total. Each round applies an aggregated
+float32 numpy diff with the optimizer and converts the model back to numpy, as FedOpt does.
+The default 1B parameters need about 20 GB of memory for SGD with momentum (model, momentum, diff, gradient and
+numpy weights), reduce `num_params` on smaller machines.
+
+Usage:
+    python -m tests.benchmark.fedopt_update_benchmark --num_params 1000000000 --device cpu
+"""
+
+import argparse
+import gc
+import time
+
+import numpy as np
+import torch
+
+from nvflare.app_opt.pt.flat_parameters import FlatParameters
+
+
+def _make_model(num_params: int, layer_size: int) -> torch.nn.Module:
+    num_layers = max(1, num_params // (layer_size * layer_size + layer_size))
+    return torch.nn.Sequential(*[torch.nn.Linear(layer_size, layer_size) for _ in range(num_layers)])
+
+
+def _per_parameter_round(model, optimizer, model_diff, device):
+    optimizer.zero_grad()
+    for name, param in model.named_parameters():
+        param.grad = torch.tensor(-1.0 * model_diff[name]).to(device)
+    optimizer.step()
+    return {k: v.detach().cpu().numpy() for k, v in model.state_dict().items()}
+
+
+def _fused_round(model, optimizer, model_diff, flat_params):
+    flat_params.set_grad_from_diff(model_diff)
+    optimizer.step()
+    return flat_params.state_dict_to_numpy(model.state_dict())
+
+
+def run(num_params: int, layer_size: int, num_rounds: int, device: str):
+    for name in ("per-parameter", "fused"):
+        model = _make_model(num_params, layer_size).to(device)
+        n = sum(p.numel() for p in model.parameters())
+        model_diff = {k: np.full(tuple(v.shape), 1e-3, dtype=np.float32) for k, v in model.state_dict().items()}
+        if name == "fused":
+            flat_params = FlatParameters(model)
+            optimizer = torch.optim.SGD([flat_params.param], lr=1.0, momentum=0.6)
+            update = lambda: _fused_round(model, optimizer, model_diff, flat_params)  # noqa: E731
+        else:
+            optimizer = torch.optim.SGD(model.parameters(), lr=1.0, momentum=0.6)
+            update = lambda: _per_parameter_round(model, optimizer, model_diff, device)  # noqa: E731
+
+        times = []
+        for _ in range(num_rounds + 1):
+            start = time.perf_counter()
+            weights = update()
+            if device.startswith("cuda"):
+                torch.cuda.synchronize()
+            times.append(time.perf_counter() - start)
+            del weights
+        secs = float(np.median(times[1:]))  # the first round allocates the optimizer state
+        print(f"{name:>14}: {n / 1e6:8.1f}M params, {secs:7.3f} secs/round, {n / secs / 1e6:8.1f}M params/s")
+
+        del model, optimizer, model_diff, update
+        gc.collect()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num_params", type=int, default=1_000_000_000)
+    parser.add_argument("--layer_size", type=int, default=4096)
+    parser.add_argument("--num_rounds", type=int, default=3)
+    parser.add_argument("--device", type=str, default="cuda:0" if torch.cuda.is_available() else "cpu")
+    args = parser.parse_args()
+    run(args.num_params, args.layer_size, args.num_rounds, args.device)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure the time to hand a model over a pipe, from send to received data.
+
+Usage:
+    python -m tests.benchmark.pipe_benchmark --model_mb 1024
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from nvflare.apis.dxo import DXO, DataKind
+from nvflare.apis.utils.decomposers import flare_decomposers
+from nvflare.app_common.decomposers import common_decomposers
+from nvflare.fuel.utils.constants import Mode
+from nvflare.fuel.utils.pipe.file_pipe import FilePipe
+from nvflare.fuel.utils.pipe.pipe import Message
+from nvflare.fuel.utils.pipe.shared_memory_pipe import SHM_DIR, SharedMemoryPipe
+
+
+def _handoff(pipe_cls, root_path: str, shareable, num_runs: int) -> float:
+    active = pipe_cls(Mode.ACTIVE, root_path, file_check_interval=0.001)
+    passive = pipe_cls(Mode.PASSIVE, root_path, file_check_interval=0.001)
+    active.open("benchmark")
+    passive.open("benchmark")
+    times = []
+    for _ in range(num_runs):
+        start = time.perf_counter()
+        t = threading.Thread(target=active.send, args=(Message.new_request("train", shareable), 60.0))
+        t.start()
+        msg = passive.receive(timeout=60.0)
+        times.append(time.perf_counter() - start)
+        t.join()
+        del msg
+    active.close()
+    passive.close()
+    return float(np.median(times))
+
+
+def run(model_mb: int, layer_mb: int, num_runs: int):
+    flare_decomposers.register()
+    common_decomposers.register()
+    n = layer_mb * 1024 * 1024 // 4
+    weights = {f"layer{i}": np.ones(n, dtype=np.float32) for i in range(max(1, model_mb // layer_mb))}
+    shareable = DXO(data_kind=DataKind.WEIGHTS, data=weights).to_shareable()
+
+    root = SHM_DIR if os.path.isdir(SHM_DIR) else None
+    for pipe_cls in (FilePipe, SharedMemoryPipe):
+        with tempfile.TemporaryDirectory(dir=root) as root_path:
+            secs = _handoff(pipe_cls, root_path, shareable, num_runs)
+        print(f"{pipe_cls.__name__:>16}: {model_mb} MB model handed over in {secs:.3f} secs")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model_mb", type=int, default=1024)
+    parser.add_argument("--layer_mb", type=int, default=16)
+    parser.add_argument("--num_runs", type=int, default=3)
+    args = parser.parse_args()
+    run(args.model_mb, args.layer_mb, args.num_runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the throughput of the NumPy quantization with bitsandbytes.
+
+bitsandbytes is used on the CPU for blockwise8, and on the GPU for float4 / normfloat4 (as in ModelQuantizor).
+It is skipped if it is not installed or, for 4-bit, if no GPU is available.
+
+Usage:
+    python -m tests.benchmark.quantization_benchmark --num_elements 16000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from nvflare.app_opt.pt.quantization import numpy_quantization
+from nvflare.app_opt.pt.quantization.quantizor import can_use_bitsandbytes
+from nvflare.fuel.utils.import_utils import optional_import
+
+bnb_functional, bnb_ok = optional_import(module="bitsandbytes.functional")
+
+QUANT_TYPES = {"blockwise8": None, "float4": "fp4", "normfloat4": "nf4"}
+
+
+def _time(fn, num_runs: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(num_runs):
+        fn()
+    return (time.perf_counter() - start) / num_runs
+
+
+def _numpy_funcs(values: np.ndarray, quantization_type: str):
+    if quantization_type == "blockwise8":
+        quantized, absmax, code = numpy_quantization.quantize_blockwise(values)
+        return (
+            lambda: numpy_quantization.quantize_blockwise(values, code=code),
+            lambda: numpy_quantization.dequantize_blockwise(quantized, absmax, code),
+        )
+    quant_type = QUANT_TYPES[quantization_type]
+    packed, state = numpy_quantization.quantize_4bit(values, quant_type=quant_type)
+    return (
+        lambda: numpy_quantization.quantize_4bit(values, quant_type=quant_type),
+        lambda: numpy_quantization.dequantize_4bit(packed, state),
+    )
+
+
+def _bnb_funcs(values: np.ndarray, quantization_type: str):
+    # includes the conversions between numpy and torch done by ModelQuantizor and ModelDequantizor
+    if quantization_type == "blockwise8":
+        tensor = torch.as_tensor(values)
+        quantized, state = bnb_functional.quantize_blockwise(tensor)
+        return (
+            lambda: bnb_functional.quantize_blockwise(torch.as_tensor(values)),
+            lambda: bnb_functional.dequantize_blockwise(quantized, state).numpy(),
+        )
+
+    def quantize():
+        q, s = bnb_functional.quantize_4bit(torch.as_tensor(values).cuda(), quant_type=QUANT_TYPES[quantization_type])
+        return q.cpu(), s.absmax.cpu()
+
+    def dequantize():
+        return bnb_functional.dequantize_4bit(quantized.cuda(), state).cpu().numpy()
+
+    quantized, state = bnb_functional.quantize_4bit(
+        torch.as_tensor(values).cuda(), quant_type=QUANT_TYPES[quantization_type]
+    )
+    return quantize, dequantize
+
+
+def run(num_elements: int, num_runs: int):
+    values = np.random.default_rng(0).standard_normal(num_elements).astype(np.float32)
+    mb = values.nbytes / 1024**2
+    for quantization_type in QUANT_TYPES:
+        impls = {"numpy": _numpy_funcs}
+        if can_use_bitsandbytes(quantization_type):
+            impls["bitsandbytes"] = _bnb_funcs
+        for name, get_funcs in impls.items():
+            quantize, dequantize = get_funcs(values, quantization_type)
+            q_time = _time(quantize, num_runs)
+            dq_time = _time(dequantize, num_runs)
+            print(
+                f"{quantization_type:>10} {name:>12}: quantize {mb / q_time:8.1f} MB/s, "
+                f"dequantize {mb / dq_time:8.1f} MB/s"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num_elements", type=int, default=16_000_000)
+    parser.add_argument("--num_runs", type=int, default=5)
+    args = parser.parse_args()
+    run(args.num_elements, args.num_runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure the cost of WFCommServer.process_task_request with many clients and standing tasks.
+
+Each standing task targets a single client, so every client has exactly one eligible task.
+
+Usage:
+    python -m tests.benchmark.wf_comm_server_benchmark --num_clients 1000 --num_tasks 100
+"""
+
+import argparse
+import logging
+import time
+from unittest.mock import Mock
+
+from nvflare.apis.client import Client
+from nvflare.apis.controller_spec import Task
+from nvflare.apis.fl_context import FLContextManager
+from nvflare.apis.impl.controller import Controller
+from nvflare.apis.impl.wf_comm_server import WFCommServer
+from nvflare.apis.server_engine_spec import ServerEngineSpec
+from nvflare.apis.shareable import Shareable
+
+
+class _BenchmarkController(Controller):
+    def start_controller(self, fl_ctx):
+        pass
+
+    def stop_controller(self, fl_ctx):
+        pass
+
+    def control_flow(self, abort_signal, fl_ctx):
+        pass
+
+    def process_result_of_unknown_task(self, client, task_name, client_task_id, result, fl_ctx):
+        pass
+
+
+def _setup(num_clients: int):
+    clients = [Client(f"site-{i}", None) for i in range(num_clients)]
+    engine = Mock(spec=ServerEngineSpec)
+    context_manager = FLContextManager(
+        engine=engine, identity_name="server", job_id="benchmark", public_stickers={}, private_stickers={}
+    )
+    engine.new_context.return_value = context_manager.new_context()
+    engine.get_clients.return_value = clients
+
+    fl_ctx = engine.new_context()
+    controller = _BenchmarkController()
+    communicator = WFCommServer(task_check_period=3600)
+    controller.set_communicator(communicator)
+    controller.initialize(fl_ctx)
+    communicator.initialize_run(fl_ctx)
+    return controller, communicator, clients, fl_ctx
+
+
+def run(num_clients: int, num_tasks: int, num_rounds: int):
+    controller, communicator, clients, fl_ctx = _setup(num_clients)
+    for i in range(num_tasks):
+        task = Task(name=f"task-{i}", data=Shareable())
+        controller.broadcast(task=task, fl_ctx=fl_ctx, targets=[clients[i % num_clients]], min_responses=1)
+
+    # clients that are not targeted by any task: the common "nothing to do" case
+    idle_clients = clients[num_tasks:] or clients
+    num_requests = 0
+    start = time.perf_counter()
+    for _ in range(num_rounds):
+        for client in idle_clients:
+            communicator.process_task_request(client, fl_ctx)
+            num_requests += 1
+    elapsed = time.perf_counter() - start
+    communicator.finalize_run(fl_ctx)
+
+    print(
+        f"clients={num_clients} standing_tasks={num_tasks} requests={num_requests} "
+        f"total={elapsed:.3f}s per_request={elapsed / num_requests * 1e6:.1f}us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num_clients", type=int, default=1000)
+    parser.add_argument("--num_tasks", type=int, default=100)
+    parser.add_argument("--num_rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    run(args.num_clients, args.num_tasks, args.num_rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,8 +24,10 @@ import pytest
 
 from nvflare.apis.client import Client
 from nvflare.apis.controller_spec import ClientTask, SendOrder, Task, TaskCompletionStatus
+from nvflare.apis.fl_constant import FLContextKey
 from nvflare.apis.fl_context import FLContext, FLContextManager
 from nvflare.apis.impl.controller import Controller
+from nvflare.apis.impl.seq_relay_manager import SequentialRelayTaskManager
 from nvflare.apis.impl.wf_comm_server import WFCommServer
 from nvflare.apis.server_engine_spec import ServerEngineSpec
 from nvflare.apis.shareable import ReservedHeaderKey, Shareable
@@ -109,7 +111,7 @@ def get_ready(thread, sleep_time=0.1):
     time.sleep(sleep_time)
 
 
-def _setup_system(num_clients=1):
+def _setup_system(num_clients=1, **communicator_kwargs):
     clients_list = [create_client(f"__test_client{i}") for i in range(num_clients)]
     mock_server_engine = Mock(spec=ServerEngineSpec)
     context_manager = FLContextManager(
@@ -124,7 +126,7 @@ def _setup_system(num_clients=1):
 
     controller = DummyController()
     fl_ctx = mock_server_engine.new_context()
-    communicator = WFCommServer()
+    communicator = WFCommServer(**communicator_kwargs)
     controller.set_communicator(communicator)
     controller.initialize(fl_ctx)
     controller.communicator.initialize_run(fl_ctx=fl_ctx)
@@ -137,8 +139,10 @@ class TestController:
     ALL_APIS = NO_RELAY + RELAY
 
     @staticmethod
-    def setup_system(num_of_clients=1):
-        controller, server_engine, fl_ctx, clients_list = _setup_system(num_clients=num_of_clients)
+    def setup_system(num_of_clients=1, **communicator_kwargs):
+        controller, server_engine, fl_ctx, clients_list = _setup_system(
+            num_clients=num_of_clients, **communicator_kwargs
+        )
         return controller, fl_ctx, clients_list
 
     @staticmethod
@@ -1088,6 +1092,375 @@ class TestBasic(TestController):
         self.teardown_system(controller, fl_ctx)
 
 
+class TestConcurrentResultIntake(TestController):
+    def test_results_of_same_task_are_processed_concurrently(self):
+        num_of_clients = 4
+        barrier = threading.Barrier(num_of_clients, timeout=5.0)
+
+        def result_received_cb(client_task: ClientTask, **kwargs):
+            # only passes if all results are inside the CB at the same time
+            barrier.wait()
+
+        controller, fl_ctx, clients = self.setup_system(
+            num_of_clients=num_of_clients, concurrent_result_intake=True, max_result_intake_workers=num_of_clients
+        )
+        task = create_task("__test_task", result_received_cb=result_received_cb)
+        controller.broadcast(task=task, fl_ctx=fl_ctx, targets=clients, min_responses=num_of_clients)
+
+        client_task_ids = []
+        for client in clients:
+            _, client_task_id, _ = controller.communicator.process_task_request(client, fl_ctx)
+            client_task_ids.append(client_task_id)
+
+        submit_threads = [
+            threading.Thread(
+                target=controller.communicator.process_submission,
+                kwargs={
+                    "client": client,
+                    "task_name": "__test_task",
+                    "task_id": client_task_id,
+                    "fl_ctx": fl_ctx,
+                    "result": Shareable(),
+                },
+            )
+            for client, client_task_id in zip(clients, client_task_ids)
+        ]
+        for t in submit_threads:
+            t.start()
+        for t in submit_threads:
+            t.join()
+
+        assert not barrier.broken
+        assert all(ct.result_received_time for ct in task.client_tasks)
+        controller.communicator.check_tasks()
+        assert task.completion_status == TaskCompletionStatus.OK
+        assert controller.get_num_standing_tasks() == 0
+        self.teardown_system(controller, fl_ctx)
+
+    def test_task_request_not_blocked_by_result_processing(self):
+        cb_entered = threading.Event()
+        cb_release = threading.Event()
+
+        def result_received_cb(client_task: ClientTask, **kwargs):
+            cb_entered.set()
+            cb_release.wait(5.0)
+
+        controller, fl_ctx, clients = self.setup_system(num_of_clients=2, concurrent_result_intake=True)
+        task1 = create_task("__test_task1", result_received_cb=result_received_cb)
+        task2 = create_task("__test_task2")
+        controller.send(task=task1, fl_ctx=fl_ctx, targets=[clients[0]])
+        controller.send(task=task2, fl_ctx=fl_ctx, targets=[clients[1]])
+
+        _, client_task_id, _ = controller.communicator.process_task_request(clients[0], fl_ctx)
+        submit_thread = threading.Thread(
+            target=controller.communicator.process_submission,
+            kwargs={
+                "client": clients[0],
+                "task_name": "__test_task1",
+                "task_id": client_task_id,
+                "fl_ctx": fl_ctx,
+                "result": Shareable(),
+            },
+        )
+        submit_thread.start()
+        assert cb_entered.wait(5.0)
+
+        # the result CB of task1 is still running: the task must not exit, and other clients can still pull tasks
+        task_name_out, _, _ = controller.communicator.process_task_request(clients[1], fl_ctx)
+        assert task_name_out == "__test_task2"
+        controller.cancel_task(task1)
+        controller.communicator.check_tasks()
+        assert task1.is_standing
+
+        cb_release.set()
+        submit_thread.join()
+        controller.communicator.check_tasks()
+        assert not task1.is_standing
+        controller.cancel_task(task2)
+        self.teardown_system(controller, fl_ctx)
+
+    def test_submission_after_finalize(self):
+        controller, fl_ctx, clients = self.setup_system(num_of_clients=1, concurrent_result_intake=True)
+        task = create_task("__test_task")
+        controller.send(task=task, fl_ctx=fl_ctx, targets=clients)
+        _, client_task_id, _ = controller.communicator.process_task_request(clients[0], fl_ctx)
+        self.teardown_system(controller, fl_ctx)
+
+        # a late submission is processed in the calling thread, instead of failing on the shut down pool
+        controller.communicator.log_warning = Mock()
+        controller.communicator.process_submission(
+            client=clients[0], task_name="__test_task", task_id=client_task_id, result=Shareable(), fl_ctx=fl_ctx
+        )
+        controller.communicator.log_warning.assert_called_once()
+
+
+class TestEventDrivenTaskCheck(TestController):
+    @staticmethod
+    def setup_event_driven_system(num_of_clients=1):
+        # a long task_check_period makes sure that nothing is found by periodic checking
+        return TestController.setup_system(
+            num_of_clients=num_of_clients, task_check_period=30.0, event_driven_task_check=True
+        )
+
+    @staticmethod
+    def wait_till_exit(task, timeout=5.0):
+        start = time.time()
+        while task.is_standing and time.time() - start < timeout:
+            time.sleep(0.01)
+        return time.time() - start
+
+    @pytest.mark.parametrize("method", TestController.ALL_APIS)
+    def test_task_exits_on_submission(self, method):
+        controller, fl_ctx, clients = self.setup_event_driven_system()
+        task = create_task("__test_task")
+        launch_thread = threading.Thread(
+            target=launch_task,
+            kwargs={
+                "controller": controller,
+                "task": task,
+                "method": method,
+                "fl_ctx": fl_ctx,
+                "kwargs": {"targets": clients},
+            },
+        )
+        get_ready(launch_thread)
+
+        clients_pull_and_submit_result(controller, fl_ctx, clients, "__test_task")
+        assert self.wait_till_exit(task) < 1.0
+        launch_thread.join(timeout=1.0)
+        assert not launch_thread.is_alive()
+        assert task.completion_status == TaskCompletionStatus.OK
+        assert controller.get_num_standing_tasks() == 0
+        self.teardown_system(controller, fl_ctx)
+
+    @pytest.mark.parametrize("method", TestController.ALL_APIS)
+    def test_task_timeout(self, method):
+        controller, fl_ctx, clients = self.setup_event_driven_system()
+        task = create_task(name="__test_task", timeout=1)
+        launch_thread = threading.Thread(
+            target=launch_task,
+            kwargs={
+                "controller": controller,
+                "task": task,
+                "method": method,
+                "fl_ctx": fl_ctx,
+                "kwargs": {"targets": clients},
+            },
+        )
+        get_ready(launch_thread)
+        assert controller.get_num_standing_tasks() == 1
+        assert self.wait_till_exit(task) < 2.0
+        launch_thread.join(timeout=1.0)
+        assert not launch_thread.is_alive()
+        assert task.completion_status == TaskCompletionStatus.TIMEOUT
+        assert controller.get_num_standing_tasks() == 0
+        self.teardown_system(controller, fl_ctx)
+
+    def test_broadcast_wait_time_after_min_received(self):
+        controller, fl_ctx, clients = self.setup_event_driven_system(num_of_clients=2)
+        task = create_task("__test_task")
+        controller.broadcast(task=task, fl_ctx=fl_ctx, targets=clients, min_responses=1, wait_time_after_min_received=1)
+        clients_pull_and_submit_result(controller, fl_ctx, clients[:1], "__test_task")
+        assert task.is_standing
+        time.sleep(2)
+        assert not task.is_standing
+        assert task.completion_status == TaskCompletionStatus.OK
+        self.teardown_system(controller, fl_ctx)
+
+    @pytest.mark.parametrize("method", TestController.ALL_APIS)
+    def test_cancel_task(self, method):
+        controller, fl_ctx, clients = self.setup_event_driven_system()
+        task = create_task(name="__test_task")
+        launch_thread = threading.Thread(
+            target=launch_task,
+            kwargs={
+                "controller": controller,
+                "task": task,
+                "method": method,
+                "fl_ctx": fl_ctx,
+                "kwargs": {"targets": clients},
+            },
+        )
+        get_ready(launch_thread)
+        controller.cancel_task(task=task)
+        assert self.wait_till_exit(task) < 1.0
+        launch_thread.join(timeout=1.0)
+        assert not launch_thread.is_alive()
+        assert controller.get_num_standing_tasks() == 0
+        assert task.completion_status == TaskCompletionStatus.CANCELLED
+        self.teardown_system(controller, fl_ctx)
+
+    def test_relay_exit_check_time(self):
+        task = create_task("__test_task")
+        task.targets = ["site-1", "site-2"]
+        task.schedule_time = time.time() - 100
+        manager = SequentialRelayTaskManager(
+            task, task_assignment_timeout=10, task_result_timeout=20, dynamic_targets=False
+        )
+
+        # nothing sent: the window covers all targets + 1 after the schedule time
+        assert manager.get_exit_check_time(task) == pytest.approx(task.schedule_time + 30, abs=0.01)
+
+        # the last client has not returned: check again when its result times out
+        client_task = ClientTask(client=Client("site-1", None), task=task)
+        client_task.task_sent_time = time.time() - 5
+        task.last_client_task_map["site-1"] = client_task
+        task.props["__last_send_idx"] = 0
+        assert manager.get_exit_check_time(task) == pytest.approx(client_task.task_sent_time + 20, abs=0.01)
+
+        # the last client has returned: the window moves on from the time its result was received
+        client_task.result_received_time = time.time() - 1
+        assert manager.get_exit_check_time(task) == pytest.approx(client_task.result_received_time + 20, abs=0.01)
+
+        # the last client timed out: the window moves on from the time its result timed out
+        client_task.result_received_time = None
+        client_task.task_sent_time = time.time() - 25
+        assert manager.get_exit_check_time(task) == pytest.approx(client_task.task_sent_time + 20 + 20, abs=0.01)
+
+    def test_relay_exit_check_time_without_timeouts(self):
+        task = create_task("__test_task")
+        task.targets = ["site-1"]
+        task.schedule_time = time.time()
+        manager = SequentialRelayTaskManager(
+            task, task_assignment_timeout=0, task_result_timeout=0, dynamic_targets=False
+        )
+        assert manager.get_exit_check_time(task) is None
+
+
+class TestTaskChangeWait(TestController):
+    def test_wait_released_when_task_scheduled(self):
+        controller, fl_ctx, clients = self.setup_system()
+        communicator = controller.communicator
+        seq = communicator.get_task_change_seq()
+        task_name_out, _, _ = communicator.process_task_request(clients[0], fl_ctx)
+        assert task_name_out == ""
+
+        task = create_task("__test_task")
+        timer = threading.Timer(0.2, controller.broadcast, kwargs={"task": task, "fl_ctx": fl_ctx})
+        timer.start()
+        start = time.time()
+        communicator.wait_for_task_change(seq, 5.0)
+        assert time.time() - start < 2.0
+        task_name_out, _, _ = communicator.process_task_request(clients[0], fl_ctx)
+        assert task_name_out == "__test_task"
+        controller.cancel_task(task)
+        self.teardown_system(controller, fl_ctx)
+
+    def test_wait_returns_immediately_if_changed(self):
+        controller, fl_ctx, clients = self.setup_system()
+        communicator = controller.communicator
+        seq = communicator.get_task_change_seq()
+        task = create_task("__test_task")
+        controller.broadcast(task=task, fl_ctx=fl_ctx)
+
+        start = time.time()
+        communicator.wait_for_task_change(seq, 5.0)
+        assert time.time() - start < 1.0
+        controller.cancel_task(task)
+        self.teardown_system(controller, fl_ctx)
+
+    def test_wait_timeout(self):
+        controller, fl_ctx, clients = self.setup_system()
+        communicator = controller.communicator
+        start = time.time()
+        communicator.wait_for_task_change(communicator.get_task_change_seq(), 0.5)
+        assert time.time() - start >= 0.5
+        self.teardown_system(controller, fl_ctx)
+
+
+class TestClientTaskIndex(TestController):
+    @staticmethod
+    def wait_till_no_tasks(communicator, timeout=5.0):
+        start = time.time()
+        while communicator._tasks and time.time() - start < timeout:
+            time.sleep(0.01)
+
+    def test_only_targeted_tasks_indexed(self):
+        controller, fl_ctx, clients = self.setup_system(num_of_clients=3)
+        communicator = controller.communicator
+        task1 = create_task("__test_task1")
+        task2 = create_task("__test_task2")
+        controller.broadcast(task=task1, fl_ctx=fl_ctx, targets=[clients[1]])
+        controller.broadcast(task=task2, fl_ctx=fl_ctx, targets=[clients[0], clients[1]])
+
+        assert communicator._get_candidate_tasks(clients[0].name) == [task2]
+        assert communicator._get_candidate_tasks(clients[1].name) == [task1, task2]
+        assert communicator._get_candidate_tasks(clients[2].name) == []
+
+        task_name_out, _, _ = communicator.process_task_request(clients[0], fl_ctx)
+        assert task_name_out == "__test_task2"
+        task_name_out, _, _ = communicator.process_task_request(clients[2], fl_ctx)
+        assert task_name_out == ""
+
+        controller.cancel_task(task1)
+        controller.cancel_task(task2)
+        self.wait_till_no_tasks(communicator)
+        assert communicator._client_task_index == {}
+        self.teardown_system(controller, fl_ctx)
+
+    def test_dynamic_targets_merged_in_schedule_order(self):
+        controller, fl_ctx, clients = self.setup_system(num_of_clients=2)
+        communicator = controller.communicator
+        task1 = create_task("__test_task1")
+        task2 = create_task("__test_task2")
+        task3 = create_task("__test_task3")
+        controller.broadcast(task=task1, fl_ctx=fl_ctx, targets=[clients[0]])
+        controller.relay(task=task2, fl_ctx=fl_ctx, targets=[clients[0]], dynamic_targets=True)
+        controller.broadcast(task=task3, fl_ctx=fl_ctx, targets=[clients[1]])
+
+        assert communicator._get_candidate_tasks(clients[0].name) == [task1, task2]
+        assert communicator._get_candidate_tasks(clients[1].name) == [task2, task3]
+
+        task_name_out, _, _ = communicator.process_task_request(clients[0], fl_ctx)
+        assert task_name_out == "__test_task1"
+        task_name_out, _, _ = communicator.process_task_request(clients[0], fl_ctx)
+        assert task_name_out == "__test_task2"
+
+        for task in [task1, task2, task3]:
+            controller.cancel_task(task)
+        self.wait_till_no_tasks(communicator)
+        assert communicator._client_task_index == {}
+        assert communicator._dynamic_target_tasks == []
+        self.teardown_system(controller, fl_ctx)
+
+
+class TestPendingTasks(TestController):
+    @staticmethod
+    def _set_pending_task_ids(fl_ctx, task_ids):
+        peer_ctx = FLContext()
+        peer_ctx.set_prop(FLContextKey.PENDING_TASK_IDS, task_ids, private=False, sticky=False)
+        fl_ctx.set_peer_context(peer_ctx)
+
+    def test_pending_task_not_resent(self):
+        controller, fl_ctx, clients = self.setup_system()
+        communicator = controller.communicator
+        task1 = create_task("__test_task1")
+        controller.broadcast(task=task1, fl_ctx=fl_ctx)
+        task_name_out, task_id, _ = communicator.process_task_request(clients[0], fl_ctx)
+        assert task_name_out == "__test_task1"
+
+        # the client asks for a task while still working on task1, to prefetch its next task
+        self._set_pending_task_ids(fl_ctx, [task_id])
+        task_name_out, _, _ = communicator.process_task_request(clients[0], fl_ctx)
+        assert task_name_out == ""
+
+        # without pending tasks, the task that has no result is sent again
+        self._set_pending_task_ids(fl_ctx, [])
+        task_name_out, resent_task_id, _ = communicator.process_task_request(clients[0], fl_ctx)
+        assert task_name_out == "__test_task1"
+        assert resent_task_id == task_id
+
+        self._set_pending_task_ids(fl_ctx, [task_id])
+
+        task2 = create_task("__test_task2")
+        controller.broadcast(task=task2, fl_ctx=fl_ctx)
+        task_name_out, _, _ = communicator.process_task_request(clients[0], fl_ctx)
+        assert task_name_out == "__test_task2"
+        controller.cancel_task(task1)
+        controller.cancel_task(task2)
+        self.teardown_system(controller, fl_ctx)
+
+
 @pytest.mark.parametrize("method", ["broadcast", "broadcast_and_wait"])
 class TestBroadcastBehavior(TestController):
     @pytest.mark.parametrize("num_of_clients", [1, 2, 3, 4])
@@ -14,6 +14,7 @@
 
 import random
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import pytest
@@ -22,6 +23,7 @@ from nvflare.apis.dxo import DXO, DataKind, MetaKey, from_shareable
 from nvflare.apis.fl_constant import ReservedKey
 from nvflare.apis.fl_context import FLContext
 from nvflare.apis.shareable import Shareable
+from nvflare.app_common.abstract.sparse_array import SparseArray
 from nvflare.app_common.aggregators.intime_accumulate_model_aggregator import InTimeAccumulateWeightedAggregator
 from nvflare.app_common.app_constant import AppConstants
 
@@ -222,9 +224,14 @@ class TestInTimeAccumulateWeightedAggregator:
 
     @pytest.mark.parametrize("shape", [4, (6, 6)])
     @pytest.mark.parametrize("n_clients", [10, 50, 100])
-    def test_aggregate_random(self, shape, n_clients):
+    @pytest.mark.parametrize(
+        "aggregator_kwargs",
+        [{}, {"num_aggregation_shards": 2}, {"flatten_model": True}],
+        ids=["default", "sharded", "flat"],
+    )
+    def test_aggregate_random(self, shape, n_clients, aggregator_kwargs):
         aggregation_weights = {f"client_{i}": random.random() for i in range(n_clients)}
-        agg = InTimeAccumulateWeightedAggregator(aggregation_weights=aggregation_weights)
+        agg = InTimeAccumulateWeightedAggregator(aggregation_weights=aggregation_weights, **aggregator_kwargs)
         agg._initialize(agg.aggregation_weights, agg.exclude_vars, agg.expected_data_kind)
         weighted_sum = np.zeros(shape)
         sum_of_weights = 0
@@ -251,6 +258,30 @@ class TestInTimeAccumulateWeightedAggregator:
         result_dxo = from_shareable(result)
         np.testing.assert_allclose(result_dxo.data["var1"], weighted_sum / sum_of_weights)
 
+    def test_aggregate_flat_model_vars_change(self):
+        agg = InTimeAccumulateWeightedAggregator(flatten_model=True, exclude_vars="num_batches")
+        agg._initialize(agg.aggregation_weights, agg.exclude_vars, agg.expected_data_kind)
+        fl_ctx = FLContext()
+        fl_ctx.set_prop(AppConstants.CURRENT_ROUND, 0)
+
+        def _accept(client_name, data):
+            s = Shareable()
+            s.set_peer_props({ReservedKey.IDENTITY_NAME: client_name})
+            s.add_cookie(AppConstants.CONTRIBUTION_ROUND, 0)
+            return agg.accept(DXO(DataKind.WEIGHT_DIFF, data=data).update_shareable(s), fl_ctx)
+
+        assert _accept("client_0", {"var1": np.ones(3), "num_batches": np.ones(1)})
+        result_dxo = from_shareable(agg.aggregate(fl_ctx))
+        assert set(result_dxo.data.keys()) == {"var1"}
+
+        # a var added to the model is not dropped by the index of the previous round
+        assert _accept("client_0", {"var1": np.ones(3), "var2": np.ones(2)})
+        # but contributions of the same round must have the same vars
+        assert not _accept("client_1", {"var1": np.ones(3)})
+        result_dxo = from_shareable(agg.aggregate(fl_ctx))
+        assert set(result_dxo.data.keys()) == {"var1", "var2"}
+        np.testing.assert_allclose(result_dxo.data["var2"], np.ones(2))
+
     @pytest.mark.parametrize("num_dxo", [1, 2, 3])
     @pytest.mark.parametrize("shape", [4, (6, 6)])
     @pytest.mark.parametrize("n_clients", [10, 50, 100])
@@ -302,3 +333,123 @@ class TestInTimeAccumulateWeightedAggregator:
             np.testing.assert_allclose(
                 result_dxo.data[dxo_name].data["var1"], weighted_sum[dxo_name] / sum_of_weights[dxo_name]
             )
+
+
+class TestHierarchicalAggregation:
+    @staticmethod
+    def _make_shareable(client_name, data, meta):
+        s = Shareable()
+        s.set_peer_props({ReservedKey.IDENTITY_NAME: client_name})
+        s.add_cookie(AppConstants.CONTRIBUTION_ROUND, 0)
+        return DXO(DataKind.WEIGHT_DIFF, data=data, meta=meta).update_shareable(s)
+
+    @staticmethod
+    def _create_aggregator(**kwargs):
+        agg = InTimeAccumulateWeightedAggregator(**kwargs)
+        agg._initialize(agg.aggregation_weights, agg.exclude_vars, agg.expected_data_kind)
+        return agg
+
+    def test_two_tier_same_as_single_tier(self):
+        fl_ctx = FLContext()
+        fl_ctx.set_prop(AppConstants.CURRENT_ROUND, 0)
+        subtrees = {"relay_0": [f"client_{i}" for i in range(3)], "relay_1": [f"client_{i}" for i in range(3, 7)]}
+        contributions = {
+            client: ({"var1": np.random.random((2, 3))}, {MetaKey.NUM_STEPS_CURRENT_ROUND: random.randint(1, 50)})
+            for clients in subtrees.values()
+            for client in clients
+        }
+
+        single_tier = self._create_aggregator()
+        for client, (data, meta) in contributions.items():
+            assert single_tier.accept(self._make_shareable(client, data, meta), fl_ctx)
+        expected = from_shareable(single_tier.aggregate(fl_ctx)).data["var1"]
+
+        top = self._create_aggregator()
+        for relay, clients in subtrees.items():
+            relay_agg = self._create_aggregator(partial_aggregation=True)
+            for client in clients:
+                data, meta = contributions[client]
+                assert relay_agg.accept(self._make_shareable(client, data, meta), fl_ctx)
+            partial = from_shareable(relay_agg.aggregate(fl_ctx))
+            assert partial.get_meta_prop(MetaKey.AGGREGATED_CONTRIBUTORS) == clients
+            assert top.accept(self._make_shareable(relay, partial.data, partial.meta), fl_ctx)
+
+        result = from_shareable(top.aggregate(fl_ctx))
+        np.testing.assert_allclose(result.data["var1"], expected)
+        assert result.get_meta_prop(MetaKey.AGGREGATED_WEIGHT) is None
+
+    def test_overlapping_subtrees_rejected(self):
+        fl_ctx = FLContext()
+        fl_ctx.set_prop(AppConstants.CURRENT_ROUND, 0)
+        top = self._create_aggregator()
+        data = {"var1": np.ones(3)}
+        meta = {MetaKey.AGGREGATED_WEIGHT: 2.0, MetaKey.AGGREGATED_CONTRIBUTORS: ["client_0", "client_1"]}
+        assert top.accept(self._make_shareable("relay_0", data, meta), fl_ctx)
+        meta = {MetaKey.AGGREGATED_WEIGHT: 2.0, MetaKey.AGGREGATED_CONTRIBUTORS: ["client_1", "client_2"]}
+        assert not top.accept(self._make_shareable("relay_1", data, meta), fl_ctx)
+
+    def test_leaf_overlapping_subtree_rejected(self):
+        fl_ctx = FLContext()
+        fl_ctx.set_prop(AppConstants.CURRENT_ROUND, 0)
+        top = self._create_aggregator()
+        data = {"var1": np.ones(3)}
+        meta = {MetaKey.AGGREGATED_WEIGHT: 2.0, MetaKey.AGGREGATED_CONTRIBUTORS: ["client_0", "client_1"]}
+        assert top.accept(self._make_shareable("relay_0", data, meta), fl_ctx)
+        assert not top.accept(self._make_shareable("client_1", data, {}), fl_ctx)
+
+        top = self._create_aggregator()
+        assert top.accept(self._make_shareable("client_1", data, {}), fl_ctx)
+        assert not top.accept(self._make_shareable("relay_0", data, meta), fl_ctx)
+
+    def test_failed_partial_aggregate_not_recorded(self):
+        fl_ctx = FLContext()
+        fl_ctx.set_prop(AppConstants.CURRENT_ROUND, 0)
+        top = self._create_aggregator(partial_aggregation=True)
+        assert top.accept(self._make_shareable("client_0", {"var1": np.ones(3)}, {}), fl_ctx)
+        meta = {MetaKey.AGGREGATED_WEIGHT: 2.0, MetaKey.AGGREGATED_CONTRIBUTORS: ["client_1", "client_2"]}
+        with pytest.raises(ValueError):
+            top.accept(self._make_shareable("relay_0", {"var1": np.ones(4)}, meta), fl_ctx)
+
+        # the leaves of the failed partial aggregate can still be accepted
+        assert top.accept(self._make_shareable("relay_0", {"var1": np.ones(3)}, meta), fl_ctx)
+        result = from_shareable(top.aggregate(fl_ctx))
+        assert result.get_meta_prop(MetaKey.AGGREGATED_WEIGHT) == 3.0
+        assert result.get_meta_prop(MetaKey.AGGREGATED_CONTRIBUTORS) == ["client_0", "client_1", "client_2"]
+
+    def test_concurrent_partial_aggregates(self):
+        fl_ctx = FLContext()
+        fl_ctx.set_prop(AppConstants.CURRENT_ROUND, 0)
+        top = self._create_aggregator(partial_aggregation=True)
+        data = {"var1": np.ones(1000)}
+        meta = {MetaKey.AGGREGATED_WEIGHT: 2.0, MetaKey.AGGREGATED_CONTRIBUTORS: ["client_0", "client_1"]}
+        shareables = [self._make_shareable(f"relay_{i}", data, meta) for i in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            accepted = list(executor.map(lambda s: top.accept(s, fl_ctx), shareables))
+
+        assert accepted.count(True) == 1
+        result = from_shareable(top.aggregate(fl_ctx))
+        assert result.get_meta_prop(MetaKey.AGGREGATED_WEIGHT) == 2.0
+        assert result.get_meta_prop(MetaKey.AGGREGATED_CONTRIBUTORS) == ["client_0", "client_1"]
+
+
+class TestSparseWeightDiffAggregation:
+    def test_sparse_weight_diff_aggregated_as_weight_diff(self):
+        agg = InTimeAccumulateWeightedAggregator(expected_data_kind=DataKind.WEIGHT_DIFF)
+        agg._initialize(agg.aggregation_weights, agg.exclude_vars, agg.expected_data_kind)
+        fl_ctx = FLContext()
+        fl_ctx.set_prop(AppConstants.CURRENT_ROUND, 0)
+        for i, (data_kind, v) in enumerate(
+            [
+                (DataKind.SPARSE_WEIGHT_DIFF, SparseArray(np.array([0, 3]), np.array([4.0, 8.0]), (2, 2))),
+                (DataKind.WEIGHT_DIFF, np.array([[2.0, 0.0], [0.0, 0.0]])),
+            ]
+        ):
+            s = Shareable()
+            s.set_peer_props({ReservedKey.IDENTITY_NAME: f"client_{i}"})
+            s.add_cookie(AppConstants.CONTRIBUTION_ROUND, 0)
+            dxo = DXO(data_kind, data={"var1": v}, meta={MetaKey.NUM_STEPS_CURRENT_ROUND: 1})
+            assert agg.accept(dxo.update_shareable(s), fl_ctx)
+
+        result_dxo = from_shareable(agg.aggregate(fl_ctx))
+        assert result_dxo.data_kind == DataKind.WEIGHT_DIFF
+        np.testing.assert_allclose(result_dxo.data["var1"], [[3.0, 0.0], [0.0, 4.0]])
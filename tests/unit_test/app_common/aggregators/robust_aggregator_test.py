@@ -0,0 +1,123 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+from nvflare.apis.dxo import DXO, DataKind, from_shareable
+from nvflare.apis.fl_constant import ReservedKey
+from nvflare.apis.fl_context import FLContext
+from nvflare.apis.shareable import Shareable
+from nvflare.app_common.aggregators.robust_aggregator import RobustAggregationMethod, RobustAggregator
+from nvflare.app_common.app_constant import AppConstants
+
+
+def _make_shareable(client_name, data, contribution_round=0, data_kind=DataKind.WEIGHT_DIFF):
+    s = DXO(data_kind, data=data).to_shareable()
+    s.set_peer_props({ReservedKey.IDENTITY_NAME: client_name})
+    s.add_cookie(AppConstants.CONTRIBUTION_ROUND, contribution_round)
+    return s
+
+
+def _get_contributions(n_clients=7, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        f"client_{i}": {"w": rng.random((3, 4)).astype(np.float32), "b": rng.random(5)} for i in range(n_clients)
+    }
+
+
+def _aggregate(agg, contributions):
+    fl_ctx = FLContext()
+    fl_ctx.set_prop(AppConstants.CURRENT_ROUND, 0)
+    for name, data in contributions.items():
+        assert agg.accept(_make_shareable(name, data), fl_ctx)
+    return from_shareable(agg.aggregate(fl_ctx)).data
+
+
+class TestRobustAggregator:
+    @pytest.mark.parametrize("chunk_size", [0, 1, 5])
+    @pytest.mark.parametrize("n_clients", [6, 7])
+    def test_median(self, chunk_size, n_clients):
+        contributions = _get_contributions(n_clients)
+        agg = RobustAggregator(
+            method=RobustAggregationMethod.MEDIAN, chunk_size=chunk_size, expected_num_contributions=2
+        )
+        result = _aggregate(agg, contributions)
+        for k in ["w", "b"]:
+            expected = np.median(np.stack([c[k] for c in contributions.values()]), axis=0)
+            np.testing.assert_allclose(result[k], expected, rtol=1e-6)
+            assert result[k].dtype == contributions["client_0"][k].dtype
+
+    @pytest.mark.parametrize("chunk_size", [0, 4])
+    @pytest.mark.parametrize("trim_ratio", [0.0, 0.2, 0.4])
+    def test_trimmed_mean(self, chunk_size, trim_ratio):
+        contributions = _get_contributions(10)
+        agg = RobustAggregator(trim_ratio=trim_ratio, chunk_size=chunk_size)
+        result = _aggregate(agg, contributions)
+        k = int(trim_ratio * 10)
+        for name in ["w", "b"]:
+            stacked = np.sort(np.stack([c[name] for c in contributions.values()]), axis=0)
+            expected = stacked[k : 10 - k].mean(axis=0)
+            np.testing.assert_allclose(result[name], expected, rtol=1e-6)
+
+    @pytest.mark.parametrize("method", [RobustAggregationMethod.TRIMMED_MEAN, RobustAggregationMethod.MEDIAN])
+    def test_outlier_ignored(self, method):
+        contributions = {f"client_{i}": {"w": np.ones(4)} for i in range(9)}
+        contributions["bad"] = {"w": np.full(4, 1e6)}
+        result = _aggregate(RobustAggregator(method=method, trim_ratio=0.1), contributions)
+        np.testing.assert_allclose(result["w"], np.ones(4))
+
+    @pytest.mark.parametrize("chunk_size", [0, 3])
+    @pytest.mark.parametrize("num_selected", [1, 3])
+    def test_krum(self, chunk_size, num_selected):
+        rng = np.random.default_rng(1)
+        contributions = {f"client_{i}": {"w": 1.0 + 0.01 * rng.random(6)} for i in range(6)}
+        contributions["bad_0"] = {"w": np.full(6, -50.0)}
+        contributions["bad_1"] = {"w": np.full(6, 80.0)}
+        agg = RobustAggregator(
+            method=RobustAggregationMethod.KRUM, num_byzantine=2, num_selected=num_selected, chunk_size=chunk_size
+        )
+        result = _aggregate(agg, contributions)
+        assert np.all(np.abs(result["w"] - 1.0) < 0.02)
+
+    def test_rejects_duplicate_and_mismatched_contributions(self):
+        agg = RobustAggregator(exclude_vars="b")
+        fl_ctx = FLContext()
+        fl_ctx.set_prop(AppConstants.CURRENT_ROUND, 0)
+        assert agg.accept(_make_shareable("client_0", {"w": np.ones(3), "b": np.ones(2)}), fl_ctx)
+        assert not agg.accept(_make_shareable("client_0", {"w": np.ones(3)}), fl_ctx)
+        assert not agg.accept(_make_shareable("client_1", {"w": np.ones(4)}), fl_ctx)
+        assert not agg.accept(_make_shareable("client_2", {"w": np.ones(3)}, contribution_round=1), fl_ctx)
+        assert not agg.accept(_make_shareable("client_3", {"w": np.ones(3)}, data_kind=DataKind.WEIGHTS), fl_ctx)
+        assert agg.accept(_make_shareable("client_4", {"w": np.ones(3) * 3}), fl_ctx)
+
+        result = from_shareable(agg.aggregate(fl_ctx)).data
+        assert list(result.keys()) == ["w"]
+        np.testing.assert_allclose(result["w"], np.full(3, 2.0))
+
+    def test_reuse_after_aggregate(self):
+        agg = RobustAggregator(method=RobustAggregationMethod.MEDIAN, expected_num_contributions=1)
+        _aggregate(agg, _get_contributions(5, seed=1))
+        contributions = _get_contributions(3, seed=2)
+        result = _aggregate(agg, contributions)
+        expected = np.median(np.stack([c["w"] for c in contributions.values()]), axis=0)
+        np.testing.assert_allclose(result["w"], expected, rtol=1e-6)
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"method": "mean"}, {"trim_ratio": 0.5}, {"num_byzantine": -1}, {"num_selected": 0}, {"chunk_size": -1}],
+    )
+    def test_invalid_args(self, kwargs):
+        with pytest.raises(ValueError):
+            RobustAggregator(**kwargs)
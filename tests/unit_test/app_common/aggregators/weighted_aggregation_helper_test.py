@@ -0,0 +1,218 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import numpy as np
+import pytest
+
+from nvflare.app_common.abstract.sparse_array import BlockQuantizedArray, LowRankArray, SparseArray
+from nvflare.app_common.aggregators.weighted_aggregation_helper import (
+    ShardedWeightedAggregationHelper,
+    WeightedAggregationHelper,
+)
+from nvflare.app_common.utils.flat_model import FlatModel, FlatModelIndex
+
+
+def _get_contributions():
+    rng = np.random.default_rng(0)
+    return [
+        (
+            {
+                "conv.weight": rng.random((4, 3)).astype(np.float32),
+                "bn.num_batches": np.array(i + 1, dtype=np.int64),
+                "bn.running_mean": rng.random(5),
+                "loss": 0.5 * i,
+            },
+            i + 1,
+        )
+        for i in range(3)
+    ]
+
+
+class TestWeightedAggregationHelper:
+    @pytest.mark.parametrize("weigh_by_local_iter", [True, False])
+    def test_weighted_average(self, weigh_by_local_iter):
+        helper = WeightedAggregationHelper(weigh_by_local_iter=weigh_by_local_iter)
+        contributions = _get_contributions()
+        for i, (data, weight) in enumerate(contributions):
+            helper.add(data, weight, f"site-{i}", 1)
+        result = helper.get_result()
+
+        total_weight = sum(weight for _, weight in contributions)
+        for k, v in contributions[0][0].items():
+            if weigh_by_local_iter:
+                expected = sum(data[k] * weight for data, weight in contributions) / total_weight
+            else:
+                expected = sum(data[k] for data, _ in contributions) / total_weight
+            np.testing.assert_allclose(result[k], expected, rtol=1e-6)
+
+        assert result["conv.weight"].dtype == np.float32
+        assert result["bn.num_batches"].dtype == np.float64
+        assert result["bn.running_mean"].dtype == np.float64
+        assert isinstance(result["loss"], float)
+        assert helper.total == {}
+
+    def test_contributions_not_modified(self):
+        helper = WeightedAggregationHelper()
+        contributions = _get_contributions()
+        originals = [{k: np.copy(v) for k, v in data.items()} for data, _ in contributions]
+        for i, (data, weight) in enumerate(contributions):
+            helper.add(data, weight, f"site-{i}", 1)
+        helper.get_result()
+
+        for (data, _), original in zip(contributions, originals):
+            for k, v in original.items():
+                np.testing.assert_array_equal(data[k], v)
+
+    def test_exclude_vars(self):
+        helper = WeightedAggregationHelper(exclude_vars="bn")
+        for i, (data, weight) in enumerate(_get_contributions()):
+            helper.add(data, weight, f"site-{i}", 1)
+        assert set(helper.get_result().keys()) == {"conv.weight", "loss"}
+
+    def test_reuse_after_get_result(self):
+        helper = WeightedAggregationHelper()
+        data = {"w": np.ones((2, 2), dtype=np.float32)}
+        helper.add(data, 2, "site-1", 1)
+        first = helper.get_result()
+
+        helper.add({"w": np.full((2, 2), 3.0, dtype=np.float32)}, 1, "site-1", 2)
+        second = helper.get_result()
+        np.testing.assert_array_equal(first["w"], np.ones((2, 2)))
+        np.testing.assert_array_equal(second["w"], np.full((2, 2), 3.0))
+
+
+class TestShardedWeightedAggregationHelper:
+    @pytest.mark.parametrize("num_shards", [1, 2, 5])
+    def test_same_as_unsharded(self, num_shards):
+        helper = WeightedAggregationHelper(exclude_vars="num_batches")
+        sharded_helper = ShardedWeightedAggregationHelper(exclude_vars="num_batches", num_shards=num_shards)
+        for i, (data, weight) in enumerate(_get_contributions()):
+            helper.add(data, weight, f"site-{i}", 1)
+            sharded_helper.add(data, weight, f"site-{i}", 1)
+        assert sharded_helper.get_history() == helper.get_history()
+
+        expected = helper.get_result()
+        result = sharded_helper.get_result()
+        assert list(result.keys()) == list(expected.keys())
+        for k, v in expected.items():
+            np.testing.assert_allclose(result[k], v)
+        assert sharded_helper.get_len() == 0
+        sharded_helper.shutdown()
+
+    def test_concurrent_add(self):
+        sharded_helper = ShardedWeightedAggregationHelper(num_shards=3)
+        data = {f"layer{i}": np.full((10, 10), 1.0, dtype=np.float32) for i in range(6)}
+        threads = [
+            threading.Thread(target=sharded_helper.add, args=(data, i + 1, f"site-{i}", 1)) for i in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sharded_helper.get_len() == 8
+        result = sharded_helper.get_result()
+        for v in result.values():
+            np.testing.assert_allclose(v, 1.0)
+        sharded_helper.shutdown()
+
+    def test_invalid_num_shards(self):
+        with pytest.raises(ValueError, match="num_shards"):
+            ShardedWeightedAggregationHelper(num_shards=0)
+
+
+class TestFlatModelAggregation:
+    def test_same_as_dict(self):
+        contributions = [(data, weight) for data, weight in _get_contributions()]
+        for data, _ in contributions:
+            data.pop("loss")
+
+        helper = WeightedAggregationHelper()
+        flat_helper = WeightedAggregationHelper()
+        index = FlatModelIndex.from_dict(contributions[0][0])
+        for i, (data, weight) in enumerate(contributions):
+            helper.add(data, weight, f"site-{i}", 1)
+            flat_helper.add(FlatModel.from_dict(data, index=index), weight, f"site-{i}", 1)
+
+        expected = helper.get_result()
+        result = flat_helper.get_result()
+        assert isinstance(result, FlatModel)
+        result = result.to_dict()
+        for k, v in expected.items():
+            np.testing.assert_allclose(result[k], v)
+            assert result[k].dtype == v.dtype
+
+    def test_different_index(self):
+        helper = WeightedAggregationHelper()
+        helper.add(FlatModel.from_dict({"a": np.ones(2)}), 1, "site-1", 1)
+        with pytest.raises(ValueError):
+            helper.add(FlatModel.from_dict({"b": np.ones(2)}), 1, "site-2", 1)
+
+
+class TestSparseAggregation:
+    def test_sparse_and_low_rank_same_as_dense(self):
+        rng = np.random.default_rng(0)
+        dense_contributions = []
+        contributions = []
+        for i in range(4):
+            indices = np.sort(rng.choice(12, size=4, replace=False))
+            sparse = SparseArray(indices, rng.random(4).astype(np.float32), (3, 4))
+            low_rank = LowRankArray(rng.random((6, 2)), rng.random((2, 5)))
+            # mix dense and sparse contributions of the same var
+            v = sparse if i % 2 else sparse.to_dense()
+            contributions.append(({"w": v, "lora": low_rank}, i + 1))
+            dense_contributions.append(({"w": sparse.to_dense(), "lora": low_rank.to_dense()}, i + 1))
+
+        helper = WeightedAggregationHelper()
+        for i, (data, weight) in enumerate(dense_contributions):
+            helper.add(data, weight, f"site-{i}", 1)
+        expected = helper.get_result()
+
+        for i, (data, weight) in enumerate(contributions):
+            helper.add(data, weight, f"site-{i}", 1)
+        result = helper.get_result()
+        for k, v in expected.items():
+            np.testing.assert_allclose(result[k], v)
+            assert result[k].dtype == v.dtype
+
+    @pytest.mark.parametrize("packed", [False, True])
+    @pytest.mark.parametrize("shape", [(8, 16), (7, 11)])
+    def test_block_quantized(self, packed, shape):
+        rng = np.random.default_rng(1)
+        size = int(np.prod(shape))
+        blocksize = 16
+        code = np.sort(rng.uniform(-1, 1, 16 if packed else 256)).astype(np.float32)
+        helper = WeightedAggregationHelper()
+        expected = np.zeros(shape)
+        for i in range(3):
+            indices = rng.integers(0, code.size, size=size + size % 2).astype(np.uint8)
+            absmax = rng.uniform(0, 10, (size + blocksize - 1) // blocksize).astype(np.float32)
+            dense = code[indices[:size]] * np.repeat(absmax, blocksize)[:size]
+            quantized = (indices[::2] << 4) | indices[1::2] if packed else indices[:size]
+            v = BlockQuantizedArray(quantized, absmax, code, blocksize, shape, packed=packed)
+            np.testing.assert_allclose(v.to_dense(), dense.reshape(shape), rtol=1e-6)
+
+            # chunks smaller than the array
+            chunked = np.zeros(shape)
+            v.add_to(chunked, 2.0, chunk_size=blocksize * 2)
+            np.testing.assert_allclose(chunked, 2 * dense.reshape(shape), rtol=1e-6)
+
+            helper.add({"w": v}, i + 1, f"site-{i}", 1)
+            expected += (i + 1) * dense.reshape(shape)
+
+        result = helper.get_result()["w"]
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, expected / 6, rtol=1e-5)
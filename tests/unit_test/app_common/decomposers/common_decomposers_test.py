@@ -22,7 +22,8 @@ from nvflare.apis.utils.decomposers import flare_decomposers
 from nvflare.app_common.abstract.fl_model import FLModel, ParamsType
 from nvflare.app_common.abstract.learnable import Learnable
 from nvflare.app_common.abstract.model import ModelLearnable
-from nvflare.app_common.decomposers import common_decomposers
+from nvflare.app_common.abstract.sparse_array import LowRankArray, SignArray, SparseArray
+from nvflare.app_common.decomposers import common_decomposers, numpy_decomposers
 from nvflare.app_common.widgets.event_recorder import _CtxPropReq, _EventReq, _EventStats
 from nvflare.fuel.utils import fobs
 
@@ -34,6 +35,7 @@ class TestCommonDecomposers:
     def setup_class(cls):
         flare_decomposers.register()
         common_decomposers.register()
+        numpy_decomposers.register()
 
     @pytest.mark.parametrize(
         "size",
@@ -153,6 +155,27 @@ class TestCommonDecomposers:
         assert new_stats.prop_block_list_violation == stats.prop_block_list_violation
         assert new_stats.peer_ctx_missing == stats.peer_ctx_missing
 
+    def test_sparse_arrays(self):
+        sparse = SparseArray(np.array([1, 5], dtype=np.int32), np.array([0.5, -2.0], dtype=np.float32), (2, 3))
+        low_rank = LowRankArray(np.ones((4, 2), dtype=np.float32), np.full((2, 3), 2.0, dtype=np.float32))
+        signs = SignArray.from_dense(np.array([[1.0, -2.0, 0.0], [-1.0, 3.0, 4.0]], dtype=np.float32), 0.5)
+        new_data = self._run_fobs({"sparse": sparse, "low_rank": low_rank, "signs": signs})
+
+        new_sparse = new_data["sparse"]
+        assert isinstance(new_sparse, SparseArray)
+        assert new_sparse.shape == (2, 3)
+        np.testing.assert_array_equal(new_sparse.to_dense(), sparse.to_dense())
+        assert new_sparse.indices.dtype == np.int32
+
+        new_low_rank = new_data["low_rank"]
+        assert isinstance(new_low_rank, LowRankArray)
+        np.testing.assert_array_equal(new_low_rank.to_dense(), low_rank.to_dense())
+
+        new_signs = new_data["signs"]
+        assert isinstance(new_signs, SignArray)
+        assert new_signs.dtype == np.float32
+        np.testing.assert_array_equal(new_signs.to_dense(), [[0.5, -0.5, 0.5], [-0.5, 0.5, 0.5]])
+
     @staticmethod
     def _run_fobs(data: Any) -> Any:
         buf = fobs.dumps(data)
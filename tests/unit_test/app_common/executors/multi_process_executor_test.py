@@ -0,0 +1,53 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+import numpy as np
+
+from nvflare.apis.dxo import DXO, DataKind, from_shareable
+from nvflare.apis.shareable import Shareable
+from nvflare.app_common.decomposers.numpy_decomposers import NumpyArrayDecomposer
+from nvflare.app_common.executors.multi_process_executor import MultiProcessExecutor, get_task_input_accessor
+from nvflare.fuel.utils import fobs
+from nvflare.fuel.utils.fobs.decomposer import DictDecomposer
+
+
+class _TestMultiProcessExecutor(MultiProcessExecutor):
+    def get_multi_process_command(self) -> str:
+        return ""
+
+
+class TestSharedTaskInput:
+    def test_write_read_remove(self):
+        fobs.register(DictDecomposer(Shareable))
+        fobs.register(NumpyArrayDecomposer)
+        executor = _TestMultiProcessExecutor(executor_id="e", num_of_processes=2, components=[], shared_task_input=True)
+        weights = {"w": np.arange(5000, dtype=np.float32), "b": np.ones(3)}
+        shareable = DXO(data_kind=DataKind.WEIGHTS, data=weights).to_shareable()
+        executor.task_input_path = executor._write_task_input(shareable)
+        accessor = get_task_input_accessor(executor.task_input_path)
+        assert os.path.exists(accessor.get_segment_path(executor.task_input_path))
+
+        # every rank reads the same input, and can change it without affecting the others
+        ranks = [from_shareable(accessor.read(executor.task_input_path)) for _ in range(2)]
+        ranks[0].data["w"] *= 2
+        for k, v in weights.items():
+            np.testing.assert_array_equal(ranks[1].data[k], v)
+
+        task_input_path = executor.task_input_path
+        executor._remove_task_input()
+        assert executor.task_input_path is None
+        assert not os.path.exists(task_input_path)
+        assert not os.path.exists(accessor.get_segment_path(task_input_path))
@@ -0,0 +1,147 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from nvflare.apis.client import Client
+from nvflare.apis.dxo import DXO, DataKind, MetaKey, from_shareable
+from nvflare.apis.event_type import EventType
+from nvflare.apis.fl_constant import FLContextKey, ReservedKey, ReturnCode
+from nvflare.apis.fl_context import FLContextManager
+from nvflare.apis.shareable import ReservedHeaderKey, Shareable, make_reply
+from nvflare.apis.signal import Signal
+from nvflare.app_common.aggregators.intime_accumulate_model_aggregator import InTimeAccumulateWeightedAggregator
+from nvflare.app_common.app_constant import AppConstants
+from nvflare.app_common.executors.relay_aggregation_executor import RelayAggregationExecutor
+
+
+class _Site:
+    """A site that routes the aux requests of its relay executor to the executors of its children."""
+
+    def __init__(self, name: str, children: dict, partial_aggregation=True):
+        self.name = name
+        self.children = children
+        self.aggregator = InTimeAccumulateWeightedAggregator(
+            expected_data_kind=DataKind.WEIGHTS, partial_aggregation=partial_aggregation
+        )
+        engine = Mock()
+        engine.all_clients = {child: Client(child, None) for child in children}
+        engine.validate_targets.side_effect = lambda names: ([engine.all_clients[n] for n in names], [])
+        engine.get_component.side_effect = lambda component_id: self.aggregator
+        engine.send_aux_request.side_effect = self._send_aux_request
+        self.fl_ctx_manager = FLContextManager(engine=engine, identity_name=name, job_id="job")
+
+        self.executor = RelayAggregationExecutor(children=list(children), aggregator_id="aggregator")
+        fl_ctx = self.fl_ctx_manager.new_context()
+        fl_ctx.set_prop(FLContextKey.RUNNER, Mock(task_data_filters={}, task_result_filters={}))
+        self.aggregator.handle_event(EventType.START_RUN, fl_ctx)
+        self.executor.handle_event(EventType.START_RUN, fl_ctx)
+
+    def _send_aux_request(self, targets, topic, request, timeout, fl_ctx, secure=False):
+        replies = {}
+        task_name = request.get_header(ReservedHeaderKey.TASK_NAME)
+        for target in targets:
+            # like the ClientRunner of the child
+            reply = self.children[target](task_name, request)
+            reply.set_cookie_jar(request.get_cookie_jar())
+            replies[target] = reply
+        return replies
+
+    def __call__(self, task_name: str, task_data: Shareable) -> Shareable:
+        return self.executor.execute(task_name, task_data, self.fl_ctx_manager.new_context(), Signal())
+
+
+def _leaf(data: np.ndarray, num_steps: int):
+    def _execute(task_name, task_data):
+        return DXO(DataKind.WEIGHTS, data={"w": data}, meta={MetaKey.NUM_STEPS_CURRENT_ROUND: num_steps}).to_shareable()
+
+    return _execute
+
+
+def _failed_leaf(task_name, task_data):
+    return make_reply(ReturnCode.EXECUTION_EXCEPTION)
+
+
+def _make_task_data(current_round=0):
+    task_data = DXO(DataKind.WEIGHTS, data={"w": np.zeros(3)}).to_shareable()
+    task_data.add_cookie(AppConstants.CONTRIBUTION_ROUND, current_round)
+    return task_data
+
+
+def _aggregate(contributions: dict, current_round=0):
+    aggregator = InTimeAccumulateWeightedAggregator(expected_data_kind=DataKind.WEIGHTS)
+    fl_ctx = FLContextManager(engine=Mock(), identity_name="server", job_id="job").new_context()
+    aggregator.handle_event(EventType.START_RUN, fl_ctx)
+    fl_ctx.set_prop(AppConstants.CURRENT_ROUND, current_round)
+    for name, result in contributions.items():
+        # like the ClientRunner of the site and the server
+        result.set_cookie_jar(_make_task_data(current_round).get_cookie_jar())
+        result.set_peer_props({ReservedKey.IDENTITY_NAME: name})
+        assert aggregator.accept(result, fl_ctx)
+    return from_shareable(aggregator.aggregate(fl_ctx))
+
+
+class TestRelayAggregationExecutor:
+    def test_two_tier_same_as_single_tier(self):
+        leaves = {f"site-{i}": (np.random.random(3), random.randint(1, 10)) for i in range(3, 9)}
+        expected = _aggregate({name: _leaf(*leaf)("train", _make_task_data()) for name, leaf in leaves.items()})
+
+        # the second relay has a relay of its own
+        sub_relay = _Site("site-9", {name: _leaf(*leaves[name]) for name in ("site-7", "site-8")})
+        relays = {
+            "site-1": _Site("site-1", {name: _leaf(*leaves[name]) for name in ("site-3", "site-4")}),
+            "site-2": _Site(
+                "site-2", {"site-5": _leaf(*leaves["site-5"]), "site-6": _leaf(*leaves["site-6"]), "site-9": sub_relay}
+            ),
+        }
+
+        results = {}
+        for name, relay in relays.items():
+            results[name] = relay("train", _make_task_data())
+            assert results[name].get_return_code(ReturnCode.OK) == ReturnCode.OK
+        result = _aggregate(results)
+        np.testing.assert_allclose(result.data["w"], expected.data["w"])
+
+        contributors = from_shareable(results["site-2"]).get_meta_prop(MetaKey.AGGREGATED_CONTRIBUTORS)
+        assert sorted(contributors) == ["site-5", "site-6", "site-7", "site-8"]
+
+    def test_failed_children_ignored(self):
+        relay = _Site("site-1", {"site-3": _leaf(np.ones(3), 2), "site-4": _failed_leaf})
+        result = from_shareable(relay("train", _make_task_data()))
+        np.testing.assert_allclose(result.data["w"], np.ones(3))
+        assert result.get_meta_prop(MetaKey.AGGREGATED_WEIGHT) == 2.0
+        assert result.get_meta_prop(MetaKey.AGGREGATED_CONTRIBUTORS) == ["site-3"]
+
+    def test_all_children_failed(self):
+        relay = _Site("site-1", {"site-3": _failed_leaf, "site-4": _failed_leaf})
+        assert relay("train", _make_task_data()).get_return_code() == ReturnCode.EXECUTION_EXCEPTION
+
+    def test_reset_every_round(self):
+        relay = _Site("site-1", {"site-3": _leaf(np.ones(3), 1)})
+        assert relay("train", _make_task_data(current_round=0)).get_return_code(ReturnCode.OK) == ReturnCode.OK
+        result = from_shareable(relay("train", _make_task_data(current_round=1)))
+        assert result.get_meta_prop(MetaKey.AGGREGATED_CONTRIBUTORS) == ["site-3"]
+
+    def test_aggregator_not_partial(self):
+        relay = _Site("site-1", {"site-3": _leaf(np.ones(3), 1)}, partial_aggregation=False)
+        assert relay("train", _make_task_data()).get_return_code() == ReturnCode.EXECUTION_EXCEPTION
+
+    @pytest.mark.parametrize("children", [[], None, ["site-3", ""]])
+    def test_invalid_children(self, children):
+        with pytest.raises(Exception):
+            RelayAggregationExecutor(children=children, aggregator_id="aggregator")
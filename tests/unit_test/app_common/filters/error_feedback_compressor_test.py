@@ -0,0 +1,109 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+from nvflare.apis.dxo import DXO, DataKind, from_shareable
+from nvflare.apis.event_type import EventType
+from nvflare.apis.fl_context import FLContext
+from nvflare.app_common.abstract.sparse_array import SignArray, SparseArray
+from nvflare.app_common.aggregators.weighted_aggregation_helper import WeightedAggregationHelper
+from nvflare.app_common.filters import ErrorFeedbackCompressor, WeightDiffDecompressor
+
+
+def _run(f, data: dict) -> DXO:
+    dxo = DXO(data_kind=DataKind.WEIGHT_DIFF, data=data)
+    return from_shareable(f.process(dxo.to_shareable(), FLContext()))
+
+
+class TestErrorFeedbackCompressor:
+    @pytest.mark.parametrize(
+        "method,compressed_type", [("top_k", SparseArray), ("random_k", SparseArray), ("sign", SignArray)]
+    )
+    def test_residual_carried_over(self, method, compressed_type):
+        rng = np.random.default_rng(0)
+        f = ErrorFeedbackCompressor(method=method, ratio=0.1, min_size=10, seed=0)
+        total_in = np.zeros((20, 10))
+        total_sent = np.zeros((20, 10))
+        for _ in range(5):
+            diff = rng.standard_normal((20, 10)).astype(np.float32)
+            total_in += diff
+            new_dxo = _run(f, {"weight": diff, "bias": np.ones(5, dtype=np.float32)})
+
+            assert new_dxo.data_kind == DataKind.SPARSE_WEIGHT_DIFF
+            np.testing.assert_array_equal(new_dxo.data["bias"], np.ones(5))
+            compressed = new_dxo.data["weight"]
+            assert isinstance(compressed, compressed_type)
+            if method != "sign":
+                assert compressed.indices.size == 20
+            total_sent += compressed.to_dense()
+
+            # everything that was not sent is kept in the residual
+            np.testing.assert_allclose(total_sent + f._residuals["weight"], total_in, atol=1e-4)
+
+    def test_top_k_sends_largest_corrected_values(self):
+        f = ErrorFeedbackCompressor(method="top_k", ratio=0.25, min_size=1)
+        sent = _run(f, {"w": np.array([4.0, 1.0, 3.0, 2.0])}).data["w"]
+        np.testing.assert_array_equal(sent.to_dense(), [4.0, 0.0, 0.0, 0.0])
+
+        # the residual of the second element makes it the largest one
+        sent = _run(f, {"w": np.array([0.0, 2.5, 0.0, 0.0])}).data["w"]
+        np.testing.assert_array_equal(sent.to_dense(), [0.0, 3.5, 0.0, 0.0])
+        sent = _run(f, {"w": np.array([0.0, 0.0, 0.0, 0.0])}).data["w"]
+        np.testing.assert_array_equal(sent.to_dense(), [0.0, 0.0, 3.0, 0.0])
+
+    def test_residual_reset(self):
+        f = ErrorFeedbackCompressor(method="top_k", ratio=0.5, min_size=1)
+        _run(f, {"w": np.array([1.0, 2.0])})
+        np.testing.assert_array_equal(f._residuals["w"], [1.0, 0.0])
+
+        # a var with a different shape starts a new residual
+        _run(f, {"w": np.array([1.0, 2.0, 3.0])})
+        np.testing.assert_array_equal(f._residuals["w"], [1.0, 2.0, 0.0])
+
+        f.handle_event(EventType.END_RUN, FLContext())
+        assert not f._residuals
+
+    def test_input_not_modified(self):
+        diff = np.arange(8, dtype=np.float32)
+        f = ErrorFeedbackCompressor(method="sign", min_size=1)
+        _run(f, {"w": diff})
+        _run(f, {"w": diff})
+        np.testing.assert_array_equal(diff, np.arange(8))
+
+    def test_aggregation(self):
+        rng = np.random.default_rng(1)
+        diffs = [rng.standard_normal(100).astype(np.float32) for _ in range(3)]
+        methods = ["top_k", "random_k", "sign"]
+        dxos = [
+            _run(ErrorFeedbackCompressor(method=m, ratio=0.2, min_size=1), {"w": d}) for m, d in zip(methods, diffs)
+        ]
+
+        helper = WeightedAggregationHelper()
+        for i, dxo in enumerate(dxos):
+            helper.add({"w": dxo.data["w"]}, weight=i + 1, contributor_name=f"site-{i}", contribution_round=0)
+        result = helper.get_result()["w"]
+
+        dense = [WeightDiffDecompressor().process(dxo.to_shareable(), FLContext()) for dxo in dxos]
+        dense = [from_shareable(s) for s in dense]
+        assert all(dxo.data_kind == DataKind.WEIGHT_DIFF for dxo in dense)
+        expected = sum((i + 1) * dxo.data["w"].astype(np.float64) for i, dxo in enumerate(dense)) / 6
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, expected, rtol=1e-6, atol=1e-6)
+
+    @pytest.mark.parametrize("kwargs", [{"method": "qsgd"}, {"ratio": 0}, {"min_size": -1}])
+    def test_invalid_args(self, kwargs):
+        with pytest.raises(ValueError):
+            ErrorFeedbackCompressor(**kwargs)
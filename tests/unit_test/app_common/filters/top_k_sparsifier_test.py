@@ -0,0 +1,63 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+from nvflare.apis.dxo import DXO, DataKind, from_shareable
+from nvflare.apis.fl_context import FLContext
+from nvflare.app_common.abstract.sparse_array import SparseArray
+from nvflare.app_common.filters import TopKSparsifier
+
+
+class TestTopKSparsifier:
+    def test_sparsify(self):
+        rng = np.random.default_rng(0)
+        weights = rng.standard_normal((20, 10)).astype(np.float32)
+        bias = rng.standard_normal(5).astype(np.float32)
+        dxo = DXO(data_kind=DataKind.WEIGHT_DIFF, data={"weight": weights.copy(), "bias": bias.copy()})
+
+        f = TopKSparsifier(ratio=0.1, min_size=10)
+        new_dxo = from_shareable(f.process(dxo.to_shareable(), FLContext()))
+
+        assert new_dxo.data_kind == DataKind.SPARSE_WEIGHT_DIFF
+        np.testing.assert_array_equal(new_dxo.data["bias"], bias)
+        sparse = new_dxo.data["weight"]
+        assert isinstance(sparse, SparseArray)
+        assert sparse.shape == weights.shape
+        assert sparse.indices.size == 20
+        assert sparse.indices.dtype == np.int32
+        assert np.all(np.diff(sparse.indices) > 0)
+
+        threshold = np.sort(np.abs(weights).reshape(-1))[-20]
+        dense = sparse.to_dense()
+        kept = np.abs(weights) >= threshold
+        np.testing.assert_array_equal(dense[kept], weights[kept])
+        assert np.all(dense[~kept] == 0)
+
+    def test_small_vars_not_filtered(self):
+        dxo = DXO(data_kind=DataKind.WEIGHT_DIFF, data={"bias": np.ones(5)})
+        new_dxo = from_shareable(TopKSparsifier(min_size=10).process(dxo.to_shareable(), FLContext()))
+        assert new_dxo.data_kind == DataKind.WEIGHT_DIFF
+        np.testing.assert_array_equal(new_dxo.data["bias"], np.ones(5))
+
+    def test_weights_not_filtered(self):
+        dxo = DXO(data_kind=DataKind.WEIGHTS, data={"weight": np.ones(100)})
+        new_dxo = from_shareable(TopKSparsifier(min_size=10).process(dxo.to_shareable(), FLContext()))
+        assert new_dxo.data_kind == DataKind.WEIGHTS
+
+    @pytest.mark.parametrize("ratio", [0, 1.5])
+    def test_invalid_ratio(self, ratio):
+        with pytest.raises(ValueError):
+            TopKSparsifier(ratio=ratio)
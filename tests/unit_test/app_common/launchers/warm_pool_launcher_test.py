@@ -0,0 +1,165 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import time
+
+import pytest
+
+from nvflare.apis.fl_constant import FLContextKey
+from nvflare.apis.fl_context import FLContext
+from nvflare.apis.signal import Signal
+from nvflare.apis.workspace import Workspace
+from nvflare.app_common.abstract.launcher import LauncherRunStatus
+from nvflare.app_common.launchers.warm_pool_launcher import WarmPoolLauncher
+
+SCRIPT = """
+import os
+import sys
+
+with open("runs.txt", "a") as f:
+    f.write(f"{os.getpid()} {'warm_module' in sys.modules} {' '.join(sys.argv[1:])}\\n")
+sys.exit(int(os.environ.get("EXIT_CODE", "0")))
+"""
+
+NON_BLOCKING_SEND_SCRIPT = """
+import time
+
+import nvflare.client.api as flare
+from nvflare.app_common.abstract.fl_model import FLModel
+from nvflare.client.ex_process.api import ExProcessClientAPI
+
+
+def _record(event):
+    with open("events.txt", "a") as f:
+        f.write(event + "\\n")
+
+
+class _ModelRegistry:
+    # stands in for the model registry and agent created by flare.init()
+    def __init__(self):
+        self.flare_agent = self
+
+    def submit_model(self, model):
+        time.sleep(0.5)
+        _record("sent")
+
+    def clear(self):
+        pass
+
+    def stop(self):
+        _record("stopped")
+
+
+client_api = ExProcessClientAPI()
+client_api.process_model_registry = _ModelRegistry()
+client_api.receive_called = True
+flare.client_api = client_api
+flare.send(FLModel(params={"w": 1.0}), blocking=False)
+"""
+
+
+@pytest.fixture
+def app_dir(tmp_path):
+    (tmp_path / "train.py").write_text(SCRIPT)
+    (tmp_path / "warm_module.py").write_text("")
+    (tmp_path / "startup").mkdir()
+    (tmp_path / "local").mkdir()
+    return str(tmp_path)
+
+
+def _make_launcher(app_dir, **kwargs):
+    launcher = WarmPoolLauncher(f"{sys.executable} train.py --epochs 2", **kwargs)
+    launcher._app_dir = app_dir
+    fl_ctx = FLContext()
+    fl_ctx.set_prop(FLContextKey.WORKSPACE_OBJECT, Workspace(app_dir, "site-1"), private=True, sticky=False)
+    fl_ctx.set_prop(FLContextKey.CURRENT_JOB_ID, "job", private=True, sticky=False)
+    return launcher, fl_ctx
+
+
+def _run_task(launcher, fl_ctx, timeout=30.0):
+    assert launcher.launch_task("train", None, fl_ctx, Signal())
+    start = time.time()
+    while launcher.check_run_status("train", fl_ctx) == LauncherRunStatus.RUNNING:
+        assert time.time() - start < timeout
+        time.sleep(0.05)
+    status = launcher.check_run_status("train", fl_ctx)
+    launcher.stop_task("train", fl_ctx, Signal())
+    return status
+
+
+def _read_runs(app_dir):
+    with open(os.path.join(app_dir, "runs.txt")) as f:
+        return [line.split(" ", 2) for line in f.read().splitlines()]
+
+
+class TestWarmPoolLauncher:
+    def test_new_worker_per_task(self, app_dir):
+        launcher, fl_ctx = _make_launcher(app_dir, preload_modules=["warm_module"])
+        try:
+            assert launcher.check_run_status("train", fl_ctx) == LauncherRunStatus.NOT_RUNNING
+            assert _run_task(launcher, fl_ctx) == LauncherRunStatus.COMPLETE_SUCCESS
+            assert _run_task(launcher, fl_ctx) == LauncherRunStatus.COMPLETE_SUCCESS
+            assert len(launcher._idle_workers) == 1
+        finally:
+            launcher.finalize(fl_ctx)
+
+        runs = _read_runs(app_dir)
+        assert len(runs) == 2
+        assert runs[0][0] != runs[1][0]
+        assert all(warm == "True" and args == "--epochs 2" for _, warm, args in runs)
+
+    def test_reuse_worker(self, app_dir):
+        launcher, fl_ctx = _make_launcher(app_dir, max_tasks_per_worker=2)
+        try:
+            for _ in range(3):
+                assert _run_task(launcher, fl_ctx) == LauncherRunStatus.COMPLETE_SUCCESS
+            assert len(launcher._idle_workers) == 1
+        finally:
+            launcher.finalize(fl_ctx)
+
+        pids = [pid for pid, _, _ in _read_runs(app_dir)]
+        assert pids[0] == pids[1]
+        assert pids[2] != pids[1]
+
+    def test_failed_task(self, app_dir, monkeypatch):
+        monkeypatch.setenv("EXIT_CODE", "3")
+        launcher, fl_ctx = _make_launcher(app_dir, max_tasks_per_worker=2)
+        try:
+            assert _run_task(launcher, fl_ctx) == LauncherRunStatus.COMPLETE_FAILED
+            assert _run_task(launcher, fl_ctx) == LauncherRunStatus.COMPLETE_FAILED
+        finally:
+            launcher.finalize(fl_ctx)
+
+        pids = [pid for pid, _, _ in _read_runs(app_dir)]
+        # a worker whose task failed is not reused
+        assert pids[0] != pids[1]
+
+    @pytest.mark.parametrize("script", ["bash run.sh", "python", "python -u", "python -m"])
+    def test_invalid_script(self, script):
+        with pytest.raises(ValueError):
+            WarmPoolLauncher(script)
+
+    def test_non_blocking_send_at_script_end(self, app_dir):
+        with open(os.path.join(app_dir, "train.py"), "w") as f:
+            f.write(NON_BLOCKING_SEND_SCRIPT)
+        launcher, fl_ctx = _make_launcher(app_dir)
+        try:
+            assert _run_task(launcher, fl_ctx) == LauncherRunStatus.COMPLETE_SUCCESS
+        finally:
+            launcher.finalize(fl_ctx)
+
+        with open(os.path.join(app_dir, "events.txt")) as f:
+            assert f.read().splitlines() == ["sent", "stopped"]
@@ -0,0 +1,81 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+from nvflare.app_common.utils.flat_model import FlatModel, FlatModelIndex
+
+
+def _get_params():
+    return {
+        "conv.weight": np.arange(24, dtype=np.float32).reshape(2, 3, 4),
+        "conv.bias": np.array([1.0, 2.0], dtype=np.float32),
+        "bn.num_batches_tracked": np.array(7, dtype=np.int64),
+    }
+
+
+class TestFlatModel:
+    def test_round_trip(self):
+        params = _get_params()
+        flat_model = FlatModel.from_dict(params)
+
+        assert flat_model.buffer.ndim == 1
+        assert flat_model.buffer.size == 24 + 2 + 1
+        assert flat_model.buffer.dtype == np.float64
+        result = flat_model.to_dict()
+        assert list(result.keys()) == list(params.keys())
+        for k, v in params.items():
+            assert result[k].dtype == v.dtype
+            np.testing.assert_array_equal(result[k], v)
+
+    def test_views(self):
+        params = {"a": np.ones((2, 2), dtype=np.float32), "b": np.zeros(3, dtype=np.float32)}
+        flat_model = FlatModel.from_dict(params)
+        flat_model.buffer *= 2
+        np.testing.assert_array_equal(flat_model.get("a"), np.full((2, 2), 2.0))
+        assert np.shares_memory(flat_model.to_dict()["a"], flat_model.buffer)
+
+    def test_reuse_index_and_buffer(self):
+        index = FlatModelIndex.from_dict(_get_params(), exclude_vars="num_batches")
+        assert index.names == ["conv.weight", "conv.bias"]
+        assert index.offsets == [0, 24]
+
+        out = np.empty(index.size, dtype=np.float32)
+        flat_model = FlatModel.from_dict(_get_params(), index=index, out=out)
+        assert flat_model.buffer is out
+        assert flat_model.index is index
+        assert set(flat_model.to_dict().keys()) == {"conv.weight", "conv.bias"}
+
+    def test_index_matches(self):
+        params = _get_params()
+        index = FlatModelIndex.from_dict(params)
+        assert index.matches(params)
+        params["conv.bias"] = np.zeros(3)
+        assert not index.matches(params)
+        with pytest.raises(ValueError, match="conv.bias"):
+            FlatModel.from_dict(params, index=index)
+
+    def test_index_matches_extra_vars(self):
+        params = _get_params()
+        index = FlatModelIndex.from_dict(params, exclude_vars="num_batches")
+        assert not index.matches(params)
+        assert index.matches(params, exclude_vars="num_batches")
+        params["fc.weight"] = np.zeros(3, dtype=np.float32)
+        assert not index.matches(params, exclude_vars="num_batches")
+
+    def test_invalid_buffer(self):
+        index = FlatModelIndex.from_dict(_get_params())
+        with pytest.raises(ValueError):
+            FlatModel(np.zeros(3), index)
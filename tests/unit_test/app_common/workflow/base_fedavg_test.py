@@ -0,0 +1,115 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from nvflare.apis.fl_constant import FLMetaKey
+from nvflare.apis.fl_context import FLContext
+from nvflare.app_common.abstract.fl_model import FLModel, ParamsType
+from nvflare.app_common.workflows.fedavg import FedAvg
+from nvflare.app_common.workflows.scaffold import Scaffold, scaffold_aggregate_fn
+
+
+def _create_results(num_results=3, with_metrics=True):
+    results = []
+    for i in range(num_results):
+        results.append(
+            FLModel(
+                params_type=ParamsType.FULL,
+                params={"a": np.full((2, 3), float(i)), "b": np.array([i, i + 1.0])},
+                metrics={"accuracy": 0.1 * i} if with_metrics else None,
+                current_round=2,
+                meta={FLMetaKey.NUM_STEPS_CURRENT_ROUND: i + 1, "client_name": f"site-{i}"},
+            )
+        )
+    return results
+
+
+def _create_controller(aggregate_in_time):
+    controller = FedAvg(aggregate_in_time=aggregate_in_time)
+    controller.fl_ctx = FLContext()
+    controller.event = Mock()
+    controller.panic = Mock()
+    return controller
+
+
+class TestBaseFedAvg:
+    @pytest.mark.parametrize("with_metrics", [True, False])
+    def test_in_time_aggregation_same_as_aggregate_fn(self, with_metrics):
+        expected = FedAvg.aggregate_fn(_create_results(with_metrics=with_metrics))
+
+        controller = _create_controller(aggregate_in_time=True)
+        for result in _create_results(with_metrics=with_metrics):
+            controller._collect_result(result)
+        assert controller._results == []
+        aggr_result = controller.aggregate([])
+
+        assert aggr_result.params.keys() == expected.params.keys()
+        for k, v in expected.params.items():
+            np.testing.assert_allclose(aggr_result.params[k], v)
+        assert aggr_result.metrics == expected.metrics
+        assert aggr_result.params_type == expected.params_type
+        assert aggr_result.meta == expected.meta
+
+    def test_in_time_aggregation_reset_after_aggregate(self):
+        controller = _create_controller(aggregate_in_time=True)
+        results = _create_results()
+        for result in results:
+            controller._collect_result(result)
+        controller.aggregate([])
+
+        controller._collect_result(results[1])
+        aggr_result = controller.aggregate([])
+        np.testing.assert_allclose(aggr_result.params["a"], results[1].params["a"])
+        assert aggr_result.meta["nr_aggregated"] == 1
+
+    def test_in_time_aggregation_empty_result(self):
+        controller = _create_controller(aggregate_in_time=True)
+        controller._collect_result(FLModel(meta={"client_name": "site-1"}))
+        with pytest.raises(ValueError, match="site-1"):
+            controller.aggregate([])
+
+    def test_results_kept_without_in_time_aggregation(self):
+        controller = _create_controller(aggregate_in_time=False)
+        results = _create_results()
+        for result in results:
+            controller._collect_result(result)
+        assert controller._results == results
+
+    def test_in_time_aggregation_rejects_custom_aggregate_fn(self):
+        controller = _create_controller(aggregate_in_time=True)
+        for result in _create_results():
+            controller._collect_result(result)
+        with pytest.raises(ValueError, match="aggregate_fn"):
+            controller.aggregate([], aggregate_fn=scaffold_aggregate_fn)
+        aggr_result = controller.aggregate([], aggregate_fn=controller.aggregate_fn)
+        assert aggr_result.meta["nr_aggregated"] == 3
+
+    def test_scaffold_rejects_in_time_aggregation(self):
+        with pytest.raises(ValueError, match="aggregate_in_time"):
+            Scaffold(aggregate_in_time=True)
+
+    def test_in_time_aggregation_reset_at_broadcast_start(self):
+        controller = _create_controller(aggregate_in_time=True)
+        results = _create_results()
+        controller._collect_result(results[0])
+        controller._reset_results()
+
+        controller._collect_result(results[2])
+        aggr_result = controller.aggregate([])
+        np.testing.assert_allclose(aggr_result.params["a"], results[2].params["a"])
+        assert aggr_result.meta["nr_aggregated"] == 1
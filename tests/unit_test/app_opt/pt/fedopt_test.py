@@ -0,0 +1,87 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+import torch
+
+from nvflare.apis.dxo import DXO, DataKind
+from nvflare.apis.event_type import EventType
+from nvflare.apis.fl_context import FLContext
+from nvflare.app_common.abstract.model import ModelLearnableKey, make_model_learnable
+from nvflare.app_common.app_constant import AppConstants
+from nvflare.app_opt.pt.fedopt import PTFedOptModelShareableGenerator
+
+
+class Net(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.fc1 = torch.nn.Linear(4, 8)
+        self.bn = torch.nn.BatchNorm1d(8)
+        self.fc2 = torch.nn.Linear(8, 2)
+
+    def forward(self, x):
+        return self.fc2(self.bn(self.fc1(x)))
+
+
+def _build_component(config):
+    return getattr(torch.optim, config["path"].split(".")[-1])(**config["args"])
+
+
+def _start_generator(model, optimizer_args, fused_update):
+    generator = PTFedOptModelShareableGenerator(
+        optimizer_args=optimizer_args, source_model=model, device="cpu", fused_update=fused_update
+    )
+    engine = Mock()
+    engine.build_component.side_effect = _build_component
+    fl_ctx = FLContext()
+    fl_ctx.get_engine = Mock(return_value=engine)
+    generator.handle_event(EventType.START_RUN, fl_ctx)
+    return generator, fl_ctx
+
+
+class TestPTFedOptModelShareableGenerator:
+    @pytest.mark.parametrize(
+        "optimizer_args",
+        [
+            {"path": "torch.optim.SGD", "args": {"lr": 1.0, "momentum": 0.6}},
+            {"path": "torch.optim.Adam", "args": {"lr": 0.01}},
+        ],
+    )
+    def test_fused_update_rounds(self, optimizer_args):
+        torch.manual_seed(0)
+        model = Net()
+        fused_model = Net()
+        fused_model.load_state_dict(model.state_dict())
+        generator, fl_ctx = _start_generator(model, dict(optimizer_args), fused_update=False)
+        fused_generator, fused_fl_ctx = _start_generator(fused_model, dict(optimizer_args), fused_update=True)
+        assert fused_generator.flat_params is not None
+
+        global_weights = {k: v.numpy().copy() for k, v in model.state_dict().items()}
+        rng = np.random.default_rng(0)
+        for _ in range(3):
+            model_diff = {k: rng.standard_normal(v.shape).astype(np.float32) for k, v in global_weights.items()}
+            results = []
+            for gen, ctx in ((generator, fl_ctx), (fused_generator, fused_fl_ctx)):
+                ctx.set_prop(AppConstants.GLOBAL_MODEL, make_model_learnable(global_weights, {}), private=True)
+                shareable = DXO(data_kind=DataKind.WEIGHT_DIFF, data=dict(model_diff)).to_shareable()
+                results.append(gen.shareable_to_learnable(shareable, ctx)[ModelLearnableKey.WEIGHTS])
+
+            weights, fused_weights = results
+            assert set(fused_weights) == set(weights)
+            for name, value in weights.items():
+                np.testing.assert_allclose(fused_weights[name], value, rtol=1e-5, atol=1e-6)
+            global_weights = weights
@@ -0,0 +1,136 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+import torch
+
+from nvflare.app_opt.pt.flat_parameters import FlatParameters
+
+
+class Net(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.fc1 = torch.nn.Linear(4, 8)
+        self.bn = torch.nn.BatchNorm1d(8)
+        self.fc2 = torch.nn.Linear(8, 2)
+
+    def forward(self, x):
+        return self.fc2(self.bn(self.fc1(x)))
+
+
+def _per_parameter_update(model, optimizer, model_diff):
+    optimizer.zero_grad()
+    for name, param in model.named_parameters():
+        if name in model_diff:
+            param.grad = torch.tensor(-1.0 * model_diff[name])
+    optimizer.step()
+
+
+def _random_diff(model, rng):
+    return {name: rng.standard_normal(tuple(v.shape)).astype(np.float32) for name, v in model.state_dict().items()}
+
+
+class TestFlatParameters:
+    @pytest.mark.parametrize(
+        "optimizer_cls,kwargs",
+        [(torch.optim.SGD, {"lr": 1.0, "momentum": 0.6}), (torch.optim.Adam, {"lr": 0.01})],
+    )
+    def test_same_as_per_parameter_update(self, optimizer_cls, kwargs):
+        torch.manual_seed(0)
+        model = Net()
+        fused_model = Net()
+        fused_model.load_state_dict(model.state_dict())
+
+        optimizer = optimizer_cls(model.parameters(), **kwargs)
+        flat_params = FlatParameters(fused_model)
+        fused_optimizer = optimizer_cls([flat_params.param], **kwargs)
+
+        rng = np.random.default_rng(0)
+        for _ in range(3):
+            model_diff = _random_diff(model, rng)
+            _per_parameter_update(model, optimizer, model_diff)
+            updated = flat_params.set_grad_from_diff(model_diff)
+            fused_optimizer.step()
+
+        assert updated == [name for name, _ in model.named_parameters()]
+        weights = flat_params.state_dict_to_numpy(fused_model.state_dict())
+        assert set(weights) == set(model.state_dict())
+        for name, value in model.state_dict().items():
+            np.testing.assert_allclose(weights[name], value.numpy(), rtol=1e-6, atol=1e-6)
+            np.testing.assert_allclose(fused_model.state_dict()[name].numpy(), value.numpy(), rtol=1e-6, atol=1e-6)
+
+    def test_grad_set_to_none(self):
+        torch.manual_seed(0)
+        model = Net()
+        fused_model = Net()
+        fused_model.load_state_dict(model.state_dict())
+
+        optimizer = torch.optim.SGD(model.parameters(), lr=1.0, momentum=0.6)
+        flat_params = FlatParameters(fused_model)
+        fused_optimizer = torch.optim.SGD([flat_params.param], lr=1.0, momentum=0.6)
+
+        rng = np.random.default_rng(0)
+        for _ in range(3):
+            model_diff = _random_diff(model, rng)
+            _per_parameter_update(model, optimizer, model_diff)
+            fused_optimizer.zero_grad(set_to_none=True)
+            assert flat_params.param.grad is None
+            flat_params.set_grad_from_diff(model_diff)
+            fused_optimizer.step()
+
+        for name, param in model.named_parameters():
+            np.testing.assert_allclose(
+                fused_model.state_dict()[name].numpy(), param.detach().numpy(), rtol=1e-6, atol=1e-6
+            )
+
+    def test_model_still_trainable(self):
+        model = Net()
+        flat_params = FlatParameters(model)
+        loss = model(torch.ones(3, 4)).sum()
+        loss.backward()
+        assert all(p.grad is not None for p in model.parameters())
+        assert model.fc1.weight.data_ptr() == flat_params.param.data_ptr()
+
+    def test_to_numpy(self):
+        model = Net()
+        flat_params = FlatParameters(model)
+        weights = flat_params.to_numpy()
+        assert list(weights) == ["fc1.weight", "fc1.bias", "bn.weight", "bn.bias", "fc2.weight", "fc2.bias"]
+        for name, param in model.named_parameters():
+            np.testing.assert_array_equal(weights[name], param.detach().numpy())
+
+    @pytest.mark.parametrize("to_value", [lambda v: v.astype(np.float64), torch.from_numpy])
+    def test_diff_types(self, to_value):
+        model = Net()
+        flat_params = FlatParameters(model)
+        model_diff = _random_diff(model, np.random.default_rng(0))
+        flat_params.set_grad_from_diff({k: to_value(v) for k, v in model_diff.items()})
+        for name, param in model.named_parameters():
+            grad = flat_params.param.grad[flat_params.offsets[flat_params.names.index(name)] :][: param.numel()]
+            np.testing.assert_array_equal(grad.numpy(), -model_diff[name].reshape(-1))
+
+    def test_missing_diff(self):
+        model = Net()
+        flat_params = FlatParameters(model)
+        model_diff = _random_diff(model, np.random.default_rng(0))
+        model_diff.pop("fc2.bias")
+        with pytest.raises(ValueError):
+            flat_params.set_grad_from_diff(model_diff)
+
+    def test_mixed_dtypes(self):
+        model = Net()
+        model.fc2.double()
+        with pytest.raises(ValueError):
+            FlatParameters(model)
@@ -0,0 +1,73 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+import torch
+
+from nvflare.apis.fl_context import FLContext
+from nvflare.app_opt.pt.params_converter import NumpyToPTParamsConverter, PTToNumpyParamsConverter
+
+DEVICES = ["cpu"] + (["cuda"] if torch.cuda.is_available() else [])
+
+
+def _make_params(device):
+    torch.manual_seed(0)
+    return {"w": torch.randn(4, 3, device=device), "b": torch.randn(3, device=device), "step": 7}
+
+
+class TestParamsConverters:
+    @pytest.mark.parametrize("device", DEVICES)
+    @pytest.mark.parametrize("use_pinned_buffers", [False, True])
+    def test_round_trip(self, device, use_pinned_buffers):
+        fl_ctx = FLContext()
+        params = _make_params(device)
+        to_numpy = PTToNumpyParamsConverter(use_pinned_buffers=use_pinned_buffers)
+        from_numpy = NumpyToPTParamsConverter(use_pinned_buffers=use_pinned_buffers)
+
+        arrays = to_numpy.convert(params, fl_ctx)
+        assert set(arrays.keys()) == {"w", "b"}
+        for k in arrays:
+            assert isinstance(arrays[k], np.ndarray)
+            np.testing.assert_array_equal(arrays[k], params[k].cpu().numpy())
+
+        # the server sends flattened arrays: the shapes are restored from the ones stashed by PTToNumpy
+        tensors = from_numpy.convert({k: v.reshape(-1) for k, v in arrays.items()}, fl_ctx)
+        assert tensors["step"] == 7
+        for k in ("w", "b"):
+            assert tensors[k].device.type == "cpu"
+            assert torch.equal(tensors[k], params[k].cpu())
+
+    @pytest.mark.parametrize("use_pinned_buffers", [False, True])
+    def test_cpu_tensors_not_copied(self, use_pinned_buffers):
+        params = _make_params("cpu")
+        arrays = PTToNumpyParamsConverter(use_pinned_buffers=use_pinned_buffers).convert(params, FLContext())
+        assert np.shares_memory(arrays["w"], params["w"].numpy())
+
+    @pytest.mark.skipif(not torch.cuda.is_available(), reason="needs CUDA")
+    def test_pinned_buffers_reused(self):
+        fl_ctx = FLContext()
+        to_numpy = PTToNumpyParamsConverter(use_pinned_buffers=True)
+        first = to_numpy.convert(_make_params("cuda"), fl_ctx)
+        params = {k: v * 2 for k, v in _make_params("cuda").items() if k != "step"}
+        second = to_numpy.convert(params, fl_ctx)
+        assert np.shares_memory(first["w"], second["w"])
+        np.testing.assert_array_equal(second["w"], params["w"].cpu().numpy())
+
+        from_numpy = NumpyToPTParamsConverter(use_pinned_buffers=True)
+        first = from_numpy.convert({"w": np.ones(3, dtype=np.float32)}, fl_ctx)
+        second = from_numpy.convert({"w": np.full(3, 2, dtype=np.float32)}, fl_ctx)
+        assert first["w"].is_pinned()
+        assert first["w"].data_ptr() == second["w"].data_ptr()
+        assert torch.equal(second["w"], torch.full((3,), 2.0))
@@ -0,0 +1,55 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+import torch
+
+from nvflare.client.utils import numerical_params_diff, numerical_params_diff_in_place
+
+DEVICES = ["cpu"] + (["cuda"] if torch.cuda.is_available() else [])
+
+
+class TestPTParamsDiffInPlace:
+    @pytest.mark.parametrize("device", DEVICES)
+    def test_diff_in_place(self, device):
+        torch.manual_seed(0)
+        model = torch.nn.Sequential(torch.nn.Linear(8, 4), torch.nn.BatchNorm1d(4))
+        # the received params are on the CPU, the trained params on the training device
+        original = {k: v.clone() for k, v in model.state_dict().items()}
+        model.to(device)
+        with torch.no_grad():
+            for p in model.parameters():
+                p.add_(1.5)
+        model.train()
+        model(torch.randn(16, 8, device=device))
+        new = model.state_dict()
+
+        expected = numerical_params_diff({k: v.to(device) for k, v in original.items()}, new)
+        buffers = dict(original)
+        diff = numerical_params_diff_in_place(original, new)
+
+        assert diff.keys() == expected.keys()
+        for k, v in diff.items():
+            torch.testing.assert_close(v.to(device), expected[k])
+            if v.is_floating_point():
+                # written into the received buffer, which stays on the CPU
+                assert v is buffers[k]
+                assert v.device.type == "cpu"
+        assert diff["1.num_batches_tracked"] == 1
+
+    def test_diff_in_place_requires_grad(self):
+        original = {"w": torch.ones(3, requires_grad=True)}
+        diff = numerical_params_diff_in_place(original, {"w": torch.full((3,), 2.0)})
+        assert diff["w"] is not original["w"]
+        torch.testing.assert_close(diff["w"].detach(), torch.ones(3))
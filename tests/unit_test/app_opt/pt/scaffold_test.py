@@ -0,0 +1,88 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+
+import numpy as np
+import torch
+
+from nvflare.app_opt.pt.scaffold import PTScaffoldHelper
+
+
+class Net(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.fc = torch.nn.Linear(4, 8)
+        self.bn = torch.nn.BatchNorm1d(8)
+
+    def forward(self, x):
+        return self.bn(self.fc(x))
+
+
+def _reference_model_update(model, curr_lr, c_global_para, c_local_para):
+    net_para = model.state_dict()
+    for key in net_para:
+        net_para[key] = net_para[key] - curr_lr * (c_global_para[key] - c_local_para[key])
+    model.load_state_dict(net_para)
+
+
+def _reference_terms_update(c_local, cnt, model, curr_lr, c_global_para, c_local_para, model_global):
+    c_new_para = c_local.state_dict()
+    c_delta_para = {}
+    global_model_para = model_global.state_dict()
+    net_para = model.state_dict()
+    for key in net_para:
+        c_new_para[key] = (
+            c_new_para[key] - c_global_para[key] + (global_model_para[key] - net_para[key]) / (cnt * curr_lr)
+        )
+        c_delta_para[key] = (c_new_para[key] - c_local_para[key]).cpu().numpy()
+    c_local.load_state_dict(c_new_para)
+    return c_delta_para
+
+
+def _assert_same(a, b):
+    assert list(a) == list(b)
+    for key in a:
+        np.testing.assert_allclose(np.asarray(a[key]), np.asarray(b[key]), rtol=1e-6, atol=1e-6)
+
+
+class TestPTScaffoldHelper:
+    def test_same_as_reference(self):
+        torch.manual_seed(0)
+        model = Net()
+        helper = PTScaffoldHelper()
+        helper.init(model)
+        global_controls = {k: torch.randn_like(v.float()).to(v.dtype) for k, v in model.state_dict().items()}
+        helper.load_global_controls(global_controls)
+
+        ref_model = copy.deepcopy(model)
+        ref_c_local = copy.deepcopy(helper.c_local)
+        for _ in range(2):
+            model_global = copy.deepcopy(model)
+            c_global_para, c_local_para = helper.get_params()
+            ref_c_local_para = copy.deepcopy(ref_c_local.state_dict())
+            for step in range(3):
+                with torch.no_grad():
+                    model(torch.randn(5, 4))
+                ref_model.load_state_dict(model.state_dict())
+                helper.model_update(model, 0.1, c_global_para, c_local_para)
+                _reference_model_update(ref_model, 0.1, c_global_para, ref_c_local_para)
+                _assert_same(model.state_dict(), ref_model.state_dict())
+
+            ref_delta = _reference_terms_update(
+                ref_c_local, 3, ref_model, 0.1, c_global_para, ref_c_local_para, model_global
+            )
+            helper.terms_update(model, 0.1, c_global_para, c_local_para, model_global)
+            _assert_same(helper.get_delta_controls(), ref_delta)
+            _assert_same(helper.c_local.state_dict(), ref_c_local.state_dict())
@@ -0,0 +1,87 @@
+# Copyright (c) 2024, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+from nvflare.app_opt.pt.quantization import numpy_quantization
+
+
+class TestNumpyQuantization:
+    def test_dynamic_map(self):
+        code = numpy_quantization.create_dynamic_map()
+        assert code.dtype == np.float32
+        assert code.shape == (256,)
+        assert np.all(np.diff(code) >= 0)
+        assert code[0] == -code[-2] and code[-1] == 1.0
+        assert 0.0 in code
+
+    @pytest.mark.parametrize("shape", [(4096 * 2,), (100, 123), (7,)])
+    def test_blockwise8(self, shape):
+        rng = np.random.default_rng(0)
+        values = (rng.standard_normal(shape) * 10).astype(np.float32)
+        quantized, absmax, code = numpy_quantization.quantize_blockwise(values)
+
+        assert quantized.dtype == np.uint8
+        assert quantized.shape == values.shape
+        n_blocks = (values.size + 4095) // 4096
+        assert absmax.dtype == np.float32 and absmax.shape == (n_blocks,)
+        blocks = np.array_split(np.abs(values).reshape(-1), range(4096, values.size, 4096))
+        np.testing.assert_array_equal(absmax, [b.max() for b in blocks])
+
+        dequantized = numpy_quantization.dequantize_blockwise(quantized, absmax, code)
+        assert dequantized.shape == values.shape
+        # each value is quantized to the nearest code
+        scale = np.repeat(absmax, 4096)[: values.size].reshape(shape)
+        errors = np.abs(code[None, :] - (values / scale).reshape(-1, 1))
+        np.testing.assert_array_equal(quantized.reshape(-1), np.argmin(errors, axis=1))
+        np.testing.assert_allclose(dequantized, values, rtol=0.05, atol=0.05 * np.abs(values).max())
+
+    @pytest.mark.parametrize("quant_type", ["fp4", "nf4"])
+    @pytest.mark.parametrize("size", [128, 101, 1])
+    def test_4bit(self, quant_type, size):
+        rng = np.random.default_rng(1)
+        values = rng.standard_normal(size).astype(np.float32)
+        packed, state = numpy_quantization.quantize_4bit(values, quant_type=quant_type)
+
+        assert packed.dtype == np.uint8
+        assert packed.shape == ((size + 1) // 2, 1)
+        assert set(state.keys()) == {"quant_type", "absmax", "blocksize", "quant_map", "dtype", "shape"}
+        assert state["quant_type"] == quant_type
+        assert state["blocksize"] == 64
+        assert state["dtype"] == "float32"
+        assert state["shape"] == (size,)
+        assert state["absmax"].shape == ((size + 63) // 64,)
+
+        dequantized = numpy_quantization.dequantize_4bit(packed, state)
+        assert dequantized.dtype == np.float32
+        assert dequantized.shape == values.shape
+        # all dequantized values are codes scaled by the absmax of their block
+        scale = np.repeat(state["absmax"], 64)[:size]
+        codes = dequantized / scale
+        assert np.all(np.min(np.abs(codes[:, None] - state["quant_map"][None, :]), axis=1) < 1e-6)
+        # the first value of a pair is in the high bits
+        high = packed[0, 0] >> 4
+        np.testing.assert_allclose(dequantized[0], state["quant_map"][high] * scale[0])
+
+    def test_zeros(self):
+        values = np.zeros(100, dtype=np.float32)
+        quantized, absmax, code = numpy_quantization.quantize_blockwise(values)
+        np.testing.assert_array_equal(numpy_quantization.dequantize_blockwise(quantized, absmax, code), values)
+        packed, state = numpy_quantization.quantize_4bit(values, quant_type="nf4")
+        np.testing.assert_array_equal(numpy_quantization.dequantize_4bit(packed, state), values)
+
+    def test_invalid_quant_type(self):
+        with pytest.raises(ValueError):
+            numpy_quantization.quantize_4bit(np.ones(4, dtype=np.float32), quant_type="int4")
@@ -16,10 +16,16 @@ import numpy as np
 import pytest
 import torch
 
-from nvflare.apis.dxo import DXO, DataKind
+from nvflare.apis.dxo import DXO, DataKind, MetaKey, from_shareable
+from nvflare.apis.fl_constant import ReservedKey
 from nvflare.apis.fl_context import FLContext
+from nvflare.apis.shareable import Shareable
+from nvflare.app_common.abstract.sparse_array import BlockQuantizedArray
+from nvflare.app_common.aggregators import InTimeAccumulateWeightedAggregator
+from nvflare.app_common.app_constant import AppConstants
+from nvflare.app_opt.pt.quantization import dequantizor, quantizor
 from nvflare.app_opt.pt.quantization.dequantizor import ModelDequantizor
-from nvflare.app_opt.pt.quantization.quantizor import ModelQuantizor
+from nvflare.app_opt.pt.quantization.quantizor import ModelQuantizor, can_use_bitsandbytes
 
 TEST_CASES = [
     (
@@ -42,15 +48,33 @@ TEST_CASES = [
         "blockwise8",
         {"a": torch.tensor([0.99062496, 2.003125, 3.015625, 4.0], dtype=torch.float32)},
     ),
+    (
+        {"a": np.array([1.0, 2.0, 3.0, 4.0], dtype="float32")},
+        "float4",
+        {"a": np.array([1.0, 2.0, 2.6666667, 4.0], dtype="float32")},
+    ),
+    (
+        {"a": torch.tensor([1.0, 2.0, 3.0, 4.0], dtype=torch.bfloat16)},
+        "normfloat4",
+        {"a": torch.tensor([0.9844492, 1.7628393, 2.8918273, 4.0], dtype=torch.bfloat16)},
+    ),
 ]
 
 
 class TestQuantization:
+    @pytest.mark.parametrize("use_bitsandbytes", [True, False])
     @pytest.mark.parametrize("input_data, quantization_type, expected_data", TEST_CASES)
-    def test_quantization(self, input_data, quantization_type, expected_data):
+    def test_quantization(self, input_data, quantization_type, expected_data, use_bitsandbytes, monkeypatch):
+        if use_bitsandbytes:
+            if quantization_type != "float16" and not can_use_bitsandbytes(quantization_type):
+                pytest.skip("bitsandbytes or GPU not available")
+        else:
+            # force the numpy implementation
+            monkeypatch.setattr(quantizor, "can_use_bitsandbytes", lambda quantization_type: False)
+            monkeypatch.setattr(dequantizor, "can_use_bitsandbytes", lambda quantization_type: False)
         dxo = DXO(
             data_kind=DataKind.WEIGHTS,
-            data=input_data,
+            data={k: v.clone() if isinstance(v, torch.Tensor) else v.copy() for k, v in input_data.items()},
         )
         fl_ctx = FLContext()
         f_quant = ModelQuantizor(quantization_type=quantization_type)
@@ -68,3 +92,38 @@ class TestQuantization:
                 assert torch.allclose(dequant_array, expected_array)
             else:
                 assert np.allclose(dequant_array, expected_array)
+
+    @pytest.mark.parametrize("use_torch", [False, True])
+    @pytest.mark.parametrize("quantization_type", ["blockwise8", "float4", "normfloat4"])
+    def test_aggregate_quantized(self, quantization_type, use_torch):
+        rng = np.random.default_rng(0)
+        updates = [rng.standard_normal((100, 77)).astype(np.float32) for _ in range(3)]
+        fl_ctx = FLContext()
+        fl_ctx.set_prop(AppConstants.CURRENT_ROUND, 0)
+
+        results = []
+        for aggregate_quantized in [False, True]:
+            aggregator = InTimeAccumulateWeightedAggregator(expected_data_kind=DataKind.WEIGHTS)
+            aggregator._initialize(
+                aggregator.aggregation_weights, aggregator.exclude_vars, aggregator.expected_data_kind
+            )
+            f_dequant = ModelDequantizor(aggregate_quantized=aggregate_quantized)
+            for i, update in enumerate(updates):
+                data = {"a": torch.from_numpy(update.copy()) if use_torch else update.copy()}
+                dxo = DXO(data_kind=DataKind.WEIGHTS, data=data, meta={MetaKey.NUM_STEPS_CURRENT_ROUND: i + 1})
+                quant_dxo = ModelQuantizor(quantization_type=quantization_type).process_dxo(dxo, None, fl_ctx)
+                s = quant_dxo.to_shareable()
+                s = f_dequant.process(s, fl_ctx)
+                if aggregate_quantized:
+                    assert isinstance(from_shareable(s).data["a"], BlockQuantizedArray)
+                s.set_peer_props({ReservedKey.IDENTITY_NAME: f"site-{i}"})
+                s.add_cookie(AppConstants.CONTRIBUTION_ROUND, 0)
+                assert aggregator.accept(s, fl_ctx)
+            results.append(from_shareable(aggregator.aggregate(fl_ctx)).data["a"])
+
+        expected, result = results
+        if isinstance(expected, torch.Tensor):
+            expected = expected.numpy()
+        assert isinstance(result, np.ndarray)
+        assert result.dtype == np.float32
+        np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-6)
@@ -0,0 +1,52 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import pytest
+
+from nvflare.client.background_sender import BackgroundSender
+
+
+class TestBackgroundSender:
+    def test_sends_in_order(self):
+        sender = BackgroundSender()
+        sent = []
+        futures = [sender.submit(sent.append, i) for i in range(5)]
+        sender.wait()
+        assert all(f.done() for f in futures)
+        assert sent == list(range(5))
+
+    def test_wait_without_pending_send(self):
+        BackgroundSender().wait()
+
+    def test_wait_blocks_until_done(self):
+        sender = BackgroundSender()
+        proceed = threading.Event()
+        future = sender.submit(proceed.wait, 5.0)
+        assert not future.done()
+        proceed.set()
+        sender.wait()
+        assert future.done()
+
+    def test_error_is_reported_by_future(self):
+        sender = BackgroundSender()
+
+        def fail():
+            raise RuntimeError("send failed")
+
+        future = sender.submit(fail)
+        sender.wait()
+        with pytest.raises(RuntimeError, match="send failed"):
+            future.result()
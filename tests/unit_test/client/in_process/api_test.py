@@ -12,9 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
 import unittest
 
+import numpy as np
+
 from nvflare.apis.fl_constant import FLMetaKey
+from nvflare.app_common.abstract.fl_model import FLModel
 from nvflare.client.config import ConfigKey
 from nvflare.client.in_process.api import (
     TOPIC_ABORT,
@@ -90,4 +94,35 @@ class TestInProcessClientAPI(unittest.TestCase):
             TOPIC_STOP,
         ]
 
+    def test_non_blocking_send(self):
+        self.task_metadata[ConfigKey.TASK_EXCHANGE][ConfigKey.TRANSFER_TYPE] = "FULL"
+        client_api = InProcessClientAPI(self.task_metadata)
+        client_api.init()
+
+        started = threading.Event()
+        proceed = threading.Event()
+        results = []
+
+        def slow_local_result_callback(topic, data, databus):
+            started.set()
+            proceed.wait(5.0)
+            results.append(data)
+
+        client_api.data_bus.subscribe([TOPIC_LOCAL_RESULT], slow_local_result_callback)
+        try:
+            client_api.fl_model = FLModel(params={"w": np.zeros(3)})
+            client_api.receive()
+            future = client_api.send(FLModel(params={"w": np.ones(3)}), blocking=False)
+            assert started.wait(5.0)
+            assert not future.done()
+
+            proceed.set()
+            assert future.result(timeout=5.0) is None
+            assert len(results) == 1
+            assert client_api.fl_model is None
+            assert client_api.receive_called is False
+        finally:
+            proceed.set()
+            client_api.data_bus.subscribers.pop(TOPIC_LOCAL_RESULT, None)
+
     # Add more test methods for other functionalities in the class
@@ -0,0 +1,71 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+from nvflare.client.utils import numerical_params_diff, numerical_params_diff_in_place
+
+
+def _params():
+    rng = np.random.default_rng(0)
+    original = {"w": rng.standard_normal((4, 3)).astype(np.float32), "step": np.array(3), "only_original": np.ones(2)}
+    new = {"w": rng.standard_normal((4, 3)).astype(np.float32), "step": np.array(5), "only_new": np.ones(2)}
+    return original, new
+
+
+class TestParamsDiff:
+    def test_diff(self):
+        original, new = _params()
+        expected = new["w"] - original["w"]
+        diff = numerical_params_diff(original, new)
+        assert diff.keys() == {"w", "step"}
+        np.testing.assert_array_equal(diff["w"], expected)
+        assert diff["step"] == 2
+
+    def test_diff_in_place(self):
+        original, new = _params()
+        expected = new["w"] - original["w"]
+        w = original["w"]
+        diff = numerical_params_diff_in_place(original, new)
+        assert diff.keys() == {"w", "step"}
+        np.testing.assert_array_equal(diff["w"], expected)
+        assert diff["step"] == 2
+        # the diff is written into the original buffer
+        assert diff["w"] is w
+        assert original["w"] is w
+
+    @pytest.mark.parametrize(
+        "original,new",
+        [
+            # read-only original
+            (np.ones(3, dtype=np.float32), np.full(3, 3, dtype=np.float32)),
+            # the result cannot be written into the original dtype
+            (np.ones(3, dtype=np.float32), np.full(3, 3, dtype=np.float64)),
+            # different shapes
+            (np.ones(3, dtype=np.float32), np.full((2, 3), 3, dtype=np.float32)),
+            ([1.0, 2.0], [3.0, 4.0]),
+        ],
+    )
+    def test_diff_in_place_fallback(self, original, new):
+        if isinstance(original, np.ndarray) and original.dtype == new.dtype and original.shape == new.shape:
+            original.setflags(write=False)
+        expected = numerical_params_diff({"v": original}, {"v": new})["v"]
+        diff = numerical_params_diff_in_place({"v": original}, {"v": new})["v"]
+        assert diff is not original
+        np.testing.assert_array_equal(diff, expected)
+
+    def test_no_common_keys(self):
+        with pytest.raises(RuntimeError):
+            numerical_params_diff_in_place({"a": np.ones(1)}, {"b": np.ones(1)})
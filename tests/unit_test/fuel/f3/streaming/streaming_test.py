@@ -18,11 +18,24 @@ import pytest
 from nvflare.fuel.f3.cellnet.core_cell import CoreCell
 from nvflare.fuel.f3.message import Message
 from nvflare.fuel.f3.stream_cell import StreamCell
-from nvflare.fuel.f3.streaming.stream_types import StreamFuture
+from nvflare.fuel.f3.streaming.stream_types import ObjectIterator, ObjectStreamFuture, StreamFuture
 from nvflare.fuel.f3.streaming.tools.utils import RX_CELL, TEST_CHANNEL, TEST_TOPIC, TX_CELL, make_buffer
 from nvflare.fuel.utils.network_utils import get_open_ports
 
 WAIT_SEC = 10
+OBJECTS_CHANNEL = "objects"
+
+
+class BufferIterator(ObjectIterator):
+    def __init__(self, buffers):
+        super().__init__()
+        self.buffers = buffers
+
+    def __next__(self):
+        if self.index >= len(self.buffers):
+            raise StopIteration
+        self.index += 1
+        return self.buffers[self.index - 1]
 
 
 class State:
@@ -95,6 +108,28 @@ class TestStreamCell:
 
         assert buffer == state.result
 
+    def test_streaming_objects(self, server_cell, client_cell):
+        buffers = [make_buffer(3 * 1024 * 1024 + 7), make_buffer(10), bytes(0), make_buffer(1024 * 1024)]
+        received = {}
+        done = threading.Event()
+
+        def object_stream_cb(future: ObjectStreamFuture):
+            future.add_done_callback(lambda f: done.set())
+
+        def object_cb(obj_sid, index, message):
+            received[index] = bytes(message.payload)
+
+        server_cell.register_objects_cb(OBJECTS_CHANNEL, TEST_TOPIC, object_stream_cb, object_cb)
+        send_future = client_cell.send_objects(
+            OBJECTS_CHANNEL, TEST_TOPIC, RX_CELL, Message(None, BufferIterator(buffers))
+        )
+        assert send_future.result(timeout=30) == len(buffers)
+
+        if not done.wait(timeout=30):
+            raise Exception("Objects not received after 30 seconds")
+
+        assert [received[i] for i in range(len(buffers))] == [bytes(b) for b in buffers]
+
     def blob_cb(self, future: StreamFuture, **kwargs):
         state = kwargs.get("state")
         state.result = future.result()
@@ -0,0 +1,182 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+import uuid
+
+import numpy as np
+import pytest
+
+from nvflare.app_common.decomposers.numpy_decomposers import NumpyArrayDecomposer
+from nvflare.fuel.f3.cellnet.core_cell import CoreCell
+from nvflare.fuel.f3.message import Message as StreamMessage
+from nvflare.fuel.f3.streaming.stream_types import ObjectIterator
+from nvflare.fuel.utils import fobs
+from nvflare.fuel.utils.attributes_exportable import ExportMode
+from nvflare.fuel.utils.network_utils import get_open_ports
+from nvflare.fuel.utils.pipe import cell_pipe
+from nvflare.fuel.utils.pipe.cell_pipe import CellPipe, StreamedObjectRef, _extract_large_values
+from nvflare.fuel.utils.pipe.pipe import Message
+
+
+@pytest.fixture(scope="module")
+def root_port():
+    port = get_open_ports(1)[0]
+    cell = CoreCell("server", f"tcp://localhost:{port}", secure=False, credentials={})
+    cell.start()
+    yield port
+    cell.stop()
+
+
+@pytest.fixture
+def pipes(root_port):
+    fobs.register(NumpyArrayDecomposer)
+    token = str(uuid.uuid4())
+    # cells are shared by the pipes with the same root url, so the two endpoints use different urls of the root
+    sender = CellPipe("ACTIVE", "site-1", token, root_url=f"tcp://localhost:{root_port}", secure_mode=False)
+    receiver = CellPipe("PASSIVE", "site-1", token, root_url=f"tcp://127.0.0.1:{root_port}", secure_mode=False)
+    sender.open("task")
+    receiver.open("task")
+    yield sender, receiver
+    sender.close()
+    receiver.close()
+
+
+def _model(num_layers=3):
+    rng = np.random.default_rng(0)
+    weights = {f"layer{i}": rng.standard_normal(300_000).astype(np.float32) for i in range(num_layers)}
+    weights["bias"] = np.ones(10, dtype=np.float32)
+    return {"DXO": {"kind": "WEIGHTS", "data": weights, "meta": {"round": 1}}, "header": "value"}
+
+
+def _assert_model_equal(received, expected):
+    assert received["header"] == expected["header"]
+    assert received["DXO"]["meta"] == expected["DXO"]["meta"]
+    assert received["DXO"]["data"].keys() == expected["DXO"]["data"].keys()
+    for k, v in expected["DXO"]["data"].items():
+        np.testing.assert_array_equal(received["DXO"]["data"][k], v)
+
+
+class _StalledObjects(ObjectIterator):
+    def __init__(self, proceed: threading.Event):
+        """Yields the first object, then waits until `proceed` is set before the next one."""
+        super().__init__()
+        self.proceed = proceed
+        self.count = 0
+
+    def __next__(self):
+        self.count += 1
+        if self.count > 2:
+            raise StopIteration
+        if self.count == 2:
+            self.proceed.wait()
+        return fobs.dumps({"index": self.count})
+
+
+def _wait_for(condition, timeout=10.0):
+    start = time.time()
+    while not condition():
+        assert time.time() - start < timeout
+        time.sleep(0.05)
+
+
+class TestCellPipe:
+    def test_extract_large_values(self):
+        data = _model()
+        values = []
+        body = _extract_large_values(data, values)
+        assert len(values) == 3
+        assert isinstance(body["DXO"]["data"]["layer0"], StreamedObjectRef)
+        assert body["DXO"]["data"]["bias"] is data["DXO"]["data"]["bias"]
+        # the original data is not changed
+        assert isinstance(data["DXO"]["data"]["layer0"], np.ndarray)
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_send_model(self, pipes, streaming, monkeypatch):
+        sender, receiver = pipes
+        sender.streaming = streaming
+        streamed = []
+        send_objects = sender.cell.send_objects
+
+        def spy(**kwargs):
+            streamed.append(kwargs["topic"])
+            return send_objects(**kwargs)
+
+        monkeypatch.setattr(sender.cell, "send_objects", spy)
+        data = _model()
+        msg = Message.new_request("train", data)
+        assert sender.send(msg, timeout=10.0)
+
+        received = receiver.receive(timeout=10.0)
+        assert received.topic == "train"
+        assert received.msg_id == msg.msg_id
+        _assert_model_equal(received.data, data)
+        assert streamed == (["train"] if streaming else [])
+
+    def test_streaming_small_message(self, pipes):
+        sender, receiver = pipes
+        sender.streaming = True
+        assert sender.send(Message.new_request("small", {"a": 1}), timeout=10.0)
+        assert receiver.receive(timeout=10.0).data == {"a": 1}
+
+    def test_export(self, root_port):
+        pipe = CellPipe(
+            "ACTIVE", "site-1", str(uuid.uuid4()), f"tcp://localhost:{root_port}", secure_mode=False, streaming=True
+        )
+        _, args = pipe.export(ExportMode.SELF)
+        assert args["streaming"]
+        pipe.close()
+
+    def test_cancelled_stream_expired(self, pipes, monkeypatch):
+        sender, receiver = pipes
+        monkeypatch.setattr(cell_pipe, "_STREAM_COMPLETION_WAIT", 0.5)
+        obj_tasks = receiver.cell.object_streamer.obj_tasks
+        proceed = threading.Event()
+        future = sender.cell.send_objects(
+            channel=sender.channel + cell_pipe._OBJECTS_CHANNEL_SUFFIX,
+            topic="train",
+            target=sender.peer_fqcn,
+            message=StreamMessage({}, _StalledObjects(proceed)),
+        )
+        stream_id = future.get_stream_id()
+        _wait_for(lambda: stream_id in receiver.received_streams and receiver.received_streams[stream_id].objects)
+        assert stream_id in obj_tasks
+
+        # the sender gives up partway, so the end of the stream and its final request never arrive
+        assert future.cancel()
+        proceed.set()
+        time.sleep(1.0)
+
+        # any later message expires the stalled stream
+        assert sender.send(Message.new_request("small", {"a": 1}), timeout=10.0)
+        assert receiver.receive(timeout=10.0).data == {"a": 1}
+        _wait_for(lambda: stream_id not in receiver.received_streams and stream_id not in obj_tasks)
+
+    def test_failed_stream_dropped(self, pipes):
+        sender, receiver = pipes
+        proceed = threading.Event()
+        future = sender.cell.send_objects(
+            channel=sender.channel + cell_pipe._OBJECTS_CHANNEL_SUFFIX,
+            topic="train",
+            target=sender.peer_fqcn,
+            message=StreamMessage({}, _StalledObjects(proceed)),
+        )
+        stream_id = future.get_stream_id()
+        _wait_for(lambda: stream_id in receiver.received_streams and receiver.received_streams[stream_id].future)
+
+        receiver.received_streams[stream_id].future.set_exception(RuntimeError("stream failed"))
+        proceed.set()
+        _wait_for(lambda: stream_id not in receiver.received_streams)
+        assert stream_id not in receiver.cell.object_streamer.obj_tasks
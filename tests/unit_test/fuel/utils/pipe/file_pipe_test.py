@@ -0,0 +1,161 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import threading
+import time
+
+import pytest
+
+from nvflare.fuel.utils.attributes_exportable import ExportMode
+from nvflare.fuel.utils.constants import Mode
+from nvflare.fuel.utils.pipe.dir_watcher import DirWatcher, inotify_available
+from nvflare.fuel.utils.pipe.file_pipe import FilePipe
+from nvflare.fuel.utils.pipe.pipe import Message
+
+requires_inotify = pytest.mark.skipif(not inotify_available(), reason="inotify is not available")
+
+
+@pytest.fixture(params=[True, False], ids=["inotify", "polling"])
+def pipes(request, tmp_path):
+    use_inotify = request.param
+    if use_inotify and not inotify_available():
+        pytest.skip("inotify is not available")
+    # with inotify, the check interval is not used to wait for files
+    interval = 10.0 if use_inotify else 0.01
+    active = FilePipe(Mode.ACTIVE, str(tmp_path), file_check_interval=interval, use_inotify=use_inotify)
+    passive = FilePipe(Mode.PASSIVE, str(tmp_path), file_check_interval=interval, use_inotify=use_inotify)
+    active.open("test")
+    passive.open("test")
+    yield active, passive
+    active.close()
+    passive.close()
+
+
+class TestDirWatcher:
+    @requires_inotify
+    def test_wakes_up_on_change(self, tmp_path):
+        with DirWatcher(str(tmp_path), poll_interval=10.0, max_wait=10.0) as watcher:
+            assert watcher.is_event_driven()
+            threading.Timer(0.05, lambda: open(os.path.join(tmp_path, "f"), "w").close()).start()
+            start = time.time()
+            watcher.wait(5.0)
+            assert time.time() - start < 2.0
+
+    @requires_inotify
+    def test_change_before_wait_not_missed(self, tmp_path):
+        with DirWatcher(str(tmp_path), poll_interval=10.0, max_wait=10.0) as watcher:
+            open(os.path.join(tmp_path, "f"), "w").close()
+            start = time.time()
+            watcher.wait(5.0)
+            assert time.time() - start < 1.0
+
+    @requires_inotify
+    def test_shared_by_threads(self, tmp_path):
+        with DirWatcher(str(tmp_path), poll_interval=10.0, max_wait=10.0) as watcher:
+            durations = []
+
+            def wait():
+                start = time.time()
+                watcher.wait(5.0)
+                durations.append(time.time() - start)
+
+            threads = [threading.Thread(target=wait) for _ in range(3)]
+            for t in threads:
+                t.start()
+            time.sleep(0.1)
+            open(os.path.join(tmp_path, "f"), "w").close()
+            for t in threads:
+                t.join()
+            assert len(durations) == 3
+            assert max(durations) < 2.0
+
+    @requires_inotify
+    def test_change_after_version_not_missed(self, tmp_path):
+        with DirWatcher(str(tmp_path), poll_interval=10.0, max_wait=10.0) as watcher:
+            version = watcher.get_version()
+            open(os.path.join(tmp_path, "f"), "w").close()
+            # another thread sees the change first
+            watcher.wait(5.0)
+            start = time.time()
+            watcher.wait(5.0, version)
+            assert time.time() - start < 1.0
+
+    def test_polling(self, tmp_path):
+        with DirWatcher(str(tmp_path), poll_interval=0.01, use_inotify=False) as watcher:
+            assert not watcher.is_event_driven()
+            start = time.time()
+            watcher.wait(5.0)
+            watcher.wait(-1.0)
+            assert time.time() - start < 1.0
+
+    def test_timeout(self, tmp_path):
+        with DirWatcher(str(tmp_path), poll_interval=0.01) as watcher:
+            start = time.time()
+            watcher.wait(0.1)
+            assert time.time() - start < 1.0
+
+
+class TestFilePipe:
+    def test_watchers_reused(self, pipes):
+        active, passive = pipes
+        watchers = dict(active._watchers)
+        assert set(watchers) == {active.x_path, active.y_path}
+        for i in range(3):
+            t = threading.Thread(target=active.send, args=(Message.new_request("t", i), 5.0))
+            t.start()
+            assert passive.receive(timeout=5.0).data == i
+            t.join()
+            assert active.receive(timeout=0.1) is None
+        assert active._watchers == watchers
+
+        active.close()
+        assert not active._watchers
+        assert all(w.fd < 0 for w in watchers.values())
+
+    def test_send_receive(self, pipes):
+        active, passive = pipes
+        result = {}
+        t = threading.Thread(target=lambda: result.update(sent=active.send(Message.new_request("t", {"a": 1}), 5.0)))
+        start = time.time()
+        t.start()
+        msg = passive.receive(timeout=5.0)
+        t.join()
+        assert time.time() - start < 2.0
+        assert result["sent"]
+        assert msg.topic == "t"
+        assert msg.data == {"a": 1}
+
+    def test_receive_timeout(self, pipes):
+        _, passive = pipes
+        start = time.time()
+        assert passive.receive(timeout=0.1) is None
+        assert time.time() - start < 2.0
+
+    def test_export(self, pipes):
+        active, _ = pipes
+        class_path, args = active.export(ExportMode.PEER)
+        assert class_path == "nvflare.fuel.utils.pipe.file_pipe.FilePipe"
+        assert args["mode"] == Mode.PASSIVE
+        assert args["file_check_interval"] == active.file_check_interval
+        assert args["use_inotify"] == active.use_inotify
+
+        # the peer endpoint waits for files the same way
+        peer = FilePipe(**args)
+        assert peer.use_inotify == active.use_inotify
+
+    def test_send_timeout(self, pipes):
+        active, passive = pipes
+        assert not active.send(Message.new_request("t", None), 0.1)
+        assert passive.receive() is None
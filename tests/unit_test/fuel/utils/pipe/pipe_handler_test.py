@@ -0,0 +1,160 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+import uuid
+
+import pytest
+
+from nvflare.fuel.utils.constants import Mode
+from nvflare.fuel.utils.pipe.memory_pipe import MemoryPipe
+from nvflare.fuel.utils.pipe.pipe import Message, Topic
+from nvflare.fuel.utils.pipe import pipe_handler
+from nvflare.fuel.utils.pipe.pipe_handler import PipeHandler
+
+
+class _CountingPipe(MemoryPipe):
+    def __init__(self, token: str, mode: Mode = Mode.ACTIVE):
+        super().__init__(token, mode)
+        self.num_receives = 0
+        self.num_heartbeats_received = 0
+
+    def receive(self, timeout=None):
+        self.num_receives += 1
+        msg = super().receive(timeout)
+        if msg and msg.topic == Topic.HEARTBEAT:
+            self.num_heartbeats_received += 1
+        return msg
+
+
+class _StalledPipe(MemoryPipe):
+    def __init__(self, token: str, mode: Mode = Mode.ACTIVE):
+        """A pipe whose peer never reads: each send blocks until `released` is set."""
+        super().__init__(token, mode)
+        self.released = threading.Event()
+        self.num_sends = 0
+
+    def send(self, msg, timeout=None) -> bool:
+        self.num_sends += 1
+        self.released.wait()
+        return False
+
+
+def _make_handlers(blocking_receive=True, **kwargs):
+    token = str(uuid.uuid4())
+    pipes = [_CountingPipe(token, Mode.ACTIVE), _CountingPipe(token, Mode.PASSIVE)]
+    handlers = []
+    for pipe in pipes:
+        pipe.open("test")
+        handler = PipeHandler(pipe, blocking_receive=blocking_receive, **kwargs)
+        handler.start()
+        handlers.append(handler)
+    return pipes, handlers
+
+
+@pytest.fixture
+def stop_handlers():
+    all_handlers = []
+    yield all_handlers
+    for handler in all_handlers:
+        handler.stop()
+
+
+class TestPipeHandler:
+    def test_message_delivered_without_waiting_read_interval(self, stop_handlers):
+        pipes, handlers = _make_handlers(read_interval=10.0, heartbeat_timeout=0)
+        stop_handlers.extend(handlers)
+        a, b = handlers
+
+        start = time.time()
+        assert a.send_to_peer(Message.new_request("task", {"x": 1}))
+        msg = b.get_next(timeout=5.0)
+        assert time.time() - start < 2.0
+        assert msg.topic == "task"
+        assert msg.data == {"x": 1}
+
+    def test_polling_mode(self, stop_handlers):
+        pipes, handlers = _make_handlers(blocking_receive=False, read_interval=0.01, heartbeat_timeout=0)
+        stop_handlers.extend(handlers)
+        a, b = handlers
+        assert a.send_to_peer(Message.new_request("task", None))
+        assert b.get_next(timeout=5.0).topic == "task"
+
+    def test_idle_reader_does_not_spin(self, stop_handlers):
+        pipes, handlers = _make_handlers(read_interval=0.001, heartbeat_interval=10.0, heartbeat_timeout=0)
+        stop_handlers.extend(handlers)
+        time.sleep(0.5)
+        # a polling reader would have received about 500 times
+        assert pipes[0].num_receives < 20
+
+    def test_heartbeats_from_shared_timer(self, stop_handlers):
+        pipes, handlers = _make_handlers(heartbeat_interval=0.05, heartbeat_timeout=5.0)
+        stop_handlers.extend(handlers)
+        time.sleep(0.5)
+        assert pipes[0].num_heartbeats_received >= 3
+        assert pipes[1].num_heartbeats_received >= 3
+
+        # heartbeats are not sent while paused, and stop after the handler is stopped
+        handlers[0].pause()
+        time.sleep(0.1)
+        count = pipes[1].num_heartbeats_received
+        time.sleep(0.3)
+        assert pipes[1].num_heartbeats_received == count
+        handlers[0].resume()
+        handlers[0].stop(close_pipe=False)
+        time.sleep(0.2)
+        count = pipes[1].num_heartbeats_received
+        time.sleep(0.3)
+        assert pipes[1].num_heartbeats_received == count
+
+    def test_stalled_peer_does_not_block_heartbeats(self, stop_handlers, monkeypatch):
+        monkeypatch.setattr(pipe_handler, "_heartbeat_timer", pipe_handler._HeartbeatTimer(num_workers=1))
+        stalled_pipe = _StalledPipe(str(uuid.uuid4()))
+        stalled_pipe.open("test")
+        stalled = PipeHandler(stalled_pipe, heartbeat_interval=0.05, heartbeat_timeout=0)
+        stalled.start()
+        stop_handlers.append(stalled)
+        try:
+            time.sleep(0.2)
+            assert stalled_pipe.num_sends == 1
+
+            pipes, handlers = _make_handlers(heartbeat_interval=0.05, heartbeat_timeout=5.0)
+            stop_handlers.extend(handlers)
+            time.sleep(0.5)
+            assert pipes[0].num_heartbeats_received >= 3
+            assert pipes[1].num_heartbeats_received >= 3
+            # the stalled handler still occupies one worker at most
+            assert stalled_pipe.num_sends == 1
+        finally:
+            stalled_pipe.released.set()
+
+    def test_get_next_wakes_up_on_stop(self):
+        pipes, handlers = _make_handlers(heartbeat_timeout=0)
+        a, b = handlers
+        threading.Timer(0.1, b.stop).start()
+        start = time.time()
+        assert b.get_next(timeout=5.0) is None
+        assert time.time() - start < 2.0
+        a.stop()
+
+    def test_peer_gone(self, stop_handlers):
+        token = str(uuid.uuid4())
+        pipe = MemoryPipe(token, Mode.ACTIVE)
+        pipe.open("test")
+        handler = PipeHandler(pipe, read_interval=0.01, heartbeat_interval=0.1, heartbeat_timeout=0.3)
+        stop_handlers.append(handler)
+        handler.start()
+        msg = handler.get_next(timeout=5.0)
+        assert msg.topic == Topic.PEER_GONE
@@ -0,0 +1,140 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from nvflare.apis.dxo import DXO, DataKind, from_shareable
+from nvflare.apis.shareable import Shareable
+from nvflare.app_common.decomposers.numpy_decomposers import NumpyArrayDecomposer
+from nvflare.fuel.utils import fobs
+from nvflare.fuel.utils.attributes_exportable import ExportMode
+from nvflare.fuel.utils.constants import Mode
+from nvflare.fuel.utils.fobs.decomposer import DictDecomposer
+from nvflare.fuel.utils.pipe.pipe import Message
+from nvflare.fuel.utils.pipe.shared_memory_pipe import SharedMemoryFileAccessor, SharedMemoryPipe
+
+
+@pytest.fixture
+def pipes(tmp_path):
+    # registered directly, as other tests may reset fobs
+    fobs.register(DictDecomposer(Shareable))
+    fobs.register(NumpyArrayDecomposer)
+    segment_dir = str(tmp_path / "shm")
+    os.makedirs(segment_dir)
+    active = SharedMemoryPipe(Mode.ACTIVE, str(tmp_path / "pipes"), file_check_interval=0.01, segment_dir=segment_dir)
+    passive = SharedMemoryPipe(Mode.PASSIVE, str(tmp_path / "pipes"), file_check_interval=0.01, segment_dir=segment_dir)
+    active.open("test")
+    passive.open("test")
+    yield active, passive, segment_dir
+    active.close()
+    passive.close()
+
+
+def _send(pipe, msg, timeout=5.0):
+    result = {}
+    t = threading.Thread(target=lambda: result.update(sent=pipe.send(msg, timeout)))
+    t.start()
+    return t, result
+
+
+class TestSharedMemoryPipe:
+    def test_send_receive(self, pipes):
+        active, passive, segment_dir = pipes
+        weights = {
+            "large": np.arange(10000, dtype=np.float32).reshape(100, 100),
+            "small": np.array([1, 2, 3]),
+            "strided": np.arange(20000, dtype=np.float64)[::2],
+        }
+        shareable = DXO(data_kind=DataKind.WEIGHTS, data=weights, meta={"round": 3}).to_shareable()
+        t, result = _send(active, Message.new_request("train", shareable))
+        msg = passive.receive(timeout=5.0)
+        t.join()
+
+        assert result["sent"]
+        assert msg.topic == "train"
+        dxo = from_shareable(msg.data)
+        assert dxo.get_meta_prop("round") == 3
+        for k, v in weights.items():
+            np.testing.assert_array_equal(dxo.data[k], v)
+            assert dxo.data[k].dtype == v.dtype
+        # large arrays are views into the mapped segment, which is already removed
+        assert dxo.data["large"].base is not None
+        assert not os.listdir(segment_dir)
+        # the sent data is unchanged
+        assert isinstance(shareable["DXO"]["data"]["large"], np.ndarray)
+
+        # reply in the other direction
+        t, result = _send(passive, Message.new_reply("train", {"w": np.ones(5000)}, msg.msg_id))
+        reply = active.receive(timeout=5.0)
+        t.join()
+        assert reply.req_id == msg.msg_id
+        np.testing.assert_array_equal(reply.data["w"], np.ones(5000))
+
+    def test_tensor(self, pipes):
+        torch = pytest.importorskip("torch")
+        active, passive, _ = pipes
+        tensor = torch.arange(4096, dtype=torch.float32, requires_grad=True)
+        t, _ = _send(active, Message.new_request("train", {"t": tensor, "l": [tensor, 1]}))
+        msg = passive.receive(timeout=5.0)
+        t.join()
+        assert isinstance(msg.data["t"], torch.Tensor)
+        assert torch.equal(msg.data["t"], tensor.detach())
+        assert torch.equal(msg.data["l"][0], tensor.detach())
+
+    def test_timeout_removes_segment(self, pipes):
+        active, _, segment_dir = pipes
+        assert not active.send(Message.new_request("train", {"w": np.ones(5000)}), timeout=0.05)
+        assert not os.listdir(segment_dir)
+
+    def test_clear(self, pipes):
+        active, passive, segment_dir = pipes
+        active.accessor.write({"w": np.ones(5000)}, os.path.join(active.t_path, "REQ.x.1"))
+        assert os.listdir(segment_dir)
+        passive.clear()
+        assert not os.listdir(segment_dir)
+
+    def test_export(self, pipes):
+        active, _, segment_dir = pipes
+        class_path, args = active.export(ExportMode.PEER)
+        assert class_path == "nvflare.fuel.utils.pipe.shared_memory_pipe.SharedMemoryPipe"
+        assert args["mode"] == Mode.PASSIVE
+        assert args["segment_dir"] == segment_dir
+        assert args["file_check_interval"] == 0.01
+        assert args["use_inotify"]
+
+        pipe = SharedMemoryPipe(Mode.PASSIVE, active.root_path, use_inotify=False)
+        _, args = pipe.export(ExportMode.PEER)
+        assert not args["use_inotify"]
+
+
+class TestSharedMemoryFileAccessor:
+    def test_multiple_readers(self, tmp_path):
+        fobs.register(NumpyArrayDecomposer)
+        accessor = SharedMemoryFileAccessor(str(tmp_path), multiple_readers=True)
+        file_path = str(tmp_path / "task")
+        accessor.write({"w": np.arange(5000, dtype=np.float32)}, file_path)
+
+        first = accessor.read(file_path)
+        second = accessor.read(file_path)
+        assert os.path.exists(accessor.get_segment_path(file_path))
+        # the arrays are copy-on-write: a reader does not see the changes of the others
+        first["w"] += 1
+        np.testing.assert_array_equal(second["w"], np.arange(5000, dtype=np.float32))
+
+        accessor.remove_segment(file_path)
+        assert not os.path.exists(accessor.get_segment_path(file_path))
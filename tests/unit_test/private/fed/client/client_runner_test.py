@@ -0,0 +1,163 @@
+# Copyright (c) 2022, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from nvflare.apis.fl_constant import FLContextKey, ReturnCode
+from nvflare.apis.fl_context import FLContext
+from nvflare.apis.shareable import Shareable, make_reply
+from nvflare.fuel.f3.cellnet.fqcn import FQCN
+from nvflare.private.defs import SpecialTaskName, TaskConstant
+from nvflare.private.fed.client.client_engine_executor_spec import TaskAssignment
+from nvflare.private.fed.client.client_runner import ClientRunner, ClientRunnerConfig, TaskRouter
+
+
+def _try_again():
+    data = Shareable()
+    data.set_header(TaskConstant.WAIT_TIME, 0.01)
+    return TaskAssignment(SpecialTaskName.TRY_AGAIN, "", data)
+
+
+class _Server:
+    def __init__(self, tasks):
+        """Hands out the given tasks, and then TRY_AGAIN. A task may be a callable that returns the task."""
+        self.tasks = list(tasks)
+        self.requests = []  # pending task IDs of each task request
+
+    def get_task_assignment(self, fl_ctx: FLContext, timeout=None):
+        self.requests.append(fl_ctx.get_prop(FLContextKey.PENDING_TASK_IDS))
+        if not self.tasks:
+            return _try_again()
+        task = self.tasks.pop(0)
+        if callable(task):
+            task = task()
+        peer_ctx = FLContext()
+        peer_ctx.set_prop("task_id", task.task_id)
+        fl_ctx.set_peer_context(peer_ctx)
+        fl_ctx.set_prop(FLContextKey.SSID, f"ssid_{task.task_id}", sticky=False)
+        return task
+
+
+def _task(task_id: str):
+    return TaskAssignment("train", task_id, Shareable())
+
+
+def _create_runner(server: _Server, send_task_result) -> ClientRunner:
+    engine = MagicMock()
+    engine.new_context.side_effect = FLContext
+    engine.get_task_assignment.side_effect = server.get_task_assignment
+    engine.send_aux_request.return_value = {FQCN.ROOT_SERVER: make_reply(ReturnCode.OK)}
+    engine.send_task_result.side_effect = send_task_result
+
+    runner = ClientRunner(ClientRunnerConfig(TaskRouter(), {}, {}, default_task_fetch_interval=0.01), "job", engine)
+    runner.prefetch_next_task = True
+    runner.fire_event = MagicMock()
+    runner.processed = []  # (task ID, peer task ID, SSID) of each processed task
+
+    def process_task(task, fl_ctx):
+        runner.processed.append(
+            (task.task_id, fl_ctx.get_peer_context().get_prop("task_id"), fl_ctx.get_prop(FLContextKey.SSID))
+        )
+        return Shareable()
+
+    runner._process_task = process_task
+    return runner
+
+
+class TestClientRunnerPrefetch:
+    def test_task_prefetched_while_sending_result(self):
+        prefetched = threading.Event()
+
+        def next_task():
+            prefetched.set()
+            return _task("t2")
+
+        server = _Server([_task("t1"), next_task])
+
+        def send_task_result(result, fl_ctx, timeout=None):
+            # the result of the first task is still being sent when the next task arrives
+            if not runner.processed[1:]:
+                assert prefetched.wait(5.0)
+            return True
+
+        runner = _create_runner(server, send_task_result)
+        assert runner.fetch_and_run_one_task(FLContext())[1]
+        assert server.requests == [None, ["t1"]]
+
+        assert runner.fetch_and_run_one_task(FLContext())[1]
+        # the prefetched task is run with the peer context and SSID of its own task request
+        assert runner.processed == [("t1", "t1", "ssid_t1"), ("t2", "t2", "ssid_t2")]
+        assert server.requests[2:] == [["t2"]] * len(server.requests[2:])
+        # the prefetch of the second round stops once its result is sent
+        runner._prefetch_thread.join(5.0)
+        assert not runner._prefetch_thread.is_alive()
+
+    def test_nothing_prefetched(self):
+        server = _Server([_task("t1")])
+        sent = threading.Event()
+
+        def send_task_result(result, fl_ctx, timeout=None):
+            # the server keeps asking to try again while the result is sent
+            while len(server.requests) < 3:
+                threading.Event().wait(0.01)
+            sent.set()
+            return True
+
+        runner = _create_runner(server, send_task_result)
+        assert runner.fetch_and_run_one_task(FLContext())[1]
+        assert sent.is_set()
+        runner._prefetch_thread.join(5.0)
+        num_requests = len(server.requests)
+        assert server.requests[1:] == [["t1"]] * (num_requests - 1)
+
+        # the next task is fetched as usual
+        _, processed = runner.fetch_and_run_one_task(FLContext())
+        assert not processed
+        assert runner._prefetch_thread is None
+        assert len(server.requests) == num_requests + 1
+        assert server.requests[-1] is None
+        assert runner.processed == [("t1", "t1", "ssid_t1")]
+
+    def test_send_fails_while_prefetch_held(self):
+        request_held = threading.Event()
+        release = threading.Event()
+
+        def held_task():
+            # the server holds the task request until the next task is available
+            request_held.set()
+            release.wait(5.0)
+            return _task("t2")
+
+        server = _Server([_task("t1"), held_task])
+
+        def send_task_result(result, fl_ctx, timeout=None):
+            if runner.processed[1:]:
+                return True
+            assert request_held.wait(5.0)
+            raise RuntimeError("connection lost")
+
+        runner = _create_runner(server, send_task_result)
+        with pytest.raises(RuntimeError, match="connection lost"):
+            runner.fetch_and_run_one_task(FLContext())
+        assert runner._prefetch_stop.is_set()
+        assert runner._prefetch_thread.is_alive()
+
+        # the answer of the held request is still taken by the next fetch
+        threading.Timer(0.1, release.set).start()
+        assert runner.fetch_and_run_one_task(FLContext())[1]
+        assert runner.processed == [("t1", "t1", "ssid_t1"), ("t2", "t2", "ssid_t2")]
+        assert server.requests[:2] == [None, ["t1"]]